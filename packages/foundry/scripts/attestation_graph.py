@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Compact attestation graph storage for the PageRank oracle
+
+Addresses are interned into dense integer ids once, and edges are kept as three
+array-backed columns (source id, destination id, raw weight) instead of one
+NetworkX edge with an attribute dict per attestation. Repeated attestations for the
+same (attester, borrower) pair follow the contract's semantics: the latest weight
+replaces the previous one. Removals are recorded as tombstone rows. Duplicates and
+tombstones are resolved lazily, in bulk, when the edge columns are read.
+
+A graph can also adopt existing NumPy columns (for example memory-mapped ones from
+`attestation_io.py`) without copying; they are converted to growable arrays only
+when further edges are appended.
+"""
+
+from array import array
+from itertools import chain, repeat
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class AddressTable:
+    """Interning table mapping addresses to dense integer ids in first-seen order"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.addresses: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    def __contains__(self, address: str) -> bool:
+        return address in self._ids
+
+    def lookup(self, address: str) -> Optional[int]:
+        """Return the id of an address, or None if it has not been interned"""
+        return self._ids.get(address)
+
+    def intern(self, address: str) -> int:
+        """
+        Return the id of an address, assigning the next free id if it is new
+
+        Args:
+            address: Account address (kept verbatim, no case normalization)
+        """
+        node_id = self._ids.get(address)
+        if node_id is None:
+            node_id = len(self.addresses)
+            self._ids[address] = node_id
+            self.addresses.append(address)
+        return node_id
+
+    def intern_many(self, addresses: Sequence[str]) -> np.ndarray:
+        """
+        Intern a batch of addresses in bulk
+
+        New addresses receive ids in order of first appearance within the batch,
+        matching repeated calls to `intern`. Lookups run through C-level map/dict
+        operations; only addresses not seen before touch Python code.
+
+        Args:
+            addresses: Sequence of addresses (may contain repeats)
+
+        Returns:
+            Array of ids aligned with `addresses`
+        """
+        # dict.fromkeys deduplicates while preserving first-seen order
+        for address in dict.fromkeys(addresses):
+            if address not in self._ids:
+                self.intern(address)
+        return np.fromiter(map(self._ids.__getitem__, addresses), dtype=np.int64, count=len(addresses))
+
+
+# Weight recorded for a removed edge; dropped when the edge columns are compacted
+REMOVED = -1
+
+
+class AttestationGraph:
+    """Directed attester -> borrower graph stored as interned, array-backed edge columns"""
+
+    def __init__(self):
+        self.addresses = AddressTable()
+        self._src = array('I')
+        self._dst = array('I')
+        self._weight = array('q')
+        self._compacted = True
+        # Sorted (src, dst) key index over the compacted columns, built on demand
+        self._key_index = None
+
+    @classmethod
+    def from_columns(cls, addresses: Sequence[str], src: np.ndarray, dst: np.ndarray, weights: np.ndarray,
+                     compacted: bool = False) -> 'AttestationGraph':
+        """
+        Adopt id-based edge columns without copying them
+
+        Args:
+            addresses: Distinct addresses; position i is node id i
+            src: uint32 attester id per edge
+            dst: uint32 borrower id per edge
+            weights: int64 raw weight per edge
+            compacted: Whether the columns are already deduplicated and grouped by
+                source (as written by `write_column_store`)
+        """
+        graph = cls()
+        for address in addresses:
+            graph.addresses.intern(address)
+        if len(graph.addresses) != len(addresses):
+            raise ValueError("Column addresses must be distinct")
+        if not (len(src) == len(dst) == len(weights)):
+            raise ValueError("src, dst and weights must have the same length")
+
+        graph._src = np.asarray(src, dtype=np.uint32)
+        graph._dst = np.asarray(dst, dtype=np.uint32)
+        graph._weight = np.asarray(weights, dtype=np.int64)
+        graph._compacted = compacted
+        return graph
+
+    def add_columns(self, addresses: Sequence[str], src: np.ndarray, dst: np.ndarray, weights: np.ndarray):
+        """
+        Add or replace a batch of edges given as id columns over their own address list
+
+        Args:
+            addresses: Distinct addresses referenced by `src`/`dst`
+            src: Attester index into `addresses` per edge
+            dst: Borrower index into `addresses` per edge
+            weights: Raw weight per edge
+        """
+        weights = np.asarray(weights, dtype=np.int64)
+        if len(weights) and weights.min() < 0:
+            raise ValueError("Attestation weights must be non-negative")
+        remap = self.addresses.intern_many(addresses)
+        self._appendable()
+        self._src.frombytes(remap[np.asarray(src, dtype=np.int64)].astype(np.uint32).tobytes())
+        self._dst.frombytes(remap[np.asarray(dst, dtype=np.int64)].astype(np.uint32).tobytes())
+        self._weight.frombytes(weights.tobytes())
+        self._compacted = False
+
+    def _appendable(self):
+        """Switch adopted NumPy columns back to growable arrays before appending"""
+        if isinstance(self._src, np.ndarray):
+            self._src = array('I', self._src.tobytes())
+            self._dst = array('I', self._dst.tobytes())
+            self._weight = array('q', self._weight.tobytes())
+
+    def add_edge(self, attester: str, borrower: str, weight: int):
+        """
+        Add or replace a single attestation edge
+
+        Args:
+            attester: Address of the attester
+            borrower: Address of the borrower
+            weight: Raw attestation weight (0 to scale)
+        """
+        if weight < 0:
+            raise ValueError("Attestation weight must be non-negative")
+        self._appendable()
+        self._src.append(self.addresses.intern(attester))
+        self._dst.append(self.addresses.intern(borrower))
+        self._weight.append(int(weight))
+        self._compacted = False
+
+    def add_edges(self, attesters: Sequence[str], borrowers: Sequence[str], weights: Sequence[int]):
+        """
+        Add or replace a batch of attestation edges in one vectorized call
+
+        Args:
+            attesters: Attester address per edge
+            borrowers: Borrower address per edge
+            weights: Raw attestation weight per edge
+        """
+        if not (len(attesters) == len(borrowers) == len(weights)):
+            raise ValueError("attesters, borrowers and weights must have the same length")
+        if len(attesters) == 0:
+            return
+        weights = np.asarray(weights, dtype=np.int64)
+        if weights.min() < 0:
+            raise ValueError("Attestation weights must be non-negative")
+
+        # Interleave so node ids follow per-edge (attester, borrower) first appearance
+        ids = self.addresses.intern_many(list(chain.from_iterable(zip(attesters, borrowers))))
+        self._appendable()
+
+        self._src.frombytes(ids[0::2].astype(np.uint32).tobytes())
+        self._dst.frombytes(ids[1::2].astype(np.uint32).tobytes())
+        self._weight.frombytes(weights.tobytes())
+        self._compacted = False
+
+    def remove_edges(self, attesters: Sequence[str], borrowers: Sequence[str]):
+        """
+        Remove a batch of attestation edges
+
+        Nodes are kept (as with NetworkX `remove_edge`); pairs that reference unknown
+        addresses are ignored.
+
+        Args:
+            attesters: Attester address per removed edge
+            borrowers: Borrower address per removed edge
+        """
+        if len(attesters) != len(borrowers):
+            raise ValueError("attesters and borrowers must have the same length")
+        lookup = self.addresses.lookup
+        for attester, borrower in zip(attesters, borrowers):
+            src, dst = lookup(attester), lookup(borrower)
+            if src is not None and dst is not None:
+                self._appendable()
+                self._src.append(src)
+                self._dst.append(dst)
+                self._weight.append(REMOVED)
+                self._compacted = False
+
+    def edge_weights(self, attesters: Sequence[str], borrowers: Sequence[str]) -> np.ndarray:
+        """
+        Look up the current weight of a batch of (attester, borrower) pairs
+
+        Returns:
+            Array of weights aligned with the input, REMOVED (-1) where no edge exists
+        """
+        lookup = self.addresses._ids.get
+        src = np.fromiter(map(lookup, attesters, repeat(-1)), dtype=np.int64, count=len(attesters))
+        dst = np.fromiter(map(lookup, borrowers, repeat(-1)), dtype=np.int64, count=len(borrowers))
+        position, found = self._find_edges(src, dst)
+        weights = np.full(len(src), REMOVED, dtype=np.int64)
+        weights[found] = self.edge_arrays()[2][position[found]]
+        return weights
+
+    def diff(self, other: 'AttestationGraph') -> Dict[str, int]:
+        """
+        Count the edge changes needed to turn this graph into `other`
+
+        Args:
+            other: The newer graph (its own address table, matched by address)
+
+        Returns:
+            Dictionary with "added", "updated" and "removed" edge counts
+        """
+        weight = self.edge_arrays()[2]
+        other_src, other_dst, other_weight = other.edge_arrays()
+        to_self = self.id_map(other)
+
+        position, found = self._find_edges(to_self[other_src], to_self[other_dst])
+        return {
+            'added': int((~found).sum()),
+            'updated': int((found & (weight[position] != other_weight)).sum()),
+            'removed': int(len(weight) - found.sum()),
+        }
+
+    def _find_edges(self, src: np.ndarray, dst: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Locate (src, dst) id pairs in the compacted edge columns
+
+        Returns:
+            Tuple (position, found): edge index per pair and whether the edge exists.
+            Ids of -1 (unknown addresses) never match.
+        """
+        edge_src, edge_dst, _ = self.edge_arrays()
+        if self._key_index is None:
+            keys = edge_src.astype(np.int64) * max(len(self.addresses), 1) + edge_dst
+            self._key_index = (keys, np.argsort(keys))
+        keys, sorter = self._key_index
+
+        known = (src >= 0) & (dst >= 0)
+        if len(keys) == 0:
+            return np.zeros(len(src), dtype=np.int64), np.zeros(len(src), dtype=bool)
+        wanted = np.where(known, src * max(len(self.addresses), 1) + dst, -1)
+        position = sorter[np.searchsorted(keys, wanted, sorter=sorter).clip(max=len(keys) - 1)]
+        return position, known & (keys[position] == wanted)
+
+    def id_map(self, other: 'AttestationGraph') -> np.ndarray:
+        """
+        Map node ids of `other` to node ids of this graph
+
+        Returns:
+            Array indexed by `other`'s node id holding this graph's id, or -1 if absent
+        """
+        return np.fromiter(
+            map(self.addresses._ids.get, other.addresses.addresses, repeat(-1)),
+            dtype=np.int64,
+            count=len(other.addresses)
+        )
+
+    def _compact(self):
+        """
+        Resolve repeated (src, dst) pairs and group edges by source node
+
+        The last weight written for a pair wins and removed pairs are dropped. Edges
+        are ordered by source id, then by first insertion, which is the adjacency order
+        NetworkX would report.
+        """
+        if self._compacted:
+            return
+        src = np.frombuffer(self._src, dtype=np.uint32).astype(np.int64)
+        dst = np.frombuffer(self._dst, dtype=np.uint32).astype(np.int64)
+        weight = np.frombuffer(self._weight, dtype=np.int64)
+
+        key = src * max(len(self.addresses), 1) + dst
+        _, first_index = np.unique(key, return_index=True)
+        _, last_from_end = np.unique(key[::-1], return_index=True)
+        last_index = len(key) - 1 - last_from_end
+
+        order = np.lexsort((first_index, src[first_index]))
+        first_index, last_index = first_index[order], last_index[order]
+        live = weight[last_index] != REMOVED
+        first_index, last_index = first_index[live], last_index[live]
+
+        self._src = array('I', src[first_index].astype(np.uint32).tobytes())
+        self._dst = array('I', dst[first_index].astype(np.uint32).tobytes())
+        self._weight = array('q', weight[last_index].tobytes())
+        self._compacted = True
+        self._key_index = None
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the deduplicated edge columns
+
+        Returns:
+            Tuple (src, dst, weight) of read-only NumPy views, one entry per distinct
+            (attester, borrower) pair, grouped by source id
+        """
+        self._compact()
+        return (
+            np.frombuffer(self._src, dtype=np.uint32),
+            np.frombuffer(self._dst, dtype=np.uint32),
+            np.frombuffer(self._weight, dtype=np.int64),
+        )
+
+    def number_of_nodes(self) -> int:
+        return len(self.addresses)
+
+    def number_of_edges(self) -> int:
+        self._compact()
+        return len(self._src)
+
+    def iter_edges(self) -> Iterable[Tuple[str, str, int]]:
+        """Yield (attester, borrower, weight) tuples for every distinct edge"""
+        names = self.addresses.addresses
+        src, dst, weight = self.edge_arrays()
+        for u, v, w in zip(src.tolist(), dst.tolist(), weight.tolist()):
+            yield names[u], names[v], w
+
+    def to_networkx(self, scale: int = 1):
+        """
+        Materialize the graph as a NetworkX DiGraph
+
+        Args:
+            scale: Divisor applied to raw weights (edge attribute "weight")
+        """
+        import networkx as nx
+
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.addresses.addresses)
+        graph.add_weighted_edges_from((u, v, w / scale) for u, v, w in self.iter_edges())
+        return graph
+
+
+def flatten_attestation_data(attestation_data: Dict[str, Any]) -> Tuple[List[str], List[str], List[int]]:
+    """
+    Flatten the contract export shape into parallel edge columns
+
+    Args:
+        attestation_data: Dictionary with borrowers, attesters, and weights arrays
+            (as returned by exportAttestationData)
+
+    Returns:
+        Tuple (attesters, borrowers, weights) with one entry per attestation. Entries
+        without a matching attester/weight (ragged input) are skipped.
+    """
+    borrowers = attestation_data.get('borrowers', [])
+    attesters_arrays = attestation_data.get('attesters', [])
+    weights_arrays = attestation_data.get('weights', [])
+
+    flat_attesters: List[str] = []
+    flat_borrowers: List[str] = []
+    flat_weights: List[int] = []
+    count = min(len(borrowers), len(attesters_arrays), len(weights_arrays))
+    for borrower, attesters, weights in zip(borrowers[:count], attesters_arrays, weights_arrays):
+        k = min(len(attesters), len(weights))
+        flat_attesters.extend(attesters[:k])
+        flat_borrowers.extend([borrower] * k)
+        flat_weights.extend(weights[:k])
+
+    return flat_attesters, flat_borrowers, flat_weights
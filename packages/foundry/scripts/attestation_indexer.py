@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Checkpointed MetaAttested event indexer for the PageRank oracle
+
+Instead of re-reading every borrower's attestations through exportAttestationData(),
+the indexer scans `MetaAttested(address indexed attester, address indexed borrower,
+uint256 weight)` logs in block ranges and keeps two things in a local SQLite store:
+the latest weight per (attester, borrower) edge and the last fully indexed block.
+Each block range is committed atomically with the cursor, so after a restart the
+indexer reloads the edge table from disk and resumes from the checkpoint instead of
+scanning history again. Only newly indexed edges are fed into the calculator.
+
+Logs come from a JSON-RPC endpoint (`eth_getLogs`, e.g. anvil at localhost:8545) or,
+for tests, from a JSON file holding the same log objects.
+
+Note: `recordAttestation` does not emit an event, so only meta-attestations are indexed.
+
+Usage:
+    python attestation_indexer.py sync [options]
+    python attestation_indexer.py watch [options]
+    python attestation_indexer.py export <attestations.json> [options]
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+from evm_encoding import keccak256
+from pagerank_calculator import PageRankCalculator
+
+META_ATTESTED_TOPIC = '0x' + keccak256(b'MetaAttested(address,address,uint256)').hex()
+DEFAULT_RPC_URL = 'http://localhost:8545'
+DEFAULT_DATABASE = 'attestation_index.db'
+DEFAULT_BLOCK_RANGE = 2_000
+DEPLOYMENT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'deployment.json')
+
+
+class JsonRpcError(RuntimeError):
+    """Error response from a JSON-RPC endpoint"""
+
+    def __init__(self, method: str, error: Dict[str, Any]):
+        super().__init__(f"{method} failed: {error.get('message', error)}")
+        self.code = error.get('code')
+
+
+class JsonRpcLogSource:
+    """MetaAttested logs fetched with eth_getLogs"""
+
+    def __init__(self, url: str, contract_address: str, timeout: float = 30.0):
+        """
+        Args:
+            url: JSON-RPC endpoint URL
+            contract_address: DecentralizedMicrocredit address
+            timeout: Request timeout in seconds
+        """
+        self.url = url
+        self.contract_address = contract_address
+        self.timeout = timeout
+        self._request_id = 0
+
+    def _call(self, method: str, params: List[Any]) -> Any:
+        self._request_id += 1
+        body = json.dumps({'jsonrpc': '2.0', 'id': self._request_id, 'method': method, 'params': params})
+        request = urllib.request.Request(self.url, data=body.encode(), headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            reply = json.load(response)
+        if 'error' in reply:
+            raise JsonRpcError(method, reply['error'])
+        return reply['result']
+
+    def latest_block(self) -> int:
+        return int(self._call('eth_blockNumber', []), 16)
+
+    def get_logs(self, from_block: int, to_block: int) -> List[Dict[str, Any]]:
+        return self._call('eth_getLogs', [{
+            'address': self.contract_address,
+            'fromBlock': hex(from_block),
+            'toBlock': hex(to_block),
+            'topics': [META_ATTESTED_TOPIC],
+        }])
+
+
+class FileLogSource:
+    """
+    Local stand-in for the RPC source
+
+    Reads a JSON file with a list of eth_getLogs-style log objects, or an object
+    {"latestBlock": n, "logs": [...]}. The file is re-read on every scan, so a test
+    can append logs between polls.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _load(self) -> Tuple[int, List[Dict[str, Any]]]:
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+        logs = data['logs'] if isinstance(data, dict) else data
+        latest = max((_quantity(log['blockNumber']) for log in logs), default=0)
+        if isinstance(data, dict) and 'latestBlock' in data:
+            latest = _quantity(data['latestBlock'])
+        return latest, logs
+
+    def latest_block(self) -> int:
+        return self._load()[0]
+
+    def get_logs(self, from_block: int, to_block: int) -> List[Dict[str, Any]]:
+        _, logs = self._load()
+        return [
+            log for log in logs
+            if from_block <= _quantity(log['blockNumber']) <= to_block
+            and log['topics'] and log['topics'][0].lower() == META_ATTESTED_TOPIC
+        ]
+
+
+def _quantity(value) -> int:
+    """Decode a JSON-RPC quantity (hex string) or plain integer"""
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+def decode_meta_attested(log: Dict[str, Any]) -> Tuple[str, str, int, int, int]:
+    """
+    Decode one MetaAttested log
+
+    Returns:
+        Tuple (attester, borrower, weight, block_number, log_index)
+    """
+    topics = log['topics']
+    attester = '0x' + topics[1][-40:].lower()
+    borrower = '0x' + topics[2][-40:].lower()
+    weight = int(log['data'], 16)
+    return attester, borrower, weight, _quantity(log['blockNumber']), _quantity(log['logIndex'])
+
+
+class AttestationStore:
+    """SQLite edge table and block cursor"""
+
+    def __init__(self, path: str = DEFAULT_DATABASE):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS edges (
+                attester TEXT NOT NULL,
+                borrower TEXT NOT NULL,
+                weight INTEGER NOT NULL,
+                block_number INTEGER NOT NULL,
+                log_index INTEGER NOT NULL,
+                PRIMARY KEY (attester, borrower)
+            );
+        """)
+
+    def close(self):
+        self._db.close()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def bind_contract(self, contract_address: str):
+        """
+        Tie the store to one contract address
+
+        Raises:
+            ValueError: If the store already indexes a different contract
+        """
+        stored = self.get_meta('contract')
+        if stored is None:
+            with self._db:
+                self._db.execute("INSERT INTO meta VALUES ('contract', ?)", (contract_address.lower(),))
+        elif stored != contract_address.lower():
+            raise ValueError(f"{self.path} indexes contract {stored}, not {contract_address}")
+
+    def last_block(self) -> Optional[int]:
+        """Last fully indexed block, or None if nothing was indexed yet"""
+        value = self.get_meta('last_block')
+        return None if value is None else int(value)
+
+    def apply(self, events: List[Tuple[str, str, int, int, int]], last_block: int):
+        """
+        Upsert decoded events and advance the cursor in one transaction
+
+        Args:
+            events: (attester, borrower, weight, block_number, log_index) tuples
+            last_block: Block up to which the range is complete
+        """
+        with self._db:
+            self._db.executemany("""
+                INSERT INTO edges VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (attester, borrower) DO UPDATE SET
+                    weight = excluded.weight,
+                    block_number = excluded.block_number,
+                    log_index = excluded.log_index
+                WHERE (excluded.block_number, excluded.log_index) > (edges.block_number, edges.log_index)
+            """, events)
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('last_block', ?)", (str(last_block),))
+
+    def edges(self) -> Tuple[List[str], List[str], List[int]]:
+        """All edges in first-indexed order, as (attesters, borrowers, weights) columns"""
+        rows = self._db.execute("SELECT attester, borrower, weight FROM edges ORDER BY rowid").fetchall()
+        if not rows:
+            return [], [], []
+        attesters, borrowers, weights = zip(*rows)
+        return list(attesters), list(borrowers), list(weights)
+
+    def edge_count(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+
+
+class AttestationIndexer:
+    def __init__(self, source, store: AttestationStore, calculator: Optional[PageRankCalculator] = None,
+                 start_block: int = 0, block_range: int = DEFAULT_BLOCK_RANGE, confirmations: int = 0):
+        """
+        Initialize the indexer
+
+        Args:
+            source: Log source (JsonRpcLogSource or FileLogSource)
+            store: Local edge/cursor store
+            calculator: Calculator fed with indexed edges (optional)
+            start_block: First block to scan when the store has no cursor
+            block_range: Maximum blocks per eth_getLogs request
+            confirmations: Blocks to stay behind the head (reorg safety)
+        """
+        self.source = source
+        self.store = store
+        self.calculator = calculator
+        self.start_block = start_block
+        self.block_range = block_range
+        self.confirmations = confirmations
+
+    def resume(self) -> int:
+        """
+        Load the persisted edge table into the calculator
+
+        Returns:
+            Number of edges loaded from the store
+        """
+        attesters, borrowers, weights = self.store.edges()
+        if self.calculator is not None and attesters:
+            self.calculator.add_attestations(attesters, borrowers, weights)
+        return len(attesters)
+
+    def poll(self) -> int:
+        """
+        Index all confirmed blocks after the cursor and feed new edges to the calculator
+
+        Returns:
+            Number of MetaAttested events indexed
+        """
+        head = self.source.latest_block() - self.confirmations
+        last = self.store.last_block()
+        next_block = self.start_block if last is None else last + 1
+        indexed = 0
+        span = self.block_range
+
+        while next_block <= head:
+            to_block = min(next_block + span - 1, head)
+            try:
+                logs = self.source.get_logs(next_block, to_block)
+            except JsonRpcError:
+                # Providers cap results per request; retry with a smaller range
+                if span == 1:
+                    raise
+                span = max(1, span // 2)
+                continue
+
+            events = sorted(
+                (decode_meta_attested(log) for log in logs if not log.get('removed', False)),
+                key=lambda event: (event[3], event[4])
+            )
+            self.store.apply(events, to_block)
+            if self.calculator is not None and events:
+                attesters, borrowers, weights, _, _ = zip(*events)
+                self.calculator.add_attestations(attesters, borrowers, weights)
+
+            indexed += len(events)
+            next_block = to_block + 1
+            span = self.block_range
+        return indexed
+
+    def watch(self, interval: float = 5.0, on_update=None):
+        """
+        Poll forever, calling `on_update(count)` after polls that indexed new events
+
+        Args:
+            interval: Seconds to sleep between polls
+            on_update: Optional callback receiving the number of new events
+        """
+        while True:
+            count = self.poll()
+            if count and on_update is not None:
+                on_update(count)
+            time.sleep(interval)
+
+
+def default_contract_address() -> Optional[str]:
+    """DecentralizedMicrocredit address from deployment.json, if present"""
+    if not os.path.exists(DEPLOYMENT_FILE):
+        return None
+    with open(DEPLOYMENT_FILE, 'r') as f:
+        return json.load(f).get('DecentralizedMicrocredit')
+
+
+def main():
+    """Index MetaAttested events and export the edge table"""
+    options = {
+        'rpc': DEFAULT_RPC_URL,
+        'contract': None,
+        'logs': None,
+        'db': DEFAULT_DATABASE,
+        'from-block': '0',
+        'block-range': str(DEFAULT_BLOCK_RANGE),
+        'confirmations': '0',
+        'interval': '5',
+        'backend': 'networkx',
+    }
+    for arg in [a for a in sys.argv if a.startswith('--') and '=' in a]:
+        name, value = arg[2:].split('=', 1)
+        if name in options:
+            options[name] = value
+            sys.argv.remove(arg)
+
+    if len(sys.argv) < 2:
+        print("Usage: python attestation_indexer.py <command> [args...] [options]")
+        print("Commands:")
+        print("  sync - Index new MetaAttested events up to the confirmed head")
+        print("  watch - Keep indexing and recompute PageRank after new events")
+        print("  export <attestations.json> - Write indexed edges as an attestation list")
+        print("Options:")
+        print(f"  --rpc=<url> - JSON-RPC endpoint (default {DEFAULT_RPC_URL})")
+        print("  --contract=<address> - Contract address (default from deployment.json)")
+        print("  --logs=<file> - Read logs from a JSON file instead of RPC")
+        print(f"  --db=<file> - SQLite store (default {DEFAULT_DATABASE})")
+        print("  --from-block=<n> - First block when the store is empty (default 0)")
+        print(f"  --block-range=<n> - Blocks per eth_getLogs request (default {DEFAULT_BLOCK_RANGE})")
+        print("  --confirmations=<n> - Blocks to stay behind the head (default 0)")
+        print("  --interval=<seconds> - Poll interval for watch (default 5)")
+        print("  --backend=<name> - PageRank engine for watch (default networkx)")
+        return
+
+    command = sys.argv[1]
+    store = AttestationStore(options['db'])
+    try:
+        if command == "export":
+            if len(sys.argv) < 3:
+                print("Error: Please provide an output JSON file")
+                return
+            attesters, borrowers, weights = store.edges()
+            with open(sys.argv[2], 'w') as f:
+                json.dump([
+                    {'attester': a, 'borrower': b, 'weight': w}
+                    for a, b, w in zip(attesters, borrowers, weights)
+                ], f, indent=2)
+            print(f"Exported {len(attesters)} attestations to {sys.argv[2]}")
+            return
+
+        if options['logs'] is not None:
+            source = FileLogSource(options['logs'])
+        else:
+            contract = options['contract'] or default_contract_address()
+            if contract is None:
+                print("Error: Please provide --contract=<address> or a deployment.json")
+                return
+            store.bind_contract(contract)
+            source = JsonRpcLogSource(options['rpc'], contract)
+
+        calculator = PageRankCalculator(backend=options['backend']) if command == "watch" else None
+        indexer = AttestationIndexer(
+            source, store, calculator,
+            start_block=int(options['from-block']),
+            block_range=int(options['block-range']),
+            confirmations=int(options['confirmations']),
+        )
+
+        if command == "sync":
+            count = indexer.poll()
+            print(f"Indexed {count} events up to block {store.last_block()} ({store.edge_count()} edges)")
+        elif command == "watch":
+            print(f"Resumed {indexer.resume()} edges from {options['db']} at block {store.last_block()}")
+
+            def recompute(count: int):
+                scores = calculator.compute_pagerank(warm_start=calculator.has_scores())
+                print(f"Indexed {count} events up to block {store.last_block()}; "
+                      f"recomputed {len(scores)} scores")
+
+            recompute(0)
+            indexer.watch(float(options['interval']), recompute)
+        else:
+            print(f"Unknown command: {command}")
+
+    except FileNotFoundError as e:
+        print(f"Error: File {e.filename} not found")
+    except (OSError, JsonRpcError) as e:
+        print(f"Error: {e}")
+    except ValueError as e:
+        print(f"Error: {e}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
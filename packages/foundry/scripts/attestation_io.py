@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+"""
+Streaming and columnar attestation input for the PageRank oracle
+
+Large contract exports should not be `json.load`-ed into nested Python lists before the
+graph is built. This module provides:
+
+- A streaming reader for both existing JSON shapes: a list of
+  {"attester", "borrower", "weight"} objects, and the exportAttestationData() object
+  with borrowers/attesters/weights arrays (plus optional "personalization"). Elements
+  are decoded incrementally and interned straight into compact id/weight columns, so
+  memory stays proportional to the columns rather than to the JSON text.
+- A columnar on-disk store: a directory holding fixed-width `.npy` columns
+  (addresses, src, dst, weight) that is memory-mapped on load, letting the calculator
+  adopt the edge columns without parsing or copying.
+
+Usage:
+    python attestation_io.py convert <attestations.json> <store_dir>
+    python attestation_io.py info <attestations.json|store_dir>
+"""
+
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from attestation_graph import AddressTable, AttestationGraph, flatten_attestation_data
+from personalization import Personalization
+
+COLUMN_STORE_FORMAT = 'attestation-columns'
+COLUMN_STORE_VERSION = 1
+# Number of streamed elements interned per bulk call
+BATCH_SIZE = 65_536
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Characters a number can continue with ("12" + ".5", "1" + "e3")
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+
+
+class AttestationColumns:
+    """Attestations as id columns over a distinct address list"""
+
+    def __init__(self, addresses: Sequence[str], src: np.ndarray, dst: np.ndarray, weights: np.ndarray,
+                 personalization: Optional[Dict[str, Any]] = None, compacted: bool = False):
+        """
+        Args:
+            addresses: Distinct addresses; position i is node id i
+            src: Attester id per attestation
+            dst: Borrower id per attestation
+            weights: Raw weight per attestation
+            personalization: Optional "personalization" object (oracle input format)
+            compacted: Whether the columns are deduplicated and grouped by source
+        """
+        self.addresses = addresses
+        self.src = src
+        self.dst = dst
+        self.weights = weights
+        self.personalization = personalization
+        self.compacted = compacted
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    @classmethod
+    def from_contract_data(cls, attestation_data: Dict[str, Any]) -> 'AttestationColumns':
+        """Build columns from an in-memory exportAttestationData() style dictionary"""
+        graph = AttestationGraph()
+        graph.add_edges(*flatten_attestation_data(attestation_data))
+        src, dst, weight = graph.edge_arrays()
+        return cls(graph.addresses.addresses, src, dst, weight,
+                   attestation_data.get('personalization'), compacted=True)
+
+    def to_graph(self) -> AttestationGraph:
+        """Adopt the columns as an AttestationGraph (no copy)"""
+        return AttestationGraph.from_columns(self.addresses, self.src, self.dst, self.weights,
+                                             compacted=self.compacted)
+
+    def get_personalization(self) -> Optional[Personalization]:
+        """Personalization inputs carried with the columns, if any"""
+        if self.personalization is None:
+            return None
+        return Personalization.from_dict(self.personalization)
+
+
+class JsonStreamReader:
+    """Incremental JSON reader that decodes one array element or object member at a time"""
+
+    def __init__(self, stream, chunk_size: int = 1 << 20):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        # Number of successful fills, and the fill whose buffer could not be bulk-decoded
+        self._fills = 0
+        self._bulk_failed = -1
+
+    def _fill(self, size: int = 0) -> bool:
+        """
+        Append input, dropping already-consumed text; False at end of input
+
+        Reads at least one chunk, and more until `size` characters are unconsumed. The
+        chunks are joined once, so growing the buffer by many chunks stays linear.
+        """
+        if self._eof:
+            return False
+        chunks = [self._buffer[self._pos:]]
+        length = len(chunks[0])
+        while True:
+            chunk = self._stream.read(self._chunk_size)
+            if not chunk:
+                self._eof = True
+                break
+            chunks.append(chunk)
+            length += len(chunk)
+            if length >= size:
+                break
+        if len(chunks) == 1:
+            return False
+        self._buffer = ''.join(chunks)
+        self._pos = 0
+        self._fills += 1
+        return True
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at end)"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise self._error(f"Expecting '{char}'")
+        self._pos += 1
+
+    def end(self):
+        """Check that only whitespace follows the top-level value, as json.load does"""
+        if self.peek():
+            raise self._error("Extra data")
+
+    def value(self) -> Any:
+        """
+        Decode and return the next complete JSON value
+
+        Prefer `items()`/`members()` for large containers: a value is decoded whole, so
+        it must fit in the buffer.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # Incomplete value: retry once the unconsumed text has doubled, so a value
+                # spanning many chunks is decoded a logarithmic number of times
+                if self._fill(2 * (len(self._buffer) - self._pos)):
+                    continue
+                raise
+            # A number or literal running to the buffer end may continue in the next
+            # chunk, so only accept it once more input (or EOF) has been seen.
+            if (self._buffer[end - 1] not in '"]}'
+                    and _NUMBER_TAIL.match(self._buffer, end).end() == len(self._buffer) and self._fill()):
+                continue
+            self._pos = end
+            return value
+
+    def _scalar_run(self) -> List[Any]:
+        """
+        Decode the buffered scalar elements followed by a comma in one call
+
+        Covers the text up to the last comma before the next ']', and consumes it only if
+        it decodes as a list of complete elements (a cut inside a string or a nested
+        value does not). After a failure the per-element path is used until the next fill.
+        """
+        if self._bulk_failed == self._fills:
+            return []
+        close = self._buffer.find(']', self._pos)
+        cut = self._buffer.rfind(',', self._pos, close if close >= 0 else len(self._buffer))
+        if cut <= self._pos:
+            return []
+        try:
+            values = self._decoder.decode('[' + self._buffer[self._pos:cut] + ']')
+        except json.JSONDecodeError:
+            self._bulk_failed = self._fills
+            return []
+        self._pos = cut + 1
+        return values
+
+    def items(self) -> Iterator[Any]:
+        """Iterate over the elements of the array starting at the current position"""
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            if self.peek() not in '[{':
+                # Runs of numbers, strings and literals are decoded in bulk
+                yield from self._scalar_run()
+            yield self.value()
+            char = self.peek()
+            self._pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                self._pos -= 1
+                raise self._error("Expecting ',' delimiter")
+
+    def members(self) -> Iterator[str]:
+        """
+        Iterate over the keys of the object starting at the current position
+
+        The caller must consume each member's value (`value()` or `items()`) before
+        advancing the iterator.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise self._error("Expecting property name")
+            self.expect(':')
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                self._pos -= 1
+                raise self._error("Expecting ',' delimiter")
+
+
+def _batched(iterator: Iterator[Any], size: int = BATCH_SIZE, nested: bool = False) -> Iterator[List[Any]]:
+    """Group streamed elements into lists of about `size` entries (counting inner items if nested)"""
+    batch = []
+    count = 0
+    for item in iterator:
+        batch.append(item)
+        count += len(item) if nested else 1
+        if count >= size:
+            yield batch
+            batch = []
+            count = 0
+    if batch:
+        yield batch
+
+
+def _segment_positions(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Flat positions [starts[i], starts[i] + lengths[i]) for every segment, vectorized"""
+    total = int(lengths.sum())
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + (np.arange(total) - offsets)
+
+
+def _first_seen_order(addresses: Sequence[str], src: np.ndarray, dst: np.ndarray):
+    """
+    Renumber nodes by first appearance over (attester, borrower) pairs
+
+    This makes streamed columns produce the same node order as the in-memory path,
+    which adds edges borrower by borrower, attester first.
+    """
+    interleaved = np.empty(2 * len(src), dtype=np.int64)
+    interleaved[0::2] = src
+    interleaved[1::2] = dst
+    unique, first_index = np.unique(interleaved, return_index=True)
+    order = unique[np.argsort(first_index, kind='stable')]
+
+    remap = np.full(len(addresses), -1, dtype=np.int64)
+    remap[order] = np.arange(len(order))
+    return [addresses[i] for i in order.tolist()], remap[src], remap[dst]
+
+
+def _read_personalization(reader: JsonStreamReader) -> Any:
+    """Stream the "personalization" object, decoding its array columns element by element"""
+    if reader.peek() != '{':
+        return reader.value()
+    personalization = {}
+    for key in reader.members():
+        personalization[key] = list(reader.items()) if reader.peek() == '[' else reader.value()
+    return personalization
+
+
+def _read_attestation_list(reader: JsonStreamReader) -> AttestationColumns:
+    """Stream a list of {"attester", "borrower", "weight"} objects"""
+    table = AddressTable()
+    ids: List[np.ndarray] = []
+    weights: List[np.ndarray] = []
+    for batch in _batched(reader.items()):
+        pairs = []
+        for attestation in batch:
+            pairs.append(attestation['attester'])
+            pairs.append(attestation['borrower'])
+        ids.append(table.intern_many(pairs))
+        weights.append(np.fromiter((a['weight'] for a in batch), dtype=np.int64, count=len(batch)))
+
+    pair_ids = np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+    weight = np.concatenate(weights) if weights else np.zeros(0, dtype=np.int64)
+    return AttestationColumns(table.addresses, pair_ids[0::2], pair_ids[1::2], weight)
+
+
+def _read_contract_export(reader: JsonStreamReader) -> AttestationColumns:
+    """Stream an exportAttestationData() object (borrowers/attesters/weights arrays)"""
+    table = AddressTable()
+    borrower_ids: List[np.ndarray] = []
+    attester_ids: List[np.ndarray] = []
+    attester_counts: List[int] = []
+    weight_values: List[np.ndarray] = []
+    weight_counts: List[int] = []
+    personalization = None
+
+    for key in reader.members():
+        if key == 'borrowers':
+            for batch in _batched(reader.items()):
+                borrower_ids.append(table.intern_many(batch))
+        elif key == 'attesters':
+            for batch in _batched(reader.items(), nested=True):
+                attester_counts.extend(len(group) for group in batch)
+                attester_ids.append(table.intern_many([a for group in batch for a in group]))
+        elif key == 'weights':
+            for batch in _batched(reader.items(), nested=True):
+                weight_counts.extend(len(group) for group in batch)
+                weight_values.append(np.asarray([w for group in batch for w in group], dtype=np.int64))
+        elif key == 'personalization':
+            personalization = _read_personalization(reader)
+        else:
+            reader.value()
+
+    def joined(parts: List[np.ndarray]) -> np.ndarray:
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    borrowers = joined(borrower_ids)
+    attesters, weights = joined(attester_ids), joined(weight_values)
+    attester_counts = np.asarray(attester_counts, dtype=np.int64)
+    weight_counts = np.asarray(weight_counts, dtype=np.int64)
+
+    # Same truncation rules as flatten_attestation_data, applied per borrower in bulk
+    count = min(len(borrowers), len(attester_counts), len(weight_counts))
+    attester_counts, weight_counts = attester_counts[:count], weight_counts[:count]
+    taken = np.minimum(attester_counts, weight_counts)
+    attester_starts = np.cumsum(attester_counts) - attester_counts
+    weight_starts = np.cumsum(weight_counts) - weight_counts
+
+    src = attesters[_segment_positions(attester_starts, taken)]
+    weight = weights[_segment_positions(weight_starts, taken)]
+    dst = np.repeat(borrowers[:count], taken)
+
+    addresses, src, dst = _first_seen_order(table.addresses, src, dst)
+    return AttestationColumns(addresses, src, dst, weight, personalization)
+
+
+def read_attestation_json(path: str) -> AttestationColumns:
+    """
+    Stream either supported JSON shape into attestation columns
+
+    Raises:
+        json.JSONDecodeError: On malformed JSON or an unsupported top-level value
+        KeyError: When a list entry lacks attester, borrower or weight
+    """
+    with open(path, 'r') as f:
+        reader = JsonStreamReader(f)
+        first = reader.peek()
+        if first == '[':
+            columns = _read_attestation_list(reader)
+        elif first == '{':
+            columns = _read_contract_export(reader)
+        else:
+            raise reader._error("Expecting attestation list or export object")
+        reader.end()
+        return columns
+
+
+def write_column_store(path: str, columns: AttestationColumns):
+    """
+    Write attestation columns as a memory-mappable column store directory
+
+    Columns are deduplicated and grouped by source first, so loading needs no further
+    processing.
+
+    Args:
+        path: Target directory (created if needed)
+        columns: Attestation columns to store
+    """
+    graph = columns.to_graph()
+    src, dst, weight = graph.edge_arrays()
+    addresses = graph.addresses.addresses
+    width = max((len(a) for a in addresses), default=1)
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, 'addresses.npy'), np.array(addresses, dtype=f'S{width}'))
+    np.save(os.path.join(path, 'src.npy'), np.ascontiguousarray(src, dtype=np.uint32))
+    np.save(os.path.join(path, 'dst.npy'), np.ascontiguousarray(dst, dtype=np.uint32))
+    np.save(os.path.join(path, 'weight.npy'), np.ascontiguousarray(weight, dtype=np.int64))
+    if columns.personalization is not None:
+        with open(os.path.join(path, 'personalization.json'), 'w') as f:
+            json.dump(columns.personalization, f)
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump({
+            'format': COLUMN_STORE_FORMAT,
+            'version': COLUMN_STORE_VERSION,
+            'node_count': len(addresses),
+            'edge_count': len(src),
+        }, f, indent=2)
+
+
+def map_column_store(path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Optional[Dict[str, Any]]]:
+    """
+    Memory-map the raw columns of a store written by `write_column_store`
+
+    Addresses stay a fixed-width bytes column, so nothing proportional to the graph is
+    read into memory.
+
+    Returns:
+        Tuple (addresses, src, dst, weight, personalization)
+
+    Raises:
+        FileNotFoundError: If the directory or one of its columns is missing
+        ValueError: If the directory is not an attestation column store
+    """
+    with open(os.path.join(path, 'meta.json'), 'r') as f:
+        meta = json.load(f)
+    if meta.get('format') != COLUMN_STORE_FORMAT or meta.get('version') != COLUMN_STORE_VERSION:
+        raise ValueError(f"{path} is not a version {COLUMN_STORE_VERSION} attestation column store")
+
+    def column(name: str) -> np.ndarray:
+        return np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+
+    personalization = None
+    personalization_path = os.path.join(path, 'personalization.json')
+    if os.path.exists(personalization_path):
+        with open(personalization_path, 'r') as f:
+            personalization = json.load(f)
+    return column('addresses'), column('src'), column('dst'), column('weight'), personalization
+
+
+def read_column_store(path: str) -> AttestationColumns:
+    """
+    Memory-map a column store written by `write_column_store`
+
+    Raises:
+        FileNotFoundError: If the directory or one of its columns is missing
+        ValueError: If the directory is not an attestation column store
+    """
+    addresses, src, dst, weight, personalization = map_column_store(path)
+    return AttestationColumns([a.decode() for a in addresses.tolist()], src, dst, weight,
+                              personalization, compacted=True)
+
+
+def load_attestation_columns(path: str) -> AttestationColumns:
+    """Load attestations from a column store directory or stream them from a JSON file"""
+    if os.path.isdir(path):
+        return read_column_store(path)
+    return read_attestation_json(path)
+
+
+def main():
+    """Convert or inspect attestation inputs"""
+    if len(sys.argv) < 3:
+        print("Usage: python attestation_io.py <command> [args...]")
+        print("Commands:")
+        print("  convert <attestations.json> <store_dir> - Write a memory-mappable column store")
+        print("  info <attestations.json|store_dir> - Print node and edge counts")
+        return
+
+    command = sys.argv[1]
+    source = sys.argv[2]
+    try:
+        if command == "convert":
+            if len(sys.argv) < 4:
+                print("Error: Please provide an output directory")
+                return
+            columns = load_attestation_columns(source)
+            write_column_store(sys.argv[3], columns)
+            print(f"Wrote {len(columns)} attestations over {len(columns.addresses)} addresses to {sys.argv[3]}")
+        elif command == "info":
+            columns = load_attestation_columns(source)
+            print(json.dumps({
+                'node_count': len(columns.addresses),
+                'attestation_count': len(columns),
+                'has_personalization': columns.personalization is not None,
+            }, indent=2))
+        else:
+            print(f"Unknown command: {command}")
+    except FileNotFoundError:
+        print(f"Error: File {source} not found")
+    except json.JSONDecodeError:
+        print(f"Error: Invalid JSON in {source}")
+    except KeyError as e:
+        print(f"Error: Missing required field {e} in attestation data")
+    except ValueError as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
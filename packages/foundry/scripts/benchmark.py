@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the PageRank oracle pipeline
+
+Generates synthetic attestation graphs and times each pipeline stage separately:
+- build: PageRankCalculator.add_attestations
+- compute: PageRankCalculator.compute_pagerank
+- export: scores written as JSON, like pagerank_scores.json
+- calldata: ScorePublisher.plan against an empty snapshot (every score is encoded)
+
+Every case runs in a fresh subprocess so that its peak RSS (`ru_maxrss`) is its own.
+Results are written as JSON; `compare` flags stages that got slower than a baseline.
+
+Generators:
+- seeddemo: the SeedDemo layout (every lender attests every borrower, 1 lender per 30
+  borrowers; 10 x 300 = 3000 edges at the original size)
+- powerlaw: attester out-degrees and borrower popularity drawn from Zipf-like laws
+- chain / cycle: the PageRankVerification.t.sol cycle, stretched to n nodes
+
+Usage:
+    python benchmark.py run [options]
+    python benchmark.py compare <baseline.json> <results.json> [--threshold=1.25]
+"""
+
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+GENERATORS = ('seeddemo', 'powerlaw', 'chain', 'cycle')
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_BACKENDS = ('csr',)
+DEFAULT_RESULTS = 'benchmark_results.json'
+# NetworkX runs are skipped above this many edges (they take minutes)
+NETWORKX_MAX_EDGES = 200_000
+STAGES = ('build', 'compute', 'export', 'calldata')
+
+# Edge weights of the five-node cycle in PageRankVerification.t.sol
+_CYCLE_WEIGHTS = np.array([500_000, 300_000, 700_000, 400_000, 600_000], dtype=np.int64)
+
+Graph = Tuple[List[str], List[str], np.ndarray]
+
+
+def _addresses(count: int, offset: int = 0) -> List[str]:
+    return [f"0x{i:040x}" for i in range(offset + 1, offset + count + 1)]
+
+
+def generate_seeddemo(edges: int, seed: int = 0) -> Graph:
+    """Complete lender x borrower bipartite graph with 30 borrowers per lender"""
+    rng = np.random.default_rng(seed)
+    lenders = max(1, int(round((edges / 30) ** 0.5)))
+    borrowers = max(1, edges // lenders)
+    lender_addresses = _addresses(lenders)
+    borrower_addresses = _addresses(borrowers, offset=lenders)
+    # SeedDemo attests borrower by borrower, every lender in turn
+    attesters = lender_addresses * borrowers
+    targets = [b for b in borrower_addresses for _ in range(lenders)]
+    weights = rng.integers(500_000, 1_000_001, size=len(attesters), dtype=np.int64)
+    return attesters, targets, weights
+
+
+def generate_powerlaw(edges: int, seed: int = 0, exponent: float = 2.1) -> Graph:
+    """Scale-free attestations: few prolific attesters, few popular borrowers"""
+    rng = np.random.default_rng(seed)
+    nodes = max(10, edges // 8)
+    addresses = _addresses(nodes)
+    ranks = np.arange(1, nodes + 1, dtype=np.float64)
+    popularity = ranks ** -(exponent - 1.0)
+    popularity /= popularity.sum()
+    src = rng.choice(nodes, size=edges, p=popularity)
+    dst = rng.permutation(nodes)[rng.choice(nodes, size=edges, p=popularity)]
+    loops = src == dst
+    dst[loops] = (dst[loops] + 1) % nodes
+    weights = rng.integers(1, 1_000_001, size=edges, dtype=np.int64)
+    return [addresses[i] for i in src.tolist()], [addresses[i] for i in dst.tolist()], weights
+
+
+def generate_chain(edges: int, seed: int = 0, closed: bool = False) -> Graph:
+    """Path (or cycle) with the verification test's repeating weight pattern"""
+    nodes = edges if closed else edges + 1
+    addresses = _addresses(nodes)
+    src = np.arange(edges)
+    dst = (src + 1) % nodes
+    weights = _CYCLE_WEIGHTS[src % len(_CYCLE_WEIGHTS)]
+    return [addresses[i] for i in src.tolist()], [addresses[i] for i in dst.tolist()], weights
+
+
+GENERATOR_FUNCTIONS: Dict[str, Callable[..., Graph]] = {
+    'seeddemo': generate_seeddemo,
+    'powerlaw': generate_powerlaw,
+    'chain': generate_chain,
+    'cycle': lambda edges, seed=0: generate_chain(edges, seed, closed=True),
+}
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_case(generator: str, edges: int, backend: str, seed: int = 0) -> Dict[str, Any]:
+    """Run one benchmark case in the current process"""
+    from pagerank_calculator import PageRankCalculator
+    from score_publisher import ScorePublisher
+
+    result: Dict[str, Any] = {'generator': generator, 'edges': edges, 'backend': backend, 'seed': seed}
+    timings: Dict[str, float] = {}
+    rss: Dict[str, float] = {'baseline': _peak_rss_mb()}
+
+    attesters, borrowers, weights = GENERATOR_FUNCTIONS[generator](edges, seed)
+    rss['generated'] = _peak_rss_mb()
+
+    calculator = PageRankCalculator(backend=backend)
+    started = time.perf_counter()
+    calculator.add_attestations(attesters, borrowers, weights)
+    calculator.graph.edge_arrays()
+    timings['build'] = time.perf_counter() - started
+    rss['build'] = _peak_rss_mb()
+    del attesters, borrowers, weights
+
+    started = time.perf_counter()
+    scores = calculator.compute_pagerank()
+    timings['compute'] = time.perf_counter() - started
+    rss['compute'] = _peak_rss_mb()
+
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        with open(os.path.join(directory, 'pagerank_scores.json'), 'w') as f:
+            json.dump(scores, f)
+        timings['export'] = time.perf_counter() - started
+    rss['export'] = _peak_rss_mb()
+
+    started = time.perf_counter()
+    batches = ScorePublisher(snapshot_path=None, threshold=0).plan(scores)
+    timings['calldata'] = time.perf_counter() - started
+    rss['calldata'] = _peak_rss_mb()
+
+    result.update({
+        'nodes': calculator.graph.number_of_nodes(),
+        'unique_edges': calculator.graph.number_of_edges(),
+        'iterations': calculator.last_iterations,
+        'batches': len(batches),
+        'seconds': timings,
+        'peak_rss_mb': rss['calldata'],
+        'peak_rss_mb_by_stage': rss,
+    })
+    return result
+
+
+def run_isolated(generator: str, edges: int, backend: str, seed: int = 0, timeout: float = 3600) -> Dict[str, Any]:
+    """Run one case in a fresh interpreter and return its result (or the error)"""
+    command = [sys.executable, os.path.abspath(__file__), 'case', generator, str(edges), backend, str(seed)]
+    completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    if completed.returncode != 0:
+        return {'generator': generator, 'edges': edges, 'backend': backend, 'seed': seed,
+                'error': completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else 'failed'}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def environment() -> Dict[str, Any]:
+    """Versions and host details stored alongside results"""
+    import networkx
+
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'networkx': networkx.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 1.25) -> List[str]:
+    """
+    List stages that are slower than the baseline by more than `threshold` times
+
+    Cases are matched on (generator, edges, backend); stages under 10 ms are ignored as noise.
+    A baseline case that now fails or is missing from the current results is a regression.
+    """
+    def key(case):
+        return case['generator'], case['edges'], case['backend']
+
+    def name(case_key):
+        return '/'.join(str(part) for part in case_key)
+
+    reference = {key(case): case for case in baseline['results'] if 'error' not in case}
+    results = {key(case): case for case in current['results']}
+    regressions = [f"{name(case_key)}: missing from the current results"
+                   for case_key in reference if case_key not in results]
+    for case in current['results']:
+        before = reference.get(key(case))
+        if before is None:
+            continue
+        if 'error' in case:
+            regressions.append(f"{name(key(case))}: failed ({case['error']})")
+            continue
+        for stage in STAGES:
+            old, new = before['seconds'][stage], case['seconds'][stage]
+            if new > 0.01 and new > old * threshold:
+                regressions.append(f"{case['generator']}/{case['edges']}/{case['backend']} {stage}: "
+                                   f"{old:.3f}s -> {new:.3f}s ({new / old:.2f}x)")
+        if case['peak_rss_mb'] > before['peak_rss_mb'] * threshold:
+            regressions.append(f"{case['generator']}/{case['edges']}/{case['backend']} peak RSS: "
+                               f"{before['peak_rss_mb']:.0f} MB -> {case['peak_rss_mb']:.0f} MB")
+    return regressions
+
+
+def _parse_sizes(text: str) -> List[int]:
+    return [int(float(size)) for size in text.split(',') if size]
+
+
+def main():
+    """Run benchmarks or compare result files"""
+    options = {
+        'generators': ','.join(GENERATORS),
+        'sizes': ','.join(str(size) for size in DEFAULT_SIZES),
+        'backends': ','.join(DEFAULT_BACKENDS),
+        'output': DEFAULT_RESULTS,
+        'seed': '0',
+        'threshold': '1.25',
+    }
+    for arg in [a for a in sys.argv if a.startswith('--') and '=' in a]:
+        name, value = arg[2:].split('=', 1)
+        if name in options:
+            options[name] = value
+            sys.argv.remove(arg)
+
+    if len(sys.argv) < 2:
+        print("Usage: python benchmark.py <command> [args...] [options]")
+        print("Commands:")
+        print("  run - Run every generator x size x backend case")
+        print("  compare <baseline.json> <results.json> - Report stages slower than the baseline "
+              "and baseline cases that fail or are missing")
+        print("Options:")
+        print(f"  --generators=<list> - Comma-separated, from {', '.join(GENERATORS)}")
+        print("  --sizes=<list> - Edge counts, e.g. 1e3,1e5,1e7 (default 1e3..1e6)")
+        print("  --backends=<list> - PageRank engines (default csr; networkx is capped at "
+              f"{NETWORKX_MAX_EDGES} edges)")
+        print(f"  --output=<file> - Results file for run (default {DEFAULT_RESULTS})")
+        print("  --seed=<n> - Generator seed (default 0)")
+        print("  --threshold=<x> - Slowdown factor reported by compare (default 1.25)")
+        return
+
+    command = sys.argv[1]
+
+    if command == "case":
+        # Internal: one case per subprocess, result as the last stdout line
+        generator, edges, backend, seed = sys.argv[2], int(sys.argv[3]), sys.argv[4], int(sys.argv[5])
+        print(json.dumps(run_case(generator, edges, backend, seed)))
+
+    elif command == "run":
+        generators = options['generators'].split(',')
+        unknown = [g for g in generators if g not in GENERATOR_FUNCTIONS]
+        if unknown:
+            print(f"Error: Unknown generators {unknown}, expected {GENERATORS}")
+            return
+
+        results = []
+        for generator in generators:
+            for edges in _parse_sizes(options['sizes']):
+                for backend in options['backends'].split(','):
+                    if backend == 'networkx' and edges > NETWORKX_MAX_EDGES:
+                        continue
+                    case = run_isolated(generator, edges, backend, int(options['seed']))
+                    results.append(case)
+                    if 'error' in case:
+                        print(f"{generator:>9} {edges:>10} {backend:>8}  error: {case['error']}")
+                    else:
+                        seconds = case['seconds']
+                        print(f"{generator:>9} {edges:>10} {backend:>8}  "
+                              + '  '.join(f"{stage} {seconds[stage]:.3f}s" for stage in STAGES)
+                              + f"  peak {case['peak_rss_mb']:.0f} MB")
+
+        with open(options['output'], 'w') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+        print(f"Results saved to {options['output']}")
+
+    elif command == "compare":
+        if len(sys.argv) < 4:
+            print("Error: Please provide baseline and results JSON files")
+            return
+        try:
+            with open(sys.argv[2], 'r') as f:
+                baseline = json.load(f)
+            with open(sys.argv[3], 'r') as f:
+                current = json.load(f)
+        except FileNotFoundError as e:
+            print(f"Error: File {e.filename} not found")
+            return
+        except json.JSONDecodeError:
+            print("Error: Invalid JSON in results file")
+            return
+
+        regressions = compare(baseline, current, float(options['threshold']))
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        print(f"{len(regressions)} regressions")
+        sys.exit(1 if regressions else 0)
+
+    else:
+        print(f"Unknown command: {command}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,47 +7,53 @@ Integrates with the DecentralizedMicrocredit contract to compute PageRank scores
 import json
 import sys
 import os
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Union
 from pagerank_calculator import PageRankCalculator
+from personalization import Personalization
+from attestation_graph import flatten_attestation_data
+from attestation_io import AttestationColumns, load_attestation_columns
+from score_publisher import ScorePublisher
 
 class ContractIntegration:
-    def __init__(self, contract_address: str = None):
+    def __init__(self, contract_address: str = None, backend: str = 'networkx'):
         """
         Initialize contract integration
         
         Args:
             contract_address: Address of the deployed contract (for future web3 integration)
+            backend: PageRank engine used by the calculator ("networkx", "csr" or "components")
+
+        Raises:
+            ValueError: If the backend is unknown
         """
         self.contract_address = contract_address
-        self.calculator = PageRankCalculator()
+        self.backend = backend
+        self.calculator = PageRankCalculator(backend=backend)
         
-    def process_attestation_data(self, attestation_data: Dict[str, Any]) -> Dict[str, int]:
+    def process_attestation_data(self, attestation_data: Union[Dict[str, Any], AttestationColumns]) -> Dict[str, int]:
         """
         Process attestation data from the smart contract and compute PageRank
         
         Args:
-            attestation_data: Dictionary with borrowers, attesters, and weights arrays
+            attestation_data: Dictionary with borrowers, attesters, and weights arrays, and
+                optional "personalization" columns (see personalization.py), or the
+                same data already loaded as AttestationColumns
             
         Returns:
             Dictionary mapping addresses to PageRank scores
         """
-        borrowers = attestation_data.get('borrowers', [])
-        attesters_arrays = attestation_data.get('attesters', [])
-        weights_arrays = attestation_data.get('weights', [])
-        
         # Clear previous data
-        self.calculator = PageRankCalculator()
-        
-        # Add all attestations to the graph
-        for i, borrower in enumerate(borrowers):
-            if i < len(attesters_arrays) and i < len(weights_arrays):
-                attesters = attesters_arrays[i]
-                weights = weights_arrays[i]
-                
-                for j, attester in enumerate(attesters):
-                    if j < len(weights):
-                        weight = weights[j]
-                        self.calculator.add_attestation(attester, borrower, weight)
+        self.calculator = PageRankCalculator(backend=self.backend)
+        
+        if isinstance(attestation_data, AttestationColumns):
+            self.calculator.add_attestation_columns(attestation_data)
+            self.calculator.set_personalization(attestation_data.get_personalization())
+            return self.calculator.compute_pagerank()
+        
+        # Add all attestations to the graph in one bulk call
+        self.calculator.add_attestations(*flatten_attestation_data(attestation_data))
+        if 'personalization' in attestation_data:
+            self.calculator.set_personalization(Personalization.from_dict(attestation_data['personalization']))
         
         # Compute PageRank scores
         scores = self.calculator.compute_pagerank()
@@ -65,38 +71,50 @@ class ContractIntegration:
             json.dump(scores, f, indent=2)
         print(f"PageRank scores exported to {filename}")
         
-    def generate_update_calldata(self, scores: Dict[str, int]) -> List[str]:
+    def generate_update_calldata(self, scores: Dict[str, int], publisher: ScorePublisher = None) -> List[str]:
         """
         Generate calldata for updating credit scores in the smart contract
         This would be used with a web3 integration to update scores on-chain
         
         Args:
             scores: Dictionary of address -> score mappings
+            publisher: Publisher holding the last published snapshot; by default every
+                non-zero score is encoded (empty in-memory snapshot, no threshold)
             
         Returns:
-            List of function call data strings
+            List of ABI-encoded calldata hex strings, in batch order
         """
-        # This is a placeholder for future web3 integration
-        # In a real implementation, this would generate actual contract calls
-        calldata = []
+        if publisher is None:
+            publisher = ScorePublisher(snapshot_path=None, threshold=0)
         
-        for address, score in scores.items():
-            # Example: updateCreditScore(address user, uint256 newScore)
-            calldata.append(f"updateCreditScore({address}, {score})")
+        calldata = []
+        for batch in publisher.plan(scores):
+            calldata.extend('0x' + data.hex() for data in batch.calldata)
             
         return calldata
 
 def main():
     """Example usage and testing"""
+    backend = 'networkx'
+    for arg in [a for a in sys.argv if a.startswith('--backend=')]:
+        backend = arg.split('=', 1)[1]
+        sys.argv.remove(arg)
+        
     if len(sys.argv) < 2:
         print("Usage: python contract_integration.py <command> [args...]")
         print("Commands:")
         print("  test - Run integration test")
-        print("  process <attestations.json> - Process attestation data from JSON")
+        print("  process <attestations.json|store_dir> - Process attestation data from JSON or a column store")
+        print("Options:")
+        print("  --backend=<name> - PageRank engine, networkx, csr or components (default networkx)")
         return
         
     command = sys.argv[1]
-    integration = ContractIntegration()
+    try:
+        integration = ContractIntegration(backend=backend)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
     
     if command == "test":
         # Test with sample attestation data
@@ -136,9 +154,9 @@ def main():
             
         json_file = sys.argv[2]
         try:
-            with open(json_file, 'r') as f:
-                attestation_data = json.load(f)
-                
+            # Stream the export into columns instead of loading the whole JSON document
+            attestation_data = load_attestation_columns(json_file)
+            
             # Process the data
             scores = integration.process_attestation_data(attestation_data)
             
@@ -153,6 +171,8 @@ def main():
             print(f"Error: File {json_file} not found")
         except json.JSONDecodeError:
             print(f"Error: Invalid JSON in {json_file}")
+        except ValueError as e:
+            print(f"Error: {e}")
     else:
         print(f"Unknown command: {command}")
 
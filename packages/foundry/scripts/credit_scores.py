@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Bulk credit-score queries over an oracle score snapshot
+
+`getCreditScore` maps PageRank to a credit score with a softplus-like curve:
+
+    x = PR * 1000 / maxPageRank          (integer division)
+    credit = SCALE * x / (x + 100)       (0 if maxPageRank is 0)
+
+and returns `scoreOverrides[user]` instead when it is non-zero. On-chain every call
+rescans all PageRank nodes for the maximum. `CreditScores` applies the mapping to a
+whole snapshot in one integer-exact vectorized pass with the maximum computed once,
+keeps a sorted index for top-k, rank and percentile queries, and looks addresses up
+in O(1). Addresses are compared case-insensitively (stored and reported lowercase), so
+checksummed and lowercase spellings of an address are the same row.
+
+A snapshot is any score set the oracle writes: `pagerank_scores.json`, the publisher's
+`published_scores.json`, or a Merkle snapshot directory (a `--merkle-dir` root means
+its latest epoch). The mapping only depends on score ratios, so it applies equally to
+the oracle's 1e6-scaled scores and the contract's PR_SCALE ones, up to rounding.
+Overrides come from the "scoreOverrides" personalization column of an oracle input.
+
+Usage:
+    python credit_scores.py top pagerank_scores.json 20
+    python credit_scores.py lookup pagerank_scores.json 0x1111 --overrides=attestations.json
+"""
+
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from attestation_io import load_attestation_columns
+from merkle_snapshot import ScoreSnapshot, epoch_path, latest_epoch
+
+# getCreditScore constants: output scale and the curve's x range and knee
+SCALE = 10**6
+X_RANGE = 1000
+X_KNEE = 100
+
+
+def credit_scores(pagerank: np.ndarray, max_pagerank: Optional[int] = None,
+                  overrides: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    getCreditScore for many addresses at once
+
+    Args:
+        pagerank: PageRank score per address (non-negative integers)
+        max_pagerank: getMaxPageRankScore() (default: the maximum of `pagerank`)
+        overrides: scoreOverrides per address (0 = none)
+
+    Returns:
+        int64 credit score per address
+    """
+    pagerank = np.asarray(pagerank, dtype=np.int64)
+    if max_pagerank is None:
+        max_pagerank = int(pagerank.max()) if len(pagerank) else 0
+    if max_pagerank == 0:
+        scores = np.zeros(len(pagerank), dtype=np.int64)
+    else:
+        if max_pagerank > np.iinfo(np.int64).max // X_RANGE:
+            # PR * 1000 would overflow int64: use Python integers
+            pagerank = pagerank.astype(object)
+        x = (pagerank * X_RANGE // max_pagerank).astype(np.int64)
+        scores = SCALE * x // (x + X_KNEE)
+    if overrides is not None:
+        overrides = np.asarray(overrides, dtype=np.int64)
+        scores = np.where(overrides != 0, overrides, scores)
+    return scores
+
+
+class CreditScores:
+    """Credit scores of a snapshot with address lookup and a sorted rank index"""
+
+    def __init__(self, addresses: Sequence[str], pagerank: Sequence[int],
+                 overrides: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            addresses: Address per snapshot row
+            pagerank: PageRank score per row
+            overrides: Non-zero scoreOverrides by address; addresses missing from the
+                snapshot are added with PageRank 0, as the contract serves them too
+
+        Raises:
+            ValueError: If two snapshot rows or two overrides name the same address
+                (ignoring case), or a score or override is out of range
+        """
+        self.addresses = [address.lower() for address in addresses]
+        self._index: Dict[str, int] = {address: i for i, address in enumerate(self.addresses)}
+        if len(self._index) != len(self.addresses):
+            raise ValueError("Duplicate addresses in score snapshot (addresses are case-insensitive)")
+        pagerank = np.asarray(pagerank, dtype=np.int64)
+        if len(pagerank) != len(self.addresses):
+            raise ValueError(f"Expected {len(self.addresses)} scores, got {len(pagerank)}")
+        if len(pagerank) and pagerank.min() < 0:
+            raise ValueError("Scores must be non-negative")
+
+        override_column = np.zeros(len(pagerank), dtype=np.int64)
+        given = {address: score for address, score in (overrides or {}).items() if score}
+        overrides = {address.lower(): score for address, score in given.items()}
+        if len(overrides) != len(given):
+            raise ValueError("Duplicate addresses in score overrides (addresses are case-insensitive)")
+        if overrides:
+            extra = [address for address in overrides if address not in self._index]
+            for address in extra:
+                self._index[address] = len(self.addresses)
+                self.addresses.append(address)
+            pagerank = np.concatenate([pagerank, np.zeros(len(extra), dtype=np.int64)])
+            override_column = np.zeros(len(pagerank), dtype=np.int64)
+            rows = np.fromiter((self._index[address] for address in overrides), dtype=np.int64, count=len(overrides))
+            override_column[rows] = np.fromiter(overrides.values(), dtype=np.int64, count=len(overrides))
+            if override_column.min() < 0 or override_column.max() > SCALE:
+                raise ValueError(f"Score overrides must be within 0..{SCALE}")
+
+        self.pagerank = pagerank
+        self.overrides = override_column
+        self.max_pagerank = int(pagerank.max()) if len(pagerank) else 0
+        self.scores = credit_scores(pagerank, self.max_pagerank, override_column)
+        # Rows by descending score (ties in row order), and each row's position in it
+        self.order = np.argsort(-self.scores, kind='stable')
+        self._positions = np.empty(len(self.order), dtype=np.int64)
+        self._positions[self.order] = np.arange(len(self.order))
+        self._ascending = self.scores[self.order[::-1]]
+
+    @classmethod
+    def from_scores(cls, scores: Dict[str, int], overrides: Optional[Dict[str, int]] = None) -> 'CreditScores':
+        return cls(list(scores), np.fromiter(scores.values(), dtype=np.int64, count=len(scores)), overrides)
+
+    @classmethod
+    def load(cls, path: str, overrides: Optional[Dict[str, int]] = None) -> 'CreditScores':
+        """
+        Load an oracle score snapshot
+
+        Args:
+            path: pagerank_scores.json, a publisher snapshot, a Merkle snapshot
+                directory or a Merkle snapshot root (latest epoch)
+            overrides: As for the constructor
+
+        Raises:
+            FileNotFoundError: If nothing is found at `path`
+            ValueError: If the file is not a score snapshot
+        """
+        if os.path.isdir(path):
+            if not os.path.exists(os.path.join(path, 'meta.json')):
+                epoch = latest_epoch(path)
+                if epoch is None:
+                    raise FileNotFoundError(2, 'No score snapshot', path)
+                path = epoch_path(path, epoch)
+            snapshot = ScoreSnapshot.load(path)
+            hex_rows = np.asarray(snapshot.address_rows).tobytes().hex()
+            addresses = ['0x' + hex_rows[40 * i:40 * i + 40] for i in range(len(snapshot))]
+            return cls(addresses, np.asarray(snapshot.scores), overrides)
+
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"{path} is not a score snapshot")
+        # Publisher snapshots and calculator output nest the scores
+        scores = data.get('scores', data.get('pagerank_scores', data))
+        return cls.from_scores({address: int(score) for address, score in scores.items()}, overrides)
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    def __contains__(self, address: str) -> bool:
+        return address.lower() in self._index
+
+    def score(self, address: str) -> int:
+        """getCreditScore(address); 0 for addresses outside the snapshot"""
+        row = self._index.get(address.lower())
+        return 0 if row is None else int(self.scores[row])
+
+    def lookup(self, address: str) -> Optional[Dict[str, Any]]:
+        """Score, PageRank, override, rank (1 = best) and percentile of an address"""
+        row = self._index.get(address.lower())
+        if row is None:
+            return None
+        score = int(self.scores[row])
+        return {
+            'address': self.addresses[row],
+            'score': score,
+            'pagerank': int(self.pagerank[row]),
+            'override': int(self.overrides[row]),
+            'rank': int(self._positions[row]) + 1,
+            'percentile': self.percentile_of(score),
+        }
+
+    def rank(self, address: str) -> Optional[int]:
+        """1-based position in descending score order (ties keep snapshot order)"""
+        row = self._index.get(address.lower())
+        return None if row is None else int(self._positions[row]) + 1
+
+    def percentile_of(self, score: int) -> float:
+        """Percentage of addresses with a strictly lower score"""
+        if not len(self._ascending):
+            return 0.0
+        return 100.0 * int(np.searchsorted(self._ascending, score, side='left')) / len(self._ascending)
+
+    def at_percentile(self, percentile: float) -> int:
+        """
+        Nearest-rank score at a percentile (0 gives the lowest score, 100 the highest)
+
+        Raises:
+            ValueError: If the snapshot is empty or the percentile is outside 0..100
+        """
+        if not len(self._ascending):
+            raise ValueError("Score snapshot is empty")
+        if not 0 <= percentile <= 100:
+            raise ValueError("Percentile must be within 0..100")
+        position = max(int(np.ceil(percentile / 100 * len(self._ascending))) - 1, 0)
+        return int(self._ascending[position])
+
+    def top(self, k: int, offset: int = 0) -> List[Tuple[str, int]]:
+        """The k best (address, score) pairs after skipping `offset`"""
+        return [(self.addresses[row], int(self.scores[row])) for row in self.order[offset:offset + k].tolist()]
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(zip(self.addresses, self.scores.tolist()))
+
+
+def load_overrides(path: str) -> Dict[str, int]:
+    """Non-zero scoreOverrides from the personalization of an oracle input file or store"""
+    personalization = load_attestation_columns(path).get_personalization()
+    if personalization is None:
+        return {}
+    return personalization.overrides()
+
+
+def main():
+    """Query credit scores of an oracle snapshot"""
+    overrides_path = None
+    for arg in [a for a in sys.argv if a.startswith('--overrides=')]:
+        overrides_path = arg.split('=', 1)[1]
+        sys.argv.remove(arg)
+
+    if len(sys.argv) < 3:
+        print("Usage: python credit_scores.py <command> <snapshot> [args...]")
+        print("Commands:")
+        print("  lookup <snapshot> <address>... - Score, rank and percentile of addresses")
+        print("  top <snapshot> [k] [offset] - Best k addresses (default 10)")
+        print("  percentile <snapshot> <p>... - Scores at percentiles (0-100)")
+        print("  export <snapshot> [output.json] - Write every credit score (default stdout)")
+        print("Snapshot: pagerank_scores.json, published_scores.json or a Merkle snapshot directory")
+        print("Options:")
+        print("  --overrides=<attestations.json|store_dir> - Apply scoreOverrides from an oracle input")
+        return
+
+    command = sys.argv[1]
+    try:
+        overrides = load_overrides(overrides_path) if overrides_path else None
+        credit = CreditScores.load(sys.argv[2], overrides)
+
+        if command == "lookup":
+            if len(sys.argv) < 4:
+                print("Error: Please provide at least one address")
+                return
+            print(json.dumps([credit.lookup(address) or {'address': address, 'score': 0}
+                              for address in sys.argv[3:]], indent=2))
+
+        elif command == "top":
+            k = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+            offset = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+            for position, (address, score) in enumerate(credit.top(k, offset), start=offset + 1):
+                print(f"{position:>8}  {address}  {score}")
+
+        elif command == "percentile":
+            if len(sys.argv) < 4:
+                print("Error: Please provide at least one percentile")
+                return
+            print(json.dumps({p: credit.at_percentile(float(p)) for p in sys.argv[3:]}, indent=2))
+
+        elif command == "export":
+            output = json.dumps({
+                'max_pagerank': credit.max_pagerank,
+                'count': len(credit),
+                'scores': credit.to_dict(),
+            }, indent=2)
+            if len(sys.argv) > 3:
+                with open(sys.argv[3], 'w') as f:
+                    f.write(output)
+                print(f"{len(credit)} credit scores saved to {sys.argv[3]}")
+            else:
+                print(output)
+        else:
+            print(f"Unknown command: {command}")
+
+    except FileNotFoundError as e:
+        print(f"Error: File {e.filename} not found")
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON in snapshot")
+    except ValueError as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
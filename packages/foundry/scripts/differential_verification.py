@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Differential verification of every PageRank engine on generated graphs
+
+Runs the same benchmark graphs (see benchmark.GENERATOR_FUNCTIONS) through each
+available scoring engine and compares them against NetworkX:
+
+    networkx        - PageRankCalculator(backend="networkx"), the reference
+    csr/<solver>    - PageRankCalculator(backend="csr") with every pagerank_csr solver
+    components      - PageRankCalculator(backend="components")
+    outofcore       - blocked_pagerank over a temporary destination-blocked edge file
+    onchain         - the bit-exact emulator of the contract's integer PR_SCALE math
+
+Scores are compared in oracle units (1e6 = probability 1.0; on-chain scores are
+multiplied by SCALE / PR_SCALE). Per engine the report holds the max and mean absolute
+difference, the Spearman rank correlation, the largest rank displacement, the top-k
+overlap, the iteration count and the wall time.
+
+Generators may emit the same (attester, borrower) pair twice. By default only the last
+attestation per pair is kept; with --keep-duplicates they are fed in order as
+re-attestations, where the float engines keep the last weight but the on-chain emulator
+also inflates the attester's out-degree, exactly like `_addPagerankEdge`.
+
+Float engines are gated on the mean absolute difference (they all stop on the same L1
+criterion, but at different distances from the fixed point). The on-chain emulator is
+gated on the max absolute difference against the PageRankVerification.t.sol tolerance;
+its `totalDelta < tol * n` exit loosens with n, so expect it to drift on large graphs.
+
+The `fixture` command writes a Foundry test with the exact scores `computePageRank()`
+must store for sampled nodes of a graph with hundreds of nodes. Expected values come
+from the on-chain emulator, so they are asserted exactly. `computePageRank()` is
+O(n^2) in storage reads, so keep fixtures to a few hundred nodes.
+
+Usage:
+    python differential_verification.py run [--generators=powerlaw,chain] [--sizes=1e3,1e4]
+    python differential_verification.py fixture [--generator=powerlaw] [--edges=1600]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from attestation_graph import AttestationGraph
+from benchmark import GENERATOR_FUNCTIONS, NETWORKX_MAX_EDGES
+from onchain_pagerank import PR_SCALE, OnChainPageRank
+from pagerank_calculator import PageRankCalculator
+from pagerank_csr import SOLVERS
+from pagerank_outofcore import EDGE_FILE, MIN_BLOCK_EDGES, BlockedEdges, blocked_pagerank
+
+SCALE = 1_000_000
+REFERENCE = 'networkx'
+ENGINES = (REFERENCE,) + tuple(f'csr/{solver}' for solver in SOLVERS) + ('components', 'outofcore', 'onchain')
+
+DEFAULT_GENERATORS = tuple(GENERATOR_FUNCTIONS)
+DEFAULT_SIZES = (1_000, 10_000)
+TOP_K = 10
+
+# Float engines stop within about tol / (1 - alpha) per node of the fixed point (~7 units)
+DEFAULT_MAX_MEAN_DIFF = 10
+# PageRankVerification.t.sol tolerance (2,000 in PR_SCALE units), in oracle units
+DEFAULT_MAX_ONCHAIN_DIFF = 20_000
+
+# Fixture defaults: a power-law graph of about 200 nodes
+FIXTURE_GENERATOR = 'powerlaw'
+FIXTURE_EDGES = 1_600
+FIXTURE_SAMPLES = 24
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test', 'PageRankLargeGraph.t.sol')
+# Fixture node i lives at address(uint160(FIXTURE_NODE_BASE + i)), clear of precompiles
+FIXTURE_NODE_BASE = 0x10000
+# Packed edge record: uint16 attester index, uint16 borrower index, uint32 weight
+FIXTURE_MAX_NODES = 1 << 16
+
+Engine = Callable[[AttestationGraph, Sequence[str], Sequence[str], np.ndarray], Tuple[Dict[str, int], Optional[int]]]
+
+
+def _calculator_engine(backend: str, solver: str = 'power') -> Engine:
+    def run(graph, attesters, borrowers, weights):
+        calculator = PageRankCalculator(backend=backend, solver=solver)
+        calculator.graph = graph
+        scores = calculator.compute_pagerank()
+        if backend == 'components':
+            calculator.component_solver.close()
+        return scores, calculator.last_iterations
+    return run
+
+
+def _outofcore_engine(graph, attesters, borrowers, weights):
+    src, dst, weight = graph.edge_arrays()
+    node_count = graph.number_of_nodes()
+    # Small blocks so that even modest graphs exercise the multi-block path
+    budget = max(MIN_BLOCK_EDGES, -(-len(src) // 4))
+    with tempfile.TemporaryDirectory() as directory:
+        edges = BlockedEdges.build(os.path.join(directory, EDGE_FILE), src, dst, weight, node_count, budget,
+                                   compacted=True)
+        scores, iterations = blocked_pagerank(edges)
+    scaled = (scores * SCALE).astype(np.int64)
+    return dict(zip(graph.addresses.addresses, scaled.tolist())), iterations
+
+
+def _onchain_engine(graph, attesters, borrowers, weights):
+    emulator = OnChainPageRank()
+    emulator.add_attestations(attesters, borrowers, weights)
+    factor = SCALE // PR_SCALE
+    scores = {address: score * factor for address, score in emulator.compute().items()}
+    return scores, emulator.iterations
+
+
+ENGINE_FUNCTIONS: Dict[str, Engine] = {
+    REFERENCE: _calculator_engine('networkx'),
+    **{f'csr/{solver}': _calculator_engine('csr', solver) for solver in SOLVERS},
+    'components': _calculator_engine('components'),
+    'outofcore': _outofcore_engine,
+    'onchain': _onchain_engine,
+}
+
+
+def average_ranks(values: np.ndarray) -> np.ndarray:
+    """Ranks from 0 (lowest) with ties sharing their mean rank"""
+    order = np.argsort(values, kind='stable')
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[order] = np.arange(len(values))
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    return (np.bincount(inverse, weights=ranks) / counts)[inverse]
+
+
+def compare_scores(reference: np.ndarray, scores: np.ndarray, top_k: int = TOP_K) -> Dict[str, Any]:
+    """
+    Difference and rank-order agreement between two score vectors
+
+    Args:
+        reference: Reference scores in node order
+        scores: Scores of the engine under test, same order and units
+        top_k: Size of the top set compared by `top_k_overlap`
+
+    Returns:
+        Dictionary with max_abs_diff, mean_abs_diff, spearman, max_rank_shift and top_k_overlap
+    """
+    diff = np.abs(scores.astype(np.float64) - reference.astype(np.float64))
+    reference_ranks = average_ranks(reference)
+    ranks = average_ranks(scores)
+    if reference_ranks.std() == 0 or ranks.std() == 0:
+        spearman = 1.0 if reference_ranks.std() == ranks.std() else 0.0
+    else:
+        spearman = float(np.corrcoef(reference_ranks, ranks)[0, 1])
+    k = min(top_k, len(reference))
+    top_reference = set(np.argsort(-reference, kind='stable')[:k].tolist())
+    top_scores = set(np.argsort(-scores, kind='stable')[:k].tolist())
+    return {
+        'max_abs_diff': float(diff.max()) if len(diff) else 0.0,
+        'mean_abs_diff': float(diff.mean()) if len(diff) else 0.0,
+        'spearman': spearman,
+        'max_rank_shift': float(np.abs(reference_ranks - ranks).max()) if len(diff) else 0.0,
+        'top_k_overlap': len(top_reference & top_scores) / k if k else 1.0,
+    }
+
+
+def last_attestations(attesters: Sequence[str], borrowers: Sequence[str],
+                      weights: np.ndarray) -> Tuple[List[str], List[str], np.ndarray]:
+    """Keep only the last attestation of every (attester, borrower) pair, in order"""
+    last = {pair: i for i, pair in enumerate(zip(attesters, borrowers))}
+    if len(last) == len(attesters):
+        return list(attesters), list(borrowers), np.asarray(weights)
+    keep = sorted(last.values())
+    return [attesters[i] for i in keep], [borrowers[i] for i in keep], np.asarray(weights)[keep]
+
+
+def run_case(generator: str, edges: int, engines: Sequence[str] = ENGINES, seed: int = 0,
+             keep_duplicates: bool = False) -> Dict[str, Any]:
+    """
+    Score one generated graph with every requested engine and compare against NetworkX
+
+    NetworkX is skipped above benchmark.NETWORKX_MAX_EDGES; the first remaining engine
+    (the csr power iteration by default) is then the reference instead.
+    """
+    attesters, borrowers, weights = GENERATOR_FUNCTIONS[generator](edges, seed)
+    if not keep_duplicates:
+        attesters, borrowers, weights = last_attestations(attesters, borrowers, weights)
+    graph = AttestationGraph()
+    graph.add_edges(attesters, borrowers, weights)
+    graph.edge_arrays()
+    addresses = graph.addresses.addresses
+
+    skipped = {}
+    if REFERENCE in engines and edges > NETWORKX_MAX_EDGES:
+        skipped[REFERENCE] = f'over {NETWORKX_MAX_EDGES} edges'
+        engines = [name for name in engines if name != REFERENCE]
+    reference_name = REFERENCE if REFERENCE in engines else engines[0]
+
+    results: Dict[str, Dict[str, Any]] = {}
+    vectors: Dict[str, np.ndarray] = {}
+    for name in engines:
+        started = time.perf_counter()
+        try:
+            scores, iterations = ENGINE_FUNCTIONS[name](graph, attesters, borrowers, weights)
+        except Exception as e:
+            results[name] = {'error': f'{type(e).__name__}: {e}'}
+            continue
+        seconds = time.perf_counter() - started
+        vectors[name] = np.fromiter((scores[address] for address in addresses), dtype=np.int64, count=len(addresses))
+        results[name] = {'iterations': iterations, 'seconds': seconds, 'total': int(vectors[name].sum())}
+
+    if reference_name in vectors:
+        for name, vector in vectors.items():
+            results[name].update(compare_scores(vectors[reference_name], vector))
+
+    return {
+        'generator': generator,
+        'edges': edges,
+        'seed': seed,
+        'attestations': len(attesters),
+        'nodes': graph.number_of_nodes(),
+        'unique_edges': graph.number_of_edges(),
+        'reference': reference_name,
+        'engines': results,
+        'skipped': skipped,
+    }
+
+
+def check(report: Dict[str, Any], max_mean_diff: float = DEFAULT_MAX_MEAN_DIFF,
+          max_onchain_diff: float = DEFAULT_MAX_ONCHAIN_DIFF) -> List[str]:
+    """List engine results that failed or drifted beyond the allowed difference"""
+    failures = []
+    for case in report['cases']:
+        label = f"{case['generator']}/{case['edges']}"
+        for name, result in case['engines'].items():
+            if 'error' in result:
+                failures.append(f"{label} {name}: {result['error']}")
+                continue
+            if name == 'onchain':
+                metric, limit = 'max', max_onchain_diff
+            else:
+                metric, limit = 'mean', max_mean_diff
+            value = result.get(f'{metric}_abs_diff', 0)
+            if value > limit:
+                failures.append(f"{label} {name}: {metric} |diff| {value:.2f} > {limit:g} vs {case['reference']}")
+    return failures
+
+
+def print_report(report: Dict[str, Any]):
+    """Print one table per case"""
+    for case in report['cases']:
+        print(f"\n{case['generator']} edges={case['edges']} attestations={case['attestations']} "
+              f"nodes={case['nodes']} unique_edges={case['unique_edges']} reference={case['reference']}")
+        print(f"  {'engine':<16} {'iters':>6} {'seconds':>9} {'max|d|':>9} {'mean|d|':>9} "
+              f"{'spearman':>9} {'rankshift':>9} {'top' + str(TOP_K):>6}")
+        for name, result in case['engines'].items():
+            if 'error' in result:
+                print(f"  {name:<16} {result['error']}")
+                continue
+            iterations = '-' if result['iterations'] is None else result['iterations']
+            print(f"  {name:<16} {iterations:>6} {result['seconds']:>9.4f} {result['max_abs_diff']:>9.0f} "
+                  f"{result['mean_abs_diff']:>9.2f} {result['spearman']:>9.6f} {result['max_rank_shift']:>9.1f} "
+                  f"{result['top_k_overlap']:>6.2f}")
+        for name, reason in case['skipped'].items():
+            print(f"  {name:<16} skipped ({reason})")
+
+
+def sample_nodes(scores: np.ndarray, samples: int, seed: int = 0) -> np.ndarray:
+    """Pick fixture nodes: the highest and lowest scores plus a seeded random spread"""
+    count = len(scores)
+    if samples >= count:
+        return np.arange(count)
+    order = np.argsort(-scores, kind='stable')
+    extremes = samples // 4
+    chosen = set(order[:extremes].tolist()) | set(order[count - extremes:].tolist())
+    rest = np.setdiff1d(np.arange(count), np.fromiter(chosen, dtype=np.int64, count=len(chosen)))
+    chosen.update(np.random.default_rng(seed).choice(rest, samples - len(chosen), replace=False).tolist())
+    return np.sort(np.fromiter(chosen, dtype=np.int64, count=len(chosen)))
+
+
+def _solidity_array(kind: str, values: Sequence[int], per_line: int = 8) -> str:
+    lines = []
+    for start in range(0, len(values), per_line):
+        chunk = [str(v) for v in values[start:start + per_line]]
+        if start == 0:
+            chunk[0] = f'{kind}({chunk[0]})'
+        lines.append('            ' + ', '.join(chunk))
+    return ',\n'.join(lines)
+
+
+def build_fixture(generator: str = FIXTURE_GENERATOR, edges: int = FIXTURE_EDGES, seed: int = 0,
+                  samples: int = FIXTURE_SAMPLES) -> str:
+    """
+    Render a Foundry test asserting exact computePageRank() results on a generated graph
+
+    Args:
+        generator: Name in benchmark.GENERATOR_FUNCTIONS
+        edges: Number of attestations to generate
+        seed: Generator and sampling seed
+        samples: Number of nodes whose exact score is asserted
+
+    Returns:
+        Solidity source of the test file
+
+    Raises:
+        ValueError: If the graph has too many nodes for the packed edge encoding
+    """
+    attesters, borrowers, weights = GENERATOR_FUNCTIONS[generator](edges, seed)
+    emulator = OnChainPageRank()
+    emulator.add_attestations(attesters, borrowers, weights)
+    nodes = emulator.graph.addresses.addresses
+    if len(nodes) > FIXTURE_MAX_NODES:
+        raise ValueError(f"Fixture graphs are limited to {FIXTURE_MAX_NODES} nodes, got {len(nodes)}")
+    scores = np.fromiter(emulator.compute().values(), dtype=np.int64, count=len(nodes))
+
+    # Attestation order is kept so that re-attested pairs inflate out-degrees as on-chain
+    index = emulator.graph.addresses.intern_many
+    records = np.empty(len(attesters), dtype=[('src', '>u2'), ('dst', '>u2'), ('weight', '>u4')])
+    records['src'] = index(attesters)
+    records['dst'] = index(borrowers)
+    records['weight'] = weights
+    packed = records.tobytes().hex()
+
+    reattested = len(attesters) - emulator.graph.number_of_edges()
+    sampled = sample_nodes(scores, samples, seed)
+    command = (f'python differential_verification.py fixture --generator={generator} --edges={edges} '
+               f'--seed={seed} --samples={samples}')
+    hex_lines = '\n'.join(f'        hex"{packed[i:i + 128]}"' for i in range(0, len(packed), 128))
+
+    return f'''// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.17;
+
+/*
+ * PageRankLargeGraph.t.sol
+ *
+ * Generated by scripts/differential_verification.py, do not edit by hand:
+ *
+ *     cd packages/foundry/scripts
+ *     {command}
+ *
+ * Graph: {generator}, {len(attesters)} attestations ({reattested} re-attested pairs), {len(nodes)} nodes.
+ * Expected values come from the bit-exact on-chain emulator (scripts/onchain_pagerank.py), so
+ * scores, their total and the iteration count are asserted exactly rather than within the
+ * NetworkX tolerance. Re-attestations add to pagerankOutDegree, so the total stays below
+ * PR_SCALE whenever the graph has any.
+ */
+import "forge-std/Test.sol";
+import "../contracts/DecentralizedMicrocredit.sol";
+
+/// Loads a graph straight into PageRank storage; recordAttestation would recompute
+/// PageRank after every edge.
+contract PageRankGraphHarness is DecentralizedMicrocredit {{
+    uint256 constant NODE_BASE = {FIXTURE_NODE_BASE:#x};
+
+    constructor() DecentralizedMicrocredit(500, 2000, 10_000e6, address(0xC0FFEE), address(0xC0FFEE)) {{}}
+
+    /// @param packed 8 bytes per attestation: uint16 attester, uint16 borrower, uint32 weight
+    function loadEdges(bytes memory packed) external {{
+        for (uint256 offset = 0; offset < packed.length; offset += 8) {{
+            uint256 edge;
+            assembly ("memory-safe") {{
+                edge := shr(192, mload(add(add(packed, 32), offset)))
+            }}
+            address from = address(uint160(NODE_BASE + (edge >> 48)));
+            address to = address(uint160(NODE_BASE + ((edge >> 32) & 0xffff)));
+            _addPagerankNode(from);
+            _addPagerankNode(to);
+            _addPagerankEdge(from, to, edge & 0xffffffff);
+        }}
+    }}
+}}
+
+contract PageRankLargeGraphTest is Test {{
+    PageRankGraphHarness credit;
+
+    uint256 constant NODE_BASE = {FIXTURE_NODE_BASE:#x};
+    uint256 constant NODE_COUNT = {len(nodes)};
+    uint256 constant EXPECTED_ITERATIONS = {emulator.iterations};
+    uint256 constant EXPECTED_TOTAL = {int(scores.sum())};
+
+    bytes constant EDGES =
+{hex_lines};
+
+    function setUp() public {{
+        // The O(n^2) recompute is far above the default block gas limit; only results are checked
+        vm.pauseGasMetering();
+        credit = new PageRankGraphHarness();
+        credit.loadEdges(EDGES);
+    }}
+
+    function testLargeGraphExactScores() public {{
+        vm.pauseGasMetering();
+        assertEq(credit.computePageRank(), EXPECTED_ITERATIONS, "iterations");
+
+        uint16[{len(sampled)}] memory nodes = [
+{_solidity_array('uint16', sampled.tolist())}
+        ];
+        uint256[{len(sampled)}] memory expected = [
+{_solidity_array('uint256', scores[sampled].tolist())}
+        ];
+        for (uint256 i = 0; i < nodes.length; i++) {{
+            address node = address(uint160(NODE_BASE + nodes[i]));
+            assertEq(credit.pagerankScores(node), expected[i], "score mismatch");
+        }}
+    }}
+
+    function testLargeGraphTotalScore() public {{
+        vm.pauseGasMetering();
+        credit.computePageRank();
+
+        (address[] memory allNodes, uint256[] memory allScores) = credit.getAllPageRankScores();
+        assertEq(allNodes.length, NODE_COUNT, "node count");
+        uint256 total = 0;
+        for (uint256 i = 0; i < allScores.length; i++) {{
+            total += allScores[i];
+        }}
+        assertEq(total, EXPECTED_TOTAL, "total score");
+    }}
+}}
+'''
+
+
+def main() -> int:
+    """Run the differential report or write a Solidity fixture"""
+    if len(sys.argv) < 2:
+        print("Usage: python differential_verification.py <command> [options]")
+        print("Commands:")
+        print("  run     - Score generated graphs with every engine and compare against NetworkX")
+        print("  fixture - Write a Solidity test with exact on-chain scores for a generated graph")
+        print("Options (run):")
+        print(f"  --generators=<list> - Comma-separated, from {', '.join(GENERATOR_FUNCTIONS)} (default all)")
+        print(f"  --sizes=<list> - Comma-separated edge counts (default {','.join(map(str, DEFAULT_SIZES))})")
+        print(f"  --engines=<list> - Comma-separated, from {', '.join(ENGINES)} (default all)")
+        print("  --seed=<n> - Generator seed (default 0)")
+        print("  --keep-duplicates - Feed repeated pairs as re-attestations instead of keeping the last")
+        print(f"  --max-mean-diff=<n> - Allowed mean |diff| of float engines in 1e6 units "
+              f"(default {DEFAULT_MAX_MEAN_DIFF})")
+        print(f"  --max-onchain-diff=<n> - Allowed max |diff| of the on-chain emulator "
+              f"(default {DEFAULT_MAX_ONCHAIN_DIFF})")
+        print("  --output=<file> - Also write the JSON report")
+        print("Options (fixture):")
+        print(f"  --generator=<name> - Graph generator (default {FIXTURE_GENERATOR})")
+        print(f"  --edges=<n> - Attestations to generate (default {FIXTURE_EDGES})")
+        print("  --seed=<n> - Generator and sampling seed (default 0)")
+        print(f"  --samples=<n> - Nodes with asserted scores (default {FIXTURE_SAMPLES})")
+        print("  --output=<file> - Test file to write (default ../test/PageRankLargeGraph.t.sol)")
+        return 1
+
+    options: Dict[str, str] = {}
+    for arg in list(sys.argv[2:]):
+        if arg.startswith('--') and '=' in arg:
+            key, value = arg[2:].split('=', 1)
+            options[key] = value
+            sys.argv.remove(arg)
+
+    keep_duplicates = '--keep-duplicates' in sys.argv
+    command = sys.argv[1]
+    try:
+        if command == 'run':
+            generators = options.get('generators', ','.join(DEFAULT_GENERATORS)).split(',')
+            engines = options.get('engines', ','.join(ENGINES)).split(',')
+            for name in generators:
+                if name not in GENERATOR_FUNCTIONS:
+                    raise ValueError(f"Unknown generator '{name}'")
+            for name in engines:
+                if name not in ENGINE_FUNCTIONS:
+                    raise ValueError(f"Unknown engine '{name}'")
+            sizes = ([int(float(size)) for size in options['sizes'].split(',') if size]
+                     if 'sizes' in options else list(DEFAULT_SIZES))
+            seed = int(options.get('seed', 0))
+
+            report = {'cases': [run_case(generator, size, engines, seed, keep_duplicates)
+                                for generator in generators for size in sizes]}
+            print_report(report)
+            if 'output' in options:
+                with open(options['output'], 'w') as f:
+                    json.dump(report, f, indent=2)
+                print(f"\nReport saved to {options['output']}")
+
+            failures = check(report, float(options.get('max-mean-diff', DEFAULT_MAX_MEAN_DIFF)),
+                             float(options.get('max-onchain-diff', DEFAULT_MAX_ONCHAIN_DIFF)))
+            if failures:
+                print("\nDrift beyond tolerance:")
+                for failure in failures:
+                    print(f"  {failure}")
+                return 1
+            print("\nAll engines agree within tolerance")
+            return 0
+
+        elif command == 'fixture':
+            generator = options.get('generator', FIXTURE_GENERATOR)
+            if generator not in GENERATOR_FUNCTIONS:
+                raise ValueError(f"Unknown generator '{generator}'")
+            source = build_fixture(generator, int(float(options.get('edges', FIXTURE_EDGES))),
+                                   int(options.get('seed', 0)), int(options.get('samples', FIXTURE_SAMPLES)))
+            output = options.get('output', FIXTURE_PATH)
+            with open(output, 'w') as f:
+                f.write(source)
+            print(f"Fixture written to {output}")
+            return 0
+
+        else:
+            print(f"Unknown command: {command}")
+            return 1
+
+    except (KeyError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
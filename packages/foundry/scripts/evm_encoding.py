@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Minimal EVM encoding helpers for the PageRank oracle
+
+Keccak-256 and Solidity ABI encoding implemented on NumPy, so the oracle can build real
+calldata without a web3 dependency. Keccak-f[1600] runs on a (25, messages) lane matrix,
+hashing every equal-length message in one vectorized pass; ABI words are built as
+(n, 32) byte matrices.
+
+Supported ABI types: address, uint256, uint8, bytes32, bytes, address[], uint256[] and
+tuples of static types (e.g. EIP-712 request structs passed by value).
+"""
+
+import re
+import sys
+from typing import Any, List, Sequence, Tuple
+
+import numpy as np
+
+KECCAK_RATE = 136  # bytes absorbed per Keccak-256 block
+WORD_SIZE = 32
+
+_ROUND_CONSTANTS = np.array([
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+], dtype=np.uint64)
+
+# Rotation offset per lane x + 5 * y
+_ROTATIONS = [
+    0, 1, 62, 28, 27,
+    36, 44, 6, 55, 20,
+    3, 10, 43, 25, 39,
+    41, 45, 15, 21, 8,
+    18, 2, 61, 56, 14,
+]
+
+# Pi step: lane x + 5 * y moves to lane y + 5 * ((2x + 3y) % 5)
+_PI_TARGET = [y + 5 * ((2 * x + 3 * y) % 5) for y in range(5) for x in range(5)]
+
+# Permutation tables for the in-place rounds
+_ROTATE_LEFT = np.array(_ROTATIONS, dtype=np.uint64)[:, None]
+_ROTATE_RIGHT = (np.uint64(64) - _ROTATE_LEFT) % np.uint64(64)
+_PI_SOURCE = np.argsort(_PI_TARGET)
+_NEXT = np.array([1, 2, 3, 4, 0])
+_PREVIOUS = np.array([4, 0, 1, 2, 3])
+_AFTER_NEXT = np.array([2, 3, 4, 0, 1])
+
+# Messages hashed per permutation pass; keeps the lane matrix in CPU cache
+HASH_CHUNK = 2048
+
+_SIGNATURE = re.compile(r'^([A-Za-z_$][A-Za-z0-9_$]*)\((.*)\)$')
+SUPPORTED_TYPES = ('address', 'uint256', 'uint8', 'bytes32', 'bytes', 'address[]', 'uint256[]')
+STATIC_TYPES = ('address', 'uint256', 'uint8', 'bytes32')
+
+
+def _keccak_f(state: np.ndarray) -> np.ndarray:
+    """Keccak-f[1600] permutation over a (25, m) uint64 lane matrix, in place"""
+    count = state.shape[1]
+    lanes = state.reshape(5, 5, count)
+    parity = np.empty((5, count), dtype=np.uint64)
+    effect = np.empty_like(parity)
+    scratch = np.empty_like(parity)
+    rotated = np.empty_like(state)
+    spill = np.empty_like(state)
+    moved = np.empty_like(state)
+    rows = moved.reshape(5, 5, count)
+    left = np.empty_like(lanes)
+    right = np.empty_like(lanes)
+
+    for round_constant in _ROUND_CONSTANTS:
+        # Theta
+        np.bitwise_xor.reduce(lanes, axis=0, out=parity)
+        np.take(parity, _NEXT, axis=0, out=scratch)
+        np.left_shift(scratch, np.uint64(1), out=effect)
+        np.right_shift(scratch, np.uint64(63), out=scratch)
+        effect |= scratch
+        np.take(parity, _PREVIOUS, axis=0, out=scratch)
+        effect ^= scratch
+        lanes ^= effect
+
+        # Rho and pi
+        np.left_shift(state, _ROTATE_LEFT, out=rotated)
+        np.right_shift(state, _ROTATE_RIGHT, out=spill)
+        spill[0] = 0
+        rotated |= spill
+        np.take(rotated, _PI_SOURCE, axis=0, out=moved)
+
+        # Chi
+        np.take(rows, _NEXT, axis=1, out=left)
+        np.invert(left, out=left)
+        np.take(rows, _AFTER_NEXT, axis=1, out=right)
+        left &= right
+        np.bitwise_xor(rows, left, out=lanes)
+
+        # Iota
+        state[0] ^= round_constant
+    return state
+
+
+def keccak256_rows(messages: np.ndarray) -> np.ndarray:
+    """
+    Keccak-256 of every row of an (m, length) uint8 matrix of equal-length messages
+
+    Returns:
+        (m, 32) uint8 matrix of digests
+    """
+    messages = np.ascontiguousarray(messages, dtype=np.uint8)
+    count, length = messages.shape
+    blocks = length // KECCAK_RATE + 1
+
+    # Original Keccak padding (0x01 ... 0x80), as used by the EVM
+    padded = np.zeros((count, blocks * KECCAK_RATE), dtype=np.uint8)
+    padded[:, :length] = messages
+    padded[:, length] ^= 0x01
+    padded[:, -1] ^= 0x80
+    lanes = padded.view('<u8').reshape(count, blocks, KECCAK_RATE // 8)
+
+    digests = np.empty((count, WORD_SIZE), dtype=np.uint8)
+    for start in range(0, count, HASH_CHUNK):
+        chunk = lanes[start:start + HASH_CHUNK]
+        state = np.zeros((25, len(chunk)), dtype=np.uint64)
+        for block in range(blocks):
+            state[:KECCAK_RATE // 8] ^= chunk[:, block, :].T
+            _keccak_f(state)
+        digests[start:start + len(chunk)] = np.ascontiguousarray(state[:4].T).astype('<u8', copy=False).view(np.uint8).reshape(-1, WORD_SIZE)
+    return digests
+
+
+def keccak256_many(messages: Sequence[bytes]) -> List[bytes]:
+    """Keccak-256 of each message, hashing equal-length messages together"""
+    digests: List[bytes] = [b''] * len(messages)
+    by_length = {}
+    for i, message in enumerate(messages):
+        by_length.setdefault(len(message), []).append(i)
+    for length, indices in by_length.items():
+        rows = np.frombuffer(b''.join(messages[i] for i in indices), dtype=np.uint8).reshape(len(indices), length)
+        for i, digest in zip(indices, keccak256_rows(rows)):
+            digests[i] = digest.tobytes()
+    return digests
+
+
+def keccak256(data: bytes) -> bytes:
+    """Keccak-256 digest of `data`"""
+    return keccak256_rows(np.frombuffer(data, dtype=np.uint8).reshape(1, len(data)))[0].tobytes()
+
+
+def split_types(text: str) -> List[str]:
+    """Split a comma-separated type list at top level, keeping tuples whole"""
+    types: List[str] = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(text):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth < 0:
+                raise ValueError(f"Unbalanced parentheses in '{text}'")
+        elif char == ',' and depth == 0:
+            types.append(text[start:i])
+            start = i + 1
+    if depth != 0:
+        raise ValueError(f"Unbalanced parentheses in '{text}'")
+    if text:
+        types.append(text[start:])
+    return types
+
+
+def _check_type(abi_type: str):
+    if abi_type.startswith('(') and abi_type.endswith(')'):
+        for component in split_types(abi_type[1:-1]):
+            if component not in STATIC_TYPES:
+                raise ValueError(f"Unsupported tuple component '{component}', expected one of {STATIC_TYPES}")
+    elif abi_type not in SUPPORTED_TYPES:
+        raise ValueError(f"Unsupported ABI type '{abi_type}', expected one of {SUPPORTED_TYPES} "
+                         f"or a tuple of static types")
+
+
+def parse_signature(signature: str) -> Tuple[str, List[str]]:
+    """
+    Split a canonical function signature into its name and argument types
+
+    Raises:
+        ValueError: If the signature is malformed or uses an unsupported type
+    """
+    match = _SIGNATURE.match(signature.replace(' ', ''))
+    if not match:
+        raise ValueError(f"Invalid function signature '{signature}'")
+    name, arguments = match.groups()
+    types = split_types(arguments)
+    for abi_type in types:
+        _check_type(abi_type)
+    return name, types
+
+
+def function_selector(signature: str) -> bytes:
+    """First four bytes of keccak256(signature)"""
+    parse_signature(signature)
+    return keccak256(signature.replace(' ', '').encode())[:4]
+
+
+def address_words(addresses: Sequence[str]) -> np.ndarray:
+    """
+    ABI words (left zero-padded) for hex addresses
+
+    Returns:
+        (n, 32) uint8 matrix
+    """
+    digits = []
+    for address in addresses:
+        hex_digits = address[2:] if address[:2] in ('0x', '0X') else address
+        if len(hex_digits) > 40:
+            raise ValueError(f"Invalid address '{address}'")
+        digits.append(hex_digits.rjust(40, '0'))
+    words = np.zeros((len(addresses), WORD_SIZE), dtype=np.uint8)
+    if len(addresses):
+        words[:, 12:] = np.frombuffer(bytes.fromhex(''.join(digits)), dtype=np.uint8).reshape(-1, 20)
+    return words
+
+
+def uint256_words(values: Sequence[int]) -> np.ndarray:
+    """
+    ABI words (big-endian) for unsigned integers
+
+    Returns:
+        (n, 32) uint8 matrix
+    """
+    words = np.zeros((len(values), WORD_SIZE), dtype=np.uint8)
+    if len(values) == 0:
+        return words
+    array = np.asarray(values)
+    if array.dtype.kind in 'iu' and array.min() >= 0:
+        words[:, 24:] = array.astype('>u8').view(np.uint8).reshape(-1, 8)
+        return words
+
+    # Arbitrary-precision path for values beyond 64 bits
+    for i, value in enumerate(values):
+        value = int(value)
+        if not 0 <= value < 2**256:
+            raise ValueError(f"Value {value} does not fit in uint256")
+        words[i] = np.frombuffer(value.to_bytes(WORD_SIZE, 'big'), dtype=np.uint8)
+    return words
+
+
+def bytes32_words(values: Sequence[bytes]) -> np.ndarray:
+    """
+    ABI words for 32-byte values
+
+    Returns:
+        (n, 32) uint8 matrix
+    """
+    for value in values:
+        if len(value) != WORD_SIZE:
+            raise ValueError(f"Expected {WORD_SIZE} bytes, got {len(value)}")
+    return np.frombuffer(b''.join(values), dtype=np.uint8).reshape(len(values), WORD_SIZE)
+
+
+def _static_words(abi_type: str, value: Any) -> np.ndarray:
+    if abi_type == 'address':
+        return address_words([value])
+    if abi_type == 'bytes32':
+        return bytes32_words([value])
+    if abi_type.startswith('('):
+        components = split_types(abi_type[1:-1])
+        if len(components) != len(value):
+            raise ValueError(f"Expected {len(components)} tuple components, got {len(value)}")
+        return np.concatenate([_static_words(t, v) for t, v in zip(components, value)])
+    if abi_type == 'uint8' and not 0 <= int(value) < 256:
+        raise ValueError(f"Value {value} does not fit in uint8")
+    return uint256_words([value])
+
+
+def encode_arguments(types: Sequence[str], arguments: Sequence[Any]) -> np.ndarray:
+    """
+    ABI-encode arguments (head/tail layout) as a flat uint8 array
+
+    Args:
+        types: Argument types from SUPPORTED_TYPES, or tuples of STATIC_TYPES
+        arguments: One value (a sequence for array and tuple types, bytes for bytes
+            and bytes32) per type
+    """
+    if len(types) != len(arguments):
+        raise ValueError(f"Expected {len(types)} arguments, got {len(arguments)}")
+    head = []
+    tail = []
+    head_words = [len(split_types(t[1:-1])) if t.startswith('(') else 1 for t in types]
+    tail_offset = WORD_SIZE * sum(head_words)
+    for abi_type, value in zip(types, arguments):
+        if abi_type in STATIC_TYPES or abi_type.startswith('('):
+            head.append(_static_words(abi_type, value))
+        elif abi_type == 'bytes':
+            padded = -(-len(value) // WORD_SIZE) * WORD_SIZE
+            head.append(uint256_words([tail_offset]))
+            tail.append(uint256_words([len(value)]))
+            tail.append(np.frombuffer(bytes(value).ljust(padded, b'\0'), dtype=np.uint8).reshape(-1, WORD_SIZE))
+            tail_offset += WORD_SIZE + padded
+        else:
+            elements = address_words(value) if abi_type == 'address[]' else uint256_words(value)
+            head.append(uint256_words([tail_offset]))
+            tail.append(uint256_words([len(value)]))
+            tail.append(elements)
+            tail_offset += WORD_SIZE * (len(value) + 1)
+    if not head:
+        return np.zeros(0, dtype=np.uint8)
+    return np.concatenate(head + tail).reshape(-1)
+
+
+def encode_call(signature: str, arguments: Sequence[Any]) -> bytes:
+    """Calldata for `signature` called with `arguments`"""
+    _, types = parse_signature(signature)
+    return function_selector(signature) + encode_arguments(types, arguments).tobytes()
+
+
+def calldata_gas(calldata: np.ndarray) -> int:
+    """Intrinsic calldata gas (EIP-2028): 16 per non-zero byte, 4 per zero byte"""
+    nonzero = int(np.count_nonzero(calldata))
+    return 16 * nonzero + 4 * (len(calldata) - nonzero)
+
+
+def main():
+    """Print Keccak-256 digests or function selectors"""
+    if len(sys.argv) < 3:
+        print("Usage: python evm_encoding.py <command> [args...]")
+        print("Commands:")
+        print("  keccak <text> - Keccak-256 of UTF-8 text")
+        print("  selector <signature> - Function selector, e.g. 'transfer(address,uint256)'")
+        return
+
+    command = sys.argv[1]
+    try:
+        if command == "keccak":
+            print('0x' + keccak256(sys.argv[2].encode()).hex())
+        elif command == "selector":
+            print('0x' + function_selector(sys.argv[2]).hex())
+        else:
+            print(f"Unknown command: {command}")
+    except ValueError as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
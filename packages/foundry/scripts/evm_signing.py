@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+secp256k1 signing and EIP-712 hashing for locally held test keys
+
+Pure-Python ECDSA on top of the Keccak-256 and ABI helpers in evm_encoding, so scripts
+can derive addresses and sign meta-transaction requests and ERC-2612 permits without
+eth_account. Signatures use RFC 6979 deterministic nonces and low-s normalization (as
+required by OpenZeppelin's ECDSA.recover) and are returned as 65 bytes r || s || v.
+
+Generator multiples come from a fixed-base table of 4-bit windows (64 windows x 16
+points, built on first use), so one signature costs 64 point additions and no doublings.
+Hashing goes through keccak256_many, so the batch helpers (`struct_hashes`,
+`typed_data_digests`, `private_keys_to_addresses`, `sign_digests`) should be preferred
+for many requests; `sign_digests` can also spread signing over worker processes.
+The arithmetic is not constant-time: use it for anvil/test accounts only.
+
+Usage:
+    python evm_signing.py address <private_key>
+    python evm_signing.py sign <private_key> <digest>
+"""
+
+import hashlib
+import hmac
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Optional, Sequence, Tuple
+
+from evm_encoding import WORD_SIZE, encode_arguments, keccak256, keccak256_many, split_types
+
+# secp256k1 curve parameters
+P = 2**256 - 2**32 - 977
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+G = (0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+     0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8)
+
+WINDOW_BITS = 4
+EIP712_DOMAIN_TYPE = 'EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)'
+
+_TYPE_STRING = re.compile(r'^([A-Za-z_$][A-Za-z0-9_$]*)\((.*)\)$')
+
+# Affine multiples j * 16**i * G for window i, digit j (index 0 unused); built lazily
+_generator_table: Optional[List[List[Optional[Tuple[int, int]]]]] = None
+
+
+def _add(p: Optional[Tuple[int, int]], q: Optional[Tuple[int, int]]) -> Optional[Tuple[int, int]]:
+    """Affine point addition (None is the point at infinity)"""
+    if p is None:
+        return q
+    if q is None:
+        return p
+    if p[0] == q[0]:
+        if (p[1] + q[1]) % P == 0:
+            return None
+        slope = 3 * p[0] * p[0] * pow(2 * p[1], -1, P) % P
+    else:
+        slope = (q[1] - p[1]) * pow(q[0] - p[0], -1, P) % P
+    x = (slope * slope - p[0] - q[0]) % P
+    return x, (slope * (p[0] - x) - p[1]) % P
+
+
+def _table() -> List[List[Optional[Tuple[int, int]]]]:
+    global _generator_table
+    if _generator_table is None:
+        table = []
+        base: Optional[Tuple[int, int]] = G
+        for _ in range(256 // WINDOW_BITS):
+            row = [None, base]
+            for _ in range(2, 1 << WINDOW_BITS):
+                row.append(_add(row[-1], base))
+            table.append(row)
+            base = _add(row[-1], base)
+        _generator_table = table
+    return _generator_table
+
+
+def _jacobian_add_affine(point: Tuple[int, int, int], affine: Tuple[int, int]) -> Tuple[int, int, int]:
+    """Mixed addition of a Jacobian point (Z = 0 is infinity) and an affine point"""
+    x1, y1, z1 = point
+    if z1 == 0:
+        return affine[0], affine[1], 1
+    z1z1 = z1 * z1 % P
+    u2 = affine[0] * z1z1 % P
+    s2 = affine[1] * z1 * z1z1 % P
+    h = (u2 - x1) % P
+    r = (s2 - y1) % P
+    if h == 0:
+        if r == 0:
+            # Doubling: only reachable if two table entries coincide, never for k < N
+            x, y = _add((x1 * pow(z1z1, -1, P) % P, y1 * pow(z1z1 * z1, -1, P) % P), affine)
+            return x, y, 1
+        return 0, 1, 0
+    hh = h * h % P
+    hhh = h * hh % P
+    v = x1 * hh % P
+    x3 = (r * r - hhh - 2 * v) % P
+    y3 = (r * (v - x3) - y1 * hhh) % P
+    return x3, y3, z1 * h % P
+
+
+def generator_multiple(k: int) -> Tuple[int, int]:
+    """
+    Affine k * G for 0 < k < N
+
+    Raises:
+        ValueError: If k is out of range
+    """
+    if not 0 < k < N:
+        raise ValueError("Scalar out of range")
+    point = (0, 1, 0)
+    mask = (1 << WINDOW_BITS) - 1
+    for row in _table():
+        digit = k & mask
+        if digit:
+            point = _jacobian_add_affine(point, row[digit])
+        k >>= WINDOW_BITS
+    x, y, z = point
+    z_inv = pow(z, -1, P)
+    z_inv2 = z_inv * z_inv % P
+    return x * z_inv2 % P, y * z_inv2 * z_inv % P
+
+
+def _private_key(key: Any) -> int:
+    if isinstance(key, (bytes, bytearray)):
+        key = int.from_bytes(key, 'big')
+    elif isinstance(key, str):
+        key = int(key, 16)
+    if not 0 < key < N:
+        raise ValueError("Private key out of range")
+    return key
+
+
+def private_keys_to_addresses(keys: Sequence[Any]) -> List[str]:
+    """
+    Ethereum addresses (lowercase hex) of private keys
+
+    Args:
+        keys: Private keys as int, 32 bytes or hex string
+    """
+    public_keys = []
+    for key in keys:
+        x, y = generator_multiple(_private_key(key))
+        public_keys.append(x.to_bytes(32, 'big') + y.to_bytes(32, 'big'))
+    return ['0x' + digest[12:].hex() for digest in keccak256_many(public_keys)]
+
+
+def private_key_to_address(key: Any) -> str:
+    """Ethereum address (lowercase hex) of one private key"""
+    return private_keys_to_addresses([key])[0]
+
+
+def _rfc6979_nonce(key: int, digest: bytes) -> int:
+    """Deterministic ECDSA nonce (RFC 6979 section 3.2, HMAC-SHA256)"""
+    x = key.to_bytes(32, 'big')
+    h = (int.from_bytes(digest, 'big') % N).to_bytes(32, 'big')
+    v = b'\x01' * 32
+    k = b'\x00' * 32
+    k = hmac.new(k, v + b'\x00' + x + h, hashlib.sha256).digest()
+    v = hmac.new(k, v, hashlib.sha256).digest()
+    k = hmac.new(k, v + b'\x01' + x + h, hashlib.sha256).digest()
+    v = hmac.new(k, v, hashlib.sha256).digest()
+    while True:
+        v = hmac.new(k, v, hashlib.sha256).digest()
+        candidate = int.from_bytes(v, 'big')
+        if 0 < candidate < N:
+            return candidate
+        k = hmac.new(k, v + b'\x00', hashlib.sha256).digest()
+        v = hmac.new(k, v, hashlib.sha256).digest()
+
+
+def sign_digest(key: Any, digest: bytes) -> bytes:
+    """
+    Sign a 32-byte digest
+
+    Args:
+        key: Private key as int, 32 bytes or hex string
+        digest: Message hash, e.g. an EIP-712 digest
+
+    Returns:
+        65-byte signature r || s || v with low s and v in {27, 28}
+    """
+    if len(digest) != 32:
+        raise ValueError(f"Expected a 32-byte digest, got {len(digest)} bytes")
+    d = _private_key(key)
+    z = int.from_bytes(digest, 'big')
+    k = _rfc6979_nonce(d, digest)
+    rx, ry = generator_multiple(k)
+    r = rx % N
+    s = pow(k, -1, N) * (z + r * d) % N
+    recovery = ry & 1
+    if s > N // 2:
+        s = N - s
+        recovery ^= 1
+    return r.to_bytes(32, 'big') + s.to_bytes(32, 'big') + bytes([27 + recovery])
+
+
+def _sign_chunk(pairs: Sequence[Tuple[Any, bytes]]) -> List[bytes]:
+    return [sign_digest(key, digest) for key, digest in pairs]
+
+
+def sign_digests(keys: Sequence[Any], digests: Sequence[bytes], workers: int = 1) -> List[bytes]:
+    """
+    Sign digests[i] with keys[i]
+
+    Args:
+        keys: Private key per digest
+        digests: 32-byte digests
+        workers: Worker processes; 1 signs in this process
+
+    Returns:
+        65-byte signatures in input order
+    """
+    if len(keys) != len(digests):
+        raise ValueError("keys and digests must have the same length")
+    pairs = list(zip(keys, digests))
+    if workers <= 1 or len(pairs) < 256:
+        return _sign_chunk(pairs)
+    size = -(-len(pairs) // (workers * 4))
+    with ProcessPoolExecutor(workers) as pool:
+        chunks = pool.map(_sign_chunk, [pairs[i:i + size] for i in range(0, len(pairs), size)])
+        return [signature for chunk in chunks for signature in chunk]
+
+
+def split_signature(signature: bytes) -> Tuple[int, bytes, bytes]:
+    """(v, r, s) of a 65-byte signature, as taken by ERC-2612 permit"""
+    return signature[64], signature[:32], signature[32:64]
+
+
+def _member_types(type_string: str) -> List[str]:
+    match = _TYPE_STRING.match(type_string)
+    if not match:
+        raise ValueError(f"Invalid EIP-712 type '{type_string}'")
+    return [member.split(' ')[0] for member in split_types(match.group(2))]
+
+
+def struct_hashes(type_string: str, rows: Sequence[Sequence[Any]]) -> List[bytes]:
+    """
+    hashStruct of flat EIP-712 structs, as `keccak256(abi.encode(TYPEHASH, ...))`
+
+    Args:
+        type_string: Encoded type, e.g. "AttestRequest(address attester,...)"
+        rows: Member values in declaration order, one sequence per struct (address,
+            uint256, uint8 and bytes32 members are ABI-encoded; strings are hashed first)
+    """
+    types = _member_types(type_string)
+    encoded_types = ['bytes32'] + ['bytes32' if t == 'string' else t for t in types]
+    type_hash = keccak256(type_string.encode())
+    strings = [i for i, t in enumerate(types) if t == 'string']
+    messages = []
+    for values in rows:
+        if len(values) != len(types):
+            raise ValueError(f"Expected {len(types)} struct members, got {len(values)}")
+        values = list(values)
+        for i in strings:
+            values[i] = keccak256(values[i].encode())
+        messages.append(encode_arguments(encoded_types, [type_hash] + values).tobytes())
+    return keccak256_many(messages)
+
+
+def struct_hash(type_string: str, values: Sequence[Any]) -> bytes:
+    """hashStruct of one flat EIP-712 struct (see struct_hashes)"""
+    return struct_hashes(type_string, [values])[0]
+
+
+def domain_separator(name: str, version: str, chain_id: int, verifying_contract: str) -> bytes:
+    """EIP-712 domain separator with name, version, chainId and verifyingContract"""
+    return struct_hash(EIP712_DOMAIN_TYPE, [name, version, chain_id, verifying_contract])
+
+
+def typed_data_digests(separator: bytes, hashed_structs: Sequence[bytes]) -> List[bytes]:
+    """keccak256("\\x19\\x01" || domainSeparator || hashStruct) per struct, as `_hashTypedDataV4`"""
+    if len(separator) != WORD_SIZE or any(len(h) != WORD_SIZE for h in hashed_structs):
+        raise ValueError("Domain separator and struct hashes must be 32 bytes")
+    return keccak256_many([b'\x19\x01' + separator + h for h in hashed_structs])
+
+
+def typed_data_digest(separator: bytes, hashed_struct: bytes) -> bytes:
+    """EIP-712 digest of one struct (see typed_data_digests)"""
+    return typed_data_digests(separator, [hashed_struct])[0]
+
+
+def main():
+    """Derive addresses or sign digests for test keys"""
+    if len(sys.argv) < 3:
+        print("Usage: python evm_signing.py <command> [args...]")
+        print("Commands:")
+        print("  address <private_key> - Address of a private key (hex or decimal)")
+        print("  sign <private_key> <digest> - 65-byte signature of a 32-byte hex digest")
+        return
+
+    command = sys.argv[1]
+    try:
+        key = int(sys.argv[2], 0)
+        if command == "address":
+            print(private_key_to_address(key))
+        elif command == "sign" and len(sys.argv) > 3:
+            print('0x' + sign_digest(key, bytes.fromhex(sys.argv[3].removeprefix('0x'))).hex())
+        else:
+            print(f"Unknown command: {command}")
+    except ValueError as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
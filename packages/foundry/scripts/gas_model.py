@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+Gas cost model for on-chain PageRank and oracle score publishing
+
+`computePageRank` (also run by every `recordAttestation`/`attestMeta`) and
+`clearPageRankState` loop over all `pagerankNodes` pairs, so their storage traffic grows
+with n² regardless of how sparse the attestation graph is. This module counts the
+SLOADs and SSTOREs those functions perform for a given graph, following the Solidity
+loops statement by statement, and prices them with the Berlin/London schedule
+(EIP-2929 cold/warm access, EIP-2200 net metering, EIP-3529 refunds capped at 1/5 of
+the gas used). The result is compared against the oracle's batched score updates
+(`score_publisher.py`) to decide per epoch whether to recompute on-chain or publish.
+
+Modelling assumptions:
+- Storage costs are exact for the loops as written; reading `pagerankNodes[i]` counts as
+  two SLOADs (bounds check on the length, then the element).
+- Non-storage execution (loop control, mapping slot hashing, arithmetic) is approximated
+  with LOOP_EXECUTION_GAS per loop body and SLOT_HASH_GAS per mapping lookup. Calibrate
+  both against `forge test --gas-report` when exact figures matter.
+- Recomputes are steady state: stochastic edges and scores from the previous run are
+  still stored, except for `new_nodes`/`new_edges`.
+- `_buildPersonalizationVector` is costed without score overrides (an upper bound).
+"""
+
+import json
+import sys
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from attestation_io import load_attestation_columns
+from onchain_pagerank import OnChainPageRank, PR_MAX_ITER
+
+# EVM gas schedule (Berlin/London)
+TX_BASE_GAS = 21_000
+COLD_SLOAD_GAS = 2_100        # first access to a slot in the transaction (EIP-2929)
+WARM_ACCESS_GAS = 100         # later SLOADs, no-op or dirty SSTOREs
+SSTORE_SET_GAS = 20_000       # clean slot, zero -> non-zero
+SSTORE_RESET_GAS = 2_900      # clean slot, non-zero -> other value
+SSTORE_CLEAR_REFUND = 4_800   # clean slot, non-zero -> zero (EIP-3529)
+SSTORE_RESTORE_REFUND = 2_800  # dirty slot written back to its original non-zero value
+MAX_REFUND_QUOTIENT = 5
+
+# Approximate non-storage execution
+LOOP_EXECUTION_GAS = 50       # counter increment, bound comparison, jumps
+SLOT_HASH_GAS = 50            # keccak256 of a mapping key plus the memory writes
+
+DEFAULT_BLOCK_GAS_LIMIT = 30_000_000
+
+
+def sstore_gas(original, new, cold: bool = True):
+    """
+    Gas of SSTOREs to clean slots (vectorized over NumPy arrays)
+
+    Args:
+        original: Stored value(s) before the transaction
+        new: Written value(s)
+        cold: Whether the slot has not been accessed earlier in the transaction
+
+    Returns:
+        Gas per write, excluding refunds
+    """
+    original = np.asarray(original)
+    gas = np.where(original == np.asarray(new), WARM_ACCESS_GAS,
+                   np.where(original == 0, SSTORE_SET_GAS, SSTORE_RESET_GAS))
+    return gas + (COLD_SLOAD_GAS if cold else 0)
+
+
+class StorageCost:
+    """Storage operation counts of one function, and the gas they imply"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.cold_sloads = 0
+        self.warm_sloads = 0
+        # SSTOREs by EIP-2200 case
+        self.sstore_set = 0      # clean slot, zero -> non-zero
+        self.sstore_reset = 0    # clean slot, non-zero -> other value
+        self.sstore_warm = 0     # no-op writes and writes to dirty slots
+        # SSTOREs that were the first access to their slot (pay the cold surcharge)
+        self.cold_sstores = 0
+        self.refund = 0
+        self.loop_bodies = 0
+        self.slot_hashes = 0
+
+    @property
+    def sloads(self) -> int:
+        return self.cold_sloads + self.warm_sloads
+
+    @property
+    def sstores(self) -> int:
+        return self.sstore_set + self.sstore_reset + self.sstore_warm
+
+    @property
+    def execution_gas(self) -> int:
+        return self.loop_bodies * LOOP_EXECUTION_GAS + self.slot_hashes * SLOT_HASH_GAS
+
+    @property
+    def gas(self) -> int:
+        """Gas before refunds"""
+        return (self.cold_sloads * COLD_SLOAD_GAS + self.warm_sloads * WARM_ACCESS_GAS
+                + self.sstore_set * SSTORE_SET_GAS + self.sstore_reset * SSTORE_RESET_GAS
+                + self.sstore_warm * WARM_ACCESS_GAS + self.cold_sstores * COLD_SLOAD_GAS
+                + self.execution_gas)
+
+    def scaled(self, name: str, factor: int) -> 'StorageCost':
+        """The cost of running this function `factor` times"""
+        total = StorageCost(name)
+        for field in _COUNT_FIELDS:
+            setattr(total, field, getattr(self, field) * factor)
+        return total
+
+    def __add__(self, other: 'StorageCost') -> 'StorageCost':
+        total = StorageCost(self.name)
+        for field in _COUNT_FIELDS:
+            setattr(total, field, getattr(self, field) + getattr(other, field))
+        return total
+
+    def to_dict(self) -> Dict[str, int]:
+        data = {field: getattr(self, field) for field in _COUNT_FIELDS}
+        data.update(sloads=self.sloads, sstores=self.sstores, execution_gas=self.execution_gas, gas=self.gas)
+        return data
+
+
+_COUNT_FIELDS = ('cold_sloads', 'warm_sloads', 'sstore_set', 'sstore_reset', 'sstore_warm',
+                 'cold_sstores', 'refund', 'loop_bodies', 'slot_hashes')
+
+
+def transaction_gas(cost: StorageCost) -> int:
+    """Gas charged for a transaction running `cost`, after the EIP-3529 refund cap"""
+    used = TX_BASE_GAS + cost.gas
+    return used - min(cost.refund, used // MAX_REFUND_QUOTIENT)
+
+
+class GraphProfile:
+    """The on-chain PageRank state figures that drive gas"""
+
+    def __init__(self, node_count: int, edge_count: int, source_count: int, stochastic_count: int,
+                 iterations: int, nonzero_scores: Optional[int] = None):
+        """
+        Args:
+            node_count: Length of pagerankNodes (n)
+            edge_count: Non-zero pagerankEdges entries
+            source_count: Nodes with a non-zero pagerankOutDegree
+            stochastic_count: Non-zero pagerankStochasticEdges entries
+            iterations: Iterations computePageRank runs (at most PR_MAX_ITER)
+            nonzero_scores: Non-zero pagerankScores entries (default: all nodes)
+        """
+        self.node_count = node_count
+        self.edge_count = edge_count
+        self.source_count = source_count
+        self.stochastic_count = stochastic_count
+        self.iterations = iterations
+        self.nonzero_scores = node_count if nonzero_scores is None else nonzero_scores
+
+    @classmethod
+    def from_state(cls, state: OnChainPageRank, iterations: Optional[int] = None) -> 'GraphProfile':
+        """
+        Profile an emulated contract state
+
+        Args:
+            state: On-chain PageRank emulator holding the attestations
+            iterations: Iteration count to assume; None runs the emulator to get the
+                exact count (and the non-zero score count)
+        """
+        nonzero_scores = None
+        if iterations is None:
+            scores = state.compute()
+            iterations = state.iterations
+            nonzero_scores = sum(1 for score in scores.values() if score)
+        src, _, weight = state.graph.edge_arrays()
+        attested = weight > 0
+        return cls(
+            node_count=state.graph.number_of_nodes(),
+            edge_count=int(attested.sum()),
+            source_count=len(np.unique(src[attested])),
+            stochastic_count=len(state.stochastic_edges()[0]),
+            iterations=iterations,
+            nonzero_scores=nonzero_scores,
+        )
+
+    @classmethod
+    def synthetic(cls, node_count: int, edges_per_node: float, iterations: int) -> 'GraphProfile':
+        """Profile of a graph with `edges_per_node` edges per node, every node attesting"""
+        edges = min(int(node_count * edges_per_node), node_count * (node_count - 1))
+        return cls(node_count, edges, min(node_count, edges), edges, iterations)
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            'node_count': self.node_count,
+            'edge_count': self.edge_count,
+            'source_count': self.source_count,
+            'stochastic_count': self.stochastic_count,
+            'iterations': self.iterations,
+            'nonzero_scores': self.nonzero_scores,
+        }
+
+
+def _initialize_cost(p: GraphProfile, new_nodes: int) -> StorageCost:
+    """_computePageRank before the helpers: length checks and the initial score loop"""
+    n = p.node_count
+    cost = StorageCost('_computePageRank:init')
+    cost.cold_sloads = 1 + n                # length, then every pagerankNodes element
+    cost.warm_sloads = 1 + (n + 1) + n      # division, loop condition, bounds checks
+    cost.cold_sstores = n
+    cost.sstore_set = new_nodes
+    cost.sstore_reset = n - new_nodes
+    cost.loop_bodies = n
+    cost.slot_hashes = n
+    return cost
+
+
+def create_stochastic_graph_cost(p: GraphProfile, new_edges: int = 0) -> StorageCost:
+    """
+    Storage traffic of _createStochasticGraph
+
+    Args:
+        p: Graph profile
+        new_edges: Stochastic edges not stored by the previous recompute
+    """
+    n, m, e, s = p.node_count, p.source_count, p.edge_count, p.stochastic_count
+    stored = max(s - new_edges, 0)
+    cost = StorageCost('_createStochasticGraph')
+
+    # Outer loop: condition, pagerankNodes[i], pagerankOutDegree[node]
+    cost.warm_sloads += (n + 1) + 2 * n
+    cost.cold_sloads += n
+    cost.loop_bodies += n
+    cost.slot_hashes += n
+
+    # Clearing loop over all n² pairs; every stochastic slot is touched cold here
+    cost.warm_sloads += n * (n + 1) + 2 * n * n
+    cost.cold_sstores += n * n
+    cost.sstore_reset += stored
+    cost.sstore_warm += n * n - stored
+    cost.refund += stored * SSTORE_CLEAR_REFUND
+    cost.loop_bodies += n * n
+    cost.slot_hashes += 2 * n * n
+
+    # Normalization loop over the rows of nodes with out-degree: one cold
+    # pagerankEdges read per pair, and a write back for every attested pair
+    cost.warm_sloads += m * (n + 1) + 2 * m * n
+    cost.cold_sloads += m * n
+    cost.loop_bodies += m * n
+    cost.slot_hashes += 2 * m * n + 2 * e
+    cost.sstore_set += s - stored
+    cost.sstore_warm += e - (s - stored)
+    # Rewriting the cleared value cancels its clear refund and earns the restore refund
+    cost.refund -= stored * (SSTORE_CLEAR_REFUND - SSTORE_RESTORE_REFUND)
+    return cost
+
+
+def build_personalization_cost(p: GraphProfile) -> StorageCost:
+    """Storage traffic of _buildPersonalizationVector (no score overrides)"""
+    n = p.node_count
+    cost = StorageCost('_buildPersonalizationVector')
+    # scoreOverrides, lenderDeposits and isKYCVerified per node; the contract
+    # parameters are cold once
+    cost.cold_sloads = 3 * n + 2
+    cost.warm_sloads = 1 + 2 * n + 2 * (n - 1)
+    cost.loop_bodies = 3 * n
+    cost.slot_hashes = 3 * n
+    return cost
+
+
+def pagerank_iteration_cost(p: GraphProfile) -> StorageCost:
+    """Storage traffic of one _pagerankIteration call (every slot is warm by then)"""
+    n = p.node_count
+    dangling = n - p.source_count
+    cost = StorageCost('_pagerankIteration')
+    cost.warm_sloads = (
+        1                       # pagerankNodes.length
+        + 3 * n + dangling      # dangling sum: node, out-degree, score of dangling nodes
+        + 3 * n                 # old scores: node, score
+        + 2 * n + 3 * n * n     # main loop: node, then source node and stochastic edge per pair
+    )
+    cost.sstore_warm = n        # score writes to slots already written at initialization
+    cost.loop_bodies = 3 * n + n * n
+    cost.slot_hashes = 2 * n + dangling + 2 * n * n + n
+    return cost
+
+
+def compute_pagerank_cost(p: GraphProfile, new_nodes: int = 0, new_edges: int = 0) -> Dict[str, StorageCost]:
+    """
+    Storage traffic of computePageRank, per stage
+
+    Args:
+        p: Graph profile
+        new_nodes: Nodes without a stored score from the previous recompute
+        new_edges: Stochastic edges not stored by the previous recompute
+
+    Returns:
+        Dictionary with the init, _createStochasticGraph, _buildPersonalizationVector
+        and _pagerankIteration (all iterations) costs, and their sum as "computePageRank"
+    """
+    stages = [
+        _initialize_cost(p, new_nodes),
+        create_stochastic_graph_cost(p, new_edges),
+        build_personalization_cost(p),
+        pagerank_iteration_cost(p).scaled('_pagerankIteration', p.iterations),
+    ]
+    total = StorageCost('computePageRank')
+    for stage in stages:
+        total = total + stage
+    total.name = 'computePageRank'
+    result = {stage.name: stage for stage in stages}
+    result['computePageRank'] = total
+    return result
+
+
+def clear_pagerank_state_cost(p: GraphProfile) -> StorageCost:
+    """Storage traffic of clearPageRankState"""
+    n, m, e, s, z = p.node_count, p.source_count, p.edge_count, p.stochastic_count, p.nonzero_scores
+    cost = StorageCost('clearPageRankState')
+
+    # pagerankNodes: length on every loop condition and bounds check, each element
+    # cold once
+    cost.cold_sloads += 1 + n
+    cost.warm_sloads += (n + 1) + n * (n + 1) - 1 + (n + n * n) + (n + n * n) - n
+
+    # Per node: pagerankNodeExists, pagerankScores and pagerankOutDegree cleared
+    cost.cold_sstores += 3 * n
+    cost.sstore_reset += n + z + m
+    cost.sstore_warm += (n - z) + (n - m)
+    cost.refund += (n + z + m) * SSTORE_CLEAR_REFUND
+    cost.slot_hashes += 3 * n
+
+    # Per pair: pagerankEdges and pagerankStochasticEdges cleared
+    cost.cold_sstores += 2 * n * n
+    cost.sstore_reset += e + s
+    cost.sstore_warm += 2 * n * n - e - s
+    cost.refund += (e + s) * SSTORE_CLEAR_REFUND
+    cost.slot_hashes += 4 * n * n
+    cost.loop_bodies += n + n * n
+
+    # delete pagerankNodes: every element slot and the length
+    cost.warm_sloads += 1
+    cost.sstore_reset += n + 1
+    cost.refund += (n + 1) * SSTORE_CLEAR_REFUND
+    cost.loop_bodies += n
+    return cost
+
+
+def max_onchain_nodes(block_gas_limit: int = DEFAULT_BLOCK_GAS_LIMIT, edges_per_node: float = 3.0,
+                      iterations: int = PR_MAX_ITER) -> int:
+    """
+    Largest graph whose computePageRank fits in one block
+
+    Args:
+        block_gas_limit: Block gas limit
+        edges_per_node: Attestations per node of the synthetic graph
+        iterations: Iterations to assume (PR_MAX_ITER is the worst case)
+
+    Returns:
+        Largest node count n with transaction_gas(computePageRank) <= block_gas_limit
+    """
+    def fits(n: int) -> bool:
+        profile = GraphProfile.synthetic(n, edges_per_node, iterations)
+        return transaction_gas(compute_pagerank_cost(profile)['computePageRank']) <= block_gas_limit
+
+    low, high = 0, 2
+    while fits(high):
+        low, high = high, high * 2
+    while high - low > 1:
+        middle = (low + high) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def score_publish_cost(scores: Dict[str, int], publisher: 'ScorePublisher') -> Dict[str, int]:
+    """
+    Gas of publishing `scores` through the oracle's ScorePublisher
+
+    Args:
+        scores: Scaled scores by address
+        publisher: ScorePublisher holding the snapshot, threshold and gas budget
+
+    Returns:
+        Dictionary with update, transaction and gas totals
+    """
+    batches = publisher.plan(scores)
+    return {
+        'updates': sum(len(batch.addresses) for batch in batches),
+        'transactions': sum(len(batch.calldata) for batch in batches),
+        'gas': sum(batch.gas for batch in batches),
+        'max_batch_gas': max((batch.gas for batch in batches), default=0),
+    }
+
+
+def plan_epoch(profile: GraphProfile, publish: Dict[str, int],
+               block_gas_limit: int = DEFAULT_BLOCK_GAS_LIMIT) -> Dict[str, Any]:
+    """
+    Compare an on-chain recompute with publishing from the oracle
+
+    Args:
+        profile: Current graph profile
+        publish: Result of score_publish_cost for the oracle's scores
+        block_gas_limit: Block gas limit
+
+    Returns:
+        Dictionary with both gas figures, whether the recompute fits in a block and
+        the recommended mode ("onchain" or "oracle")
+    """
+    compute = compute_pagerank_cost(profile)['computePageRank']
+    onchain_gas = transaction_gas(compute)
+    fits = onchain_gas <= block_gas_limit
+    return {
+        'onchain_gas': onchain_gas,
+        'onchain_fits_block': fits,
+        'oracle_gas': publish['gas'],
+        'oracle_transactions': publish['transactions'],
+        'recommended': 'onchain' if fits and onchain_gas < publish['gas'] else 'oracle',
+    }
+
+
+def estimate(path: str, iterations: Optional[int] = None, block_gas_limit: int = DEFAULT_BLOCK_GAS_LIMIT,
+             publisher: Optional['ScorePublisher'] = None) -> Dict[str, Any]:
+    """
+    Gas report for an attestation file or column store (any oracle input format)
+
+    Args:
+        path: Attestation JSON file, contract export or column store directory
+        iterations: Iteration count to assume (default: emulate the contract)
+        block_gas_limit: Block gas limit
+        publisher: ScorePublisher for the oracle side (default: publish every score)
+
+    Returns:
+        Dictionary with the graph profile, per-function costs and the epoch plan
+    """
+    # Imported here: score_publisher prices its writes with this module, which must
+    # stay importable without it (and without NetworkX)
+    from pagerank_calculator import PageRankCalculator
+    from score_publisher import ScorePublisher
+
+    columns = load_attestation_columns(path)
+    addresses = np.asarray(columns.addresses, dtype=object)
+    state = OnChainPageRank()
+    state.add_attestations(addresses[columns.src].tolist(), addresses[columns.dst].tolist(), columns.weights)
+    state.personalization = columns.get_personalization()
+    profile = GraphProfile.from_state(state, iterations)
+
+    calculator = PageRankCalculator(backend='csr')
+    calculator.add_attestation_columns(columns)
+    calculator.set_personalization(columns.get_personalization())
+    if publisher is None:
+        publisher = ScorePublisher(snapshot_path=None, threshold=0)
+    publish = score_publish_cost(calculator.compute_pagerank(), publisher)
+
+    costs = compute_pagerank_cost(profile)
+    per_iteration = pagerank_iteration_cost(profile)
+    clear = clear_pagerank_state_cost(profile)
+    return {
+        'profile': profile.to_dict(),
+        'functions': {name: cost.to_dict() for name, cost in costs.items()},
+        'per_iteration': per_iteration.to_dict(),
+        'clearPageRankState': dict(clear.to_dict(), transaction_gas=transaction_gas(clear)),
+        'computePageRank_transaction_gas': transaction_gas(costs['computePageRank']),
+        'publish': publish,
+        'plan': plan_epoch(profile, publish, block_gas_limit),
+        'block_gas_limit': block_gas_limit,
+    }
+
+
+def main():
+    """Estimate on-chain PageRank and score publishing gas"""
+    options = {
+        'iterations': None,
+        'block-gas-limit': str(DEFAULT_BLOCK_GAS_LIMIT),
+        'edges-per-node': '3',
+    }
+    for arg in [a for a in sys.argv if a.startswith('--') and '=' in a]:
+        name, value = arg[2:].split('=', 1)
+        options[name] = value
+        sys.argv.remove(arg)
+
+    if len(sys.argv) < 2:
+        print("Usage: python gas_model.py <command> [args...]")
+        print("Commands:")
+        print("  estimate <attestations.json|store_dir> - Gas of computePageRank, clearPageRankState and publishing")
+        print("  max-nodes - Largest graph whose computePageRank fits in one block")
+        print("Options:")
+        print("  --iterations=<n> - Iterations to assume (default: emulate; max-nodes uses 100)")
+        print(f"  --block-gas-limit=<n> - Block gas limit (default {DEFAULT_BLOCK_GAS_LIMIT})")
+        print("  --edges-per-node=<x> - Attestations per node for max-nodes (default 3)")
+        return
+
+    command = sys.argv[1]
+    try:
+        iterations = None if options['iterations'] is None else int(options['iterations'])
+        block_gas_limit = int(options['block-gas-limit'])
+        edges_per_node = float(options['edges-per-node'])
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
+    if command == "estimate":
+        if len(sys.argv) < 3:
+            print("Error: Please provide attestations JSON file")
+            return
+
+        json_file = sys.argv[2]
+        try:
+            print(json.dumps(estimate(json_file, iterations, block_gas_limit), indent=2))
+        except FileNotFoundError:
+            print(f"Error: File {json_file} not found")
+        except json.JSONDecodeError:
+            print(f"Error: Invalid JSON in {json_file}")
+        except ValueError as e:
+            print(f"Error: {e}")
+
+    elif command == "max-nodes":
+        nodes = max_onchain_nodes(block_gas_limit, edges_per_node,
+                                  PR_MAX_ITER if iterations is None else iterations)
+        print(json.dumps({
+            'block_gas_limit': block_gas_limit,
+            'edges_per_node': edges_per_node,
+            'iterations': PR_MAX_ITER if iterations is None else iterations,
+            'max_nodes': nodes,
+        }, indent=2))
+    else:
+        print(f"Unknown command: {command}")
+
+
+if __name__ == "__main__":
+    main()
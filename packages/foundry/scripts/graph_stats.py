@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Bounded statistics and paginated output for attestation graphs
+
+`graph_summary` describes a graph in a fixed-size dictionary, whatever its size: node
+and edge counts, in/out-degree and weight distributions (quantiles plus power-of-two
+degree histograms), dangling and isolated node counts and weakly connected component
+sizes. Everything comes from bincounts over the edge columns and one component
+labelling, so no per-node Python objects are created.
+
+Full listings (edges, scores) are read in pages with `page_ranges` instead of being
+materialized, and `write_ndjson` writes any record iterator as one JSON object per
+line, page by page, so output of any size is produced in bounded memory.
+"""
+
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+import numpy as np
+
+from pagerank_components import connected_components
+
+QUANTILES = (50, 90, 99)
+# Records per page for iterators and NDJSON writes
+DEFAULT_PAGE_SIZE = 10_000
+
+
+def distribution(values: np.ndarray, scale: float = 1) -> Dict[str, Any]:
+    """
+    Count, min, max, mean and quantiles of `values` divided by `scale`
+
+    Empty inputs report a count of 0 and None for everything else.
+    """
+    if not len(values):
+        return {'count': 0, 'min': None, 'max': None, 'mean': None,
+                **{f'p{q}': None for q in QUANTILES}}
+    values = np.asarray(values, dtype=np.float64) / scale
+    quantiles = np.percentile(values, QUANTILES)
+    return {
+        'count': len(values),
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'mean': float(values.mean()),
+        **{f'p{q}': float(value) for q, value in zip(QUANTILES, quantiles)},
+    }
+
+
+def degree_histogram(degrees: np.ndarray) -> Dict[str, int]:
+    """
+    Nodes per degree bucket "0", "1", "2-3", "4-7", ... (non-empty buckets only)
+    """
+    degrees = np.asarray(degrees, dtype=np.int64)
+    # Bucket 0 holds degree 0; bucket b > 0 holds degrees 2**(b-1) .. 2**b - 1
+    buckets = np.zeros(len(degrees), dtype=np.int64)
+    positive = degrees > 0
+    buckets[positive] = np.floor(np.log2(degrees[positive])).astype(np.int64) + 1
+    histogram = {}
+    for bucket, count in enumerate(np.bincount(buckets).tolist()):
+        low, high = (0, 0) if bucket == 0 else (1 << (bucket - 1), (1 << bucket) - 1)
+        if count:
+            histogram[str(low) if low == high else f'{low}-{high}'] = count
+    return histogram
+
+
+def graph_summary(src: np.ndarray, dst: np.ndarray, weight: np.ndarray, node_count: int,
+                  scale: float = 1, components: bool = True) -> Dict[str, Any]:
+    """
+    Fixed-size statistics of an edge-column graph
+
+    Args:
+        src: Attester id per distinct edge
+        dst: Borrower id per distinct edge
+        weight: Raw weight per edge
+        node_count: Number of nodes (ids 0..node_count-1, including edgeless ones)
+        scale: Divisor for reported weights (the calculator's weight scale)
+        components: Whether to label weakly connected components
+
+    Returns:
+        Dictionary with node_count, edge_count, attester/borrower/dangling/isolated
+        counts, out_degree, in_degree, weight and in_weight distributions, degree
+        histograms and component size statistics
+    """
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    weight = np.asarray(weight, dtype=np.int64)
+    out_degree = np.bincount(src, minlength=node_count)
+    in_degree = np.bincount(dst, minlength=node_count)
+    out_weight = np.bincount(src, weights=weight, minlength=node_count)
+    in_weight = np.bincount(dst, weights=weight, minlength=node_count)
+
+    summary = {
+        'node_count': node_count,
+        'edge_count': len(src),
+        'attester_count': int(np.count_nonzero(out_degree)),
+        'borrower_count': int(np.count_nonzero(in_degree)),
+        # Nodes whose PageRank mass is redistributed (no positive outgoing weight)
+        'dangling_count': int(np.count_nonzero(out_weight <= 0)),
+        'isolated_count': int(np.count_nonzero((out_degree == 0) & (in_degree == 0))),
+        'out_degree': distribution(out_degree),
+        'in_degree': distribution(in_degree),
+        'out_degree_histogram': degree_histogram(out_degree),
+        'in_degree_histogram': degree_histogram(in_degree),
+        'weight': distribution(weight, scale),
+        'in_weight': distribution(in_weight[in_degree > 0], scale),
+    }
+    if components and node_count:
+        sizes = np.bincount(connected_components(src, dst, node_count))
+        summary['components'] = {
+            'count': len(sizes),
+            'largest': int(sizes.max()),
+            'largest_share': float(sizes.max() / node_count),
+            'singletons': int(np.count_nonzero(sizes == 1)),
+            'sizes': distribution(sizes),
+        }
+    return summary
+
+
+def page_ranges(total: int, offset: int = 0, limit: Optional[int] = None,
+                page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Tuple[int, int]]:
+    """
+    [start, stop) bounds of consecutive pages covering rows offset .. offset+limit
+
+    Raises:
+        ValueError: If offset or limit is negative or page_size is not positive
+    """
+    if offset < 0 or (limit is not None and limit < 0) or page_size < 1:
+        raise ValueError("offset and limit must be non-negative and page_size positive")
+    end = total if limit is None else min(total, offset + limit)
+    for start in range(offset, end, page_size):
+        yield start, min(start + page_size, end)
+
+
+def write_ndjson(records: Iterable[Dict[str, Any]], stream: TextIO, page_size: int = DEFAULT_PAGE_SIZE) -> int:
+    """
+    Write records as newline-delimited JSON, one page at a time
+
+    Returns:
+        Number of records written
+    """
+    records = iter(records)
+    written = 0
+    while True:
+        page = [json.dumps(record) for record in islice(records, page_size)]
+        if not page:
+            return written
+        stream.write('\n'.join(page) + '\n')
+        written += len(page)
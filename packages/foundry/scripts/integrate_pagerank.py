@@ -9,6 +9,10 @@ import sys
 import os
 from typing import Dict, List, Any
 from pagerank_oracle import PageRankOracle
+from pagerank_cache import PageRankCache
+
+# Shared by the demonstrations so repeated attestation sets are not recomputed
+RESULT_CACHE = PageRankCache()
 
 def simulate_contract_attestations():
     """
@@ -40,7 +44,7 @@ def demonstrate_weight_change_impact():
     """
     print("=== DEMONSTRATING NETWORKX PAGERANK WEIGHT SENSITIVITY ===\n")
     
-    oracle = PageRankOracle()
+    oracle = PageRankOracle(cache=RESULT_CACHE)
     
     # Test case 1: High weight attestation
     print("Test 1: High weight attestation (80%)")
@@ -82,7 +86,7 @@ def demonstrate_complex_network():
     """
     print("\n=== DEMONSTRATING COMPLEX NETWORK PAGERANK ===\n")
     
-    oracle = PageRankOracle()
+    oracle = PageRankOracle(cache=RESULT_CACHE)
     
     # Complex network with multiple participants and attestations
     complex_data = simulate_contract_attestations()
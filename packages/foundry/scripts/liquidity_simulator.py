@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo stress simulator for the lending pool's withdrawal queue
+
+Liquidity is only observable on-chain by replaying transactions, so this reproduces the
+pool accounting of DecentralizedMicrocredit in integer USDC units (6 decimals) for
+thousands of independent scenarios at once, one numpy lane per scenario:
+
+- Deposits (`depositWithPermitMeta`) add to the balance and `totalDeposits`, then try
+  to fill the withdrawal queue.
+- Withdrawal requests (`requestWithdrawalMeta`) append to a FIFO queue, then try to
+  fill it.
+- `_tryFillWithdrawalQueue` is replayed exactly: the buffer is taken once per call as
+  totalDeposits * liquidityBuffer / BASIS_POINTS, the loop stops when the balance is at
+  or below reservedLiquidity + buffer + liquidityThreshold or when less than a cent
+  (10_000 units) is available, and a partial fill stops the loop.
+- Loans (`borrowAndDisburseMeta`) pass the utilisation cap and the buffer check on
+  totalDeposits - reservedLiquidity - totalLentOut, and are rejected (the transaction
+  reverts) otherwise. Repayments (`repayLoan` of the full outstanding amount, simple
+  interest after the grace period) return cash but do not touch the queue, as in the
+  contract; defaulted loans never repay and stay in totalLentOut.
+
+Time advances in days. Within a day, repayments come first, then deposits, withdrawal
+requests and loan requests interleave round-robin. Event counts are Poisson and
+amounts log-normal (see MarketModel); every candidate `setLiquidityLimits` pair sees
+the same random draws, so differences between candidates come from the limits alone.
+Lenders are assumed never to queue more than the pool holds for them, so the
+per-lender balance checks (and the revert if a fill underflowed one) are not modeled.
+
+Fill latency is the number of days from a request to its last payment; requests still
+queued at the end are reported as unfilled with their age.
+
+Usage:
+    python liquidity_simulator.py run --limits=500:0,1000:0,500:5000
+    python liquidity_simulator.py bench
+"""
+
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from loan_portfolio import BASIS_POINTS, CENT, GRACE_PERIOD, SECONDS_PER_YEAR
+
+USDC = 10**6
+DAY = 24 * 3600
+# Contract defaults: 5% buffer, no absolute threshold
+DEFAULT_LIMITS = [(500, 0)]
+INITIAL_QUEUE_CAPACITY = 64
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+class MarketModel:
+    """Demand assumptions for the simulated pool (amounts in whole USDC)"""
+
+    DEFAULTS: Dict[str, Any] = {
+        'initial_deposits': 100_000,     # pool size on day 0, all liquid
+        'deposits_per_day': 0.5,         # Poisson rate of deposits
+        'deposit_size': 2_000,           # mean deposit
+        'withdrawals_per_day': 0.5,      # Poisson rate of withdrawal requests
+        'withdrawal_size': 2_000,        # mean withdrawal request
+        'loans_per_day': 5.0,            # Poisson rate of loan requests
+        'loan_size': 500,                # mean loan
+        'size_sigma': 1.0,               # log-normal shape of every amount
+        'loan_terms_days': [30, 60, 90], # repayment day after disbursement, drawn uniformly
+        'default_rate': 0.03,            # share of loans never repaid
+        'loan_rate_bp': 1000,            # effrRate + riskPremium
+        'utilization_cap_bp': 9000,      # lendingUtilizationCap
+        'reserved': 0,                   # reservedLiquidity held by approved, undisbursed loans
+        'run_probability': 0.1,          # chance per scenario of one bank run within the horizon
+        'run_days': 7,                   # length of a run
+        'run_multiplier': 10.0,          # withdrawal rate multiplier during a run
+    }
+
+    def __init__(self, **overrides):
+        """
+        Args:
+            **overrides: Any of the DEFAULTS keys
+
+        Raises:
+            ValueError: If a key is unknown or a value is out of range
+        """
+        unknown = set(overrides) - set(self.DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown market parameters: {', '.join(sorted(unknown))}")
+        values = {**self.DEFAULTS, **overrides}
+        for key, value in values.items():
+            setattr(self, key, value)
+
+        self.loan_terms_days = [int(term) for term in self.loan_terms_days]
+        if not self.loan_terms_days or min(self.loan_terms_days) < 1:
+            raise ValueError("loan_terms_days must list terms of at least one day")
+        if not 0 <= self.default_rate <= 1 or not 0 <= self.run_probability <= 1:
+            raise ValueError("default_rate and run_probability must be between 0 and 1")
+        rates = (self.deposits_per_day, self.withdrawals_per_day, self.loans_per_day, self.run_multiplier)
+        if min(rates) < 0 or self.size_sigma < 0 or self.run_days < 0:
+            raise ValueError("Rates, size_sigma and run_days must be non-negative")
+        if not 0 <= self.utilization_cap_bp <= BASIS_POINTS:
+            raise ValueError(f"utilization_cap_bp must be between 0 and {BASIS_POINTS}")
+        # totalDeposits * liquidityBuffer must stay within int64
+        if self.initial_deposits * USDC * BASIS_POINTS * 10 > _INT64_MAX:
+            raise ValueError("initial_deposits is too large for int64 accounting")
+
+    @classmethod
+    def load(cls, path: str) -> 'MarketModel':
+        """Market parameters from a JSON object of DEFAULTS keys"""
+        with open(path, 'r') as f:
+            return cls(**json.load(f))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.DEFAULTS}
+
+
+def parse_limits(text: str) -> List[Tuple[int, int]]:
+    """
+    Parse "bufferBp:thresholdUsdc,..." into (bufferBp, threshold units) pairs
+
+    Raises:
+        ValueError: If a pair is malformed or the buffer exceeds BASIS_POINTS
+    """
+    limits = []
+    for item in text.split(','):
+        buffer_bp, _, threshold = item.strip().partition(':')
+        pair = (int(buffer_bp), round(float(threshold or 0) * USDC))
+        if not 0 <= pair[0] <= BASIS_POINTS or pair[1] < 0:
+            raise ValueError(f"Invalid liquidity limits '{item}' (expected bufferBp:thresholdUsdc)")
+        limits.append(pair)
+    return limits
+
+
+class PoolSimulation:
+    """Pool accounting and withdrawal queue for many scenarios, one row each"""
+
+    def __init__(self, buffer_bp: np.ndarray, threshold: np.ndarray, initial_deposits: int, reserved: int = 0,
+                 max_term_days: int = 0, groups: Optional[np.ndarray] = None, group_count: int = 1,
+                 max_latency: int = 0):
+        """
+        Args:
+            buffer_bp: liquidityBuffer per scenario
+            threshold: liquidityThreshold per scenario (USDC units)
+            initial_deposits: totalDeposits and balance on day 0 (USDC units)
+            reserved: reservedLiquidity, constant over the run (USDC units)
+            max_term_days: Longest loan term, sizing the repayment schedule
+            groups: Group (limits candidate) per scenario for the latency histograms
+            group_count: Number of groups
+            max_latency: Largest latency, in days, the histograms must hold
+        """
+        count = len(buffer_bp)
+        self.buffer_bp = np.asarray(buffer_bp, dtype=np.int64)
+        self.threshold = np.asarray(threshold, dtype=np.int64)
+        self.liquid = np.full(count, initial_deposits, dtype=np.int64)
+        self.total_deposits = np.full(count, initial_deposits, dtype=np.int64)
+        self.reserved = np.full(count, reserved, dtype=np.int64)
+        self.lent_out = np.zeros(count, dtype=np.int64)
+
+        # FIFO queue as a ring per scenario; head and tail count items ever dequeued/enqueued
+        self.capacity = INITIAL_QUEUE_CAPACITY
+        self.queue_remaining = np.zeros((count, self.capacity), dtype=np.int64)
+        self.queue_day = np.zeros((count, self.capacity), dtype=np.int32)
+        self.head = np.zeros(count, dtype=np.int64)
+        self.tail = np.zeros(count, dtype=np.int64)
+        self.queued = np.zeros(count, dtype=np.int64)
+
+        # Repayments due per day, as a ring over the longest term
+        self.schedule_days = max_term_days + 1
+        self.due_cash = np.zeros((count, self.schedule_days), dtype=np.int64)
+        self.due_principal = np.zeros((count, self.schedule_days), dtype=np.int64)
+
+        self.groups = np.zeros(count, dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+        self.latency_width = max_latency + 1
+        self.latency_counts = np.zeros(group_count * self.latency_width, dtype=np.int64)
+        self.requests = np.zeros(count, dtype=np.int64)
+        self.loans_accepted = np.zeros(count, dtype=np.int64)
+        self.loans_rejected = np.zeros(count, dtype=np.int64)
+
+    @property
+    def depth(self) -> np.ndarray:
+        """Queued withdrawal requests per scenario"""
+        return self.tail - self.head
+
+    def deposit(self, rows: np.ndarray, amounts: np.ndarray, day: int):
+        """depositWithPermitMeta for one deposit in each of `rows`"""
+        self.liquid[rows] += amounts
+        self.total_deposits[rows] += amounts
+        self.fill_withdrawal_queue(rows, day)
+
+    def request_withdrawal(self, rows: np.ndarray, amounts: np.ndarray, day: int):
+        """requestWithdrawalMeta for one request in each of `rows`"""
+        if self.depth[rows].max(initial=0) >= self.capacity:
+            self._grow()
+        slots = self.tail[rows] % self.capacity
+        self.queue_remaining[rows, slots] = amounts
+        self.queue_day[rows, slots] = day
+        self.tail[rows] += 1
+        self.queued[rows] += amounts
+        self.requests[rows] += 1
+        self.fill_withdrawal_queue(rows, day)
+
+    def borrow(self, rows: np.ndarray, amounts: np.ndarray, terms: np.ndarray, defaults: np.ndarray,
+               rate_bp: int, utilization_cap_bp: int, day: int) -> np.ndarray:
+        """
+        borrowAndDisburseMeta for one loan in each of `rows`, scheduling its repayment
+
+        Args:
+            rows: Scenarios requesting a loan
+            amounts: Principal (USDC units)
+            terms: Days until the loan is repaid in full
+            defaults: Whether the loan is never repaid
+            rate_bp: Loan APR in BASIS_POINTS
+            utilization_cap_bp: lendingUtilizationCap
+            day: Current day
+
+        Returns:
+            Whether each loan was disbursed (the others revert)
+        """
+        deposits = self.total_deposits[rows]
+        committed = self.reserved[rows] + self.lent_out[rows]
+        buffer = deposits * self.buffer_bp[rows] // BASIS_POINTS
+        accepted = (
+            (committed + amounts <= deposits * utilization_cap_bp // BASIS_POINTS)
+            # totalDeposits - reservedLiquidity - totalLentOut underflows (reverts) when negative
+            & (deposits >= committed)
+            & (deposits - committed >= amounts + buffer + self.threshold[rows])
+            & (self.liquid[rows] >= amounts)
+        )
+        self.loans_accepted[rows] += accepted
+        self.loans_rejected[rows] += ~accepted
+
+        rows, amounts, terms = rows[accepted], amounts[accepted], terms[accepted]
+        self.liquid[rows] -= amounts
+        self.lent_out[rows] += amounts
+
+        # getCurrentOutstandingAmount at repayment: simple interest after the grace period
+        elapsed = terms * DAY
+        interest = amounts * rate_bp // BASIS_POINTS * elapsed // SECONDS_PER_YEAR
+        interest[elapsed < GRACE_PERIOD] = 0
+        repaid = ~defaults[accepted]
+        rows, slots = rows[repaid], (day + terms[repaid]) % self.schedule_days
+        np.add.at(self.due_cash, (rows, slots), amounts[repaid] + interest[repaid])
+        np.add.at(self.due_principal, (rows, slots), amounts[repaid])
+        return accepted
+
+    def repay_due(self, day: int):
+        """repayLoan of the full outstanding amount for every loan due today"""
+        slot = day % self.schedule_days
+        self.liquid += self.due_cash[:, slot]
+        self.lent_out -= self.due_principal[:, slot]
+        self.due_cash[:, slot] = 0
+        self.due_principal[:, slot] = 0
+
+    def fill_withdrawal_queue(self, rows: np.ndarray, day: int):
+        """_tryFillWithdrawalQueue in each of `rows`"""
+        rows = rows[self.head[rows] < self.tail[rows]]
+        if not rows.size:
+            return
+        # bufferRequired is computed once, before any payment lowers totalDeposits
+        guard = (self.reserved[rows] + self.total_deposits[rows] * self.buffer_bp[rows] // BASIS_POINTS
+                 + self.threshold[rows])
+        while rows.size:
+            slots = self.head[rows] % self.capacity
+            remaining = self.queue_remaining[rows, slots]
+            liquid = self.liquid[rows]
+            available = np.where(liquid > guard, liquid - guard, 0)
+            # Emptied items are skipped without a payment; otherwise pay at least a cent
+            paying = (remaining > 0) & (available >= CENT)
+            pay = np.where(paying, np.minimum(remaining, available), 0)
+
+            self.total_deposits[rows] -= pay
+            self.liquid[rows] -= pay
+            self.queued[rows] -= pay
+            self.queue_remaining[rows, slots] = remaining - pay
+
+            done = (remaining == 0) | (paying & (pay == remaining))
+            filled = paying & done
+            if filled.any():
+                latency = day - self.queue_day[rows[filled], slots[filled]]
+                np.add.at(self.latency_counts, self.groups[rows[filled]] * self.latency_width + latency, 1)
+            self.head[rows[done]] += 1
+            # A partial fill or an exhausted guard stops the loop
+            keep = done & (self.head[rows] < self.tail[rows])
+            rows, guard = rows[keep], guard[keep]
+
+    def _grow(self):
+        """Double the queue ring, keeping every item at its position"""
+        capacity = self.capacity * 2
+        positions = self.head[:, None] + np.arange(self.capacity)
+        old_slots = positions % self.capacity
+        new_slots = positions % capacity
+        remaining = np.zeros((len(self.head), capacity), dtype=np.int64)
+        days = np.zeros((len(self.head), capacity), dtype=np.int32)
+        row_index = np.arange(len(self.head))[:, None]
+        remaining[row_index, new_slots] = self.queue_remaining[row_index, old_slots]
+        days[row_index, new_slots] = self.queue_day[row_index, old_slots]
+        self.queue_remaining, self.queue_day, self.capacity = remaining, days, capacity
+
+    def unfilled_ages(self, day: int) -> np.ndarray:
+        """Age in days of every request still queued after `day`, with its scenario"""
+        positions = self.head[:, None] + np.arange(self.capacity)
+        queued = positions < self.tail[:, None]
+        rows = np.nonzero(queued)[0]
+        days = self.queue_day[rows, positions[queued] % self.capacity]
+        return np.stack([rows, day - days])
+
+
+class SimulationResult:
+    """Per-candidate distributions of one simulation run"""
+
+    def __init__(self, limits: List[Tuple[int, int]], scenarios: int, days: int, pool: PoolSimulation,
+                 depth: np.ndarray, queued: np.ndarray, seconds: float):
+        self.limits = limits
+        self.scenarios = scenarios
+        self.days = days
+        self.pool = pool
+        self.depth = depth          # (days, candidates * scenarios) queued requests at day end
+        self.queued = queued        # (days, candidates * scenarios) queued USDC at day end
+        self.seconds = seconds
+        self.latency_counts = pool.latency_counts.reshape(len(limits), -1)
+        self._unfilled = pool.unfilled_ages(days - 1)
+
+    @staticmethod
+    def _histogram_percentiles(counts: np.ndarray, percentiles: Sequence[float]) -> List[Optional[int]]:
+        total = counts.sum()
+        if not total:
+            return [None] * len(percentiles)
+        cumulative = np.cumsum(counts)
+        return [int(np.searchsorted(cumulative, total * p / 100, side='left')) for p in percentiles]
+
+    def summary(self, candidate: int) -> Dict[str, Any]:
+        """Latency, queue depth and lending statistics of one limits candidate"""
+        pool = self.pool
+        rows = slice(candidate * self.scenarios, (candidate + 1) * self.scenarios)
+        counts = self.latency_counts[candidate]
+        filled = int(counts.sum())
+        requests = int(pool.requests[rows].sum())
+        in_candidate = self._unfilled[0] // self.scenarios == candidate
+        ages = self._unfilled[1][in_candidate]
+        depth = self.depth[:, rows]
+        peak = depth.max(axis=0)
+        queued = self.queued[:, rows]
+        buffer_bp, threshold = self.limits[candidate]
+        p50, p90, p99 = self._histogram_percentiles(counts, (50, 90, 99))
+        nonzero = np.flatnonzero(counts)
+        return {
+            'buffer_bp': buffer_bp,
+            'threshold': threshold,
+            'requests': requests,
+            'filled': filled,
+            'unfilled': requests - filled,
+            'same_day_share': float(counts[0] / filled) if filled else None,
+            'latency_days': {
+                'mean': float((counts * np.arange(len(counts))).sum() / filled) if filled else None,
+                'p50': p50, 'p90': p90, 'p99': p99,
+                'max': int(nonzero[-1]) if nonzero.size else None,
+            },
+            'unfilled_age_days': {
+                'p50': float(np.percentile(ages, 50)) if ages.size else None,
+                'max': int(ages.max()) if ages.size else None,
+            },
+            'queue_depth': {
+                'p50': float(np.percentile(depth, 50)), 'p90': float(np.percentile(depth, 90)),
+                'p99': float(np.percentile(depth, 99)), 'max': int(depth.max()),
+                'peak_p50': float(np.percentile(peak, 50)), 'peak_p99': float(np.percentile(peak, 99)),
+                'nonempty_share': float((depth > 0).mean()),
+            },
+            'queued_usdc': {
+                'p50': float(np.percentile(queued, 50)), 'p99': float(np.percentile(queued, 99)),
+                'max': float(queued.max()),
+            },
+            'loans_accepted': int(pool.loans_accepted[rows].sum()),
+            'loans_rejected': int(pool.loans_rejected[rows].sum()),
+            'final_utilization_p50': float(np.median(
+                pool.lent_out[rows] / np.maximum(pool.total_deposits[rows], 1))),
+        }
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        return [self.summary(candidate) for candidate in range(len(self.limits))]
+
+
+def _lognormal(rng: np.random.Generator, mean: float, sigma: float, size: int) -> np.ndarray:
+    """Log-normal amounts with the given mean, in USDC units"""
+    draws = rng.lognormal(np.log(mean) - sigma * sigma / 2, sigma, size) if sigma else np.full(size, float(mean))
+    return np.rint(draws * USDC).astype(np.int64)
+
+
+def simulate(market: MarketModel, limits: Sequence[Tuple[int, int]] = DEFAULT_LIMITS, scenarios: int = 10_000,
+             days: int = 365, seed: int = 0) -> SimulationResult:
+    """
+    Simulate `scenarios` independent pools for `days` days under each limits candidate
+
+    Args:
+        market: Demand assumptions
+        limits: (bufferBp, threshold in USDC units) candidates for setLiquidityLimits
+        scenarios: Scenarios per candidate
+        days: Horizon in days
+        seed: Random seed; every candidate sees the same draws
+
+    Returns:
+        SimulationResult with the per-candidate distributions
+    """
+    limits = list(limits)
+    if not limits or scenarios < 1 or days < 1:
+        raise ValueError("Need at least one limits candidate, scenario and day")
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    candidates = len(limits)
+    total = candidates * scenarios
+    pool = PoolSimulation(
+        buffer_bp=np.repeat([buffer_bp for buffer_bp, _ in limits], scenarios),
+        threshold=np.repeat([threshold for _, threshold in limits], scenarios),
+        initial_deposits=int(market.initial_deposits * USDC),
+        reserved=int(market.reserved * USDC),
+        max_term_days=max(market.loan_terms_days),
+        groups=np.repeat(np.arange(candidates), scenarios),
+        group_count=candidates,
+        max_latency=days,
+    )
+    terms = np.asarray(market.loan_terms_days, dtype=np.int64)
+    offsets = np.arange(candidates)[:, None] * scenarios
+
+    def tiled(base_rows: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """The same draws for every candidate's copy of `base_rows`"""
+        return (offsets + base_rows).ravel(), np.tile(values, candidates)
+
+    # One bank run per affected scenario, starting on a uniform day
+    runs = rng.random(scenarios) < market.run_probability
+    run_start = np.where(runs, rng.integers(0, days, scenarios), -1)
+
+    depth = np.zeros((days, total), dtype=np.int32)
+    queued = np.zeros((days, total), dtype=np.float32)
+    for day in range(days):
+        pool.repay_due(day)
+
+        in_run = (run_start >= 0) & (day >= run_start) & (day < run_start + market.run_days)
+        withdrawal_rate = np.where(in_run, market.withdrawals_per_day * market.run_multiplier,
+                                   market.withdrawals_per_day)
+        deposit_count = rng.poisson(market.deposits_per_day, scenarios)
+        withdrawal_count = rng.poisson(withdrawal_rate)
+        loan_count = rng.poisson(market.loans_per_day, scenarios)
+
+        rounds = max(deposit_count.max(), withdrawal_count.max(), loan_count.max())
+        for k in range(rounds):
+            base = np.flatnonzero(deposit_count > k)
+            if base.size:
+                rows, amounts = tiled(base, _lognormal(rng, market.deposit_size, market.size_sigma, base.size))
+                pool.deposit(rows, amounts, day)
+
+            base = np.flatnonzero(withdrawal_count > k)
+            if base.size:
+                rows, amounts = tiled(base, _lognormal(rng, market.withdrawal_size, market.size_sigma, base.size))
+                # Lenders can only queue what the pool still owes them
+                amounts = np.minimum(amounts, pool.total_deposits[rows] - pool.queued[rows])
+                valid = amounts > 0
+                if valid.any():
+                    pool.request_withdrawal(rows[valid], amounts[valid], day)
+
+            base = np.flatnonzero(loan_count > k)
+            if base.size:
+                rows, amounts = tiled(base, _lognormal(rng, market.loan_size, market.size_sigma, base.size))
+                loan_terms = np.tile(terms[rng.integers(0, len(terms), base.size)], candidates)
+                defaults = np.tile(rng.random(base.size) < market.default_rate, candidates)
+                valid = amounts > 0
+                pool.borrow(rows[valid], amounts[valid], loan_terms[valid], defaults[valid],
+                            market.loan_rate_bp, market.utilization_cap_bp, day)
+
+        depth[day] = pool.depth
+        queued[day] = pool.queued / USDC
+
+    return SimulationResult(limits, scenarios, days, pool, depth, queued, time.perf_counter() - started)
+
+
+def print_summaries(result: SimulationResult):
+    """Print one block per limits candidate"""
+    print(f"{result.scenarios} scenarios x {result.days} days x {len(result.limits)} candidates "
+          f"in {result.seconds:.1f}s")
+    for summary in result.summaries():
+        latency, depth = summary['latency_days'], summary['queue_depth']
+        print()
+        print(f"bufferBp={summary['buffer_bp']} threshold={summary['threshold'] / USDC:g} USDC")
+        print(f"  requests {summary['requests']}, filled {summary['filled']}, unfilled {summary['unfilled']}"
+              f" (oldest {summary['unfilled_age_days']['max']} days)")
+        if summary['filled']:
+            print(f"  fill latency (days): mean {latency['mean']:.2f}, p50 {latency['p50']}, p90 {latency['p90']},"
+                  f" p99 {latency['p99']}, max {latency['max']}; same day {summary['same_day_share']:.1%}")
+        print(f"  queue depth: p50 {depth['p50']:g}, p90 {depth['p90']:g}, p99 {depth['p99']:g}, max {depth['max']};"
+              f" peak per scenario p50 {depth['peak_p50']:g}, p99 {depth['peak_p99']:g};"
+              f" non-empty {depth['nonempty_share']:.1%} of days")
+        print(f"  queued USDC: p50 {summary['queued_usdc']['p50']:,.0f}, p99 {summary['queued_usdc']['p99']:,.0f}")
+        print(f"  loans accepted {summary['loans_accepted']}, rejected {summary['loans_rejected']};"
+              f" final utilization p50 {summary['final_utilization_p50']:.1%}")
+
+
+def main():
+    """Run liquidity stress simulations"""
+    if len(sys.argv) < 2:
+        print("Usage: python liquidity_simulator.py <command> [options]")
+        print("Commands:")
+        print("  run - Simulate every limits candidate and print latency and queue depth distributions")
+        print("  bench - Time 10000 scenarios x 365 days under the default limits")
+        print("  market - Print the default market parameters as JSON")
+        print("Options:")
+        print("  --limits=<list> - bufferBp:thresholdUsdc candidates, e.g. 500:0,1000:50 (default 500:0)")
+        print("  --scenarios=<n> - Scenarios per candidate (default 10000)")
+        print("  --days=<n> - Horizon in days (default 365)")
+        print("  --market=<file> - JSON object overriding market parameters")
+        print("  --seed=<n> - Random seed (default 0)")
+        print("  --output=<file> - Also write the summaries as JSON")
+        return
+
+    command = sys.argv[1]
+    options = {}
+    for arg in sys.argv[2:]:
+        if arg.startswith('--') and '=' in arg:
+            key, value = arg[2:].split('=', 1)
+            options[key] = value
+
+    try:
+        if command == "market":
+            print(json.dumps(MarketModel().to_dict(), indent=2))
+            return
+
+        market = MarketModel.load(options['market']) if 'market' in options else MarketModel()
+        if command == "bench":
+            result = simulate(market, DEFAULT_LIMITS, 10_000, 365, int(options.get('seed', 0)))
+            summary = result.summary(0)
+            print(f"10000 scenarios x 365 days: {result.seconds:.1f}s "
+                  f"({summary['requests']} withdrawal requests, {summary['loans_accepted']} loans)")
+
+        elif command == "run":
+            limits = parse_limits(options['limits']) if 'limits' in options else DEFAULT_LIMITS
+            result = simulate(market, limits, int(options.get('scenarios', 10_000)),
+                              int(options.get('days', 365)), int(options.get('seed', 0)))
+            print_summaries(result)
+            if 'output' in options:
+                with open(options['output'], 'w') as f:
+                    json.dump({'market': market.to_dict(), 'scenarios': result.scenarios, 'days': result.days,
+                               'candidates': result.summaries()}, f, indent=2)
+                print(f"\nSummaries saved to {options['output']}")
+        else:
+            print(f"Unknown command: {command}")
+
+    except FileNotFoundError as e:
+        print(f"Error: File {e.filename} not found")
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON in market file")
+    except (TypeError, ValueError) as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
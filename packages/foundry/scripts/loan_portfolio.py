@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Vectorized loan-portfolio valuation mirroring the contract's loan views
+
+For every loan and any number of timestamps this computes, with integer-exact array
+math instead of one view call per loan:
+
+- `getCurrentOutstandingAmount`: the principal during the 1-day grace period, then
+  principal + (principal * interestRate / BASIS_POINTS) * elapsed / SECONDS_PER_YEAR
+  (simple interest, each division truncating). Inactive loans report their stored
+  `outstanding`, as `getLoan` does.
+- `getOutstandingRoundedToCent`: the same, rounded half-up to 10_000 units.
+- `computeAttesterReward`: 5% of the principal split over the borrower's attesters by
+  attestation weight, (principal * 50000 / SCALE) * weight / totalWeight.
+
+Arithmetic runs in int64. The accrual product annualInterest * elapsed is split at
+SECONDS_PER_YEAR so that it stays in range for any realistic loan; if the inputs could
+still overflow, the affected step falls back to Python integers (object arrays).
+
+A loan valued before its `createdAt` (where the contract call would revert) counts as 0.
+
+Loan table formats (one row per getAllLoanIds() entry, fields as in `getLoan` plus the
+loan's creation timestamp, which `getLoan` does not return):
+
+- JSON list of {"loanId", "principal", "outstanding", "borrower", "interestRate",
+  "isActive", "createdAt"} objects, or one JSON object of equally long arrays under
+  the same keys ("loanIds" is accepted for "loanId")
+- A column store directory written by the `convert` command (memory-mapped .npy)
+
+Usage:
+    python loan_portfolio.py value loans.json 1735689600 1767225600
+    python loan_portfolio.py rewards loans.json attestations.json
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from attestation_io import load_attestation_columns
+
+# Contract constants
+BASIS_POINTS = 10_000
+SECONDS_PER_YEAR = 365 * 24 * 3600
+GRACE_PERIOD = 24 * 3600
+CENT = 10_000
+SCALE = 10**6
+ATTESTER_REWARD_SHARE = 50_000  # 5% of SCALE
+
+LOAN_STORE_FORMAT = 'loan-columns'
+LOAN_STORE_VERSION = 1
+# Loans valued per block when only totals are needed
+VALUATION_CHUNK = 1 << 18
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+def round_to_cent(amount: np.ndarray) -> np.ndarray:
+    """_roundToCent: nearest multiple of CENT, halves rounded up"""
+    return (amount + CENT // 2) // CENT * CENT
+
+
+def _fits(*bounds: int) -> bool:
+    """Whether a product of non-negative bounds stays within int64"""
+    product = 1
+    for bound in bounds:
+        product *= max(int(bound), 1)
+    return product <= _INT64_MAX
+
+
+class LoanPortfolio:
+    """Loan table as columns, valued for many loans and timestamps at once"""
+
+    def __init__(self, loan_ids: Sequence[int], principal: Sequence[int], outstanding: Sequence[int],
+                 borrowers: Sequence[str], interest_rate: Sequence[int], is_active: Sequence[bool],
+                 created_at: Sequence[int]):
+        """
+        Args:
+            loan_ids: Loan id per row
+            principal: Loan principal (USDC units)
+            outstanding: Stored outstanding amount (reported for inactive loans)
+            borrowers: Borrower address per row
+            interest_rate: Annual rate in BASIS_POINTS
+            is_active: Whether the loan is active
+            created_at: Creation block timestamp
+
+        Raises:
+            ValueError: If the columns differ in length or hold negative values
+        """
+        self.loan_ids = np.asarray(loan_ids, dtype=np.int64)
+        self.principal = np.asarray(principal, dtype=np.int64)
+        self.outstanding = np.asarray(outstanding, dtype=np.int64)
+        self.borrowers = list(borrowers)
+        self.interest_rate = np.asarray(interest_rate, dtype=np.int64)
+        self.is_active = np.asarray(is_active, dtype=bool)
+        self.created_at = np.asarray(created_at, dtype=np.int64)
+
+        count = len(self.loan_ids)
+        columns = (self.principal, self.outstanding, self.borrowers, self.interest_rate, self.is_active,
+                   self.created_at)
+        if any(len(column) != count for column in columns):
+            raise ValueError("Loan columns must all have one entry per loan")
+        for name, column in (('principal', self.principal), ('outstanding', self.outstanding),
+                             ('interestRate', self.interest_rate), ('createdAt', self.created_at)):
+            if count and column.min() < 0:
+                raise ValueError(f"Loan {name} values must be non-negative")
+
+        # Accrual split: annualInterest = whole * SECONDS_PER_YEAR + part, so that
+        # annualInterest * elapsed // YEAR = whole * elapsed + part * elapsed // YEAR
+        if count and not _fits(self.principal.max(), self.interest_rate.max()):
+            annual = self.principal.astype(object) * self.interest_rate // BASIS_POINTS
+        else:
+            annual = self.principal * self.interest_rate // BASIS_POINTS
+        self._whole_years = annual // SECONDS_PER_YEAR
+        self._part_year = (annual % SECONDS_PER_YEAR).astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.loan_ids)
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> 'LoanPortfolio':
+        """Build from a list of getLoan-style objects"""
+        def column(key: str) -> List[Any]:
+            return [record[key] for record in records]
+        return cls(column('loanId'), column('principal'), column('outstanding'), column('borrower'),
+                   column('interestRate'), column('isActive'), column('createdAt'))
+
+    @classmethod
+    def from_columns(cls, data: Dict[str, Sequence[Any]]) -> 'LoanPortfolio':
+        """Build from an object of arrays (getAllLoanIds() order)"""
+        loan_ids = data['loanIds'] if 'loanIds' in data else data['loanId']
+        return cls(loan_ids, data['principal'], data['outstanding'], data['borrower'],
+                   data['interestRate'], data['isActive'], data['createdAt'])
+
+    @classmethod
+    def load(cls, path: str) -> 'LoanPortfolio':
+        """
+        Load a loan table from a JSON file or a column store directory
+
+        Raises:
+            FileNotFoundError: If the file or a column is missing
+            KeyError: If a required field is missing
+            ValueError: If the file is not a loan table
+        """
+        if os.path.isdir(path):
+            return cls._read_store(path)
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            return cls.from_records(data)
+        if isinstance(data, dict):
+            return cls.from_columns(data)
+        raise ValueError(f"{path} is not a loan table")
+
+    def write(self, path: str):
+        """Write the table as a memory-mappable column store directory"""
+        os.makedirs(path, exist_ok=True)
+        width = max((len(borrower) for borrower in self.borrowers), default=1)
+        columns = {
+            'loan_ids': self.loan_ids, 'principal': self.principal, 'outstanding': self.outstanding,
+            'interest_rate': self.interest_rate, 'is_active': self.is_active, 'created_at': self.created_at,
+            'borrowers': np.array(self.borrowers, dtype=f'S{width}'),
+        }
+        for name, column in columns.items():
+            np.save(os.path.join(path, f'{name}.npy'), column)
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({'format': LOAN_STORE_FORMAT, 'version': LOAN_STORE_VERSION, 'loan_count': len(self)},
+                      f, indent=2)
+
+    @classmethod
+    def _read_store(cls, path: str) -> 'LoanPortfolio':
+        with open(os.path.join(path, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        if meta.get('format') != LOAN_STORE_FORMAT or meta.get('version') != LOAN_STORE_VERSION:
+            raise ValueError(f"{path} is not a version {LOAN_STORE_VERSION} loan column store")
+
+        def column(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+
+        return cls(column('loan_ids'), column('principal'), column('outstanding'),
+                   [borrower.decode() for borrower in column('borrowers').tolist()],
+                   column('interest_rate'), column('is_active'), column('created_at'))
+
+    def outstanding_at(self, timestamps: Union[int, Sequence[int]],
+                       rows: Optional[slice] = None) -> np.ndarray:
+        """
+        getCurrentOutstandingAmount / getLoan outstanding at each timestamp
+
+        Args:
+            timestamps: One block timestamp, or a sequence of them
+            rows: Restrict to a slice of loans (default all)
+
+        Returns:
+            Array of shape (len(loans),) for a single timestamp, otherwise
+            (len(timestamps), len(loans)); int64, or object if int64 could overflow
+        """
+        rows = slice(None) if rows is None else rows
+        scalar = np.ndim(timestamps) == 0
+        moments = np.atleast_1d(np.asarray(timestamps, dtype=np.int64))[:, None]
+        principal = self.principal[rows]
+        whole, part = self._whole_years[rows], self._part_year[rows]
+        elapsed = moments - self.created_at[rows]
+        # Before creation the loan does not exist yet; during the grace period no
+        # interest accrues
+        elapsed = np.where(elapsed >= GRACE_PERIOD, elapsed, 0)
+
+        max_elapsed = int(elapsed.max()) if elapsed.size else 0
+        max_whole = int(whole.max()) if len(whole) else 0
+        max_principal = int(principal.max()) if len(principal) else 0
+        if (whole.dtype == object or not _fits(SECONDS_PER_YEAR, max_elapsed)
+                or max_whole * max_elapsed + max_principal > _INT64_MAX // 2):
+            whole, part, elapsed = whole.astype(object), part.astype(object), elapsed.astype(object)
+        accrued = whole * elapsed + part * elapsed // SECONDS_PER_YEAR
+
+        amounts = np.where(self.is_active[rows], principal + accrued, self.outstanding[rows])
+        amounts = np.where(moments >= self.created_at[rows], amounts, 0)
+        return amounts[0] if scalar else amounts
+
+    def rounded_at(self, timestamps: Union[int, Sequence[int]]) -> np.ndarray:
+        """getOutstandingRoundedToCent at each timestamp (shaped as outstanding_at)"""
+        return round_to_cent(self.outstanding_at(timestamps))
+
+    def totals(self, timestamps: Sequence[int]) -> List[Dict[str, int]]:
+        """
+        Portfolio totals per timestamp, valued in blocks of VALUATION_CHUNK loans
+
+        Returns:
+            One {"timestamp", "outstanding", "rounded", "active"} dict per timestamp;
+            "active" counts loans that exist and are active at that time
+        """
+        timestamps = [int(t) for t in timestamps]
+        outstanding = [0] * len(timestamps)
+        rounded = [0] * len(timestamps)
+        for start in range(0, len(self), VALUATION_CHUNK):
+            amounts = self.outstanding_at(timestamps, slice(start, start + VALUATION_CHUNK))
+            for i, (total, total_rounded) in enumerate(zip(amounts.sum(axis=1).tolist(),
+                                                           round_to_cent(amounts).sum(axis=1).tolist())):
+                outstanding[i] += int(total)
+                rounded[i] += int(total_rounded)
+        active = [int(np.count_nonzero(self.is_active & (self.created_at <= t))) for t in timestamps]
+        return [{'timestamp': t, 'outstanding': o, 'rounded': r, 'active': a}
+                for t, o, r, a in zip(timestamps, outstanding, rounded, active)]
+
+    def attester_rewards(self, borrowers: Sequence[str], attesters: Sequence[str],
+                         weights: Sequence[int]) -> Tuple[np.ndarray, List[str], np.ndarray]:
+        """
+        computeAttesterReward for every (loan, attester of its borrower) pair
+
+        Args:
+            borrowers, attesters, weights: The contract's borrowerAttestations, one
+                entry per (borrower, attester) pair with its current weight
+
+        Returns:
+            Tuple (rows, attesters, rewards): loan row, attester address and reward per
+            pair, grouped by loan in loan order
+        """
+        edge_borrowers = np.asarray(borrowers, dtype=object)
+        edge_weights = np.asarray(weights, dtype=np.int64)
+        names, edge_ids = np.unique(edge_borrowers, return_inverse=True) if len(edge_borrowers) else (
+            np.zeros(0, dtype=object), np.zeros(0, dtype=np.int64))
+        order = np.argsort(edge_ids, kind='stable')
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(edge_ids, minlength=len(names)))])
+        weight_sums = np.concatenate([[0], np.cumsum(edge_weights[order].astype(object))])
+        total_weight = weight_sums[bounds[1:]] - weight_sums[bounds[:-1]]
+
+        # Borrower slot of each loan (-1: no attestations)
+        lookup = {name: i for i, name in enumerate(names.tolist())}
+        slots = np.fromiter((lookup.get(borrower, -1) for borrower in self.borrowers), dtype=np.int64,
+                            count=len(self))
+        counts = np.where(slots >= 0, bounds[slots + 1] - bounds[np.maximum(slots, 0)], 0)
+        rows = np.repeat(np.arange(len(self)), counts)
+        offsets = np.repeat(np.cumsum(counts) - counts, counts)
+        starts = np.repeat(bounds[np.maximum(slots, 0)], counts)
+        edges = order[starts + np.arange(len(rows)) - offsets]
+
+        pool = self.principal[rows].astype(object) * ATTESTER_REWARD_SHARE // SCALE
+        weight = edge_weights[edges]
+        totals = total_weight[slots[rows]]
+        if not len(rows) or (_fits(pool.max(), weight.max()) and _fits(totals.max())):
+            pool, totals = pool.astype(np.int64), totals.astype(np.int64)
+        rewards = np.where(totals > 0, pool * weight // np.maximum(totals, 1), 0)
+        attester_names = np.asarray(attesters, dtype=object)[edges].tolist()
+        return rows, attester_names, rewards
+
+
+def load_borrower_attestations(path: str) -> Tuple[List[str], List[str], np.ndarray]:
+    """
+    Current (borrower, attester, weight) entries of an oracle attestation input
+
+    Repeated attestations keep the latest weight, as borrowerAttestations does.
+    """
+    graph = load_attestation_columns(path).to_graph()
+    src, dst, weight = graph.edge_arrays()
+    addresses = np.asarray(graph.addresses.addresses, dtype=object)
+    return addresses[dst].tolist(), addresses[src].tolist(), np.asarray(weight, dtype=np.int64)
+
+
+def synthetic_portfolio(count: int, seed: int = 0, now: Optional[int] = None) -> LoanPortfolio:
+    """Random active portfolio of `count` loans created over the past two years"""
+    rng = np.random.default_rng(seed)
+    now = int(time.time()) if now is None else now
+    borrowers = [f'0x{i:040x}' for i in range(max(count // 4, 1))]
+    return LoanPortfolio(
+        loan_ids=np.arange(count),
+        principal=rng.integers(10 * 10**6, 10_000 * 10**6, count),
+        outstanding=np.zeros(count, dtype=np.int64),
+        borrowers=[borrowers[i] for i in rng.integers(0, len(borrowers), count).tolist()],
+        interest_rate=rng.integers(500, 2500, count),
+        is_active=rng.random(count) < 0.9,
+        created_at=now - rng.integers(0, 2 * SECONDS_PER_YEAR, count),
+    )
+
+
+def main():
+    """Value loan portfolios"""
+    if len(sys.argv) < 2:
+        print("Usage: python loan_portfolio.py <command> [args...]")
+        print("Commands:")
+        print("  value <loans> [timestamp...] - Portfolio totals per timestamp (default now)")
+        print("  loans <loans> <timestamp> [output.json] - Outstanding and rounded amount per loan")
+        print("  rewards <loans> <attestations.json|store_dir> - Attester rewards per loan")
+        print("  convert <loans.json> <store_dir> - Write a memory-mapped loan column store")
+        print("  bench [loans] [timestamps] - Time a synthetic full-portfolio revaluation")
+        print("Loans: JSON records or columns (getAllLoanIds + getLoan + createdAt), or a column store")
+        return
+
+    command = sys.argv[1]
+    try:
+        if command == "bench":
+            count = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+            moments = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+            now = int(time.time())
+            portfolio = synthetic_portfolio(count, now=now)
+            timestamps = [now + day * 86400 for day in range(moments)]
+            started = time.perf_counter()
+            amounts = portfolio.outstanding_at(timestamps)
+            rounded = round_to_cent(amounts)
+            elapsed = time.perf_counter() - started
+            print(f"{count} loans x {moments} timestamps: {elapsed:.3f}s "
+                  f"({amounts.dtype}, total {int(amounts.sum())}, rounded {int(rounded.sum())})")
+            return
+
+        if len(sys.argv) < 3:
+            print("Error: Please provide a loan table")
+            return
+        if command == "convert":
+            if len(sys.argv) < 4:
+                print("Error: Please provide a loan table and a store directory")
+                return
+            portfolio = LoanPortfolio.load(sys.argv[2])
+            portfolio.write(sys.argv[3])
+            print(f"{len(portfolio)} loans written to {sys.argv[3]}")
+            return
+
+        portfolio = LoanPortfolio.load(sys.argv[2])
+        if command == "value":
+            timestamps = [int(t) for t in sys.argv[3:]] or [int(time.time())]
+            print(json.dumps(portfolio.totals(timestamps), indent=2))
+
+        elif command == "loans":
+            if len(sys.argv) < 4:
+                print("Error: Please provide a timestamp")
+                return
+            amounts = portfolio.outstanding_at(int(sys.argv[3]))
+            output = json.dumps([
+                {'loanId': loan_id, 'borrower': borrower, 'outstanding': amount, 'rounded': rounded}
+                for loan_id, borrower, amount, rounded in zip(portfolio.loan_ids.tolist(), portfolio.borrowers,
+                                                              amounts.tolist(), round_to_cent(amounts).tolist())
+            ], indent=2)
+            if len(sys.argv) > 4:
+                with open(sys.argv[4], 'w') as f:
+                    f.write(output)
+                print(f"{len(portfolio)} loans saved to {sys.argv[4]}")
+            else:
+                print(output)
+
+        elif command == "rewards":
+            if len(sys.argv) < 4:
+                print("Error: Please provide attestations JSON file")
+                return
+            rows, attesters, rewards = portfolio.attester_rewards(*load_borrower_attestations(sys.argv[3]))
+            by_loan: Dict[int, Dict[str, int]] = {}
+            for row, attester, reward in zip(rows.tolist(), attesters, rewards.tolist()):
+                by_loan.setdefault(int(portfolio.loan_ids[row]), {})[attester] = int(reward)
+            print(json.dumps(by_loan, indent=2))
+        else:
+            print(f"Unknown command: {command}")
+
+    except FileNotFoundError as e:
+        print(f"Error: File {e.filename} not found")
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON in loan table")
+    except KeyError as e:
+        print(f"Error: Missing required field {e} in loan table")
+    except ValueError as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
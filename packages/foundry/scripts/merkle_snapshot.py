@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Merkle-committed score snapshots for the PageRank oracle
+
+Instead of one storage write per address, a snapshot commits every score of an epoch
+to a single Merkle root; borrowers (or relayers) present a proof when a score is needed.
+The tree is compatible with OpenZeppelin's `MerkleProof.verify`:
+
+    bytes32 leaf = keccak256(abi.encode(account, score, epoch));
+    require(MerkleProof.verify(proof, scoreRoot[epoch], leaf), "Bad proof");
+
+- Leaves are keccak256 of the 96-byte ABI encoding of (address, uint256, uint256). The
+  preimage length differs from the 64-byte internal nodes, so a node cannot pass as a
+  leaf and no double hashing is needed.
+- Internal nodes hash their children in sorted order, so proofs carry no direction bits.
+  A node without a sibling is promoted unchanged, so proofs are at most `depth` long.
+
+All hashing is vectorized (one `keccak256_rows` pass per tree level). A snapshot is
+written as a directory of memory-mappable arrays: the leaf addresses and scores, every
+tree level, and an open-addressing hash index from address to leaf. Looking up a proof
+is one expected-constant index probe plus one row read per level, so no per-address
+proof files are needed; `proofs` gathers proofs for many addresses at once.
+
+Usage:
+    python merkle_snapshot.py build <scores.json> <snapshot_dir> --epoch=<n>
+    python merkle_snapshot.py proof <snapshot_dir> <address>
+"""
+
+import json
+import os
+import shutil
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from evm_encoding import WORD_SIZE, address_words, keccak256, keccak256_rows, uint256_words
+
+SNAPSHOT_FORMAT = 'score-merkle'
+SNAPSHOT_VERSION = 1
+# Epoch directories inside an oracle snapshot root
+EPOCH_PREFIX = 'epoch-'
+# Rows per proof gathering pass
+PROOF_CHUNK = 65_536
+
+_EMPTY = -1
+_MIX_1 = np.uint64(0x9E3779B97F4A7C15)
+_MIX_2 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_3 = np.uint64(0x94D049BB133111EB)
+
+
+def leaf_hashes(address_rows: np.ndarray, scores: Sequence[int], epoch: int) -> np.ndarray:
+    """
+    Leaf digests keccak256(abi.encode(address, score, epoch))
+
+    Args:
+        address_rows: (n, 32) ABI address words
+        scores: Score per leaf
+        epoch: Snapshot epoch
+
+    Returns:
+        (n, 32) uint8 matrix
+    """
+    count = len(address_rows)
+    epoch_word = uint256_words([epoch])
+    encoded = np.concatenate([
+        address_rows, uint256_words(scores), np.broadcast_to(epoch_word, (count, WORD_SIZE))
+    ], axis=1)
+    return keccak256_rows(encoded)
+
+
+def _hash_pairs(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """keccak256 of each (left, right) pair, concatenated in ascending byte order"""
+    left_words = left.view('>u8').astype(np.uint64)
+    right_words = right.view('>u8').astype(np.uint64)
+    differs = left_words != right_words
+    first = differs.argmax(axis=1)
+    rows = np.arange(len(left))
+    swap = left_words[rows, first] > right_words[rows, first]
+    pairs = np.concatenate([left, right], axis=1)
+    pairs[swap] = np.concatenate([right[swap], left[swap]], axis=1)
+    return keccak256_rows(pairs)
+
+
+def build_levels(leaves: np.ndarray) -> List[np.ndarray]:
+    """
+    All tree levels, from the leaves up to the one-row root level
+
+    Raises:
+        ValueError: If there are no leaves
+    """
+    if len(leaves) == 0:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+    levels = [leaves]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        paired = len(level) // 2 * 2
+        parents = _hash_pairs(level[0:paired:2], level[1:paired:2])
+        if paired < len(level):
+            parents = np.concatenate([parents, level[-1:]])
+        levels.append(parents)
+    return levels
+
+
+def verify_proof(root: bytes, leaf: bytes, proof: Sequence[bytes]) -> bool:
+    """Check a proof the way MerkleProof.verify does"""
+    node = leaf
+    for sibling in proof:
+        node = keccak256(node + sibling if node <= sibling else sibling + node)
+    return node == root
+
+
+def _address_keys(address_rows: np.ndarray) -> np.ndarray:
+    """64-bit hash of each 20-byte address (fold, then the SplitMix64 finalizer)"""
+    padded = np.zeros((len(address_rows), 24), dtype=np.uint8)
+    padded[:, :20] = address_rows[:, -20:]
+    words = padded.view('<u8')
+    key = words[:, 0] ^ (words[:, 1] * _MIX_1) ^ (words[:, 2] * _MIX_2)
+    key ^= key >> np.uint64(30)
+    key *= _MIX_2
+    key ^= key >> np.uint64(27)
+    key *= _MIX_3
+    key ^= key >> np.uint64(31)
+    return key
+
+
+def _build_index(keys: np.ndarray) -> np.ndarray:
+    """
+    Open-addressing (linear probing) table mapping address keys to leaf positions
+
+    The table has at least twice as many slots as keys; all keys are placed in rounds,
+    each round settling every key whose current slot is free.
+    """
+    size = 1 << max(1, int(2 * len(keys) - 1).bit_length())
+    mask = np.uint64(size - 1)
+    table = np.full(size, _EMPTY, dtype=np.int64)
+    pending = np.arange(len(keys), dtype=np.int64)
+    slots = (keys & mask).astype(np.int64)
+    while len(pending):
+        free = table[slots] == _EMPTY
+        # Among keys competing for the same free slot, the first one wins
+        candidates = np.flatnonzero(free)
+        _, winners = np.unique(slots[candidates], return_index=True)
+        placed = candidates[winners]
+        table[slots[placed]] = pending[placed]
+        waiting = np.ones(len(pending), dtype=bool)
+        waiting[placed] = False
+        pending = pending[waiting]
+        slots = (slots[waiting] + 1) & (size - 1)
+    return table
+
+
+class ScoreSnapshot:
+    """A Merkle tree over (address, score, epoch) leaves, with an address index"""
+
+    def __init__(self, epoch: int, address_rows: np.ndarray, scores: np.ndarray, levels: List[np.ndarray],
+                 index: np.ndarray):
+        """
+        Args:
+            epoch: Snapshot epoch
+            address_rows: (n, 20) uint8 leaf addresses
+            scores: Score per leaf
+            levels: Tree levels as returned by build_levels
+            index: Address hash table as returned by _build_index
+        """
+        self.epoch = epoch
+        self.address_rows = address_rows
+        self.scores = scores
+        self.levels = levels
+        self.index = index
+
+    @classmethod
+    def build(cls, scores: Dict[str, int], epoch: int) -> 'ScoreSnapshot':
+        """
+        Build the snapshot of `scores` for `epoch`, leaves in dictionary order
+
+        Raises:
+            ValueError: On invalid addresses, negative or oversized scores, duplicate
+                addresses or an empty score set
+        """
+        addresses = list(scores)
+        try:
+            values = np.fromiter(scores.values(), dtype=np.int64, count=len(scores))
+        except OverflowError:
+            # The int64 conversion rejects scores of 2**63 and above (or below -2**63)
+            raise ValueError("Scores must be within 0..2**63 - 1") from None
+        if len(values) and values.min() < 0:
+            raise ValueError("Scores must be non-negative")
+        words = address_words(addresses)
+        address_rows = np.ascontiguousarray(words[:, 12:])
+        keys = _address_keys(address_rows)
+        # Equal addresses have equal keys; only rows sharing a key need comparing
+        order = np.argsort(keys)
+        collisions = np.flatnonzero(keys[order][1:] == keys[order][:-1])
+        if (address_rows[order[collisions]] == address_rows[order[collisions + 1]]).all(axis=1).any():
+            raise ValueError("Duplicate addresses in score snapshot")
+        levels = build_levels(leaf_hashes(words, values, epoch))
+        return cls(epoch, address_rows, values, levels, _build_index(keys))
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][0].tobytes()
+
+    @property
+    def depth(self) -> int:
+        return len(self.levels) - 1
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def position(self, address: str) -> Optional[int]:
+        """Leaf position of `address`, or None if it is not in the snapshot"""
+        row = address_words([address])[:, 12:]
+        mask = len(self.index) - 1
+        slot = int(_address_keys(row)[0]) & mask
+        target = row[0].tobytes()
+        while True:
+            leaf = int(self.index[slot])
+            if leaf == _EMPTY:
+                return None
+            if self.address_rows[leaf].tobytes() == target:
+                return leaf
+            slot = (slot + 1) & mask
+
+    def proof(self, position: int) -> List[bytes]:
+        """Sibling hashes from the leaf at `position` up to the root"""
+        proof = []
+        for level in self.levels[:-1]:
+            sibling = position ^ 1
+            if sibling < len(level):
+                proof.append(level[sibling].tobytes())
+            position >>= 1
+        return proof
+
+    def proofs(self, positions: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Proofs for many leaves in one gathering pass per level
+
+        Args:
+            positions: Leaf positions
+
+        Returns:
+            Tuple (siblings, present): a (k, depth, 32) uint8 array of sibling hashes
+            and a (k, depth) mask of the levels where the leaf had a sibling (a proof is
+            siblings[i][present[i]])
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        siblings = np.zeros((len(positions), self.depth, WORD_SIZE), dtype=np.uint8)
+        present = np.zeros((len(positions), self.depth), dtype=bool)
+        for depth, level in enumerate(self.levels[:-1]):
+            sibling = (positions >> depth) ^ 1
+            present[:, depth] = sibling < len(level)
+            rows = np.flatnonzero(present[:, depth])
+            siblings[rows, depth] = level[sibling[rows]]
+        return siblings, present
+
+    def lookup(self, address: str) -> Optional[Dict[str, object]]:
+        """Score, leaf and proof of `address` as JSON-ready hex strings"""
+        position = self.position(address)
+        if position is None:
+            return None
+        return {
+            'address': address,
+            'score': int(self.scores[position]),
+            'epoch': self.epoch,
+            'leaf': '0x' + self.levels[0][position].tobytes().hex(),
+            'proof': ['0x' + node.hex() for node in self.proof(position)],
+            'root': '0x' + self.root.hex(),
+        }
+
+    def write(self, path: str):
+        """
+        Write the snapshot as a directory of .npy arrays plus meta.json
+
+        The directory is assembled next to `path` and renamed into place, so readers
+        never see a partial snapshot.
+
+        Raises:
+            FileExistsError: If `path` already exists
+        """
+        if os.path.exists(path):
+            raise FileExistsError(f"{path} already exists")
+        temporary = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(temporary)
+        try:
+            np.save(os.path.join(temporary, 'addresses.npy'), self.address_rows)
+            np.save(os.path.join(temporary, 'scores.npy'), self.scores)
+            np.save(os.path.join(temporary, 'tree.npy'), np.concatenate(self.levels))
+            np.save(os.path.join(temporary, 'index.npy'), self.index)
+            with open(os.path.join(temporary, 'meta.json'), 'w') as f:
+                json.dump({
+                    'format': SNAPSHOT_FORMAT,
+                    'version': SNAPSHOT_VERSION,
+                    'epoch': self.epoch,
+                    'root': '0x' + self.root.hex(),
+                    'count': len(self),
+                    'level_sizes': [len(level) for level in self.levels],
+                }, f, indent=2)
+            os.rename(temporary, path)
+        except BaseException:
+            shutil.rmtree(temporary, ignore_errors=True)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> 'ScoreSnapshot':
+        """
+        Memory-map a snapshot written by `write`
+
+        Raises:
+            FileNotFoundError: If the directory or one of its arrays is missing
+            ValueError: If the directory is not a score snapshot
+        """
+        with open(os.path.join(path, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        if meta.get('format') != SNAPSHOT_FORMAT or meta.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} score snapshot")
+
+        def array(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+
+        tree = array('tree')
+        offsets = np.cumsum([0] + meta['level_sizes'])
+        levels = [tree[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+        return cls(meta['epoch'], array('addresses'), array('scores'), levels, array('index'))
+
+
+def epoch_path(root: str, epoch: int) -> str:
+    return os.path.join(root, f'{EPOCH_PREFIX}{epoch:08d}')
+
+
+def latest_epoch(root: str) -> Optional[int]:
+    """Highest epoch written under an oracle snapshot root, or None"""
+    if not os.path.isdir(root):
+        return None
+    epochs = [int(name[len(EPOCH_PREFIX):]) for name in os.listdir(root)
+              if name.startswith(EPOCH_PREFIX) and name[len(EPOCH_PREFIX):].isdigit()]
+    return max(epochs, default=None)
+
+
+def main():
+    """Build score snapshots and look up proofs"""
+    epoch = None
+    for arg in [a for a in sys.argv if a.startswith('--epoch=')]:
+        epoch = arg.split('=', 1)[1]
+        sys.argv.remove(arg)
+
+    if len(sys.argv) < 3:
+        print("Usage: python merkle_snapshot.py <command> [args...]")
+        print("Commands:")
+        print("  build <scores.json> <snapshot_dir> - Build and write the snapshot of a score file")
+        print("  info <snapshot_dir> - Show the epoch, root and size of a snapshot")
+        print("  proof <snapshot_dir> <address> - Show the score and proof of an address")
+        print("  proofs <snapshot_dir> <addresses.txt|all> - Write proofs as JSON lines (stdout)")
+        print("Options:")
+        print("  --epoch=<n> - Snapshot epoch for build (required)")
+        return
+
+    command = sys.argv[1]
+    try:
+        if command == "build":
+            if len(sys.argv) < 4 or epoch is None:
+                print("Error: build needs a score file, a snapshot directory and --epoch")
+                return
+            with open(sys.argv[2], 'r') as f:
+                data = json.load(f)
+            scores = data.get('pagerank_scores', data)
+            snapshot = ScoreSnapshot.build(scores, int(epoch))
+            snapshot.write(sys.argv[3])
+            print(f"Epoch {snapshot.epoch}: {len(snapshot)} scores, depth {snapshot.depth}, "
+                  f"root 0x{snapshot.root.hex()}")
+
+        elif command == "info":
+            snapshot = ScoreSnapshot.load(sys.argv[2])
+            print(json.dumps({
+                'epoch': snapshot.epoch,
+                'root': '0x' + snapshot.root.hex(),
+                'count': len(snapshot),
+                'depth': snapshot.depth,
+            }, indent=2))
+
+        elif command == "proof":
+            if len(sys.argv) < 4:
+                print("Error: Please provide an address")
+                return
+            snapshot = ScoreSnapshot.load(sys.argv[2])
+            result = snapshot.lookup(sys.argv[3])
+            if result is None:
+                print(f"Error: Address {sys.argv[3]} is not in the snapshot")
+                return
+            print(json.dumps(result, indent=2))
+
+        elif command == "proofs":
+            if len(sys.argv) < 4:
+                print("Error: Please provide an address file or 'all'")
+                return
+            snapshot = ScoreSnapshot.load(sys.argv[2])
+            if sys.argv[3] == 'all':
+                positions = np.arange(len(snapshot))
+            else:
+                with open(sys.argv[3], 'r') as f:
+                    wanted = [line.strip() for line in f if line.strip()]
+                found = [snapshot.position(address) for address in wanted]
+                missing = [address for address, position in zip(wanted, found) if position is None]
+                if missing:
+                    print(f"Error: {len(missing)} addresses are not in the snapshot, e.g. {missing[0]}")
+                    return
+                positions = np.asarray(found, dtype=np.int64)
+
+            out = sys.stdout
+            for start in range(0, len(positions), PROOF_CHUNK):
+                chunk = positions[start:start + PROOF_CHUNK]
+                siblings, present = snapshot.proofs(chunk)
+                for i, position in enumerate(chunk.tolist()):
+                    out.write(json.dumps({
+                        'address': '0x' + snapshot.address_rows[position].tobytes().hex(),
+                        'score': int(snapshot.scores[position]),
+                        'proof': ['0x' + node.tobytes().hex() for node in siblings[i][present[i]]],
+                    }) + '\n')
+        else:
+            print(f"Unknown command: {command}")
+
+    except FileNotFoundError as e:
+        print(f"Error: File {e.filename} not found")
+    except FileExistsError as e:
+        print(f"Error: {e}")
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON in score file")
+    except ValueError as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
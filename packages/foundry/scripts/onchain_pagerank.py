@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Bit-exact emulator of the on-chain fixed-point PageRank
+
+Reproduces `_computePageRank`, `_createStochasticGraph` and `_pagerankIteration` from
+`DecentralizedMicrocredit.sol` with the same integer PR_SCALE arithmetic, the same
+truncation order, the same `totalDelta < tol * n` convergence test and the same
+iteration count, but vectorized over NumPy int64 arrays. Use it to predict the scores
+`computePageRank()` will store for the full borrower set before paying for the
+recompute on-chain.
+
+Contract details that are reproduced on purpose:
+- Nodes are ordered as `pagerankNodes` is pushed: attester, then borrower, on first use.
+- `_addPagerankEdge` overwrites the edge weight but *adds* to `pagerankOutDegree`, so
+  re-attesting a pair inflates the attester's out-degree. Feed attestations in the
+  order they happened (`add_attestation(s)`) to emulate this.
+- Every product is truncated per edge before summation, exactly as the Solidity loop.
+"""
+
+import json
+import sys
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from attestation_graph import AttestationGraph, flatten_attestation_data
+from personalization import Personalization
+
+# Constants mirrored from DecentralizedMicrocredit.sol
+SCALE = 1_000_000
+PR_SCALE = 100_000
+PR_ALPHA = 85_000
+PR_TOL = 100
+PR_MAX_ITER = 100
+
+# Largest factor that can multiply a PR_SCALE-bounded value without leaving int64
+_INT64_SAFE = 2**63 - 1
+
+
+class OnChainPageRank:
+    def __init__(self):
+        """Initialize an empty on-chain PageRank state (no nodes, no edges)"""
+        self.graph = AttestationGraph()
+        # pagerankOutDegree, accumulated on every attestation like the contract
+        self._out_degree = np.zeros(0, dtype=np.int64)
+        # Deposit/KYC/override columns used by compute() (None = contract defaults, no data)
+        self.personalization: Optional[Personalization] = None
+        # Result of the last compute() call
+        self.iterations = 0
+
+    @classmethod
+    def from_contract_data(cls, attestation_data: Dict) -> 'OnChainPageRank':
+        """
+        Build the state from an exportAttestationData() style export
+
+        The export only holds current weights, so out-degrees are exact only if no
+        attestation was ever re-submitted with a different weight. An optional
+        "personalization" object is read as in the oracle input format.
+        """
+        state = cls()
+        state.add_attestations(*flatten_attestation_data(attestation_data))
+        if 'personalization' in attestation_data:
+            state.personalization = Personalization.from_dict(attestation_data['personalization'])
+        return state
+
+    def add_attestation(self, attester: str, borrower: str, weight: int):
+        """
+        Apply one recordAttestation/attestMeta call
+
+        Args:
+            attester: Address of the attester
+            borrower: Address of the borrower
+            weight: Attestation weight (0 to SCALE)
+        """
+        self.add_attestations([attester], [borrower], [weight])
+
+    def add_attestations(self, attesters: Sequence[str], borrowers: Sequence[str], weights: Sequence[int]):
+        """
+        Apply a sequence of recordAttestation/attestMeta calls, in order
+
+        Args:
+            attesters: Attester address per call
+            borrowers: Borrower address per call
+            weights: Attestation weight per call (0 to SCALE)
+
+        Raises:
+            ValueError: On inputs the contract would revert on
+        """
+        weights = np.asarray(weights, dtype=np.int64)
+        if len(weights) and weights.max() > SCALE:
+            raise ValueError("Weight too high")
+        if any(a == b for a, b in zip(attesters, borrowers)):
+            raise ValueError("Self-attestation")
+
+        self.graph.add_edges(attesters, borrowers, weights)
+
+        node_count = self.graph.number_of_nodes()
+        if len(self._out_degree) < node_count:
+            self._out_degree = np.concatenate(
+                [self._out_degree, np.zeros(node_count - len(self._out_degree), dtype=np.int64)]
+            )
+        src = self.graph.addresses.intern_many(attesters)
+        np.add.at(self._out_degree, src, weights)
+
+    def personalization_vector(self, raw_weights: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        Normalize raw teleport weights the way _buildPersonalizationVector does
+
+        Args:
+            raw_weights: Raw weight per node in node order (None means all zero,
+                the contract default with basePersonalization = 0 and no deposits/KYC)
+
+        Returns:
+            int64 array with each entry floor(w * PR_SCALE / total), or PR_SCALE / n
+            everywhere when the total is zero
+        """
+        n = self.graph.number_of_nodes()
+        if raw_weights is None:
+            return np.full(n, PR_SCALE // n, dtype=np.int64)
+
+        raw = np.asarray(raw_weights)
+        if len(raw) != n:
+            raise ValueError(f"Expected {n} personalization weights, got {len(raw)}")
+        if raw.dtype.kind in 'iub' and int(raw.max()) <= _INT64_SAFE // (PR_SCALE * n):
+            raw = raw.astype(np.int64)
+            total = int(raw.sum())
+            if total == 0:
+                return np.full(n, PR_SCALE // n, dtype=np.int64)
+            return (raw * PR_SCALE) // total
+
+        # Arbitrary-precision path for very large uint256 weights
+        raw = [int(w) for w in raw]
+        total = sum(raw)
+        if total == 0:
+            return np.full(n, PR_SCALE // n, dtype=np.int64)
+        return np.asarray([(w * PR_SCALE) // total for w in raw], dtype=np.int64)
+
+    def stochastic_edges(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Emulate _createStochasticGraph
+
+        Returns:
+            Tuple (src, dst, weight) of the non-zero pagerankStochasticEdges entries,
+            each floor(originalWeight * PR_SCALE / outDegree)
+        """
+        src, dst, weight = self.graph.edge_arrays()
+        src = src.astype(np.int64)
+        dst = dst.astype(np.int64)
+        keep = (weight > 0) & (self._out_degree[src] > 0)
+        src, dst, weight = src[keep], dst[keep], weight[keep]
+        stochastic = (weight * PR_SCALE) // self._out_degree[src]
+        nonzero = stochastic > 0
+        return src[nonzero], dst[nonzero], stochastic[nonzero]
+
+    def compute(self, personalization: Optional[Sequence[int]] = None, alpha: int = PR_ALPHA,
+                max_iter: int = PR_MAX_ITER, tol: int = PR_TOL) -> Dict[str, int]:
+        """
+        Emulate _computePageRank
+
+        Args:
+            personalization: Raw teleport weight per node in node order (see
+                personalization_vector); defaults to the weights built from
+                `self.personalization`, or the uniform fallback if that is unset
+            alpha: Damping factor in PR_SCALE units
+            max_iter: Maximum iterations
+            tol: Per-node tolerance in PR_SCALE units
+
+        Returns:
+            Dictionary mapping node addresses to pagerankScores values (PR_SCALE units)
+        """
+        n = self.graph.number_of_nodes()
+        self.iterations = 0
+        if n == 0:
+            return {}
+
+        if personalization is None and self.personalization is not None:
+            personalization = self.personalization.raw_weights(self.graph.addresses.addresses)
+
+        scores = np.full(n, PR_SCALE // n, dtype=np.int64)
+        src, dst, weight = self.stochastic_edges()
+        p = self.personalization_vector(personalization)
+        is_dangling = self._out_degree[:n] == 0
+        teleport = ((PR_SCALE - alpha) * p) // PR_SCALE
+        denominator = PR_SCALE * PR_SCALE
+
+        converged = False
+        while self.iterations < max_iter and not converged:
+            old = scores
+            dangling_sum = int(old[is_dangling].sum())
+
+            # Per-edge truncation, then summation per target node. Every partial sum
+            # is an integer below 2**53, so the float64 bincount is exact.
+            contribution = (alpha * old[src] * weight) // denominator
+            incoming = np.bincount(dst, weights=contribution, minlength=n).astype(np.int64)
+
+            if dangling_sum > 0:
+                dangling = (alpha * dangling_sum * p) // denominator
+            else:
+                dangling = 0
+
+            scores = incoming + dangling + teleport
+            converged = int(np.abs(old - scores).sum()) < tol * n
+            self.iterations += 1
+
+        return dict(zip(self.graph.addresses.addresses, scores.tolist()))
+
+
+def main():
+    """Emulate computePageRank() for sample or exported attestation data"""
+    if len(sys.argv) < 2:
+        print("Usage: python onchain_pagerank.py <command> [args...]")
+        print("Commands:")
+        print("  test - Emulate the PageRankVerification.t.sol graphs")
+        print("  compute <attestations.json> - Emulate on-chain scores for contract export data")
+        return
+
+    command = sys.argv[1]
+
+    if command == "test":
+        print("Emulating PageRankVerification.t.sol graphs...")
+
+        simple = OnChainPageRank()
+        simple.add_attestations(["0x1111", "0x1111"], ["0x2222", "0x3333"], [800_000, 400_000])
+        scores = simple.compute()
+        print(f"Simple graph: {scores} ({simple.iterations} iterations)")
+
+        cycle = OnChainPageRank()
+        cycle.add_attestations(
+            ["0x1111", "0x2222", "0x3333", "0x4444", "0x5555"],
+            ["0x2222", "0x3333", "0x4444", "0x5555", "0x1111"],
+            [500_000, 300_000, 700_000, 400_000, 600_000]
+        )
+        scores = cycle.compute()
+        print(f"Complex graph: {scores} ({cycle.iterations} iterations)")
+
+    elif command == "compute":
+        if len(sys.argv) < 3:
+            print("Error: Please provide attestations JSON file")
+            return
+
+        json_file = sys.argv[2]
+        try:
+            with open(json_file, 'r') as f:
+                attestation_data = json.load(f)
+
+            state = OnChainPageRank.from_contract_data(attestation_data)
+            scores = state.compute()
+            print(json.dumps({
+                'iterations': state.iterations,
+                'pagerank_scores': scores
+            }, indent=2))
+
+        except FileNotFoundError:
+            print(f"Error: File {json_file} not found")
+        except json.JSONDecodeError:
+            print(f"Error: Invalid JSON in {json_file}")
+        except ValueError as e:
+            print(f"Error: {e}")
+    else:
+        print(f"Unknown command: {command}")
+
+
+if __name__ == "__main__":
+    main()
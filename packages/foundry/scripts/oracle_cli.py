@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the PageRank oracle, built for frequent invocation
+
+Cron and CI call the oracle many times a day, mostly on inputs that did not change, so
+start-up time dominates. This script only imports the standard library up front: each
+command imports the modules it needs when it runs, and the networkx engine is only
+imported by the networkx backend (see `pagerank_calculator.py`).
+
+Repeated runs are skipped outright. After a successful compute, process or publish, the
+command, its options and stat fingerprints (size, mtime, inode, as `make` compares them)
+of its inputs, its outputs and the oracle scripts themselves are recorded under
+--state-dir. When none of them changed, the next identical invocation does no work:
+- compute replays the recorded output;
+- process and publish report that there is nothing new to publish and leave the batch
+  file alone: a real run would write the same batches, since batches only reach the
+  snapshot through `confirm` (a Merkle-mode process writes no new epoch).
+--force always runs the command. `confirm` rewrites the snapshot and batch file, so the
+run after it is never skipped.
+
+--worker=<url> (default: the ORACLE_WORKER environment variable) hands compute and
+process to a running `oracle_daemon.py` through its POST /sync endpoint, which keeps the
+graph, warm-start scores and publisher snapshot in memory between invocations. The
+daemon reads the input path on its own host (it must lie in the daemon's --sync-dir),
+uses its own engine options, and writes published files in its own working directory. The graph_info of a local compute is the
+calculator's graph_summary; that of a worker compute only holds node and edge counts.
+
+Usage:
+    python oracle_cli.py compute attestations.json --backend=csr
+    python oracle_cli.py process attestations.json --worker=http://127.0.0.1:8765
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from typing import Any, Dict, List, Optional, Sequence, TextIO
+
+DEFAULT_STATE_DIR = '.oracle_cli'
+WORKER_ENV = 'ORACLE_WORKER'
+WORKER_TIMEOUT = 3600
+
+# Files written by PageRankOracle.update_contract_scores and the score_publisher defaults,
+# named here so that checking for a no-op does not import NumPy
+SCORES_FILE = 'pagerank_scores.json'
+SNAPSHOT_FILE = 'published_scores.json'
+BATCH_FILE = 'score_update_batches.json'
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def fingerprint(path: str) -> Any:
+    """
+    Stat fingerprint of a file or directory tree
+
+    Returns:
+        [size, mtime_ns, inode] for a file, a sorted list of [relative path, size,
+        mtime_ns, inode] for a directory, or None if nothing exists at `path`
+    """
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if not os.path.isdir(path):
+        return [info.st_size, info.st_mtime_ns, info.st_ino]
+    entries = []
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            info = os.stat(file_path)
+            entries.append([os.path.relpath(file_path, path), info.st_size, info.st_mtime_ns, info.st_ino])
+    return entries
+
+
+def code_fingerprint() -> List[Any]:
+    """Fingerprints of the oracle scripts, so that upgrading them invalidates recorded runs"""
+    return [[name, fingerprint(os.path.join(SCRIPTS_DIR, name))]
+            for name in sorted(os.listdir(SCRIPTS_DIR)) if name.endswith('.py')]
+
+
+class RunState:
+    """Inputs and outputs of a command as they were after its last successful run"""
+
+    def __init__(self, state_dir: str, command: str, arguments: Dict[str, Any],
+                 inputs: Sequence[str], outputs: Sequence[str]):
+        """
+        Args:
+            state_dir: Directory holding recorded runs
+            command: Command name
+            arguments: Everything else that determines the result (options as given)
+            inputs: Files or directories the command reads
+            outputs: Files or directories the command writes
+        """
+        key = hashlib.blake2b(
+            json.dumps([command, arguments, os.getcwd()], sort_keys=True).encode(), digest_size=16
+        ).hexdigest()
+        self.path = os.path.join(state_dir, f"{command}-{key}.json")
+        # Recorded command output, replayed by compute
+        self.output_path = os.path.join(state_dir, f"{command}-{key}.out")
+        self.inputs = [os.path.abspath(path) for path in inputs]
+        self.outputs = [os.path.abspath(path) for path in outputs]
+
+    def _current(self) -> Dict[str, Any]:
+        return {
+            'code': code_fingerprint(),
+            'inputs': {path: fingerprint(path) for path in self.inputs},
+            'outputs': {path: fingerprint(path) for path in self.outputs},
+        }
+
+    def unchanged(self) -> bool:
+        """Whether a run was recorded and nothing it depends on changed since"""
+        try:
+            with open(self.path, 'r') as f:
+                recorded = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        return recorded == self._current()
+
+    def record(self):
+        """Record the current fingerprints (call after a successful run)"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Concurrent cron runs may race: replace the file atomically
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump(self._current(), f)
+        os.replace(temporary, self.path)
+
+
+class WorkerError(RuntimeError):
+    """The oracle daemon could not be reached or rejected the request"""
+
+
+def worker_sync(url: str, source: str, scores: bool, publish: bool) -> Dict[str, Any]:
+    """
+    Recompute on a running oracle daemon (POST /sync) and return its answer
+
+    Raises:
+        WorkerError: If the daemon is unreachable or answers with an error
+    """
+    import urllib.error
+    import urllib.request
+
+    request = urllib.request.Request(
+        url.rstrip('/') + '/sync',
+        data=json.dumps({'source': os.path.abspath(source), 'scores': scores, 'publish': publish}).encode(),
+        headers={'Content-Type': 'application/json'},
+        method='POST',
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=WORKER_TIMEOUT) as response:
+            return json.load(response)
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.load(e).get('error', e.reason)
+        except (json.JSONDecodeError, AttributeError):
+            message = e.reason
+        raise WorkerError(f"Worker {url} failed: {message}")
+    except urllib.error.URLError as e:
+        raise WorkerError(f"Worker {url} unreachable: {e.reason}")
+
+
+def pending_batches(filename: str) -> int:
+    """Number of unconfirmed batches in a batch file (0 if there is none)"""
+    try:
+        with open(filename, 'r') as f:
+            return len(json.load(f))
+    except FileNotFoundError:
+        return 0
+
+
+def compute(source: str, options: Dict[str, Optional[str]], stream: TextIO):
+    """Write the PageRank scores of an input to `stream`, as pagerank_calculator.py compute prints them"""
+    if options['worker']:
+        result = worker_sync(options['worker'], source, scores=True, publish=False)
+        json.dump({
+            'graph_info': {'node_count': result['node_count'], 'edge_count': result['edge_count']},
+            'pagerank_scores': result['pagerank_scores'],
+        }, stream, indent=2)
+        stream.write('\n')
+        return
+
+    from attestation_io import load_attestation_columns
+    from pagerank_cache import PageRankCache
+    from pagerank_calculator import PageRankCalculator, write_scores_json
+    from pagerank_metrics import PageRankNotConverged
+
+    calculator = PageRankCalculator(
+        backend=options['backend'],
+        cache=PageRankCache(directory=options['cache-dir']) if options['cache-dir'] else None,
+        workers=int(options['workers'] or 1),
+        solver=options['solver'] or 'power',
+    )
+    columns = load_attestation_columns(source)
+    calculator.add_attestation_columns(columns)
+    calculator.set_personalization(columns.get_personalization())
+    # The result form turns every backend's convergence failure (including networkx's
+    # PowerIterationFailedConvergence) into converged=False
+    result = calculator.compute_pagerank_result(tol=float(options['tol'] or 1e-6), record_residuals=False)
+    if not result.converged:
+        raise PageRankNotConverged(result)
+    # Written page by page; the full document is never held in memory
+    write_scores_json(calculator, stream, calculator.graph_summary())
+
+
+def process(source: str, options: Dict[str, Optional[str]]):
+    """Compute and publish, as pagerank_oracle.py compute"""
+    if options['worker']:
+        result = worker_sync(options['worker'], source, scores=False, publish=True)
+        print(f"Run summary: {result['last_run']}")
+        print(f"Oracle processing completed on {options['worker']}. Updated {result['node_count']} addresses.")
+        return
+
+    from attestation_io import load_attestation_columns
+    from pagerank_cache import PageRankCache
+    from pagerank_oracle import PageRankOracle
+
+    oracle = PageRankOracle(
+        backend=options['backend'],
+        cache=PageRankCache(directory=options['cache-dir']) if options['cache-dir'] else None,
+        merkle_dir=options['merkle-dir'],
+        workers=int(options['workers'] or 1),
+        solver=options['solver'] or 'power',
+    )
+    scores = oracle.process_and_update(load_attestation_columns(source))
+    print(f"Oracle processing completed. Updated {len(scores)} addresses.")
+    if options['metrics']:
+        oracle.write_metrics(options['metrics'])
+        print(f"Metrics saved to {options['metrics']}")
+
+
+def publish(scores_file: str, options: Dict[str, Optional[str]]):
+    """Write the update batches of a scores file, as score_publisher.py publish"""
+    from score_publisher import (
+        DEFAULT_GAS_BUDGET, DEFAULT_SIGNATURE, DEFAULT_THRESHOLD, ScorePublisher, summarize, write_batches
+    )
+
+    with open(scores_file, 'r') as f:
+        scores = json.load(f)
+    if 'pagerank_scores' in scores:
+        scores = scores['pagerank_scores']
+    publisher = ScorePublisher(
+        options['snapshot'] or SNAPSHOT_FILE,
+        int(options['threshold'] or DEFAULT_THRESHOLD),
+        int(options['gas-budget'] or DEFAULT_GAS_BUDGET),
+        options['function'] or DEFAULT_SIGNATURE,
+    )
+    batches = publisher.plan(scores)
+    output = options['output'] or BATCH_FILE
+    write_batches(batches, output)
+    print(summarize(batches, len(scores)))
+    print(f"Batches saved to {output}; run 'confirm {output}' once they are confirmed on-chain")
+
+
+def confirm(batch_file: str, indices: Sequence[int], options: Dict[str, Optional[str]]):
+    """Record confirmed batches in the snapshot, as score_publisher.py confirm"""
+    from score_publisher import DEFAULT_SIGNATURE, ScorePublisher, confirm_batches
+
+    publisher = ScorePublisher(options['snapshot'] or SNAPSHOT_FILE,
+                               function_signature=options['function'] or DEFAULT_SIGNATURE)
+    confirmed = confirm_batches(publisher, batch_file, list(indices) or None)
+    updates = sum(len(batch.addresses) for batch in confirmed)
+    print(f"Confirmed {len(confirmed)} batches ({updates} scores); "
+          f"{pending_batches(batch_file)} still pending in {batch_file}")
+
+
+def run_state(command: str, path: str, options: Dict[str, Optional[str]]) -> RunState:
+    """What a compute, process or publish run reads and writes"""
+    arguments = {'path': os.path.abspath(path),
+                 'options': {name: value for name, value in options.items() if value is not None}}
+    outputs = []
+    if command == 'compute':
+        if options['output']:
+            outputs.append(options['output'])
+    elif command == 'process':
+        # A worker publishes on its own host
+        if options['merkle-dir'] and not options['worker']:
+            outputs = [options['merkle-dir']]
+        elif not options['worker']:
+            outputs = [SCORES_FILE, SNAPSHOT_FILE, BATCH_FILE]
+        if options['metrics'] and not options['worker']:
+            outputs.append(options['metrics'])
+    else:
+        outputs = [options['snapshot'] or SNAPSHOT_FILE, options['output'] or BATCH_FILE]
+    state = RunState(options['state-dir'] or DEFAULT_STATE_DIR, command, arguments, [path], outputs)
+    if command == 'compute':
+        state.outputs.append(os.path.abspath(state.output_path))
+    return state
+
+
+def print_file(path: str):
+    with open(path, 'rb') as f:
+        sys.stdout.flush()
+        shutil.copyfileobj(f, sys.stdout.buffer)
+    sys.stdout.flush()
+
+
+def main() -> int:
+    """Dispatch an oracle command; returns the process exit status"""
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+
+    # bench and serve keep their own command lines
+    if command == 'bench':
+        import benchmark
+        sys.argv = ['benchmark.py'] + sys.argv[2:]
+        benchmark.main()
+        return 0
+    if command == 'serve':
+        import oracle_daemon
+        sys.argv = ['oracle_daemon.py'] + sys.argv[2:]
+        oracle_daemon.main()
+        return 0
+
+    options: Dict[str, Optional[str]] = {
+        'backend': None, 'solver': None, 'tol': None, 'workers': None, 'cache-dir': None,
+        'merkle-dir': None, 'metrics': None, 'output': None, 'snapshot': None, 'threshold': None,
+        'gas-budget': None, 'function': None, 'worker': os.environ.get(WORKER_ENV) or None,
+        'state-dir': None,
+    }
+    for arg in [a for a in sys.argv if a.startswith('--') and '=' in a]:
+        name, value = arg[2:].split('=', 1)
+        if name in options:
+            options[name] = value
+            sys.argv.remove(arg)
+    force = '--force' in sys.argv
+    if force:
+        sys.argv.remove('--force')
+    if options['backend'] is None:
+        options['backend'] = 'csr' if options['solver'] else 'networkx'
+
+    if command not in ('compute', 'process', 'publish', 'confirm'):
+        if command not in (None, '-h', '--help'):
+            print(f"Unknown command: {command}")
+            return 1
+        print("Usage: python oracle_cli.py <command> [args...] [options]")
+        print("Commands:")
+        print("  compute <attestations.json|store_dir> - Print PageRank scores (or write them to --output)")
+        print("  process <attestations.json|store_dir> - Compute and publish, as pagerank_oracle.py compute")
+        print("  publish <scores.json> - Write update batches, as score_publisher.py publish")
+        print("  confirm <batches.json> [index ...] - Record batches confirmed on-chain, "
+              "as score_publisher.py confirm")
+        print("  bench [args...] - Run benchmark.py with the remaining arguments")
+        print("  serve [args...] - Run oracle_daemon.py with the remaining arguments")
+        print("Options:")
+        print("  --backend=<name> - PageRank engine, networkx, csr or components (default networkx)")
+        print("  --solver=<name> - csr iteration scheme (implies --backend=csr)")
+        print("  --tol=<x> - Convergence tolerance for compute (default 1e-6)")
+        print("  --workers=<n> - Worker processes for the components backend (default 1)")
+        print("  --cache-dir=<dir> - Reuse PageRank results for identical inputs across runs")
+        print("  --merkle-dir=<dir> - process: publish a Merkle root per epoch instead of batches")
+        print("  --metrics=<file> - process: write run metrics afterwards")
+        print(f"  --output=<file> - compute: scores file; publish: batch file (default {BATCH_FILE})")
+        print(f"  --snapshot=<file>, --threshold=<n>, --gas-budget=<n>, --function=<sig> - publish: "
+              "as for score_publisher.py")
+        print(f"  --worker=<url> - Run compute and process on a running oracle_daemon.py (default ${WORKER_ENV})")
+        print(f"  --state-dir=<dir> - Where successful runs are recorded (default {DEFAULT_STATE_DIR})")
+        print("  --force - Run even if inputs and outputs are unchanged since the last run")
+        return 0
+
+    if len(sys.argv) < 3:
+        print("Error: Please provide an input file")
+        return 1
+
+    path = sys.argv[2]
+    if command == 'confirm':
+        try:
+            confirm(path, [int(index) for index in sys.argv[3:]], options)
+            return 0
+        except json.JSONDecodeError:
+            print(f"Error: Invalid JSON in {path}")
+        except ValueError as e:
+            print(f"Error: {e}")
+        return 1
+
+    state = run_state(command, path, options)
+    try:
+        if not force and state.unchanged():
+            if command == 'compute':
+                if options['output']:
+                    print(f"Scores in {options['output']} are up to date")
+                else:
+                    print_file(state.output_path)
+            else:
+                print(f"{path} unchanged since the last run: no new scores to publish")
+                batch_file = (options['output'] or BATCH_FILE) if command == 'publish' else BATCH_FILE
+                if command == 'publish' or not (options['merkle-dir'] or options['worker']):
+                    pending = pending_batches(batch_file)
+                    if pending:
+                        print(f"{pending} batches in {batch_file} still await confirmation")
+            return 0
+
+        if command == 'compute':
+            os.makedirs(os.path.dirname(state.output_path), exist_ok=True)
+            with open(state.output_path, 'w') as f:
+                compute(path, options, f)
+            if options['output']:
+                shutil.copyfile(state.output_path, options['output'])
+                print(f"Scores saved to {options['output']}")
+            else:
+                print_file(state.output_path)
+        elif command == 'process':
+            process(path, options)
+        else:
+            publish(path, options)
+        state.record()
+        return 0
+
+    except FileNotFoundError as e:
+        print(f"Error: File {e.filename or path} not found")
+    except json.JSONDecodeError:
+        print(f"Error: Invalid JSON in {path}")
+    except KeyError as e:
+        print(f"Error: Missing required field {e} in attestation data")
+    except (ValueError, RuntimeError) as e:
+        # RuntimeError covers PageRankNotConverged and WorkerError
+        print(f"Error: {e}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Resident PageRank oracle daemon
+
+Keeps a `PageRankOracle` (graph, warm-start scores, publisher snapshot) in memory and
+serves it over a small asyncio HTTP endpoint, so per-update cost is a warm-started
+recompute instead of process startup plus graph construction.
+
+Updates are queued and coalesced: a recompute starts once no update has arrived for
+`debounce` seconds, or `max_latency` seconds after the oldest pending update, whichever
+comes first. Recomputes (and optional publishing) run on a single worker thread, which
+is the only thread touching the graph, while requests keep being answered with the last
+computed scores.
+
+Endpoints:
+    POST /attestations   {"upserts": {...}, "removals": {...}} (apply_attestation_delta
+                         format) or a list of {"attester", "borrower", "weight"}
+    POST /recompute      Recompute now, even without pending updates
+    POST /sync           {"source": <attestations.json|store_dir>} Replace the graph with a
+                         full export read on the daemon's host and recompute (warm-started)
+                         before answering; {"scores": true} also returns the scores and
+                         {"publish": true|false} overrides --publish (see oracle_cli.py).
+                         Only sources inside --sync-dir are read.
+    GET  /scores         Last computed scores with their version
+    GET  /scores/<addr>  Score of one address
+    GET  /health         Pending updates, last run summary and timings
+    GET  /metrics        Oracle metrics in the Prometheus text format
+
+Usage:
+    python oracle_daemon.py [attestations.json|store_dir] [options]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from attestation_io import load_attestation_columns
+from pagerank_metrics import PageRankNotConverged
+from pagerank_oracle import PageRankOracle
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_MAX_LATENCY = 5.0
+MAX_BODY_BYTES = 64 * 1024 * 1024
+# Largest attestation weight, as in the contract (SCALE)
+DEFAULT_SCALE = 1_000_000
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found',
+            405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class BadRequest(ValueError):
+    """Invalid request payload"""
+
+
+def parse_update(payload: Any, scale: int = DEFAULT_SCALE) -> Dict[str, Any]:
+    """
+    Validate a posted update and normalize it to the apply_attestation_delta format
+
+    Args:
+        payload: Decoded request body
+        scale: Largest allowed weight (the calculator's weight scale)
+
+    Raises:
+        BadRequest: If the payload is malformed, a weight is outside 0..scale or an
+            attestation links an address to itself
+    """
+    if isinstance(payload, list):
+        try:
+            payload = {'upserts': {
+                'attesters': [item['attester'] for item in payload],
+                'borrowers': [item['borrower'] for item in payload],
+                'weights': [item['weight'] for item in payload],
+            }}
+        except (KeyError, TypeError) as e:
+            raise BadRequest(f"Missing required field {e} in attestation list")
+    if not isinstance(payload, dict):
+        raise BadRequest("Expected an attestation list or a delta object")
+
+    upserts = payload.get('upserts', {})
+    removals = payload.get('removals', {})
+    if not isinstance(upserts, dict) or not isinstance(removals, dict):
+        raise BadRequest("'upserts' and 'removals' must be objects")
+    columns = {
+        'upserts': [upserts.get('attesters', []), upserts.get('borrowers', []), upserts.get('weights', [])],
+        'removals': [removals.get('attesters', []), removals.get('borrowers', [])],
+    }
+    for name, values in columns.items():
+        if not all(isinstance(column, list) for column in values) or len({len(c) for c in values}) > 1:
+            raise BadRequest(f"'{name}' columns must be lists of equal length")
+        if not all(isinstance(address, str) for column in values[:2] for address in column):
+            raise BadRequest(f"'{name}' addresses must be strings")
+        if any(a.lower() == b.lower() for a, b in zip(*values[:2])):
+            raise BadRequest(f"'{name}' must not link an address to itself")
+    weights = columns['upserts'][2]
+    if not all(isinstance(w, int) and not isinstance(w, bool) and 0 <= w <= scale for w in weights):
+        raise BadRequest(f"Weights must be integers from 0 to {scale}")
+
+    attesters, borrowers, weights = columns['upserts']
+    removal_attesters, removal_borrowers = columns['removals']
+    return {
+        'upserts': {'attesters': attesters, 'borrowers': borrowers, 'weights': weights},
+        'removals': {'attesters': removal_attesters, 'borrowers': removal_borrowers},
+    }
+
+
+class OracleDaemon:
+    def __init__(self, oracle: PageRankOracle, debounce: float = DEFAULT_DEBOUNCE,
+                 max_latency: float = DEFAULT_MAX_LATENCY, publish: bool = False,
+                 sync_dir: Optional[str] = None):
+        """
+        Initialize the daemon
+
+        Args:
+            oracle: Oracle holding the graph (its calculator may already be populated)
+            debounce: Quiet period that triggers a recompute, in seconds
+            max_latency: Maximum delay between an update and its recompute, in seconds
+            publish: Run the oracle's publisher after every recompute
+            sync_dir: Directory that POST /sync sources must lie in (default: the
+                working directory)
+        """
+        self.oracle = oracle
+        self.sync_dir = os.path.realpath(sync_dir or os.getcwd())
+        self.debounce = debounce
+        self.max_latency = max_latency
+        self.publish = publish
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pagerank')
+        self._pending: List[Dict[str, Any]] = []
+        self._first_pending: Optional[float] = None
+        self._last_pending: Optional[float] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._force = False
+
+        # Served state, replaced as a whole after each recompute
+        self.scores: Dict[str, int] = {}
+        self.version = 0
+        self._scores_body = self._encode_scores()
+        self.last_error: Optional[str] = None
+        self.last_compute_seconds: Optional[float] = None
+        self.computed_at: Optional[float] = None
+        self.updates_received = 0
+        # Written by the worker thread only; the graph itself is never read from the loop
+        self.edge_count = 0
+
+    def _encode_scores(self) -> bytes:
+        return json.dumps({'version': self.version, 'pagerank_scores': self.scores}).encode()
+
+    def submit(self, delta: Dict[str, Any]):
+        """Queue a normalized delta for the next recompute"""
+        now = time.monotonic()
+        if not self._pending:
+            self._first_pending = now
+        self._pending.append(delta)
+        self._last_pending = now
+        self.updates_received += 1
+        self._wakeup.set()
+
+    def request_recompute(self):
+        self._force = True
+        self._wakeup.set()
+
+    def _recompute(self, deltas: List[Dict[str, Any]]) -> Tuple[Dict[str, int], float]:
+        """Worker-thread body: apply deltas, recompute, optionally publish"""
+        started = time.perf_counter()
+        if deltas:
+            scores = self.oracle.apply_attestation_deltas(deltas)
+        else:
+            scores = self.oracle.recompute()
+        if self.publish:
+            self.oracle.update_contract_scores(scores)
+        self.edge_count = self.oracle.calculator.graph.number_of_edges()
+        return scores, time.perf_counter() - started
+
+    def _sync(self, source: str, publish: bool) -> Tuple[Dict[str, int], float]:
+        """Worker-thread body: adopt a full export, recompute, optionally publish"""
+        started = time.perf_counter()
+        scores = self.oracle.compute_pagerank_from_contract_data(load_attestation_columns(source))
+        if publish:
+            self.oracle.update_contract_scores(scores)
+        self.edge_count = self.oracle.calculator.graph.number_of_edges()
+        return scores, time.perf_counter() - started
+
+    async def _adopt(self, scores: Dict[str, int], seconds: float):
+        """Serve freshly computed scores"""
+        self.scores = scores
+        self.version += 1
+        self._scores_body = await asyncio.get_running_loop().run_in_executor(self._executor, self._encode_scores)
+        self.last_error = None
+        self.last_compute_seconds = seconds
+        self.computed_at = time.time()
+
+    async def _scheduler(self):
+        """Wait for the debounce/max-latency deadline, then recompute in the worker"""
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._pending and not self._force:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            if self._pending and not self._force:
+                deadline = min(self._last_pending + self.debounce, self._first_pending + self.max_latency)
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+            deltas, self._pending = self._pending, []
+            self._force = False
+            try:
+                scores, seconds = await loop.run_in_executor(self._executor, self._recompute, deltas)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"Error: Recompute failed: {self.last_error}")
+                continue
+
+            await self._adopt(scores, seconds)
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            'status': 'ok' if self.last_error is None else 'degraded',
+            'version': self.version,
+            'pending_updates': len(self._pending),
+            'updates_received': self.updates_received,
+            'node_count': len(self.scores),
+            'edge_count': self.edge_count,
+            'last_run': self.oracle.last_run,
+            'last_compute_seconds': self.last_compute_seconds,
+            'computed_at': self.computed_at,
+            'last_error': self.last_error,
+        }
+
+    async def _sync_request(self, body: bytes) -> Tuple[int, bytes]:
+        """POST /sync: recompute from a full export and answer once it is served"""
+        try:
+            request = json.loads(body)
+        except json.JSONDecodeError:
+            return 400, json.dumps({'error': 'Invalid JSON'}).encode()
+        if not isinstance(request, dict) or not isinstance(request.get('source'), str):
+            return 400, json.dumps({'error': "Expected an object with a 'source' path"}).encode()
+        source = request['source']
+        # Resolved first, so neither '..' nor a symlink leads outside the directory
+        resolved = os.path.realpath(os.path.join(self.sync_dir, source))
+        if os.path.commonpath([resolved, self.sync_dir]) != self.sync_dir:
+            return 403, json.dumps({'error': f"{source} is outside the sync directory"}).encode()
+        source = resolved
+        loop = asyncio.get_running_loop()
+        try:
+            scores, seconds = await loop.run_in_executor(
+                self._executor, self._sync, source, bool(request.get('publish', self.publish)))
+        except FileNotFoundError:
+            return 404, json.dumps({'error': f"File {source} not found"}).encode()
+        except json.JSONDecodeError:
+            return 400, json.dumps({'error': f"Invalid JSON in {source}"}).encode()
+        except KeyError as e:
+            return 400, json.dumps({'error': f"Missing required field {e} in attestation data"}).encode()
+        except (ValueError, PageRankNotConverged) as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            return 500, json.dumps({'error': str(e)}).encode()
+        await self._adopt(scores, seconds)
+
+        response = {
+            'version': self.version,
+            'node_count': len(scores),
+            'edge_count': self.edge_count,
+            'last_run': self.oracle.last_run,
+            'compute_seconds': seconds,
+        }
+        if request.get('scores'):
+            response['pagerank_scores'] = scores
+        return 200, json.dumps(response).encode()
+
+    def _route(self, method: str, path: str, body: bytes) -> Tuple[int, bytes]:
+        if path == '/scores' and method == 'GET':
+            return 200, self._scores_body
+        if path.startswith('/scores/') and method == 'GET':
+            address = path[len('/scores/'):]
+            if address not in self.scores:
+                return 404, json.dumps({'error': f"Unknown address {address}"}).encode()
+            return 200, json.dumps({'version': self.version, 'address': address,
+                                    'score': self.scores[address]}).encode()
+        if path == '/health' and method == 'GET':
+            return 200, json.dumps(self.health()).encode()
+        if path == '/metrics' and method == 'GET':
+            return 200, self.oracle.metrics_text().encode()
+        if path == '/attestations' and method == 'POST':
+            try:
+                delta = parse_update(json.loads(body), self.oracle.calculator.scale)
+            except json.JSONDecodeError:
+                return 400, json.dumps({'error': 'Invalid JSON'}).encode()
+            except BadRequest as e:
+                return 400, json.dumps({'error': str(e)}).encode()
+            self.submit(delta)
+            return 202, json.dumps({'pending_updates': len(self._pending), 'version': self.version}).encode()
+        if path == '/recompute' and method == 'POST':
+            self.request_recompute()
+            return 202, json.dumps({'version': self.version}).encode()
+        if path in ('/scores', '/health', '/metrics', '/attestations', '/recompute', '/sync') or path.startswith('/scores/'):
+            return 405, json.dumps({'error': f"{method} not allowed on {path}"}).encode()
+        return 404, json.dumps({'error': f"Unknown path {path}"}).encode()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Minimal HTTP/1.1 handler: one request per connection"""
+        try:
+            request_line = await reader.readline()
+            parts = request_line.decode('latin-1').split()
+            if len(parts) < 2:
+                return
+            method, path = parts[0].upper(), parts[1].split('?', 1)[0]
+
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.strip().lower() == 'content-length':
+                    length = int(value.strip())
+
+            if length > MAX_BODY_BYTES:
+                status, payload = 413, json.dumps({'error': 'Body too large'}).encode()
+            else:
+                body = await reader.readexactly(length) if length else b''
+                if path == '/sync' and method == 'POST':
+                    status, payload = await self._sync_request(body)
+                else:
+                    status, payload = self._route(method, path, body)
+            content_type = METRICS_CONTENT_TYPE if path == '/metrics' and status == 200 else 'application/json'
+
+            writer.write(
+                f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + payload
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, ready=None):
+        """
+        Serve until cancelled
+
+        Args:
+            host: Interface to bind
+            port: TCP port (0 picks a free one)
+            ready: Optional callback receiving the bound (host, port)
+        """
+        self._wakeup = asyncio.Event()
+        if self.oracle.calculator.graph.number_of_nodes():
+            self.request_recompute()
+        scheduler = asyncio.create_task(self._scheduler())
+        server = await asyncio.start_server(self._handle, host, port)
+        try:
+            if ready is not None:
+                ready(server.sockets[0].getsockname()[:2])
+            async with server:
+                await server.serve_forever()
+        finally:
+            scheduler.cancel()
+            self._executor.shutdown(wait=False)
+
+
+def main():
+    """Run the oracle daemon"""
+    options = {
+        'host': DEFAULT_HOST,
+        'port': str(DEFAULT_PORT),
+        'debounce': str(DEFAULT_DEBOUNCE),
+        'max-latency': str(DEFAULT_MAX_LATENCY),
+        'backend': 'csr',
+        'sync-dir': None,
+    }
+    for arg in [a for a in sys.argv if a.startswith('--') and '=' in a]:
+        name, value = arg[2:].split('=', 1)
+        if name in options:
+            options[name] = value
+            sys.argv.remove(arg)
+    publish = '--publish' in sys.argv
+    if publish:
+        sys.argv.remove('--publish')
+
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '--help'):
+        print("Usage: python oracle_daemon.py [attestations.json|store_dir] [options]")
+        print("Options:")
+        print(f"  --host=<addr> - Interface to bind (default {DEFAULT_HOST})")
+        print(f"  --port=<n> - TCP port (default {DEFAULT_PORT})")
+        print(f"  --debounce=<seconds> - Quiet period before recomputing (default {DEFAULT_DEBOUNCE})")
+        print(f"  --max-latency=<seconds> - Upper bound on update-to-recompute delay (default {DEFAULT_MAX_LATENCY})")
+        print("  --backend=<name> - PageRank engine, networkx, csr or components (default csr)")
+        print("  --publish - Write changed-score batches after every recompute")
+        print("  --sync-dir=<dir> - Directory POST /sync may read sources from (default: working directory)")
+        return
+
+    oracle = PageRankOracle(backend=options['backend'], incremental=True)
+    if len(sys.argv) > 1:
+        source = sys.argv[1]
+        try:
+            columns = load_attestation_columns(source)
+        except FileNotFoundError:
+            print(f"Error: File {source} not found")
+            return
+        except json.JSONDecodeError:
+            print(f"Error: Invalid JSON in {source}")
+            return
+        oracle.calculator.add_attestation_columns(columns)
+        oracle.calculator.set_personalization(columns.get_personalization())
+        print(f"Loaded {len(columns)} attestations from {source}")
+
+    daemon = OracleDaemon(oracle, float(options['debounce']), float(options['max-latency']), publish,
+                          options['sync-dir'])
+    try:
+        asyncio.run(daemon.serve(
+            options['host'], int(options['port']),
+            ready=lambda address: print(f"Oracle daemon listening on http://{address[0]}:{address[1]}")
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache for PageRank results
+
+Identical attestation sets are recomputed often (test runs, oracle retries after RPC
+failures, repeated what-if queries). Results are keyed by a canonical BLAKE2b digest of
+everything that determines them: node order, deduplicated edge columns, raw
+personalization weights, alpha, max_iter, tol, scale and backend. Entries hold the
+unscaled score vector and the iteration count.
+
+Two tiers are used:
+- An in-memory LRU of `max_entries` results.
+- An optional on-disk directory of `.npz` files, evicted least-recently-used first once
+  it exceeds `max_disk_bytes`. It survives restarts and is shared between processes.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_MAX_ENTRIES = 128
+DEFAULT_MAX_DISK_BYTES = 256 * 1024 * 1024
+
+CacheEntry = Tuple[np.ndarray, Optional[int]]
+
+
+def pagerank_cache_key(addresses: Sequence[str], src: np.ndarray, dst: np.ndarray, weight: np.ndarray,
+                       personalization: Optional[np.ndarray], alpha: float, max_iter: int, tol: float,
+                       scale: int, backend: str) -> str:
+    """
+    Canonical digest of a PageRank computation
+
+    Args:
+        addresses: Node addresses in node id order
+        src, dst, weight: Deduplicated edge columns (AttestationGraph.edge_arrays)
+        personalization: Raw personalization weight per node, or None for uniform
+        alpha, max_iter, tol: PageRank parameters
+        scale: Score scaling factor
+        backend: PageRank engine name
+
+    Returns:
+        Hex digest identifying the result
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    digest.update(repr((alpha, max_iter, tol, scale, backend, len(addresses), len(src))).encode())
+    digest.update('\n'.join(addresses).encode())
+    for column, dtype in ((src, np.uint32), (dst, np.uint32), (weight, np.int64)):
+        digest.update(np.ascontiguousarray(column, dtype=dtype).tobytes())
+    if personalization is None:
+        digest.update(b'uniform')
+    else:
+        digest.update(np.ascontiguousarray(personalization, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+
+class PageRankCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, directory: Optional[str] = None,
+                 max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Results kept in memory
+            directory: Directory for the on-disk tier (None disables it)
+            max_disk_bytes: Size limit of the on-disk tier
+        """
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.npz')
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return (scores, iterations) for `key`, or None on a miss"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                with np.load(path) as stored:
+                    scores = stored['scores']
+                    iterations = int(stored['iterations'])
+                # Refresh the modification time, which orders disk eviction
+                os.utime(path)
+            except (OSError, KeyError, ValueError):
+                pass
+            else:
+                entry = (scores, None if iterations < 0 else iterations)
+                self._remember(key, entry)
+                self.hits += 1
+                return entry
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, scores: np.ndarray, iterations: Optional[int]):
+        """Store a result in both tiers"""
+        scores = np.array(scores, dtype=np.float64)
+        scores.setflags(write=False)
+        self._remember(key, (scores, iterations))
+
+        if self.directory is not None:
+            temporary = self._path(key) + f'.{os.getpid()}.tmp'
+            with open(temporary, 'wb') as f:
+                np.savez(f, scores=scores, iterations=-1 if iterations is None else iterations)
+            os.replace(temporary, self._path(key))
+            self._evict_disk()
+
+    def _remember(self, key: str, entry: CacheEntry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """Remove least recently used files until the directory fits max_disk_bytes"""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npz'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Drop all entries from both tiers"""
+        self._memory.clear()
+        if self.directory is not None:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.npz'):
+                    os.remove(entry.path)
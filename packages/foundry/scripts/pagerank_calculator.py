@@ -6,23 +6,99 @@ This module is used by `pagerank_oracle.py` to compute PageRank scores using Net
 The results are used as the baseline for the Solidity test `PageRankVerification.t.sol`.
 If you update the PageRank logic, ensure the expected values in the Solidity test are updated
 using the output from this script (via pagerank_oracle.py).
+
+Three backends are available: "networkx" (default, the reference implementation),
+"csr", a NumPy-vectorized sparse power iteration (see `pagerank_csr.py`) intended for
+large attestation graphs, and "components", which solves each weakly connected
+component separately, optionally across worker processes, and reuses the solutions of
+components that did not change since the previous run (see `pagerank_components.py`).
+All return the same scaled scores within `tol`. The csr backend also takes a `solver`
+(power, gauss-seidel, aitken, quadratic or adaptive; see `pagerank_csr.py`) that
+changes how the fixed point is reached, not the result; the `solvers` command compares
+their iteration counts, final residuals and run times on one input.
+
+Teleportation follows the contract's `_buildPersonalizationVector` when deposit, KYC and
+override columns are supplied via `set_personalization` (see `personalization.py`);
+otherwise it is uniform, as before.
+
+The calculator keeps the unscaled score vector of its last run so that, after a small
+attestation delta, the next run can warm-start from it (`compute_pagerank(warm_start=True)`).
+
+The `compute` command streams its input (see `attestation_io.py`), so it also accepts
+contract exports and memory-mapped column store directories.
+
+An optional `PageRankCache` returns stored results for identical inputs (graph,
+personalization and parameters) without recomputing.
+
+`compute_pagerank_result` returns a `PageRankResult` (see `pagerank_metrics.py`) with
+per-stage timings, iterations, residual history, convergence status and memory figures;
+every run also leaves one in `last_result`.
+
+Graphs are inspected through `graph_summary` (fixed-size statistics, see
+`graph_stats.py`) and the paginated `iter_edges` / `iter_scores` iterators rather than
+full node and edge lists; the `compute`, `summary` and `edges` commands stream their
+output (`--format=ndjson` writes one record per line).
 """
 
-import networkx as nx
+import numpy as np
 import json
 import sys
-from typing import Dict, List, Tuple, Any
+from itertools import chain, islice
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Any
+from attestation_graph import AttestationGraph
+from attestation_io import AttestationColumns, load_attestation_columns
+from graph_stats import DEFAULT_PAGE_SIZE, distribution, graph_summary, page_ranges, write_ndjson
+from pagerank_cache import PageRankCache, pagerank_cache_key
+from pagerank_components import ComponentPageRank
+from pagerank_csr import SOLVERS, PageRankConvergenceError, build_csr, csr_pagerank
+from pagerank_metrics import PageRankResult, peak_rss_bytes
+from personalization import Personalization
+
+
+def _networkx():
+    """Import NetworkX on first use; it dominates start-up time and only the networkx backend needs it"""
+    import networkx
+    return networkx
+
+
+BACKENDS = ('networkx', 'csr', 'components')
 
 class PageRankCalculator:
-    def __init__(self, scale: int = 1_000_000):
+    def __init__(self, scale: int = 1_000_000, backend: str = 'networkx', cache: Optional[PageRankCache] = None,
+                 workers: int = 1, solver: str = 'power'):
         """
         Initialize PageRank calculator
         
         Args:
             scale: Scaling factor for weights (default 1e6 to match Solidity)
+            backend: PageRank engine, one of BACKENDS (default "networkx")
+            cache: Result cache consulted by compute_pagerank (optional)
+            workers: Worker processes for the components backend (default 1, in-process)
+            solver: Iteration scheme of the csr backend, one of SOLVERS (default "power")
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown solver '{solver}', expected one of {SOLVERS}")
+        if solver != 'power' and backend != 'csr':
+            raise ValueError(f"Solver '{solver}' requires the csr backend")
         self.scale = scale
-        self.graph = nx.DiGraph()
+        self.backend = backend
+        self.solver = solver
+        self.graph = AttestationGraph()
+        # Unscaled scores of the last run, indexed by node id (warm-start state)
+        self._last_scores: Optional[np.ndarray] = None
+        # Iterations used by the last run (None when the backend does not report it)
+        self.last_iterations: Optional[int] = None
+        # Deposit/KYC/override columns for the teleport vector (None = uniform)
+        self.personalization: Optional[Personalization] = None
+        self.cache = cache
+        # Per-component solutions kept between runs (components backend)
+        self.component_solver = ComponentPageRank(workers) if backend == 'components' else None
+        # Whether the last compute_pagerank call was served from the cache
+        self.last_cache_hit = False
+        # Timings and convergence telemetry of the last run
+        self.last_result: Optional[PageRankResult] = None
         
     def add_attestation(self, attester: str, borrower: str, weight: int):
         """
@@ -33,13 +109,110 @@ class PageRankCalculator:
             borrower: Address of the borrower
             weight: Attestation weight (0 to scale)
         """
-        # Normalize weight to 0-1 range
-        normalized_weight = weight / self.scale
+        self.graph.add_edge(attester, borrower, weight)
+        
+    def add_attestations(self, attesters: Sequence[str], borrowers: Sequence[str], weights: Sequence[int]):
+        """
+        Add a batch of attestations to the graph in one vectorized call
+        
+        Args:
+            attesters: Attester address per attestation
+            borrowers: Borrower address per attestation
+            weights: Attestation weight per attestation (0 to scale)
+        """
+        self.graph.add_edges(attesters, borrowers, weights)
+        
+    def add_attestation_columns(self, columns: AttestationColumns):
+        """
+        Add attestations loaded as columns (streamed JSON or a column store)
+        
+        On an empty calculator the columns are adopted without copying.
+        
+        Args:
+            columns: Attestation columns from `attestation_io`
+        """
+        if self.graph.number_of_nodes() == 0:
+            self.graph = columns.to_graph()
+        else:
+            self.graph.add_columns(columns.addresses, columns.src, columns.dst, columns.weights)
+        
+    def set_personalization(self, personalization: Optional[Personalization]):
+        """
+        Set the personalization inputs used for teleportation and dangling mass
+        
+        Args:
+            personalization: Per-address deposit, KYC and override columns, or None
+                for the uniform vector
+        """
+        self.personalization = personalization
+        
+    def remove_attestations(self, attesters: Sequence[str], borrowers: Sequence[str]):
+        """
+        Remove a batch of attestations from the graph (nodes are kept)
+        
+        Args:
+            attesters: Attester address per removed attestation
+            borrowers: Borrower address per removed attestation
+        """
+        self.graph.remove_edges(attesters, borrowers)
+        
+    def sync_attestations(self, attesters: Sequence[str], borrowers: Sequence[str], weights: Sequence[int]) -> Dict[str, int]:
+        """
+        Replace the graph with a full attestation export, keeping warm-start state
         
-        # Add edge with weight
-        self.graph.add_edge(attester, borrower, weight=normalized_weight)
+        The new graph is built exactly as a fresh calculator would build it, and the
+        previous scores are carried over by address for the next warm-started run.
         
-    def compute_pagerank(self, damping_factor: float = 0.85, max_iter: int = 100, tol: float = 1e-6) -> Dict[str, float]:
+        Args:
+            attesters: Attester address per attestation
+            borrowers: Borrower address per attestation
+            weights: Attestation weight per attestation
+            
+        Returns:
+            Dictionary with "added", "updated" and "removed" edge counts
+        """
+        graph = AttestationGraph()
+        graph.add_edges(attesters, borrowers, weights)
+        return self.sync_graph(graph)
+        
+    def sync_graph(self, graph: AttestationGraph) -> Dict[str, int]:
+        """
+        Replace the graph with `graph`, carrying previous scores over by address
+        
+        Args:
+            graph: The new attestation graph
+            
+        Returns:
+            Dictionary with "added", "updated" and "removed" edge counts
+        """
+        delta = self.graph.diff(graph)
+        
+        if self._last_scores is not None:
+            to_old = self.graph.id_map(graph)
+            previous = np.full(len(to_old), np.nan)
+            known = (to_old >= 0) & (to_old < len(self._last_scores))
+            previous[known] = self._last_scores[to_old[known]]
+            self._last_scores = previous
+            
+        self.graph = graph
+        return delta
+        
+    def has_scores(self) -> bool:
+        """Whether a previous run left scores to warm-start from"""
+        return self._last_scores is not None
+        
+    def _warm_start_vector(self) -> Optional[np.ndarray]:
+        """Previous scores aligned with the current nodes; new nodes start at 1/N"""
+        if self._last_scores is None:
+            return None
+        node_count = self.graph.number_of_nodes()
+        nstart = np.full(node_count, np.nan)
+        carried = min(len(self._last_scores), node_count)
+        nstart[:carried] = self._last_scores[:carried]
+        return np.where(np.isnan(nstart), 1.0 / node_count, nstart)
+        
+    def compute_pagerank(self, damping_factor: float = 0.85, max_iter: int = 100, tol: float = 1e-6,
+                         warm_start: bool = False) -> Dict[str, float]:
         """
         Compute PageRank scores for all nodes
         
@@ -47,55 +220,300 @@ class PageRankCalculator:
             damping_factor: PageRank damping factor (default 0.7)
             max_iter: Maximum iterations
             tol: Convergence tolerance
-            
+            warm_start: Start from the previous run's scores instead of the uniform vector
+                (a cached result for the same inputs is returned as is; the components
+                backend reuses unchanged components instead)
+        
         Returns:
             Dictionary mapping node addresses to PageRank scores
+        
+        Raises:
+            PageRankConvergenceError, networkx.PowerIterationFailedConvergence: If the
+                iteration does not converge within max_iter
         """
-        if len(self.graph.nodes()) == 0:
-            return {}
-            
-        # Compute PageRank using NetworkX
-        pagerank_scores = nx.pagerank(
-            self.graph,
-            alpha=damping_factor,
-            max_iter=max_iter,
-            tol=tol,
-            weight='weight'
-        )
-        
-        # Scale scores back to match Solidity scale
-        scaled_scores = {
-            node: int(score * self.scale) 
-            for node, score in pagerank_scores.items()
-        }
-        
-        return scaled_scores
+        result = PageRankResult(self.backend, damping_factor, max_iter, tol, warm_start, self.solver)
+        self.last_result = result
+        self._compute(result, record_residuals=False)
+        return result.scores
+        
+    def compute_pagerank_result(self, damping_factor: float = 0.85, max_iter: int = 100, tol: float = 1e-6,
+                                warm_start: bool = False, record_residuals: bool = True) -> PageRankResult:
+        """
+        Compute PageRank scores together with timings and convergence telemetry
+        
+        Unlike compute_pagerank, a run that does not converge is reported through
+        `converged`/`error` on the result instead of raising.
+        
+        Args:
+            damping_factor, max_iter, tol, warm_start: As for compute_pagerank
+            record_residuals: Keep the per-iteration residual history (csr backend;
+                otherwise only the final residual is kept)
+        
+        Returns:
+            PageRankResult, also stored as `last_result`
+        """
+        result = PageRankResult(self.backend, damping_factor, max_iter, tol, warm_start, self.solver)
+        self.last_result = result
+        try:
+            self._compute(result, record_residuals)
+        except PageRankConvergenceError as e:
+            result.converged = False
+            result.iterations = e.max_iter
+            result.error = str(e)
+        except _networkx().PowerIterationFailedConvergence:
+            result.converged = False
+            result.iterations = max_iter
+            result.error = f"PageRank failed to converge in {max_iter} iterations (residual not reported)"
+        return result
+        
+    def _compute(self, result: PageRankResult, record_residuals: bool):
+        """Run PageRank with the parameters of `result`, filling it in"""
+        self.last_cache_hit = False
+        result.node_count = self.graph.number_of_nodes()
+        if result.node_count == 0:
+            result.iterations = 0
+            return
+        
+        with result.span('prepare'):
+            nodes = self.graph.addresses.addresses
+            src, dst, weight = self.graph.edge_arrays()
+            result.edge_count = len(src)
+            result.memory['edge_bytes'] = src.nbytes + dst.nbytes + weight.nbytes
+            cache_key = None
+            if self.cache is not None:
+                raw_personalization = None
+                if self.personalization is not None:
+                    raw_personalization = self.personalization.raw_weights(nodes)
+                cache_key = pagerank_cache_key(nodes, src, dst, weight, raw_personalization,
+                                               result.damping_factor, result.max_iter, result.tol,
+                                               self.scale, f"{self.backend}/{self.solver}")
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    self._last_scores, self.last_iterations = cached
+                    self.last_cache_hit = result.cache_hit = True
+        
+            if not result.cache_hit:
+                nstart = self._warm_start_vector() if result.warm_start else None
+                personalization = None
+                if self.personalization is not None:
+                    personalization = self.personalization.vector(nodes)
+        
+        if not result.cache_hit:
+            if self.backend == 'csr':
+                self._compute_pagerank_csr(result, src, dst, weight, nstart, personalization,
+                                           record_residuals)
+            elif self.backend == 'components':
+                with result.span('solve'):
+                    raw_personalization = None
+                    if self.personalization is not None:
+                        raw_personalization = self.personalization.raw_weights(nodes)
+                    self._last_scores, self.last_iterations = self.component_solver.solve(
+                        nodes, src, dst, weight, raw_personalization, alpha=result.damping_factor,
+                        max_iter=result.max_iter, tol=result.tol
+                    )
+                result.components = dict(self.component_solver.last_stats)
+            else:
+                with result.span('graph'):
+                    graph = self.graph.to_networkx(self.scale)
+                # Compute PageRank using NetworkX (it does not report iteration counts).
+                # Dangling mass follows the personalization vector, as on-chain.
+                with result.span('solve'):
+                    pagerank_scores = _networkx().pagerank(
+                        graph,
+                        alpha=result.damping_factor,
+                        max_iter=result.max_iter,
+                        tol=result.tol,
+                        nstart=None if nstart is None else dict(zip(nodes, nstart.tolist())),
+                        personalization=None if personalization is None else dict(zip(nodes, personalization.tolist())),
+                        weight='weight'
+                    )
+                self._last_scores = np.fromiter(pagerank_scores.values(), dtype=np.float64, count=len(pagerank_scores))
+                self.last_iterations = None
+        
+            if cache_key is not None:
+                self.cache.put(cache_key, self._last_scores, self.last_iterations)
+        
+        with result.span('scale'):
+            # Scale scores back to match Solidity scale
+            result.scores = dict(zip(nodes, (int(score * self.scale) for score in self._last_scores.tolist())))
+        result.iterations = self.last_iterations
+        result.memory['peak_rss_bytes'] = peak_rss_bytes()
+        
+    def _compute_pagerank_csr(self, result: PageRankResult, src: np.ndarray, dst: np.ndarray,
+                              weight: np.ndarray, nstart: Optional[np.ndarray] = None,
+                              personalization: Optional[np.ndarray] = None,
+                              record_residuals: bool = False):
+        """
+        Compute PageRank with the vectorized CSR engine
+        
+        Stores the unscaled scores (in graph node order) and iteration count on the
+        calculator, and the build/solve spans and residuals on `result` (the final
+        residual only, unless record_residuals).
+        """
+        with result.span('graph'):
+            indptr, indices, data = build_csr(src, dst, weight, result.node_count)
+        result.memory['csr_bytes'] = indptr.nbytes + indices.nbytes + data.nbytes
+        
+        residuals: List[float] = []
+        try:
+            with result.span('solve'):
+                self._last_scores, self.last_iterations = csr_pagerank(
+                    indptr, indices, data, alpha=result.damping_factor, max_iter=result.max_iter,
+                    tol=result.tol, personalization=personalization, nstart=nstart,
+                    residuals=residuals, solver=self.solver
+                )
+        finally:
+            result.residuals = residuals if record_residuals else residuals[-1:]
+        
+    def graph_summary(self, components: bool = True) -> Dict[str, Any]:
+        """
+        Fixed-size graph statistics (see `graph_stats.graph_summary`)
+        
+        Args:
+            components: Whether to include weakly connected component sizes
+        
+        Returns:
+            Dictionary of counts and distributions (weights divided by scale), plus
+            the distribution of the last run's scaled scores when there is one
+        """
+        src, dst, weight = self.graph.edge_arrays()
+        summary = graph_summary(src, dst, weight, self.graph.number_of_nodes(), self.scale, components)
+        if self._last_scores is not None:
+            scores = self._last_scores[~np.isnan(self._last_scores)]
+            summary['scores'] = distribution(scores * self.scale)
+        return summary
         
     def get_graph_info(self) -> Dict[str, Any]:
         """
         Get information about the current graph
         
+        Node and edge lists are no longer included; page through them with
+        iter_edges and iter_scores.
+        
         Returns:
-            Dictionary with graph statistics
+            Dictionary with graph statistics (as graph_summary)
         """
-        return {
-            'nodes': list(self.graph.nodes()),
-            'edges': list(self.graph.edges(data=True)),
-            'node_count': self.graph.number_of_nodes(),
-            'edge_count': self.graph.number_of_edges(),
-        }
+        return self.graph_summary()
+        
+    def iter_edges(self, offset: int = 0, limit: Optional[int] = None,
+                   page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Tuple[str, str, int]]:
+        """
+        Yield (attester, borrower, raw weight) for distinct edges, grouped by attester
+        
+        Edges are converted one page at a time, so memory stays bounded by page_size.
+        
+        Args:
+            offset: Edges to skip
+            limit: Maximum number of edges (default all)
+            page_size: Edges converted per page
+        """
+        names = self.graph.addresses.addresses
+        src, dst, weight = self.graph.edge_arrays()
+        for start, stop in page_ranges(len(src), offset, limit, page_size):
+            for u, v, w in zip(src[start:stop].tolist(), dst[start:stop].tolist(), weight[start:stop].tolist()):
+                yield names[u], names[v], w
+        
+    def iter_scores(self, offset: int = 0, limit: Optional[int] = None,
+                    page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Tuple[str, Optional[int]]]:
+        """
+        Yield (address, scaled score) from the last run, in node order
+        
+        Addresses added since that run (see sync_graph) have no score and yield None.
+        
+        Args:
+            offset: Nodes to skip
+            limit: Maximum number of nodes (default all)
+            page_size: Scores converted per page
+        
+        Raises:
+            ValueError: If PageRank has not been computed yet on a non-empty graph
+        """
+        if self._last_scores is None:
+            if self.graph.number_of_nodes() == 0:
+                return
+            raise ValueError("No scores yet; compute PageRank first")
+        names = self.graph.addresses.addresses
+        scores = self._last_scores
+        for start, stop in page_ranges(min(len(names), len(scores)), offset, limit, page_size):
+            for address, score in zip(names[start:stop], scores[start:stop].tolist()):
+                yield address, None if score != score else int(score * self.scale)
+
+
+def write_scores_json(calculator: PageRankCalculator, stream, summary: Dict[str, Any],
+                      page_size: int = DEFAULT_PAGE_SIZE):
+    """Write {"graph_info": summary, "pagerank_scores": {...}} one page of scores at a time"""
+    stream.write('{\n  "graph_info": ' + json.dumps(summary) + ',\n  "pagerank_scores": {')
+    scores = calculator.iter_scores(page_size=page_size)
+    separator = '\n'
+    while True:
+        page = [f'    {json.dumps(address)}: {json.dumps(score)}' for address, score in islice(scores, page_size)]
+        if not page:
+            break
+        stream.write(separator + ',\n'.join(page))
+        separator = ',\n'
+    stream.write('\n  }\n}\n')
+
 
 def main():
     """Example usage and testing"""
+    backend = 'networkx'
+    for arg in [a for a in sys.argv if a.startswith('--backend=')]:
+        backend = arg.split('=', 1)[1]
+        sys.argv.remove(arg)
+    solver = 'power'
+    for arg in [a for a in sys.argv if a.startswith('--solver=')]:
+        solver = arg.split('=', 1)[1]
+        if backend == 'networkx':
+            backend = 'csr'
+        sys.argv.remove(arg)
+    tol = 1e-6
+    for arg in [a for a in sys.argv if a.startswith('--tol=')]:
+        tol = float(arg.split('=', 1)[1])
+        sys.argv.remove(arg)
+    output_format = 'json'
+    for arg in [a for a in sys.argv if a.startswith('--format=')]:
+        output_format = arg.split('=', 1)[1]
+        sys.argv.remove(arg)
+    offset, limit = 0, None
+    paged = False
+    for arg in [a for a in sys.argv if a.startswith(('--offset=', '--limit='))]:
+        paged = True
+        name, value = arg[2:].split('=', 1)
+        if name == 'offset':
+            offset = int(value)
+        else:
+            limit = int(value)
+        sys.argv.remove(arg)
+        
     if len(sys.argv) < 2:
         print("Usage: python pagerank_calculator.py <command> [args...]")
         print("Commands:")
         print("  test - Run test calculations")
-        print("  compute <attestations.json> - Compute PageRank from JSON file")
+        print("  compute <attestations.json|store_dir> - Compute PageRank from JSON file or column store")
+        print("  summary <attestations.json|store_dir> - Graph statistics without computing PageRank")
+        print("  edges <attestations.json|store_dir> - Distinct edges as NDJSON (attester, borrower, raw_weight)")
+        print("  solvers <attestations.json|store_dir> - Compare csr solvers: iterations, final residual, time")
+        print("Options:")
+        print(f"  --backend=<name> - PageRank engine, one of {', '.join(BACKENDS)} (default networkx)")
+        print(f"  --solver=<name> - csr iteration scheme, one of {', '.join(SOLVERS)} (implies --backend=csr)")
+        print("  --tol=<x> - Convergence tolerance (default 1e-6)")
+        print("  --format=<json|ndjson> - compute output: one JSON document, or a summary line then one line per score")
+        print("  --offset=<n>, --limit=<n> - Page of scores (compute --format=ndjson) or edges (edges) to write")
+        return
+        
+    if output_format not in ('json', 'ndjson'):
+        print(f"Error: Unknown format '{output_format}', expected json or ndjson")
         return
         
     command = sys.argv[1]
-    calculator = PageRankCalculator()
+    if paged and not (command == 'edges' or (command == 'compute' and output_format == 'ndjson')):
+        print("Error: --offset and --limit only apply to edges and compute --format=ndjson")
+        return
+    try:
+        calculator = PageRankCalculator(backend=backend, solver=solver)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
     
     if command == "test":
         # Test with simple attestation scenario
@@ -113,11 +531,11 @@ def main():
         print(f"PageRank scores: {scores}")
         
         # Verify that higher attestation weight produces different scores
-        calculator2 = PageRankCalculator()
+        calculator2 = PageRankCalculator(backend=backend)
         calculator2.add_attestation("0x1111", "0x2222", 100_000)  # 10% weight
         scores_low = calculator2.compute_pagerank()
         
-        calculator3 = PageRankCalculator()
+        calculator3 = PageRankCalculator(backend=backend)
         calculator3.add_attestation("0x1111", "0x2222", 900_000)  # 90% weight
         scores_high = calculator3.compute_pagerank()
         
@@ -125,6 +543,18 @@ def main():
         print(f"Score with 90% weight: {scores_high.get('0x2222', 0)}")
         print(f"Scores are different: {scores_low.get('0x2222', 0) != scores_high.get('0x2222', 0)}")
         
+        # A community without deposits or KYC has no personalization mass and scores 0
+        by_backend = {}
+        for name in BACKENDS:
+            calculator4 = PageRankCalculator(backend=name)
+            calculator4.add_attestations(["0xa", "0xc"], ["0xb", "0xd"], [500_000, 500_000])
+            calculator4.set_personalization(Personalization(["0xa"], lender_deposits=[1000]))
+            by_backend[name] = calculator4.compute_pagerank()
+        reference = by_backend['csr']
+        agree = all(abs(scores[a] - reference[a]) <= 1 for scores in by_backend.values() for a in reference)
+        print(f"Zero-mass component scores: {reference}")
+        print(f"Backends agree: {agree}")
+        
     elif command == "compute":
         if len(sys.argv) < 3:
             print("Error: Please provide attestations JSON file")
@@ -132,32 +562,90 @@ def main():
             
         json_file = sys.argv[2]
         try:
-            with open(json_file, 'r') as f:
-                attestations = json.load(f)
-                
-            # Add attestations from JSON
-            for attestation in attestations:
-                calculator.add_attestation(
-                    attestation['attester'],
-                    attestation['borrower'],
-                    attestation['weight']
-                )
+            # Stream attestations into columns instead of loading the whole JSON document
+            columns = load_attestation_columns(json_file)
+            calculator.add_attestation_columns(columns)
+            calculator.set_personalization(columns.get_personalization())
                 
             # Compute PageRank
-            scores = calculator.compute_pagerank()
+            scores = calculator.compute_pagerank(tol=tol)
             
-            # Output results
-            print(json.dumps({
-                'graph_info': calculator.get_graph_info(),
-                'pagerank_scores': scores
-            }, indent=2))
+            # Stream results instead of building the whole document in memory
+            summary = calculator.graph_summary()
+            if output_format == 'ndjson':
+                write_ndjson(chain([{'type': 'summary', **summary}], (
+                    {'type': 'score', 'address': address, 'score': score}
+                    for address, score in calculator.iter_scores(offset, limit)
+                )), sys.stdout)
+            else:
+                write_scores_json(calculator, sys.stdout, summary)
+            
+        except FileNotFoundError:
+            print(f"Error: File {json_file} not found")
+        except json.JSONDecodeError:
+            print(f"Error: Invalid JSON in {json_file}")
+        except KeyError as e:
+            print(f"Error: Missing required field {e} in attestation data")
+        except ValueError as e:
+            print(f"Error: {e}")
+    elif command in ("summary", "edges"):
+        if len(sys.argv) < 3:
+            print("Error: Please provide attestations JSON file")
+            return
             
+        json_file = sys.argv[2]
+        try:
+            calculator.add_attestation_columns(load_attestation_columns(json_file))
+            if command == "summary":
+                print(json.dumps(calculator.graph_summary(), indent=2))
+            else:
+                write_ndjson((
+                    # Contract units (0 to scale); the summary divides weights by scale
+                    {'attester': attester, 'borrower': borrower, 'raw_weight': weight}
+                    for attester, borrower, weight in calculator.iter_edges(offset, limit)
+                ), sys.stdout)
+                
+        except FileNotFoundError:
+            print(f"Error: File {json_file} not found")
+        except json.JSONDecodeError:
+            print(f"Error: Invalid JSON in {json_file}")
+        except KeyError as e:
+            print(f"Error: Missing required field {e} in attestation data")
+        except ValueError as e:
+            print(f"Error: {e}")
+    elif command == "solvers":
+        if len(sys.argv) < 3:
+            print("Error: Please provide attestations JSON file")
+            return
+            
+        json_file = sys.argv[2]
+        try:
+            columns = load_attestation_columns(json_file)
+            reference = None
+            print(f"{'solver':>12} {'iterations':>10} {'residual':>10} {'seconds':>8} {'max diff':>8}")
+            for name in SOLVERS:
+                calculator = PageRankCalculator(backend='csr', solver=name)
+                calculator.add_attestation_columns(columns)
+                calculator.set_personalization(columns.get_personalization())
+                result = calculator.compute_pagerank_result(tol=tol)
+                residual = '-' if result.residual is None else f"{result.residual:.3e}"
+                if not result.converged:
+                    print(f"{name:>12} {'-':>10} {residual:>10} {result.total_seconds:>8.3f}  {result.error}")
+                    continue
+                if reference is None:
+                    reference = result.scores
+                # Largest difference from the power iteration's scaled scores
+                diff = max((abs(score - reference[address]) for address, score in result.scores.items()), default=0)
+                print(f"{name:>12} {result.iterations:>10} {residual:>10} {result.total_seconds:>8.3f} {diff:>8}")
+                
         except FileNotFoundError:
             print(f"Error: File {json_file} not found")
         except json.JSONDecodeError:
             print(f"Error: Invalid JSON in {json_file}")
         except KeyError as e:
             print(f"Error: Missing required field {e} in attestation data")
+        except ValueError as e:
+            print(f"Error: {e}")
     else:
         print(f"Unknown command: {command}")
 
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Instrumentation for PageRank computations
+
+`PageRankResult` is the structured outcome of `PageRankCalculator.compute_pagerank_result`:
+scores plus timing spans (prepare, graph, solve, scale), iteration count, convergence
+flag, per-iteration residual history (csr backend), node/edge counts, cache use and
+memory figures. `prometheus_text` renders oracle metrics in the Prometheus text
+exposition format.
+"""
+
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class PageRankResult:
+    """Scores and telemetry of one PageRank computation"""
+
+    def __init__(self, backend: str, damping_factor: float, max_iter: int, tol: float, warm_start: bool,
+                 solver: str = 'power'):
+        self.backend = backend
+        self.solver = solver
+        self.damping_factor = damping_factor
+        self.max_iter = max_iter
+        self.tol = tol
+        self.warm_start = warm_start
+        # Scaled scores (empty when the computation failed)
+        self.scores: Dict[str, int] = {}
+        # None when the backend does not report it (NetworkX)
+        self.iterations: Optional[int] = None
+        self.converged = True
+        self.error: Optional[str] = None
+        # L1 change per iteration (csr backend; only the last one unless recorded)
+        self.residuals: List[float] = []
+        # Seconds per stage, in execution order
+        self.timings: Dict[str, float] = {}
+        self.node_count = 0
+        self.edge_count = 0
+        self.cache_hit = False
+        self.memory: Dict[str, int] = {}
+        # Components found, solved and reused (components backend)
+        self.components: Dict[str, int] = {}
+
+    @contextmanager
+    def span(self, name: str):
+        """Time a stage; repeated spans with the same name accumulate"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - started
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.timings.values())
+
+    @property
+    def residual(self) -> Optional[float]:
+        """Residual of the last iteration, if recorded"""
+        return self.residuals[-1] if self.residuals else None
+
+    @property
+    def hit_max_iter(self) -> bool:
+        return not self.converged or (self.iterations is not None and self.iterations >= self.max_iter)
+
+    def to_dict(self, include_scores: bool = False) -> Dict[str, Any]:
+        data = {
+            'backend': self.backend,
+            'solver': self.solver,
+            'damping_factor': self.damping_factor,
+            'max_iter': self.max_iter,
+            'tol': self.tol,
+            'warm_start': self.warm_start,
+            'iterations': self.iterations,
+            'converged': self.converged,
+            'hit_max_iter': self.hit_max_iter,
+            'error': self.error,
+            'residuals': self.residuals,
+            'timings': self.timings,
+            'total_seconds': self.total_seconds,
+            'node_count': self.node_count,
+            'edge_count': self.edge_count,
+            'cache_hit': self.cache_hit,
+            'memory': self.memory,
+            'components': self.components,
+        }
+        if include_scores:
+            data['scores'] = self.scores
+        return data
+
+
+class PageRankNotConverged(RuntimeError):
+    """Raised by the oracle when a computation stops at max_iter without reaching tol"""
+
+    def __init__(self, result: PageRankResult):
+        super().__init__(
+            f"{result.error} [{result.backend} backend, {result.node_count} nodes, "
+            f"{result.edge_count} edges, tol={result.tol}, {result.total_seconds:.3f}s]"
+        )
+        self.result = result
+
+
+# (name, type, help, [(labels, value), ...])
+Metric = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape(text: str, quote: bool = True) -> str:
+    """Escape backslashes, newlines and (in label values) double quotes"""
+    text = str(text).replace('\\', '\\\\').replace('\n', '\\n')
+    return text.replace('"', '\\"') if quote else text
+
+
+def prometheus_text(metrics: Iterable[Metric]) -> str:
+    """Render metrics in the Prometheus text exposition format (version 0.0.4)"""
+    lines = []
+    for name, metric_type, help_text, samples in metrics:
+        lines.append(f"# HELP {name} {_escape(help_text, quote=False)}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in samples:
+            label_text = ''
+            if labels:
+                label_text = '{' + ','.join(f'{key}="{_escape(label)}"' for key, label in labels.items()) + '}'
+            lines.append(f"{name}{label_text} {float(value):.9g}")
+    return '\n'.join(lines) + '\n'
+
@@ -7,58 +7,267 @@ This script is used to generate the PageRank baseline results for the Solidity t
 test are derived from the output of this script (using NetworkX). If you change the PageRank
 algorithm or want to update the expected results, run this script with the appropriate attestation
 data to regenerate the baseline values. See the README_PageRank.md for more details.
+
+Input files are streamed into attestation columns (see `attestation_io.py`); a column store
+directory written by `attestation_io.py convert` can be passed instead of a JSON file.
+
+Every computation is instrumented (see `pagerank_metrics.py`): `metrics()` and
+`metrics_text()` expose run counts, failures, latency per stage, iterations and the last
+residual as JSON or in the Prometheus text format, and `--metrics=<file>` writes them
+after the command. A run that hits max_iter raises `PageRankNotConverged` with the graph
+size, parameters and last residual.
+
+With `--merkle-dir=<dir>` each published snapshot is committed to a Merkle root over
+(address, score, epoch) leaves instead of per-address updates (see `merkle_snapshot.py`);
+epochs are numbered consecutively inside the directory.
 """
 
-import networkx as nx
+import numpy as np
 import json
 import sys
 import os
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Union
 from pagerank_calculator import PageRankCalculator
+from personalization import Personalization
+from attestation_graph import AttestationGraph, REMOVED, flatten_attestation_data
+from attestation_io import AttestationColumns, load_attestation_columns
+from pagerank_cache import PageRankCache
+from pagerank_metrics import PageRankNotConverged, PageRankResult, prometheus_text
+from merkle_snapshot import ScoreSnapshot, epoch_path, latest_epoch
+from score_publisher import DEFAULT_BATCH_FILE, ScorePublisher, summarize, write_batches
 
 class PageRankOracle:
-    def __init__(self, contract_address: str = None):
+    def __init__(self, contract_address: str = None, backend: str = 'networkx', incremental: bool = False,
+                 publisher: ScorePublisher = None, cache: PageRankCache = None, merkle_dir: str = None,
+                 workers: int = 1, solver: str = 'power'):
         """
         Initialize PageRank oracle
         
         Args:
             contract_address: Address of the deployed contract
+            backend: PageRank engine used by the calculator ("networkx", "csr" or "components")
+            incremental: Keep the graph and scores between runs and warm-start from them.
+                Each warm run reports its iterations and wall time saved against the last
+                cold run; networkx does not report iteration counts, so there only the
+                wall-time saving (seconds_saved) is measured
+            publisher: Diffs scores against the last published snapshot and batches the
+                changes (default: ScorePublisher with its default snapshot file)
+            cache: PageRank result cache shared by every computation (optional)
+            merkle_dir: Publish Merkle-committed snapshots into this directory instead
+                of per-address score updates (optional)
+            workers: Worker processes for the components backend (default 1)
+            solver: Iteration scheme of the csr backend (default "power")
         """
         self.contract_address = contract_address
-        self.calculator = PageRankCalculator()
+        self.publisher = publisher if publisher is not None else ScorePublisher()
+        self.backend = backend
+        self.incremental = incremental
+        self.cache = cache
+        self.merkle_dir = merkle_dir
+        self.workers = workers
+        self.solver = solver
+        self.calculator = PageRankCalculator(backend=backend, cache=cache, workers=workers, solver=solver)
+        # Iterations and wall time of the last cold (uniform start) run, the reference
+        # for warm runs (iterations are None on the networkx backend)
+        self.cold_iterations = None
+        self.cold_seconds = None
+        # Summary of the last computation (mode, edge delta, iterations saved)
+        self.last_run: Dict[str, Any] = {}
+        # Telemetry: computations, non-converged ones and their cumulative duration
+        self.runs = 0
+        self.failures = 0
+        self.compute_seconds = 0.0
+        self.last_result: PageRankResult = None
         
-    def compute_pagerank_from_contract_data(self, attestation_data: Dict[str, Any]) -> Dict[str, int]:
+    def compute_pagerank_from_contract_data(self, attestation_data: Union[Dict[str, Any], AttestationColumns]) -> Dict[str, int]:
         """
         Compute PageRank from contract attestation data
         
+        In incremental mode, a previous graph is diffed against the new export and the
+        iteration warm-starts from the previous scores.
+        
         Args:
-            attestation_data: Dictionary with borrowers, attesters, and weights arrays
+            attestation_data: Dictionary with borrowers, attesters, and weights arrays, and
+                optional "personalization" columns (see personalization.py), or the
+                same data already loaded as AttestationColumns
             
         Returns:
             Dictionary mapping addresses to PageRank scores
         """
-        borrowers = attestation_data.get('borrowers', [])
-        attesters_arrays = attestation_data.get('attesters', [])
-        weights_arrays = attestation_data.get('weights', [])
+        if isinstance(attestation_data, AttestationColumns):
+            graph = attestation_data.to_graph()
+            personalization = attestation_data.get_personalization()
+        else:
+            graph = AttestationGraph()
+            graph.add_edges(*flatten_attestation_data(attestation_data))
+            personalization = None
+            if 'personalization' in attestation_data:
+                personalization = Personalization.from_dict(attestation_data['personalization'])
         
-        # Clear previous data
-        self.calculator = PageRankCalculator()
+        if self.incremental and self.calculator.has_scores():
+            delta = self.calculator.sync_graph(graph)
+            self.calculator.set_personalization(personalization)
+            return self._compute_warm(delta)
+            
+        # Clear previous data and adopt the new graph, keeping per-component solutions
+        component_solver = self.calculator.component_solver
+        self.calculator = PageRankCalculator(backend=self.backend, cache=self.cache, workers=self.workers,
+                                             solver=self.solver)
+        self.calculator.component_solver = component_solver
+        self.calculator.graph = graph
+        self.calculator.set_personalization(personalization)
         
-        # Add all attestations to the graph
-        for i, borrower in enumerate(borrowers):
-            if i < len(attesters_arrays) and i < len(weights_arrays):
-                attesters = attesters_arrays[i]
-                weights = weights_arrays[i]
+        # Compute PageRank scores
+        scores = self._run_pagerank(warm_start=False)
+        self.cold_iterations = self.calculator.last_iterations
+        self.cold_seconds = self.last_result.total_seconds
+        self.last_run = {
+            'mode': 'cold',
+            'added': self.calculator.graph.number_of_edges(),
+            'updated': 0,
+            'removed': 0,
+            'iterations': self.cold_iterations,
+            'seconds': self.cold_seconds,
+        }
+        return scores
+        
+    def apply_attestation_delta(self, delta: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Apply an attestation delta to the current graph and recompute
+        
+        Args:
+            delta: Dictionary with optional "upserts" (attesters, borrowers and weights
+                arrays for new or updated attestations) and "removals" (attesters and
+                borrowers arrays)
                 
-                for j, attester in enumerate(attesters):
-                    if j < len(weights):
-                        weight = weights[j]
-                        self.calculator.add_attestation(attester, borrower, weight)
+        Returns:
+            Dictionary mapping addresses to PageRank scores
+        """
+        return self.apply_attestation_deltas([delta])
         
-        # Compute PageRank scores
-        scores = self.calculator.compute_pagerank()
+    def apply_attestation_deltas(self, deltas: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Apply several attestation deltas in order, then recompute once
+        
+        Args:
+            deltas: Deltas in the format accepted by apply_attestation_delta
+            
+        Returns:
+            Dictionary mapping addresses to PageRank scores
+        """
+        counts = {'added': 0, 'updated': 0, 'removed': 0}
+        for delta in deltas:
+            for key, value in self._apply_delta(delta).items():
+                counts[key] += value
+        return self._compute_warm(counts)
+        
+    def recompute(self) -> Dict[str, int]:
+        """Recompute the current graph, warm-started from the previous scores if any"""
+        return self._compute_warm({'added': 0, 'updated': 0, 'removed': 0})
+        
+    def _apply_delta(self, delta: Dict[str, Any]) -> Dict[str, int]:
+        """Apply one delta to the graph without recomputing; returns its edge counts"""
+        upserts = delta.get('upserts', {})
+        removals = delta.get('removals', {})
+        upsert_attesters = upserts.get('attesters', [])
+        upsert_borrowers = upserts.get('borrowers', [])
+        upsert_weights = upserts.get('weights', [])
+        removal_attesters = removals.get('attesters', [])
+        removal_borrowers = removals.get('borrowers', [])
+        
+        graph = self.calculator.graph
+        before = graph.edge_weights(upsert_attesters, upsert_borrowers)
+        existing = before != REMOVED
+        counts = {
+            'added': int((~existing).sum()),
+            'updated': int((existing & (before != np.asarray(upsert_weights, dtype=np.int64))).sum()),
+            'removed': int((graph.edge_weights(removal_attesters, removal_borrowers) != REMOVED).sum()),
+        }
+        
+        self.calculator.add_attestations(upsert_attesters, upsert_borrowers, upsert_weights)
+        self.calculator.remove_attestations(removal_attesters, removal_borrowers)
+        return counts
+        
+    def _compute_warm(self, delta: Dict[str, Any]) -> Dict[str, int]:
+        """Warm-started recompute after a delta; records iterations and time saved vs. the last cold run"""
+        scores = self._run_pagerank(warm_start=self.calculator.has_scores())
+        iterations = self.calculator.last_iterations
+        seconds = self.last_result.total_seconds
+        saved = None
+        if iterations is not None and self.cold_iterations is not None:
+            saved = self.cold_iterations - iterations
+        seconds_saved = None if self.cold_seconds is None else self.cold_seconds - seconds
+        self.last_run = dict(delta, mode='warm', iterations=iterations,
+                             cold_iterations=self.cold_iterations, iterations_saved=saved,
+                             seconds=seconds, cold_seconds=self.cold_seconds, seconds_saved=seconds_saved)
         return scores
         
+    def _run_pagerank(self, warm_start: bool) -> Dict[str, int]:
+        """Compute with telemetry; raises PageRankNotConverged if max_iter was hit"""
+        result = self.calculator.compute_pagerank_result(warm_start=warm_start)
+        self.last_result = result
+        self.runs += 1
+        self.compute_seconds += result.total_seconds
+        if not result.converged:
+            self.failures += 1
+            raise PageRankNotConverged(result)
+        return result.scores
+        
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Oracle telemetry as a JSON-serializable dictionary
+        
+        Returns:
+            Dictionary with run counters, the last run summary and the last
+            PageRankResult (without scores)
+        """
+        return {
+            'runs': self.runs,
+            'failures': self.failures,
+            'compute_seconds': self.compute_seconds,
+            'backend': self.backend,
+            'last_run': self.last_run,
+            'last_result': None if self.last_result is None else self.last_result.to_dict(),
+        }
+        
+    def metrics_text(self) -> str:
+        """Oracle telemetry in the Prometheus text exposition format"""
+        metrics = [
+            ('pagerank_runs_total', 'counter', 'PageRank computations', [({}, self.runs)]),
+            ('pagerank_failures_total', 'counter', 'PageRank computations that hit max_iter', [({}, self.failures)]),
+            ('pagerank_compute_seconds_total', 'counter', 'Cumulative PageRank computation time',
+             [({}, self.compute_seconds)]),
+        ]
+        result = self.last_result
+        if result is not None:
+            mode = {'mode': self.last_run.get('mode', 'cold'), 'backend': result.backend, 'solver': result.solver}
+            metrics += [
+                ('pagerank_last_duration_seconds', 'gauge', 'Duration of the last computation by stage',
+                 [({'stage': stage}, seconds) for stage, seconds in result.timings.items()]
+                 + [({'stage': 'total'}, result.total_seconds)]),
+                ('pagerank_last_iterations', 'gauge', 'Iterations of the last computation',
+                 [(mode, result.iterations)] if result.iterations is not None else []),
+                ('pagerank_last_residual', 'gauge', 'L1 residual of the last iteration',
+                 [(mode, result.residual)] if result.residual is not None else []),
+                ('pagerank_last_converged', 'gauge', 'Whether the last computation converged',
+                 [(mode, result.converged)]),
+                ('pagerank_last_cache_hit', 'gauge', 'Whether the last result came from the cache',
+                 [(mode, result.cache_hit)]),
+                ('pagerank_nodes', 'gauge', 'Nodes in the attestation graph', [({}, result.node_count)]),
+                ('pagerank_edges', 'gauge', 'Edges in the attestation graph', [({}, result.edge_count)]),
+                ('pagerank_memory_bytes', 'gauge', 'Memory figures of the last computation',
+                 [({'kind': kind}, size) for kind, size in result.memory.items()]),
+            ]
+        return prometheus_text(metrics)
+        
+    def write_metrics(self, filename: str):
+        """Write metrics to `filename`: JSON for .json, otherwise Prometheus text"""
+        with open(filename, 'w') as f:
+            if filename.endswith('.json'):
+                json.dump(self.metrics(), f, indent=2)
+            else:
+                f.write(self.metrics_text())
+        
     def update_contract_scores(self, scores: Dict[str, int], contract_interface=None):
         """
         Update credit scores in the smart contract
@@ -68,27 +277,57 @@ class PageRankOracle:
             scores: Dictionary of address -> score mappings
             contract_interface: Web3 contract interface (for future implementation)
         """
+        if self.merkle_dir is not None:
+            self.commit_snapshot(scores)
+            return
+            
         # This is a placeholder for web3 integration
-        # In a real implementation, this would make actual contract calls
-        print("Would update contract with scores:", scores)
+        # In a real implementation, this would submit each batch's calldata
+        batches = self.publisher.plan(scores)
+        print("Would update contract:", summarize(batches, len(scores)))
         
-        # For now, just save to a file that can be used for manual updates
+        # For now, save the full scores and the changed-score batches for manual updates
         with open("pagerank_scores.json", "w") as f:
             json.dump(scores, f, indent=2)
         print("Scores saved to pagerank_scores.json")
+        # The batches stay pending, and in every later plan, until they are confirmed
+        # on-chain and recorded with `score_publisher.py confirm`
+        write_batches(batches)
+        print(f"Update batches saved to {DEFAULT_BATCH_FILE} (pending confirmation)")
         
-    def process_and_update(self, attestation_data: Dict[str, Any]) -> Dict[str, int]:
+    def commit_snapshot(self, scores: Dict[str, int]) -> ScoreSnapshot:
+        """
+        Write the next epoch's Merkle snapshot of `scores` into merkle_dir
+        
+        Only the root needs to go on-chain; proofs are served from the snapshot.
+        
+        Returns:
+            The written snapshot
+        """
+        previous = latest_epoch(self.merkle_dir)
+        epoch = 0 if previous is None else previous + 1
+        snapshot = ScoreSnapshot.build(scores, epoch)
+        os.makedirs(self.merkle_dir, exist_ok=True)
+        path = epoch_path(self.merkle_dir, epoch)
+        snapshot.write(path)
+        print(f"Would publish score root 0x{snapshot.root.hex()} for epoch {epoch} ({len(snapshot)} scores)")
+        print(f"Snapshot and proofs saved to {path}")
+        return snapshot
+        
+    def process_and_update(self, attestation_data: Union[Dict[str, Any], AttestationColumns]) -> Dict[str, int]:
         """
         Complete workflow: compute PageRank and update contract
         
         Args:
-            attestation_data: Contract attestation data
+            attestation_data: Contract attestation data (dictionary or AttestationColumns)
             
         Returns:
             Computed PageRank scores
         """
         print("Computing PageRank from attestation data...")
         scores = self.compute_pagerank_from_contract_data(attestation_data)
+        if self.incremental:
+            print(f"Run summary: {self.last_run}")
         
         print("Updating contract scores...")
         self.update_contract_scores(scores)
@@ -97,15 +336,59 @@ class PageRankOracle:
 
 def main():
     """Main function for oracle operation"""
+    backend = None
+    for arg in [a for a in sys.argv if a.startswith('--backend=')]:
+        backend = arg.split('=', 1)[1]
+        sys.argv.remove(arg)
+    incremental = '--incremental' in sys.argv
+    if incremental:
+        sys.argv.remove('--incremental')
+    cache = None
+    for arg in [a for a in sys.argv if a.startswith('--cache-dir=')]:
+        cache = PageRankCache(directory=arg.split('=', 1)[1])
+        sys.argv.remove(arg)
+    merkle_dir = None
+    for arg in [a for a in sys.argv if a.startswith('--merkle-dir=')]:
+        merkle_dir = arg.split('=', 1)[1]
+        sys.argv.remove(arg)
+    solver = 'power'
+    for arg in [a for a in sys.argv if a.startswith('--solver=')]:
+        solver = arg.split('=', 1)[1]
+        if backend in (None, 'networkx'):
+            backend = 'csr'
+        sys.argv.remove(arg)
+    if backend is None:
+        # Only csr and components report iteration counts, which warm runs compare
+        backend = 'csr' if incremental else 'networkx'
+    workers = 1
+    for arg in [a for a in sys.argv if a.startswith('--workers=')]:
+        workers = int(arg.split('=', 1)[1])
+        sys.argv.remove(arg)
+    metrics_file = None
+    for arg in [a for a in sys.argv if a.startswith('--metrics=')]:
+        metrics_file = arg.split('=', 1)[1]
+        sys.argv.remove(arg)
+        
     if len(sys.argv) < 2:
         print("Usage: python pagerank_oracle.py <command> [args...]")
         print("Commands:")
-        print("  compute <attestations.json> - Compute PageRank from JSON file")
+        print("  compute <attestations.json|store_dir> - Compute PageRank from JSON file or column store")
         print("  test - Run test with sample data")
+        print("Options:")
+        print("  --backend=<name> - PageRank engine, networkx, csr or components "
+              "(default networkx, csr with --incremental)")
+        print("  --workers=<n> - Worker processes for the components backend (default 1)")
+        print("  --solver=<name> - csr iteration scheme: power, gauss-seidel, aitken, quadratic or adaptive "
+              "(implies --backend=csr)")
+        print("  --incremental - Warm-start recomputes from the previous scores (test applies a one-edge delta)")
+        print("  --cache-dir=<dir> - Reuse PageRank results for identical inputs across runs")
+        print("  --merkle-dir=<dir> - Publish a Merkle root per epoch instead of per-address updates")
+        print("  --metrics=<file> - Write run metrics afterwards (.json for JSON, else Prometheus text)")
         return
         
     command = sys.argv[1]
-    oracle = PageRankOracle()
+    oracle = PageRankOracle(backend=backend, incremental=incremental, cache=cache, merkle_dir=merkle_dir,
+                            workers=workers, solver=solver)
     
     if command == "test":
         # Test with sample attestation data
@@ -126,6 +409,14 @@ def main():
         scores = oracle.process_and_update(test_data)
         print(f"Test completed. Scores: {scores}")
         
+        if incremental:
+            # A single new attestation, as emitted by one attestMeta call
+            scores = oracle.apply_attestation_delta({
+                "upserts": {"attesters": ["0x4444"], "borrowers": ["0x3333"], "weights": [500_000]}
+            })
+            print(f"Incremental update: {oracle.last_run}")
+            print(f"Updated scores: {scores}")
+        
     elif command == "compute":
         if len(sys.argv) < 3:
             print("Error: Please provide attestations JSON file")
@@ -133,9 +424,7 @@ def main():
             
         json_file = sys.argv[2]
         try:
-            with open(json_file, 'r') as f:
-                attestation_data = json.load(f)
-                
+            attestation_data = load_attestation_columns(json_file)
             scores = oracle.process_and_update(attestation_data)
             print(f"Oracle processing completed. Updated {len(scores)} addresses.")
             
@@ -143,8 +432,15 @@ def main():
             print(f"Error: File {json_file} not found")
         except json.JSONDecodeError:
             print(f"Error: Invalid JSON in {json_file}")
+        except (ValueError, PageRankNotConverged) as e:
+            print(f"Error: {e}")
     else:
         print(f"Unknown command: {command}")
+        return
+        
+    if metrics_file is not None:
+        oracle.write_metrics(metrics_file)
+        print(f"Metrics saved to {metrics_file}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""
+Out-of-core PageRank for attestation graphs larger than memory
+
+The in-memory backends keep the whole edge list resident (the networkx one builds two
+more copies of it). This engine keeps only per-node vectors in memory: `BlockedEdges`
+partitions the edges by destination into blocks of a memory-mapped file on disk, each
+block deduplicated, sorted by source and row-normalized, and `blocked_pagerank` runs
+power iteration one block at a time. A block's new scores only depend on the previous
+score vector and the block's own in-edges, so a single block of edges is in memory at
+any time.
+
+Blocks are sized from a memory ceiling: NODE_BYTES per node are set aside for the
+vectors and the rest bounds the edges of a block (EDGE_BYTES each while the block is
+deduplicated or iterated). A node with more in-edges than that gets a block of its own,
+deduplicated one source range at a time through a side file and iterated in budget-sized
+chunks. The ceiling covers the engine's arrays, not the interpreter; pages of the edge
+file and of memory-mapped input columns are page cache that the kernel reclaims as
+needed.
+
+Update rule, dangling-node handling, convergence test and the order in which each
+node's in-edges are summed are those of the csr power solver (see `pagerank_csr.py`),
+so the scores, and the scaled scores, match the in-memory csr backend.
+
+Input is a column store (see `attestation_io.py`): its columns are memory-mapped and
+read in chunks, and addresses are only decoded chunk by chunk for personalization and
+output. A JSON file is streamed into in-memory columns first. Repeated (attester,
+borrower) pairs keep their last weight, as in `AttestationGraph`.
+
+Usage:
+    python pagerank_outofcore.py compute <store_dir|attestations.json> [options]
+    python pagerank_outofcore.py verify <store_dir|attestations.json> [options]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from attestation_io import load_attestation_columns, map_column_store
+from pagerank_csr import PageRankConvergenceError
+from personalization import Personalization
+
+# On-disk edge record: source and destination node ids, then the raw weight (while
+# building) or the row-normalized weight
+EDGE_DTYPE = np.dtype([('src', '<u4'), ('dst', '<u4'), ('data', '<f8')])
+EDGE_FILE = 'edges.bin'
+
+# Peak bytes per node (score vectors, teleport vector, dangling mask; in-degree and
+# out-weight while building) and per edge of the block in memory (record, dedup keys
+# and sort order, gathered contributions)
+NODE_BYTES = 32
+EDGE_BYTES = 80
+MIN_BLOCK_EDGES = 4_096
+DEFAULT_MEMORY_LIMIT = 1 << 30
+# Addresses decoded per step for personalization and output
+ADDRESS_CHUNK = 65_536
+
+_SIZE_SUFFIXES = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+
+def parse_size(text: str) -> int:
+    """Byte count from "1073741824", "512M" or "2G" (binary multiples)"""
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in _SIZE_SUFFIXES:
+        return int(float(text[:-1]) * _SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def block_edge_budget(node_count: int, memory_limit: int) -> int:
+    """
+    Maximum edges per block that keeps the engine within `memory_limit` bytes
+
+    Raises:
+        ValueError: If the node vectors alone leave too little room for a block
+    """
+    budget = (memory_limit - NODE_BYTES * node_count) // EDGE_BYTES
+    if budget < MIN_BLOCK_EDGES:
+        needed = NODE_BYTES * node_count + EDGE_BYTES * MIN_BLOCK_EDGES
+        raise ValueError(f"Memory limit of {memory_limit} bytes is too small for {node_count} nodes "
+                         f"(needs at least {needed})")
+    return int(budget)
+
+
+class BlockedEdges:
+    """Edges in a file on disk, grouped into blocks of consecutive destination nodes"""
+
+    def __init__(self, path: str, node_count: int, bounds: np.ndarray, offsets: np.ndarray,
+                 lengths: np.ndarray, dangling: np.ndarray, budget: int):
+        """
+        Args:
+            path: Edge file (EDGE_DTYPE records)
+            node_count: Number of nodes
+            bounds: Block b holds the in-edges of nodes bounds[b] to bounds[b + 1] - 1
+            offsets: First record of each block in the file
+            lengths: Records per block
+            dangling: Mask of nodes without out-weight
+            budget: Maximum records read at once
+        """
+        self.path = path
+        self.node_count = node_count
+        self.bounds = bounds
+        self.offsets = offsets
+        self.lengths = lengths
+        self.dangling = dangling
+        self.budget = budget
+
+    def __len__(self) -> int:
+        return int(self.lengths.sum())
+
+    @property
+    def block_count(self) -> int:
+        return len(self.bounds) - 1
+
+    @classmethod
+    def build(cls, path: str, src: np.ndarray, dst: np.ndarray, weight: np.ndarray, node_count: int,
+              budget: int, compacted: bool = False) -> 'BlockedEdges':
+        """
+        Write edge columns to a destination-blocked edge file
+
+        The columns are only read in chunks of `budget` edges, so they may be memory-mapped.
+
+        Args:
+            path: Edge file to create
+            src: Attester id per edge
+            dst: Borrower id per edge
+            weight: Raw weight per edge
+            node_count: Number of nodes (ids are below it)
+            budget: Maximum edges per block and per read
+            compacted: Whether the columns hold each (src, dst) pair at most once
+
+        Raises:
+            ValueError: If the columns differ in length or a weight is negative
+        """
+        edge_count = len(src)
+        if not (len(dst) == edge_count == len(weight)):
+            raise ValueError("src, dst and weights must have the same length")
+        chunks = range(0, edge_count, budget)
+
+        # In-degree per node, then blocks of at most `budget` in-edges and nodes
+        cumulative = np.zeros(node_count, dtype=np.int64)
+        for lo in chunks:
+            nodes, counts = np.unique(_chunk(dst, lo, lo + budget), return_counts=True)
+            cumulative[nodes] += counts
+        np.cumsum(cumulative, out=cumulative)
+        bounds = [0]
+        while bounds[-1] < node_count:
+            start = bounds[-1]
+            base = int(cumulative[start - 1]) if start else 0
+            end = int(np.searchsorted(cumulative, base + budget, side='right'))
+            bounds.append(min(max(end, start + 1), start + budget))
+        bounds = np.asarray(bounds, dtype=np.int64)
+        offsets = np.zeros(len(bounds), dtype=np.int64)
+        offsets[1:] = cumulative[bounds[1:] - 1]
+        del cumulative
+
+        # Scatter every chunk into its blocks, keeping input order within a block
+        with open(path, 'wb') as f:
+            f.truncate(edge_count * EDGE_DTYPE.itemsize)
+        cursor = offsets[:-1].copy()
+        for lo in chunks:
+            chunk_weight = _chunk(weight, lo, lo + budget).astype(np.int64)
+            if len(chunk_weight) and chunk_weight.min() < 0:
+                raise ValueError("Attestation weights must be non-negative")
+            chunk_dst = _chunk(dst, lo, lo + budget).astype(np.int64)
+            blocks = np.searchsorted(bounds, chunk_dst, side='right') - 1
+            order = np.argsort(blocks, kind='stable')
+            records = np.empty(len(order), dtype=EDGE_DTYPE)
+            records['src'] = _chunk(src, lo, lo + budget)[order]
+            records['dst'] = chunk_dst[order]
+            records['data'] = chunk_weight[order]
+            present, counts = np.unique(blocks, return_counts=True)
+            position = 0
+            for block, count in zip(present.tolist(), counts.tolist()):
+                _write(path, int(cursor[block]), records[position:position + count])
+                cursor[block] += count
+                position += count
+
+        # Deduplicate each block, sort it by source and total the out-weights. Zero-weight
+        # edges count towards the out-weight but carry no mass, as in build_csr.
+        lengths = np.zeros(len(bounds) - 1, dtype=np.int64)
+        out_weight = np.zeros(node_count, dtype=np.float64)
+        for block in range(len(lengths)):
+            offset, length = int(offsets[block]), int(offsets[block + 1] - offsets[block])
+            if length > budget:
+                # A single node's in-edges: too many to sort in memory at once
+                lengths[block] = _dedup_oversized(path, offset, length, node_count, budget, out_weight)
+                continue
+            records = _read(path, offset, length)
+            if compacted:
+                records = records[np.argsort(records['src'], kind='stable')]
+            else:
+                # Last occurrence of each pair wins; unique() also sorts by source
+                start, span = int(bounds[block]), int(bounds[block + 1] - bounds[block])
+                key = records['src'].astype(np.int64) * span + (records['dst'] - start)
+                _, last_from_end = np.unique(key[::-1], return_index=True)
+                records = records[len(key) - 1 - last_from_end]
+            records = _add_out_weight(records, out_weight)
+            _write(path, offset, records)
+            lengths[block] = len(records)
+
+        for block in range(len(lengths)):
+            offset, length = int(offsets[block]), int(lengths[block])
+            for lo in range(0, length, budget):
+                records = _read(path, offset + lo, min(budget, length - lo))
+                records['data'] /= out_weight[records['src']]
+                _write(path, offset + lo, records)
+
+        return cls(path, node_count, bounds, offsets[:-1], lengths, out_weight == 0, budget)
+
+    def blocks(self) -> Iterator[Tuple[int, int, Iterator[np.ndarray]]]:
+        """Yield (first node, end node, record chunks) for every block"""
+        for block in range(self.block_count):
+            offset, length = int(self.offsets[block]), int(self.lengths[block])
+            chunks = (_read(self.path, offset + lo, min(self.budget, length - lo))
+                      for lo in range(0, length, self.budget))
+            yield int(self.bounds[block]), int(self.bounds[block + 1]), chunks
+
+
+def _add_out_weight(records: np.ndarray, out_weight: np.ndarray) -> np.ndarray:
+    """Add source-sorted, deduplicated records to the out-weights; returns those with weight"""
+    if len(records):
+        runs = np.flatnonzero(records['src'][1:] != records['src'][:-1]) + 1
+        runs = np.concatenate(([0], runs))
+        out_weight[records['src'][runs]] += np.add.reduceat(records['data'], runs)
+    return records[records['data'] > 0]
+
+
+def _dedup_oversized(path: str, offset: int, length: int, node_count: int, budget: int,
+                     out_weight: np.ndarray) -> int:
+    """
+    Deduplicate and source-sort a block of one node's in-edges holding more than `budget` records
+
+    The records are scattered by source range into a side file, with ranges chosen so
+    that each holds at most `budget` records unless it is a single source. Each range is
+    then deduplicated in memory (a single source keeps its last record) and written back
+    in order, so no more than `budget` records are in memory at once.
+
+    Returns:
+        Records left in the block (with positive weight), starting at `offset`
+    """
+    # Records per source, then source ranges of at most `budget` records
+    cumulative = np.zeros(node_count, dtype=np.int64)
+    for lo in range(0, length, budget):
+        cumulative += np.bincount(_read(path, offset + lo, min(budget, length - lo))['src'],
+                                  minlength=node_count)
+    np.cumsum(cumulative, out=cumulative)
+    ranges = [0]
+    while ranges[-1] < node_count:
+        start = ranges[-1]
+        base = int(cumulative[start - 1]) if start else 0
+        ranges.append(max(int(np.searchsorted(cumulative, base + budget, side='right')), start + 1))
+    ranges = np.asarray(ranges, dtype=np.int64)
+    starts = np.zeros(len(ranges), dtype=np.int64)
+    starts[1:] = cumulative[ranges[1:] - 1]
+    del cumulative
+
+    # Scatter into the side file by range, keeping block order within a range
+    side = path + '.block'
+    with open(side, 'wb') as f:
+        f.truncate(length * EDGE_DTYPE.itemsize)
+    try:
+        cursor = starts[:-1].copy()
+        for lo in range(0, length, budget):
+            records = _read(path, offset + lo, min(budget, length - lo))
+            parts = np.searchsorted(ranges, records['src'], side='right') - 1
+            records = records[np.argsort(parts, kind='stable')]
+            present, counts = np.unique(parts, return_counts=True)
+            position = 0
+            for part, count in zip(present.tolist(), counts.tolist()):
+                _write(side, int(cursor[part]), records[position:position + count])
+                cursor[part] += count
+                position += count
+
+        written = 0
+        for part in range(len(ranges) - 1):
+            lo, count = int(starts[part]), int(starts[part + 1] - starts[part])
+            if count == 0:
+                continue
+            if count > budget:
+                # One source repeating the same pair: the last occurrence wins
+                records = _read(side, lo + count - 1, 1)
+            else:
+                records = _read(side, lo, count)
+                _, last_from_end = np.unique(records['src'][::-1], return_index=True)
+                records = records[count - 1 - last_from_end]
+            records = _add_out_weight(records, out_weight)
+            _write(path, offset + written, records)
+            written += len(records)
+        return written
+    finally:
+        os.remove(side)
+
+
+def _chunk(column: np.ndarray, lo: int, hi: int) -> np.ndarray:
+    """
+    Copy of column[lo:hi]
+
+    A memory-mapped column is read through a mapping of just that range, so its pages do
+    not stay mapped (and counted as resident) for the rest of the build.
+    """
+    if not isinstance(column, np.memmap) or column.filename is None or not column.flags.c_contiguous:
+        return np.array(column[lo:hi])
+    hi = min(hi, len(column))
+    if hi <= lo:
+        return np.zeros(0, dtype=column.dtype)
+    window = np.memmap(column.filename, dtype=column.dtype, mode='r',
+                       offset=column.offset + lo * column.dtype.itemsize, shape=(hi - lo,))
+    values = np.array(window)
+    del window
+    return values
+
+
+def _read(path: str, offset: int, count: int) -> np.ndarray:
+    """Copy `count` records starting at record `offset` out of the edge file"""
+    if count == 0:
+        return np.zeros(0, dtype=EDGE_DTYPE)
+    window = np.memmap(path, dtype=EDGE_DTYPE, mode='r', offset=offset * EDGE_DTYPE.itemsize, shape=(count,))
+    records = np.array(window)
+    del window
+    return records
+
+
+def _write(path: str, offset: int, records: np.ndarray):
+    """Store records at record `offset` of the edge file"""
+    if len(records) == 0:
+        return
+    window = np.memmap(path, dtype=EDGE_DTYPE, mode='r+', offset=offset * EDGE_DTYPE.itemsize,
+                       shape=(len(records),))
+    window[:] = records
+    window.flush()
+    del window
+
+
+def blocked_pagerank(edges: BlockedEdges, alpha: float = 0.85, max_iter: int = 100, tol: float = 1e-6,
+                     personalization: Optional[np.ndarray] = None,
+                     residuals: Optional[List[float]] = None) -> Tuple[np.ndarray, int]:
+    """
+    Power iteration over a destination-blocked edge file
+
+    Args:
+        edges: Blocked edge file
+        alpha: Damping factor
+        max_iter: Maximum iterations
+        tol: Convergence tolerance (L1 error < node_count * tol, as in NetworkX)
+        personalization: Optional teleport (and dangling redistribution) weights per node
+        residuals: Optional list that receives the L1 change of every iteration
+
+    Returns:
+        Tuple (scores, iterations) with scores summing to 1
+
+    Raises:
+        PageRankConvergenceError: If the iteration does not converge within max_iter
+    """
+    node_count = edges.node_count
+    if node_count == 0:
+        return np.zeros(0), 0
+    if residuals is None:
+        residuals = []
+
+    x = np.full(node_count, 1.0 / node_count)
+    if personalization is None:
+        p = np.full(node_count, 1.0 / node_count)
+    else:
+        p = np.asarray(personalization, dtype=np.float64)
+        total = p.sum()
+        if total <= 0:
+            raise ValueError("Vector must have a positive sum")
+        p = p / total
+    x_next = np.empty(node_count)
+
+    err = float('inf')
+    for iteration in range(1, max_iter + 1):
+        dangling_sum = x[edges.dangling].sum()
+        for start, end, chunks in edges.blocks():
+            flow = np.zeros(end - start)
+            for records in chunks:
+                flow += np.bincount(records['dst'] - start, weights=x[records['src']] * records['data'],
+                                    minlength=end - start)
+            x_next[start:end] = alpha * (flow + dangling_sum * p[start:end]) + (1 - alpha) * p[start:end]
+
+        err = np.abs(x_next - x).sum()
+        residuals.append(float(err))
+        x, x_next = x_next, x
+        if err < node_count * tol:
+            return x, iteration
+
+    raise PageRankConvergenceError(max_iter, err)
+
+
+def _decoded(addresses: Sequence[Any], lo: int, hi: int) -> List[str]:
+    """Addresses lo..hi-1 as strings, from a list or a fixed-width bytes column"""
+    chunk = addresses[lo:hi]
+    if isinstance(chunk, np.ndarray):
+        return [a.decode() for a in chunk.tolist()]
+    return list(chunk)
+
+
+def personalization_weights(addresses: Sequence[Any], personalization: Personalization) -> Optional[np.ndarray]:
+    """Raw personalization weight per node, or None when all are zero (uniform teleport)"""
+    weights = np.empty(len(addresses), dtype=np.float64)
+    for lo in range(0, len(addresses), ADDRESS_CHUNK):
+        hi = min(lo + ADDRESS_CHUNK, len(addresses))
+        weights[lo:hi] = personalization.raw_weights(_decoded(addresses, lo, hi))
+    total = weights.sum()
+    if total == 0:
+        return None
+    # Same normalization as Personalization.vector
+    return weights / total
+
+
+class OutOfCorePageRank:
+    def __init__(self, memory_limit: int = DEFAULT_MEMORY_LIMIT, work_dir: Optional[str] = None,
+                 scale: int = 1_000_000):
+        """
+        Args:
+            memory_limit: Ceiling for the engine's arrays, in bytes
+            work_dir: Directory for the temporary edge file (default: system temp dir)
+            scale: Score scale, as for PageRankCalculator
+        """
+        self.memory_limit = memory_limit
+        self.work_dir = work_dir
+        self.scale = scale
+        self.last_stats: Dict[str, Any] = {}
+
+    def compute(self, path: str, damping_factor: float = 0.85, max_iter: int = 100,
+                tol: float = 1e-6) -> Tuple[Sequence[Any], np.ndarray]:
+        """
+        Scaled PageRank scores of an attestation input
+
+        Args:
+            path: Column store directory or attestation JSON file
+            damping_factor, max_iter, tol: As for PageRankCalculator.compute_pagerank
+
+        Returns:
+            Tuple (addresses, scores): the input's address column (a list, or a bytes
+            column for a store) and the int64 scaled score per address
+
+        Raises:
+            PageRankConvergenceError: If the iteration does not converge within max_iter
+            ValueError: If the memory limit is too small for the node count
+        """
+        if os.path.isdir(path):
+            addresses, src, dst, weight, personalization = map_column_store(path)
+            compacted = True
+        else:
+            columns = load_attestation_columns(path)
+            addresses, src, dst, weight = columns.addresses, columns.src, columns.dst, columns.weights
+            personalization, compacted = columns.personalization, columns.compacted
+        node_count = len(addresses)
+        budget = block_edge_budget(node_count, self.memory_limit)
+
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory(dir=self.work_dir) as directory:
+            edges = BlockedEdges.build(os.path.join(directory, EDGE_FILE), src, dst, weight, node_count,
+                                       budget, compacted)
+            built = time.perf_counter()
+            weights = None
+            if personalization is not None:
+                weights = personalization_weights(addresses, Personalization.from_dict(personalization))
+            residuals: List[float] = []
+            scores, iterations = blocked_pagerank(edges, damping_factor, max_iter, tol, weights, residuals)
+
+        self.last_stats = {
+            'node_count': node_count,
+            'edge_count': len(edges),
+            'blocks': edges.block_count,
+            'block_edges': budget,
+            'iterations': iterations,
+            'residual': residuals[-1] if residuals else None,
+            'build_seconds': built - started,
+            'solve_seconds': time.perf_counter() - built,
+        }
+        # int() per score in the calculator truncates the same way
+        return addresses, (scores * self.scale).astype(np.int64)
+
+
+def write_scores(path: str, addresses: Sequence[Any], scores: np.ndarray):
+    """Write scores as pagerank_scores.json does, without building the dictionary"""
+    with open(path, 'w') as f:
+        f.write('{')
+        for lo in range(0, len(addresses), ADDRESS_CHUNK):
+            hi = min(lo + ADDRESS_CHUNK, len(addresses))
+            f.write(','.join(f'\n  {json.dumps(address)}: {score}'
+                             for address, score in zip(_decoded(addresses, lo, hi), scores[lo:hi].tolist())))
+            if hi < len(addresses):
+                f.write(',')
+        f.write('\n}' if len(addresses) else '}')
+
+
+def main():
+    """Compute PageRank out of core"""
+    options = {
+        'memory-limit': str(DEFAULT_MEMORY_LIMIT),
+        'work-dir': None,
+        'output': 'pagerank_scores.json',
+        'tol': '1e-6',
+        'max-iter': '100',
+    }
+    for arg in [a for a in sys.argv if a.startswith('--') and '=' in a]:
+        name, value = arg[2:].split('=', 1)
+        if name in options:
+            options[name] = value
+            sys.argv.remove(arg)
+
+    if len(sys.argv) < 3:
+        print("Usage: python pagerank_outofcore.py <command> <store_dir|attestations.json> [options]")
+        print("Commands:")
+        print("  compute - Write scaled PageRank scores (pagerank_scores.json format)")
+        print("  verify - Compare the scores with the in-memory csr backend")
+        print("Options:")
+        print("  --memory-limit=<bytes> - Ceiling for the engine's arrays, e.g. 512M or 4G (default 1G)")
+        print("  --work-dir=<dir> - Where to put the temporary edge file (default: system temp dir)")
+        print("  --output=<file> - Scores file written by compute (default pagerank_scores.json)")
+        print("  --tol=<x> - Convergence tolerance (default 1e-6)")
+        print("  --max-iter=<n> - Maximum iterations (default 100)")
+        return
+
+    command = sys.argv[1]
+    source = sys.argv[2]
+    try:
+        engine = OutOfCorePageRank(parse_size(options['memory-limit']), options['work-dir'])
+        addresses, scores = engine.compute(source, max_iter=int(options['max-iter']), tol=float(options['tol']))
+        stats = engine.last_stats
+
+        if command == "compute":
+            write_scores(options['output'], addresses, scores)
+            print(f"{stats['node_count']} nodes, {stats['edge_count']} edges in {stats['blocks']} blocks "
+                  f"of up to {stats['block_edges']} edges")
+            print(f"Converged in {stats['iterations']} iterations (build {stats['build_seconds']:.2f}s, "
+                  f"solve {stats['solve_seconds']:.2f}s)")
+            print(f"Scores saved to {options['output']}")
+
+        elif command == "verify":
+            from pagerank_calculator import PageRankCalculator
+
+            columns = load_attestation_columns(source)
+            calculator = PageRankCalculator(backend='csr')
+            calculator.add_attestation_columns(columns)
+            calculator.set_personalization(columns.get_personalization())
+            expected = calculator.compute_pagerank(max_iter=int(options['max-iter']), tol=float(options['tol']))
+            reference = np.fromiter((expected[address] for address in columns.addresses),
+                                    dtype=np.int64, count=len(expected))
+            differences = np.abs(scores - reference)
+            print(json.dumps({
+                'nodes': len(reference),
+                'mismatched_scores': int(np.count_nonzero(differences)),
+                'max_difference': int(differences.max()) if len(differences) else 0,
+                'out_of_core_iterations': stats['iterations'],
+                'csr_iterations': calculator.last_iterations,
+            }, indent=2))
+        else:
+            print(f"Unknown command: {command}")
+
+    except FileNotFoundError:
+        print(f"Error: File {source} not found")
+    except json.JSONDecodeError:
+        print(f"Error: Invalid JSON in {source}")
+    except KeyError as e:
+        print(f"Error: Missing required field {e} in attestation data")
+    except (ValueError, PageRankConvergenceError) as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
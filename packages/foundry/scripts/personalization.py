@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+PageRank personalization mirroring `_buildPersonalizationVector`
+
+On-chain PageRank teleports (and redistributes dangling mass) according to a per-node
+weight: `scoreOverrides[node]` when set, otherwise
+`basePersonalization + min(lenderDeposits[node], personalizationCap) + (isKYCVerified ? kycBonus : 0)`.
+This module holds those inputs as columns and builds the raw and normalized vectors for
+any node ordering in one vectorized pass, so off-chain scores match the contract
+whenever deposits, KYC or overrides exist.
+
+Oracle input format (optional "personalization" key next to borrowers/attesters/weights):
+
+    "personalization": {
+        "addresses": ["0x1111", ...],
+        "lenderDeposits": [100000000, ...],
+        "isKYCVerified": [true, ...],
+        "scoreOverrides": [0, ...],
+        "basePersonalization": 0,
+        "kycBonus": 100000000,
+        "personalizationCap": 100000000
+    }
+
+Every column except "addresses" is optional; parameters default to the contract's
+constructor values.
+"""
+
+from itertools import repeat
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+# Defaults set by the DecentralizedMicrocredit constructor (USDC 6-decimals)
+BASE_PERSONALIZATION = 0
+KYC_BONUS = 100 * 10**6
+PERSONALIZATION_CAP = 100 * 10**6
+
+
+class Personalization:
+    def __init__(self, addresses: Sequence[str], lender_deposits: Optional[Sequence[int]] = None,
+                 kyc_verified: Optional[Sequence[bool]] = None, score_overrides: Optional[Sequence[int]] = None,
+                 base_personalization: int = BASE_PERSONALIZATION, kyc_bonus: int = KYC_BONUS,
+                 personalization_cap: int = PERSONALIZATION_CAP):
+        """
+        Initialize personalization inputs
+
+        Args:
+            addresses: Account address per row
+            lender_deposits: lenderDeposits per row (default 0)
+            kyc_verified: isKYCVerified per row (default False)
+            score_overrides: scoreOverrides per row (default 0, i.e. no override)
+            base_personalization: basePersonalization contract parameter
+            kyc_bonus: kycBonus contract parameter
+            personalization_cap: personalizationCap contract parameter
+        """
+        count = len(addresses)
+        self._index: Dict[str, int] = {address: i for i, address in enumerate(addresses)}
+        self.base_personalization = int(base_personalization)
+        self.kyc_bonus = int(kyc_bonus)
+        self.personalization_cap = int(personalization_cap)
+
+        # Each column gets a trailing zero row so that index -1 means "unknown address"
+        self._deposits = self._column(lender_deposits, count, np.int64)
+        self._kyc = self._column(kyc_verified, count, bool)
+        self._overrides = self._column(score_overrides, count, np.int64)
+
+    @staticmethod
+    def _column(values: Optional[Sequence[Any]], count: int, dtype) -> np.ndarray:
+        column = np.zeros(count + 1, dtype=dtype)
+        if values is not None:
+            if len(values) != count:
+                raise ValueError(f"Expected {count} personalization values, got {len(values)}")
+            column[:count] = values
+        return column
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Personalization':
+        """Build from the "personalization" object of the oracle input format"""
+        return cls(
+            data.get('addresses', []),
+            lender_deposits=data.get('lenderDeposits'),
+            kyc_verified=data.get('isKYCVerified'),
+            score_overrides=data.get('scoreOverrides'),
+            base_personalization=data.get('basePersonalization', BASE_PERSONALIZATION),
+            kyc_bonus=data.get('kycBonus', KYC_BONUS),
+            personalization_cap=data.get('personalizationCap', PERSONALIZATION_CAP),
+        )
+
+    def raw_weights(self, nodes: Sequence[str]) -> np.ndarray:
+        """
+        Raw (unnormalized) personalization weight per node, as in the contract loop
+
+        Args:
+            nodes: Node addresses in the order the vector should follow
+
+        Returns:
+            int64 array aligned with `nodes`; nodes without a row get basePersonalization
+        """
+        rows = np.fromiter(map(self._index.get, nodes, repeat(-1)), dtype=np.int64, count=len(nodes))
+        deposits = np.minimum(self._deposits[rows], self.personalization_cap)
+        weights = self.base_personalization + deposits + self._kyc[rows] * self.kyc_bonus
+        overrides = self._overrides[rows]
+        return np.where(overrides != 0, overrides, weights)
+
+    def overrides(self) -> Dict[str, int]:
+        """Non-zero scoreOverrides by address"""
+        return {address: int(self._overrides[row]) for address, row in self._index.items() if self._overrides[row]}
+
+    def vector(self, nodes: Sequence[str]) -> Optional[np.ndarray]:
+        """
+        Normalized personalization vector (sums to 1) for float PageRank engines
+
+        Returns:
+            float64 array aligned with `nodes`, or None when all weights are zero
+            (the contract then falls back to the uniform vector)
+        """
+        raw = self.raw_weights(nodes).astype(np.float64)
+        total = raw.sum()
+        if total == 0:
+            return None
+        return raw / total
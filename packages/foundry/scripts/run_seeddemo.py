@@ -0,0 +1,798 @@
+#!/usr/bin/env python3
+"""
+Concurrent, resumable SeedDemo population driver for a local anvil node
+
+Seeds the ecosystem of the SeedDemo forge script (lenders with private keys 1..L fund
+the pool, every borrower with keys L+1..L+B receives attestations and then a loan),
+but signs every request locally and submits transactions in pipelined JSON-RPC
+batches instead of running `forge script` once per attestation.
+
+Phases, each finished before the next one starts:
+    fund     MockUSDC.mint for lenders whose balance is below their deposit
+    deposit  depositWithPermitMeta (EIP-712 DepositRequest plus ERC-2612 permit)
+    attest   attestMeta (EIP-712 AttestRequest), --attestations per borrower
+    borrow   borrowAndDisburseMeta (EIP-712 BorrowAndDisburse), capped by credit score
+
+Transactions are sent by anvil's unlocked dev accounts (the relayers) through
+eth_sendTransaction, so lender and borrower keys never need ETH. Each signer is pinned
+to one relayer lane, and lanes send with locally tracked nonces, so a signer's requests
+are mined in contract-nonce order while lanes run concurrently; a lane keeps up to
+--depth batches in flight before waiting for receipts. Signing runs in worker processes
+ahead of the lanes.
+
+Requests that revert or are rejected are retried in later rounds, re-signed against
+fresh on-chain nonces (a failure also fails the signer's later requests in that round,
+so rounds continue for as long as they make progress). Progress is appended to a
+checkpoint journal, so rerunning the same command resumes where it stopped
+(transactions that were in flight are confirmed from their receipts first).
+
+attestMeta recomputes PageRank on-chain after every attestation (O(n^2) storage reads),
+so node time, not the driver, bounds large attest phases; give anvil a high --gas-limit
+(or --disable-block-gas-limit).
+
+Usage:
+    python run_seeddemo.py [--lenders=10] [--borrowers=300] [--rpc-url=http://127.0.0.1:8545]
+"""
+
+import json
+import math
+import os
+import queue
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from evm_encoding import encode_call
+from evm_signing import (domain_separator, private_keys_to_addresses, sign_digests, split_signature,
+                         struct_hashes, typed_data_digests)
+
+DEFAULT_RPC_URL = 'http://127.0.0.1:8545'
+DEPLOYMENT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'deployment.json')
+DEFAULT_CHECKPOINT = '.seeddemo_checkpoint.jsonl'
+PHASES = ('fund', 'deposit', 'attest', 'borrow')
+
+SCALE = 1_000_000
+USDC_UNIT = 10**6
+MAX_APR_BPS = 10_000
+MIN_DEPOSIT = 1_000 * USDC_UNIT
+# Share of deposits the auto-sized default leaves for loans (90% cap minus 5% buffer)
+LOANABLE_SHARE = 0.8
+
+DOMAIN_NAME = 'DecentralizedMicrocredit'
+DOMAIN_VERSION = '1'
+
+ATTEST_REQUEST = 'AttestRequest(address attester,address borrower,uint256 weight,uint256 nonce,uint256 deadline)'
+DEPOSIT_REQUEST = 'DepositRequest(address lender,uint256 amount,address receiver,uint256 nonce,uint256 deadline)'
+BORROW_AND_DISBURSE = ('BorrowAndDisburse(address borrower,uint256 amount,address to,uint256 repaymentPeriod,'
+                       'uint256 maxAprBps,uint256 nonce,uint256 deadline)')
+PERMIT = 'Permit(address owner,address spender,uint256 value,uint256 nonce,uint256 deadline)'
+
+ATTEST_META = 'attestMeta((address,address,uint256,uint256,uint256),bytes)'
+DEPOSIT_META = ('depositWithPermitMeta((address,uint256,address,uint256,uint256),bytes,'
+                '(uint256,uint256,uint8,bytes32,bytes32))')
+BORROW_META = 'borrowAndDisburseMeta((address,uint256,address,uint256,uint256,uint256,uint256),bytes)'
+
+# Jobs signed per worker task; also the granularity at which signing runs ahead of lanes
+SIGN_CHUNK = 512
+
+
+class RpcError(RuntimeError):
+    """JSON-RPC error response or unreachable node"""
+
+
+class RpcClient:
+    def __init__(self, url: str = DEFAULT_RPC_URL, timeout: float = 60.0, retries: int = 5):
+        """
+        Initialize a JSON-RPC client
+
+        Args:
+            url: Node endpoint
+            timeout: Seconds per HTTP request
+            retries: Transport-level retries (with exponential backoff) per request
+        """
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+
+    def batch(self, calls: Sequence[Tuple[str, List[Any]]]) -> List[Any]:
+        """
+        Send calls as one JSON-RPC batch
+
+        Returns:
+            Result per call, or an RpcError instance for calls the node rejected
+
+        Raises:
+            RpcError: If the node stays unreachable
+        """
+        if not calls:
+            return []
+        payload = json.dumps([{'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params}
+                              for i, (method, params) in enumerate(calls)]).encode()
+        request = urllib.request.Request(self.url, data=payload, headers={'Content-Type': 'application/json'})
+        for attempt in range(self.retries + 1):
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    replies = json.loads(response.read())
+                break
+            except (urllib.error.URLError, ConnectionError, TimeoutError) as e:
+                if attempt == self.retries:
+                    raise RpcError(f"{self.url} unreachable: {e}") from e
+                time.sleep(min(0.25 * 2**attempt, 5.0))
+        if isinstance(replies, dict):
+            raise RpcError(replies.get('error', {}).get('message', 'Invalid batch response'))
+
+        results: List[Any] = [RpcError('Missing response')] * len(calls)
+        for reply in replies:
+            if 'error' in reply:
+                results[reply['id']] = RpcError(reply['error'].get('message', str(reply['error'])))
+            else:
+                results[reply['id']] = reply.get('result')
+        return results
+
+    def call(self, method: str, *params: Any) -> Any:
+        """Send one call and return its result"""
+        result = self.batch([(method, list(params))])[0]
+        if isinstance(result, RpcError):
+            raise result
+        return result
+
+    def read_uints(self, to: str, calldatas: Sequence[bytes], chunk: int = 500) -> List[int]:
+        """eth_call each calldata against `to` and decode the uint256 results"""
+        values = []
+        for start in range(0, len(calldatas), chunk):
+            calls = [('eth_call', [{'to': to, 'data': '0x' + data.hex()}, 'latest'])
+                     for data in calldatas[start:start + chunk]]
+            for result in self.batch(calls):
+                if isinstance(result, RpcError):
+                    raise result
+                values.append(int(result, 16))
+        return values
+
+
+class Checkpoint:
+    def __init__(self, path: str, plan: Dict[str, Any], reset: bool = False):
+        """
+        Open (or start) an append-only progress journal
+
+        Args:
+            path: Journal file (JSON lines)
+            plan: Parameters identifying the run; resuming requires the same plan
+            reset: Discard an existing journal instead of resuming it
+
+        Raises:
+            ValueError: If the journal belongs to a different plan
+        """
+        self.path = path
+        self.done: Dict[str, set] = {phase: set() for phase in PHASES}
+        # Transactions sent but not yet confirmed: hash -> (phase, job)
+        self.inflight: Dict[str, Tuple[str, int]] = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path) and not reset:
+            with open(path) as f:
+                header = json.loads(f.readline() or '{}')
+                if header.get('plan') != plan:
+                    raise ValueError(f"{path} belongs to a different run; use --reset to start over")
+                for line in f:
+                    if line.strip():
+                        self._replay(json.loads(line))
+            self._file = open(path, 'a')
+        else:
+            self._file = open(path, 'w')
+            self._write({'plan': plan, 'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())})
+
+    def _replay(self, record: Dict[str, Any]):
+        phase = record['phase']
+        if record['event'] == 'sent':
+            for job, tx_hash in zip(record['jobs'], record['hashes']):
+                self.inflight[tx_hash] = (phase, job)
+            return
+        for tx_hash in record['hashes']:
+            self.inflight.pop(tx_hash, None)
+        if record['event'] == 'done':
+            self.done[phase].update(record['jobs'])
+
+    def _write(self, record: Dict[str, Any]):
+        with self._lock:
+            self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+            self._file.flush()
+
+    def record(self, event: str, phase: str, jobs: Sequence[int], hashes: Sequence[str]):
+        """Append a 'sent', 'done' or 'failed' record and apply it"""
+        record = {'event': event, 'phase': phase, 'jobs': list(jobs), 'hashes': list(hashes)}
+        self._write(record)
+        with self._lock:
+            self._replay(record)
+
+    def close(self):
+        self._file.close()
+
+
+class Lane:
+    def __init__(self, rpc: RpcClient, checkpoint: Checkpoint, phase: str, relayer: str, nonce: int,
+                 gas: int, depth: int, receipt_timeout: float):
+        """
+        One relayer account sending its share of a round in nonce order
+
+        Args:
+            rpc: Node client
+            checkpoint: Progress journal
+            phase: Phase name recorded in the journal
+            relayer: Unlocked account that sends the transactions
+            nonce: Next transaction nonce of the relayer
+            gas: Gas limit per transaction
+            depth: Batches in flight before the lane waits for receipts
+            receipt_timeout: Seconds to wait for a batch's receipts
+        """
+        self.rpc = rpc
+        self.checkpoint = checkpoint
+        self.phase = phase
+        self.relayer = relayer
+        self.nonce = nonce
+        self.gas = gas
+        self.depth = depth
+        self.receipt_timeout = receipt_timeout
+        self.succeeded = 0
+        self.failed: List[int] = []
+        self.errors: List[str] = []
+        self._stopped = False
+
+    def run(self, batches: 'queue.Queue'):
+        """Send batches of (job, to, calldata) from the queue until a None sentinel"""
+        inflight: deque = deque()
+        for batch in iter(batches.get, None):
+            if self._stopped:
+                self.failed.extend(job for job, _, _ in batch)
+                continue
+            try:
+                inflight.append(self._send(batch))
+                while len(inflight) > self.depth:
+                    self._confirm(*inflight.popleft())
+            except RpcError as e:
+                self._stop(str(e))
+                self.failed.extend(job for job, _, _ in batch)
+        while inflight:
+            try:
+                self._confirm(*inflight.popleft())
+            except RpcError as e:
+                self._stop(str(e))
+
+    def _stop(self, error: str):
+        self._stopped = True
+        self.errors.append(f"{self.relayer}: {error}")
+
+    def _send(self, batch: List[Tuple[int, str, bytes]]) -> Tuple[List[int], List[str]]:
+        calls = [('eth_sendTransaction', [{
+            'from': self.relayer, 'to': to, 'data': '0x' + data.hex(),
+            'nonce': hex(self.nonce + i), 'gas': hex(self.gas),
+        }]) for i, (_, to, data) in enumerate(batch)]
+        results = self.rpc.batch(calls)
+
+        # A rejected transaction leaves a nonce gap: drop everything queued behind it
+        accepted = next((i for i, result in enumerate(results) if isinstance(result, RpcError)), len(results))
+        if accepted < len(results):
+            self._stop(str(results[accepted]))
+            stale = [result for result in results[accepted:] if isinstance(result, str)]
+            self.rpc.batch([('anvil_dropTransaction', [tx_hash]) for tx_hash in stale])
+            self.failed.extend(job for job, _, _ in batch[accepted:])
+
+        jobs = [job for job, _, _ in batch[:accepted]]
+        hashes = results[:accepted]
+        self.nonce += accepted
+        if jobs:
+            self.checkpoint.record('sent', self.phase, jobs, hashes)
+        return jobs, hashes
+
+    def _confirm(self, jobs: List[int], hashes: List[str]):
+        receipts: Dict[str, Dict[str, Any]] = {}
+        waiting = list(hashes)
+        deadline = time.monotonic() + self.receipt_timeout
+        delay = 0.02
+        while waiting:
+            results = self.rpc.batch([('eth_getTransactionReceipt', [tx_hash]) for tx_hash in waiting])
+            for tx_hash, receipt in zip(waiting, results):
+                if isinstance(receipt, dict):
+                    receipts[tx_hash] = receipt
+            waiting = [tx_hash for tx_hash in waiting if tx_hash not in receipts]
+            if waiting:
+                if time.monotonic() > deadline:
+                    self.errors.append(f"{len(waiting)} receipts not received within {self.receipt_timeout:.0f}s")
+                    break
+                time.sleep(delay)
+                delay = min(delay * 2, 1.0)
+
+        done, done_hashes, failed, failed_hashes = [], [], [], []
+        for job, tx_hash in zip(jobs, hashes):
+            receipt = receipts.get(tx_hash)
+            if receipt is not None and receipt.get('status') == '0x1':
+                done.append(job)
+                done_hashes.append(tx_hash)
+                continue
+            failed.append(job)
+            if receipt is not None:
+                failed_hashes.append(tx_hash)
+                out_of_gas = int(receipt.get('gasUsed', '0x0'), 16) >= self.gas
+                self.errors.append(f"{tx_hash} reverted{' (out of gas)' if out_of_gas else ''}")
+        if done:
+            self.checkpoint.record('done', self.phase, done, done_hashes)
+        if failed_hashes:
+            self.checkpoint.record('failed', self.phase, [], failed_hashes)
+        self.succeeded += len(done)
+        self.failed.extend(failed)
+
+
+class Phase(ABC):
+    """One kind of request; jobs are numbered 0..count-1"""
+    name = ''
+    signatures = 0
+
+    def __init__(self, seeder: 'Seeder'):
+        self.seeder = seeder
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of jobs"""
+
+    def signer(self, job: int) -> Optional[int]:
+        """Account index whose contract nonce the job consumes (None if unsigned)"""
+        return None
+
+    def refresh(self, jobs: List[int]) -> List[int]:
+        """Read chain state before a round; returns the jobs that still need sending"""
+        return jobs
+
+    def digests(self, jobs: Sequence[int], nonces: Sequence[int], deadline: int) -> List[Tuple[int, bytes]]:
+        """(private key, digest) pairs to sign, `signatures` per job"""
+        return []
+
+    @abstractmethod
+    def calls(self, jobs: Sequence[int], nonces: Sequence[int], deadline: int,
+              signatures: Sequence[bytes]) -> List[Tuple[str, bytes]]:
+        """(to, calldata) per job"""
+
+
+class FundPhase(Phase):
+    name = 'fund'
+
+    def count(self) -> int:
+        return self.seeder.lenders
+
+    def refresh(self, jobs):
+        seeder = self.seeder
+        balances = seeder.rpc.read_uints(seeder.usdc, [encode_call('balanceOf(address)', [seeder.addresses[j]])
+                                                       for j in jobs])
+        self._missing = {job: seeder.deposit - balance for job, balance in zip(jobs, balances)
+                         if balance < seeder.deposit}
+        return [job for job in jobs if job in self._missing]
+
+    def calls(self, jobs, nonces, deadline, signatures):
+        return [(self.seeder.usdc, encode_call('mint(address,uint256)', [self.seeder.addresses[job], self._missing[job]]))
+                for job in jobs]
+
+
+class DepositPhase(Phase):
+    name = 'deposit'
+    signatures = 2
+
+    def count(self) -> int:
+        return self.seeder.lenders
+
+    def signer(self, job):
+        return job
+
+    def refresh(self, jobs):
+        seeder = self.seeder
+        lenders = [seeder.addresses[j] for j in jobs]
+        deposits = seeder.rpc.read_uints(seeder.contract, [encode_call('lenderDeposits(address)', [a]) for a in lenders])
+        jobs = [job for job, deposited in zip(jobs, deposits) if deposited < seeder.deposit]
+        permit_nonces = seeder.rpc.read_uints(seeder.usdc, [encode_call('nonces(address)', [seeder.addresses[j]])
+                                                            for j in jobs])
+        self._permit_nonces = dict(zip(jobs, permit_nonces))
+        self._usdc_domain = bytes.fromhex(seeder.rpc.call(
+            'eth_call', {'to': seeder.usdc, 'data': '0x' + encode_call('DOMAIN_SEPARATOR()', []).hex()}, 'latest')[2:])
+        return jobs
+
+    def digests(self, jobs, nonces, deadline):
+        seeder = self.seeder
+        lenders = [seeder.addresses[j] for j in jobs]
+        permits = struct_hashes(PERMIT, [(lender, seeder.contract, seeder.deposit, self._permit_nonces[job], deadline)
+                                         for job, lender in zip(jobs, lenders)])
+        requests = struct_hashes(DEPOSIT_REQUEST, [(lender, seeder.deposit, lender, nonce, deadline)
+                                                   for lender, nonce in zip(lenders, nonces)])
+        request_digests = typed_data_digests(seeder.domain, requests)
+        permit_digests = typed_data_digests(self._usdc_domain, permits)
+        pairs = []
+        for job, request_digest, permit_digest in zip(jobs, request_digests, permit_digests):
+            pairs += [(seeder.keys[job], request_digest), (seeder.keys[job], permit_digest)]
+        return pairs
+
+    def calls(self, jobs, nonces, deadline, signatures):
+        seeder = self.seeder
+        calls = []
+        for i, (job, nonce) in enumerate(zip(jobs, nonces)):
+            lender = seeder.addresses[job]
+            v, r, s = split_signature(signatures[2 * i + 1])
+            calls.append((seeder.contract, encode_call(DEPOSIT_META, [
+                (lender, seeder.deposit, lender, nonce, deadline), signatures[2 * i],
+                (seeder.deposit, deadline, v, r, s)])))
+        return calls
+
+
+class AttestPhase(Phase):
+    name = 'attest'
+    signatures = 1
+
+    def count(self) -> int:
+        return self.seeder.borrowers * self.seeder.attestations
+
+    def _pair(self, job: int) -> Tuple[int, int]:
+        """(lender, borrower) account indices: borrower b gets lenders b, b+1, ... mod L"""
+        seeder = self.seeder
+        borrower, slot = divmod(job, seeder.attestations)
+        return (borrower + slot) % seeder.lenders, seeder.lenders + borrower
+
+    def signer(self, job):
+        return self._pair(job)[0]
+
+    def digests(self, jobs, nonces, deadline):
+        seeder = self.seeder
+        rows = []
+        for job, nonce in zip(jobs, nonces):
+            lender, borrower = self._pair(job)
+            rows.append((seeder.addresses[lender], seeder.addresses[borrower], int(seeder.weights[job]), nonce, deadline))
+        digests = typed_data_digests(seeder.domain, struct_hashes(ATTEST_REQUEST, rows))
+        return [(seeder.keys[self._pair(job)[0]], digest) for job, digest in zip(jobs, digests)]
+
+    def calls(self, jobs, nonces, deadline, signatures):
+        seeder = self.seeder
+        calls = []
+        for job, nonce, signature in zip(jobs, nonces, signatures):
+            lender, borrower = self._pair(job)
+            calls.append((seeder.contract, encode_call(ATTEST_META, [
+                (seeder.addresses[lender], seeder.addresses[borrower], int(seeder.weights[job]), nonce, deadline),
+                signature])))
+        return calls
+
+
+class BorrowPhase(Phase):
+    name = 'borrow'
+    signatures = 1
+
+    def count(self) -> int:
+        return self.seeder.borrowers
+
+    def signer(self, job):
+        return self.seeder.lenders + job
+
+    def refresh(self, jobs):
+        seeder = self.seeder
+        max_loan = seeder.rpc.read_uints(seeder.contract, [encode_call('maxLoanAmount()', [])])[0]
+        scores = seeder.rpc.read_uints(seeder.contract, [
+            encode_call('getCreditScore(address)', [seeder.addresses[seeder.lenders + j]]) for j in jobs])
+        self._amounts = {job: min(seeder.loan, max_loan * score // SCALE) for job, score in zip(jobs, scores)}
+        self.skipped = sum(1 for amount in self._amounts.values() if amount == 0)
+        return [job for job in jobs if self._amounts[job] > 0]
+
+    def _request(self, job: int, nonce: int, deadline: int) -> Tuple[Any, ...]:
+        borrower = self.seeder.addresses[self.seeder.lenders + job]
+        return borrower, self._amounts[job], borrower, self.seeder.repayment_period, MAX_APR_BPS, nonce, deadline
+
+    def digests(self, jobs, nonces, deadline):
+        seeder = self.seeder
+        rows = [self._request(job, nonce, deadline) for job, nonce in zip(jobs, nonces)]
+        digests = typed_data_digests(seeder.domain, struct_hashes(BORROW_AND_DISBURSE, rows))
+        return [(seeder.keys[seeder.lenders + job], digest) for job, digest in zip(jobs, digests)]
+
+    def calls(self, jobs, nonces, deadline, signatures):
+        return [(self.seeder.contract, encode_call(BORROW_META, [self._request(job, nonce, deadline), signature]))
+                for job, nonce, signature in zip(jobs, nonces, signatures)]
+
+
+PHASE_CLASSES = {cls.name: cls for cls in (FundPhase, DepositPhase, AttestPhase, BorrowPhase)}
+
+
+class Seeder:
+    def __init__(self, rpc: RpcClient, contract: str, usdc: str, lenders: int = 10, borrowers: int = 300,
+                 attestations: Optional[int] = None, loan: int = 10 * USDC_UNIT, deposit: Optional[int] = None,
+                 seed: int = 0, repayment_days: int = 30):
+        """
+        Initialize a seeding plan
+
+        Args:
+            rpc: Node client
+            contract: DecentralizedMicrocredit address
+            usdc: (Mock)USDC address
+            lenders: Lender accounts (private keys 1..lenders)
+            borrowers: Borrower accounts (the following private keys)
+            attestations: Distinct lenders attesting each borrower (default: all lenders)
+            loan: Loan amount per borrower in USDC units, capped by its credit limit
+            deposit: Deposit per lender in USDC units (default: enough for every loan)
+            seed: Seed of the attestation weights
+            repayment_days: Repayment period signed into each loan request
+
+        Raises:
+            ValueError: If the plan is inconsistent
+        """
+        if lenders < 1 or borrowers < 1:
+            raise ValueError("Need at least one lender and one borrower")
+        attestations = lenders if attestations is None else attestations
+        if not 1 <= attestations <= lenders:
+            raise ValueError(f"Attestations per borrower must be between 1 and the lender count ({lenders})")
+        self.rpc = rpc
+        self.contract = contract.lower()
+        self.usdc = usdc.lower()
+        self.lenders = lenders
+        self.borrowers = borrowers
+        self.attestations = attestations
+        self.loan = loan
+        if deposit is None:
+            deposit = max(MIN_DEPOSIT, math.ceil(borrowers * loan / (LOANABLE_SHARE * lenders)))
+        self.deposit = deposit
+        self.seed = seed
+        self.repayment_period = repayment_days * 86_400
+
+        self.keys = list(range(1, lenders + borrowers + 1))
+        self.addresses = private_keys_to_addresses(self.keys)
+        self.weights = np.random.default_rng(seed).integers(SCALE // 2, SCALE + 1, size=borrowers * attestations)
+        self.chain_id = int(rpc.call('eth_chainId'), 16)
+        self.domain = domain_separator(DOMAIN_NAME, DOMAIN_VERSION, self.chain_id, self.contract)
+
+    def plan(self) -> Dict[str, Any]:
+        """Parameters a checkpoint must match to be resumed"""
+        return {'chain_id': self.chain_id, 'contract': self.contract, 'usdc': self.usdc, 'lenders': self.lenders,
+                'borrowers': self.borrowers, 'attestations': self.attestations, 'loan': self.loan,
+                'deposit': self.deposit, 'seed': self.seed, 'repayment_period': self.repayment_period}
+
+    def recover(self, checkpoint: Checkpoint):
+        """Settle transactions that were in flight when a previous run stopped"""
+        hashes = list(checkpoint.inflight)
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            receipts = self.rpc.batch([('eth_getTransactionReceipt', [tx_hash]) for tx_hash in chunk])
+            for tx_hash, receipt in zip(chunk, receipts):
+                phase, job = checkpoint.inflight[tx_hash]
+                succeeded = isinstance(receipt, dict) and receipt.get('status') == '0x1'
+                checkpoint.record('done' if succeeded else 'failed', phase, [job] if succeeded else [], [tx_hash])
+
+    def run(self, phases: Sequence[str], checkpoint: Checkpoint, relayers: Sequence[str], batch_size: int = 50,
+            depth: int = 4, retries: int = 3, workers: int = 1, gas: Optional[int] = None,
+            deadline_seconds: int = 86_400, receipt_timeout: float = 300.0) -> List[Dict[str, Any]]:
+        """
+        Run the requested phases in order
+
+        Args:
+            phases: Phase names, run in the given order; stops after a phase with failures
+            checkpoint: Progress journal
+            relayers: Unlocked accounts that send the transactions, one lane each
+            batch_size: Transactions per JSON-RPC batch
+            depth: Batches in flight per lane before waiting for receipts
+            retries: Rounds in a row without progress before a phase gives up
+            workers: Signing processes
+            gas: Gas limit per transaction (default: the latest block's gas limit)
+            deadline_seconds: Request deadline, relative to the latest block timestamp
+            receipt_timeout: Seconds to wait for a batch's receipts
+
+        Returns:
+            One summary per phase (jobs, sent, skipped, failed, rounds, seconds, errors)
+        """
+        if gas is None:
+            gas = int(self.rpc.call('eth_getBlockByNumber', 'latest', False)['gasLimit'], 16)
+        self.recover(checkpoint)
+
+        summaries = []
+        pool = ProcessPoolExecutor(workers) if workers > 1 else None
+        try:
+            for name in phases:
+                phase = PHASE_CLASSES[name](self)
+                started = time.perf_counter()
+                todo = [job for job in range(phase.count()) if job not in checkpoint.done[name]]
+                summary = {'phase': name, 'jobs': phase.count(), 'already_done': phase.count() - len(todo),
+                           'sent': 0, 'skipped': 0, 'failed': 0, 'rounds': 0, 'errors': []}
+                stalled = 0
+                while todo and stalled <= retries:
+                    pending = phase.refresh(todo)
+                    summary['skipped'] = len(todo) - len(pending)
+                    if not pending:
+                        todo = []
+                        break
+                    summary['rounds'] += 1
+                    summary['sent'] += len(pending)
+                    lanes = self._round(phase, pending, checkpoint, relayers, batch_size, depth, gas,
+                                        deadline_seconds, receipt_timeout, pool, 2 * workers)
+                    todo = sorted(job for lane in lanes for job in lane.failed)
+                    stalled = stalled + 1 if len(todo) == len(pending) else 0
+                    summary['errors'] = [error for lane in lanes for error in lane.errors]
+                summary['failed'] = len(todo)
+                summary['seconds'] = time.perf_counter() - started
+                summaries.append(summary)
+                if todo:
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return summaries
+
+    def _round(self, phase: Phase, jobs: List[int], checkpoint: Checkpoint, relayers: Sequence[str],
+               batch_size: int, depth: int, gas: int, deadline_seconds: int, receipt_timeout: float,
+               pool: Optional[ProcessPoolExecutor], lookahead: int) -> List[Lane]:
+        """Sign and send one pass over `jobs`; returns the lanes with their failures"""
+        # Contract nonces are assigned per signer in job order, continuing from the chain
+        signers = [phase.signer(job) for job in jobs]
+        distinct = sorted({signer for signer in signers if signer is not None})
+        chain_nonces = dict(zip(distinct, self.rpc.read_uints(
+            self.contract, [encode_call('nonces(address)', [self.addresses[s]]) for s in distinct])))
+        nonces = []
+        for signer in signers:
+            nonces.append(chain_nonces.get(signer))
+            if signer is not None:
+                chain_nonces[signer] += 1
+        deadline = int(self.rpc.call('eth_getBlockByNumber', 'latest', False)['timestamp'], 16) + deadline_seconds
+
+        relayer_nonces = self.rpc.batch([('eth_getTransactionCount', [r, 'pending']) for r in relayers])
+        lanes = []
+        for relayer, nonce in zip(relayers, relayer_nonces):
+            if isinstance(nonce, RpcError):
+                raise nonce
+            lanes.append(Lane(self.rpc, checkpoint, phase.name, relayer, int(nonce, 16), gas, depth, receipt_timeout))
+        queues = [queue.Queue(maxsize=2 * depth) for _ in lanes]
+        threads = [threading.Thread(target=lane.run, args=(q,), daemon=True) for lane, q in zip(lanes, queues)]
+        for thread in threads:
+            thread.start()
+
+        buffers: List[List[Tuple[int, str, bytes]]] = [[] for _ in lanes]
+        try:
+            for chunk, chunk_nonces, signatures in self._signed_chunks(phase, jobs, nonces, deadline, pool, lookahead):
+                for job, (to, data) in zip(chunk, phase.calls(chunk, chunk_nonces, deadline, signatures)):
+                    signer = phase.signer(job)
+                    lane = (job if signer is None else signer) % len(lanes)
+                    buffers[lane].append((job, to, data))
+                    if len(buffers[lane]) == batch_size:
+                        queues[lane].put(buffers[lane])
+                        buffers[lane] = []
+        finally:
+            for lane_queue, buffer in zip(queues, buffers):
+                if buffer:
+                    lane_queue.put(buffer)
+                lane_queue.put(None)
+            for thread in threads:
+                thread.join()
+        return lanes
+
+    @staticmethod
+    def _signed_chunks(phase: Phase, jobs: List[int], nonces: List[Optional[int]], deadline: int,
+                       pool: Optional[ProcessPoolExecutor], lookahead: int):
+        """Yield (jobs, nonces, signatures) per chunk, signing up to `lookahead` chunks ahead"""
+        signing: deque = deque()
+        for start in range(0, len(jobs), SIGN_CHUNK):
+            chunk = jobs[start:start + SIGN_CHUNK]
+            chunk_nonces = nonces[start:start + SIGN_CHUNK]
+            pairs = phase.digests(chunk, chunk_nonces, deadline)
+            keys, digests = [key for key, _ in pairs], [digest for _, digest in pairs]
+            if pool is None:
+                yield chunk, chunk_nonces, sign_digests(keys, digests)
+                continue
+            signing.append((chunk, chunk_nonces, pool.submit(sign_digests, keys, digests)))
+            if len(signing) > lookahead:
+                chunk, chunk_nonces, signed = signing.popleft()
+                yield chunk, chunk_nonces, signed.result()
+        while signing:
+            chunk, chunk_nonces, signed = signing.popleft()
+            yield chunk, chunk_nonces, signed.result()
+
+
+def _deployment_addresses() -> Tuple[Optional[str], Optional[str]]:
+    try:
+        with open(DEPLOYMENT_FILE) as f:
+            deployment = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None, None
+    return deployment.get('DecentralizedMicrocredit'), deployment.get('USDC')
+
+
+def _usdc(text: str) -> int:
+    return int(round(float(text) * USDC_UNIT))
+
+
+def main() -> int:
+    """Seed lenders, attestations and loans on a local node"""
+    if any(arg in ('-h', '--help') for arg in sys.argv[1:]):
+        print("Usage: python run_seeddemo.py [options]")
+        print("Options:")
+        print(f"  --rpc-url=<url> - Node endpoint (default {DEFAULT_RPC_URL})")
+        print("  --contract=<address> - DecentralizedMicrocredit (default from deployment.json)")
+        print("  --usdc=<address> - MockUSDC (default from deployment.json)")
+        print("  --lenders=<n> - Lender accounts, private keys 1..n (default 10)")
+        print("  --borrowers=<n> - Borrower accounts, the following private keys (default 300)")
+        print("  --attestations=<n> - Lenders attesting each borrower (default all lenders)")
+        print("  --loan=<usdc> - Loan per borrower, capped by its credit limit (default 10)")
+        print("  --deposit=<usdc> - Deposit per lender (default: enough for every loan, at least 1000)")
+        print(f"  --phases=<list> - Comma-separated, from {', '.join(PHASES)} (default all)")
+        print("  --relayers=<n> - Unlocked node accounts sending transactions in parallel (default 4)")
+        print("  --batch-size=<n> - Transactions per JSON-RPC batch (default 50)")
+        print("  --depth=<n> - Batches in flight per relayer before waiting for receipts (default 4)")
+        print("  --retries=<n> - Rounds in a row without progress before giving up (default 3)")
+        print("  --workers=<n> - Signing processes (default CPU count)")
+        print("  --gas=<n> - Gas limit per transaction (default: block gas limit)")
+        print("  --seed=<n> - Attestation weight seed (default 0)")
+        print(f"  --checkpoint=<file> - Progress journal (default {DEFAULT_CHECKPOINT})")
+        print("  --reset - Ignore an existing checkpoint and start over")
+        return 0
+
+    options: Dict[str, str] = {}
+    for arg in list(sys.argv[1:]):
+        if arg.startswith('--') and '=' in arg:
+            key, value = arg[2:].split('=', 1)
+            options[key] = value
+            sys.argv.remove(arg)
+    reset = '--reset' in sys.argv
+
+    try:
+        contract, usdc = _deployment_addresses()
+        contract = options.get('contract', contract)
+        usdc = options.get('usdc', usdc)
+        if not contract or not usdc:
+            raise ValueError("Contract addresses not found; pass --contract and --usdc")
+        phases = options.get('phases', ','.join(PHASES)).split(',')
+        for name in phases:
+            if name not in PHASE_CLASSES:
+                raise ValueError(f"Unknown phase '{name}', expected one of {PHASES}")
+
+        rpc = RpcClient(options.get('rpc-url', DEFAULT_RPC_URL))
+        seeder = Seeder(
+            rpc, contract, usdc,
+            lenders=int(options.get('lenders', 10)),
+            borrowers=int(float(options.get('borrowers', 300))),
+            attestations=int(options['attestations']) if 'attestations' in options else None,
+            loan=_usdc(options.get('loan', '10')),
+            deposit=_usdc(options['deposit']) if 'deposit' in options else None,
+            seed=int(options.get('seed', 0)),
+        )
+        accounts = rpc.call('eth_accounts')
+        relayer_count = int(options.get('relayers', 4))
+        if not 1 <= relayer_count <= len(accounts):
+            raise ValueError(f"The node has {len(accounts)} unlocked accounts, cannot use {relayer_count} relayers")
+
+        checkpoint = Checkpoint(options.get('checkpoint', DEFAULT_CHECKPOINT), seeder.plan(), reset)
+        print(f"Seeding {seeder.lenders} lenders, {seeder.borrowers} borrowers, "
+              f"{seeder.borrowers * seeder.attestations} attestations on chain {seeder.chain_id}")
+        try:
+            summaries = seeder.run(
+                phases, checkpoint, accounts[:relayer_count],
+                batch_size=int(options.get('batch-size', 50)),
+                depth=int(options.get('depth', 4)),
+                retries=int(options.get('retries', 3)),
+                workers=int(options.get('workers', os.cpu_count() or 1)),
+                gas=int(options['gas']) if 'gas' in options else None,
+            )
+        finally:
+            checkpoint.close()
+
+        failed = 0
+        for summary in summaries:
+            rate = summary['sent'] / summary['seconds'] if summary['seconds'] else 0.0
+            print(f"{summary['phase']:<8} {summary['jobs']:>7} jobs  {summary['already_done']:>7} already done  "
+                  f"{summary['sent']:>7} sent  {summary['skipped']:>5} skipped  {summary['failed']:>5} failed  "
+                  f"{summary['rounds']} rounds  {summary['seconds']:.1f}s ({rate:.0f} tx/s)")
+            for error in summary['errors'][:5]:
+                print(f"    {error}")
+            failed += summary['failed']
+        if failed:
+            print(f"{failed} requests still failing; rerun the same command to resume")
+            return 1
+        return 0
+
+    except (RpcError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
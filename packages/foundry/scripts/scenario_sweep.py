@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Parallel what-if scenario sweeps over a shared attestation graph
+
+The base graph is built and solved once. Its edge columns, a sorted (src, dst) key index,
+the base scores and the personalization vector are then placed in one
+`multiprocessing.shared_memory` block that every pool worker maps read-only. Each
+scenario is translated to node ids in the parent and shipped as a small delta; the
+worker copies only the weight column, applies the delta, rebuilds the CSR matrix and
+warm-starts from the base scores. Workers never unpickle the graph, so a sweep scales
+with the number of cores.
+
+Scenario format (JSON list, every key optional except "name"):
+
+    {
+        "name": "drop-0x1111",
+        "alpha": 0.8,
+        "upserts": {"attesters": [...], "borrowers": [...], "weights": [...]},
+        "removals": {"attesters": [...], "borrowers": [...]},
+        "remove_attesters": ["0x1111"]
+    }
+
+Removed edges keep their nodes, as in `PageRankCalculator.remove_attestations`. Nodes a
+scenario adds are solved but not reported: every row covers the same base (or tracked)
+addresses. A scenario that does not converge is reported with its error and no scores;
+the other scenarios are unaffected.
+
+Convergence uses the NetworkX test (L1 change < n * tol), under which a warm start can
+stop after one or two iterations; lower `tol` when the effects being compared are of
+the same order as the per-node tolerance.
+
+Usage:
+    python scenario_sweep.py <attestations.json|store_dir> <scenarios.json> [options]
+"""
+
+import csv
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from attestation_graph import AttestationGraph
+from attestation_io import AttestationColumns, load_attestation_columns
+from pagerank_csr import PageRankConvergenceError, build_csr, csr_pagerank
+from personalization import Personalization
+
+DEFAULT_SCALE = 1_000_000
+
+# Worker-side views into the shared block, set by _attach
+_shared: Dict[str, Any] = {}
+
+
+def _layout(node_count: int, edge_count: int) -> List[Tuple[str, Any, int]]:
+    """(name, dtype, length) of every array in the shared block, in order"""
+    return [
+        ('src', np.int64, edge_count),
+        ('dst', np.int64, edge_count),
+        ('weight', np.float64, edge_count),
+        ('keys', np.int64, edge_count),
+        ('key_order', np.int64, edge_count),
+        ('base_scores', np.float64, node_count),
+        ('personalization', np.float64, node_count),
+    ]
+
+
+def _views(buffer, node_count: int, edge_count: int) -> Dict[str, np.ndarray]:
+    views = {}
+    offset = 0
+    for name, dtype, length in _layout(node_count, edge_count):
+        views[name] = np.ndarray(length, dtype=dtype, buffer=buffer, offset=offset)
+        offset += length * np.dtype(dtype).itemsize
+    return views
+
+
+def _attach(name: str, node_count: int, edge_count: int, has_personalization: bool, settings: Dict[str, Any]):
+    """Pool initializer: map the shared block once per worker"""
+    block = shared_memory.SharedMemory(name=name)
+    _shared.update(_views(block.buf, node_count, edge_count))
+    _shared['block'] = block
+    _shared['node_count'] = node_count
+    _shared['has_personalization'] = has_personalization
+    _shared.update(settings)
+
+
+def _locate(keys: np.ndarray, key_order: np.ndarray, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Edge positions of the query keys that exist, and the mask of which ones do"""
+    if len(keys) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(len(query), dtype=bool)
+    position = np.minimum(np.searchsorted(keys, query), len(keys) - 1)
+    found = keys[position] == query
+    return key_order[position[found]], found
+
+
+def apply_delta(src: np.ndarray, dst: np.ndarray, weight: np.ndarray, keys: np.ndarray,
+                key_order: np.ndarray, key_base: int, task: Dict[str, Any]
+                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Edge columns of the base graph with one scenario's id-space delta applied
+
+    Only upserts between base nodes (ids below key_base) can match a base edge; an
+    upsert touching a node the scenario adds is always appended, since its key would
+    alias a base (src, dst) pair.
+    """
+    weight = weight.copy()
+
+    # Zero out removed edges and all out-edges of removed attesters
+    if len(task['remove_keys']):
+        weight[_locate(keys, key_order, task['remove_keys'])[0]] = 0.0
+    if len(task['remove_attesters']):
+        weight[np.isin(src, task['remove_attesters'])] = 0.0
+
+    # Update existing edges in place and append new ones
+    upsert_src, upsert_dst, upsert_weight = task['upsert_src'], task['upsert_dst'], task['upsert_weight']
+    if len(upsert_src):
+        existing = np.zeros(len(upsert_src), dtype=bool)
+        base_pair = (upsert_src < key_base) & (upsert_dst < key_base)
+        positions, found = _locate(keys, key_order, upsert_src[base_pair] * key_base + upsert_dst[base_pair])
+        existing[np.flatnonzero(base_pair)[found]] = True
+        weight[positions] = upsert_weight[existing]
+        added = ~existing
+        src = np.concatenate([src, upsert_src[added]])
+        dst = np.concatenate([dst, upsert_dst[added]])
+        weight = np.concatenate([weight, upsert_weight[added]])
+    return src, dst, weight
+
+
+def _run_scenario(task: Dict[str, Any]) -> Tuple[np.ndarray, int, Optional[str]]:
+    """
+    Apply one id-space delta to the shared base graph and warm-start PageRank
+
+    Returns:
+        Tuple (scaled scores of the reported addresses, iterations, error); a scenario
+        that does not converge has zero scores and its error message
+    """
+    node_count = _shared['node_count']
+    total = node_count + task['new_nodes']
+    src, dst, weight = apply_delta(_shared['src'], _shared['dst'], _shared['weight'], _shared['keys'],
+                                   _shared['key_order'], _shared['key_base'], task)
+
+    nstart = np.concatenate([_shared['base_scores'], np.full(task['new_nodes'], 1.0 / total)])
+    personalization = task['personalization']
+    if personalization is None and _shared['has_personalization']:
+        personalization = np.concatenate([_shared['personalization'], np.zeros(task['new_nodes'])])
+
+    indptr, indices, data = build_csr(src, dst, weight, total)
+    reported = node_count if task['track'] is None else len(task['track'])
+    try:
+        scores, iterations = csr_pagerank(
+            indptr, indices, data, alpha=task['alpha'], max_iter=_shared['max_iter'], tol=_shared['tol'],
+            personalization=personalization, nstart=nstart
+        )
+    except PageRankConvergenceError as e:
+        return np.zeros(reported, dtype=np.int64), e.max_iter, str(e)
+    # Added nodes come after the base nodes and are not reported
+    tracked = scores[:node_count] if task['track'] is None else scores[task['track']]
+    return (tracked * _shared['scale']).astype(np.int64), iterations, None
+
+
+class SweepResult:
+    """Scaled scores per scenario (rows) and tracked address (columns)"""
+
+    def __init__(self, scenarios: List[str], addresses: List[str], scores: np.ndarray,
+                 base_scores: np.ndarray, iterations: List[int], errors: Optional[List[Optional[str]]] = None):
+        self.scenarios = scenarios
+        self.addresses = addresses
+        # Rows of failed scenarios are zero; see errors
+        self.scores = scores
+        self.base_scores = base_scores
+        self.iterations = iterations
+        self.errors = errors if errors is not None else [None] * len(scenarios)
+        self._columns = {address: i for i, address in enumerate(addresses)}
+
+    def column(self, address: str) -> np.ndarray:
+        """Score of `address` in every scenario (0 where the address does not exist)"""
+        return self.scores[:, self._columns[address]]
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """
+        Tidy rows: one per (scenario, address), with the change against the base graph
+
+        Rows of a failed scenario have no score or delta and carry its error.
+        """
+        for i, scenario in enumerate(self.scenarios):
+            error = self.errors[i]
+            for j, address in enumerate(self.addresses):
+                score = None if error else int(self.scores[i, j])
+                base = int(self.base_scores[j])
+                yield {'scenario': scenario, 'address': address, 'score': score, 'base_score': base,
+                       'delta': None if error else score - base, 'iterations': self.iterations[i],
+                       'error': error}
+
+    def to_csv(self, path: str):
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['scenario', 'address', 'score', 'base_score', 'delta',
+                                                   'iterations', 'error'])
+            writer.writeheader()
+            writer.writerows(self.rows())
+
+
+class ScenarioSweep:
+    def __init__(self, graph: AttestationGraph, personalization: Optional[Personalization] = None,
+                 alpha: float = 0.85, max_iter: int = 100, tol: float = 1e-6, scale: int = DEFAULT_SCALE):
+        """
+        Solve the base graph once
+
+        Args:
+            graph: Base attestation graph
+            personalization: Deposit/KYC/override columns (None = uniform)
+            alpha: Default damping factor (scenarios may override it)
+            max_iter: Maximum iterations per scenario
+            tol: Convergence tolerance (NetworkX semantics)
+            scale: Score scaling factor
+        """
+        self.graph = graph
+        self.personalization = personalization
+        self.alpha = alpha
+        self.max_iter = max_iter
+        self.tol = tol
+        self.scale = scale
+
+        self.addresses = graph.addresses.addresses
+        node_count = len(self.addresses)
+        src, dst, weight = graph.edge_arrays()
+        self._src = src.astype(np.int64)
+        self._dst = dst.astype(np.int64)
+        self._weight = weight.astype(np.float64)
+        self._key_base = max(node_count, 1)
+        self._vector = None if personalization is None else personalization.vector(self.addresses)
+
+        indptr, indices, data = build_csr(self._src, self._dst, self._weight, node_count)
+        self.base_scores, self.base_iterations = csr_pagerank(
+            indptr, indices, data, alpha=alpha, max_iter=max_iter, tol=tol, personalization=self._vector
+        )
+
+    @classmethod
+    def from_columns(cls, columns: AttestationColumns, **kwargs) -> 'ScenarioSweep':
+        return cls(columns.to_graph(), columns.get_personalization(), **kwargs)
+
+    def _task(self, scenario: Dict[str, Any], track: Optional[np.ndarray]) -> Dict[str, Any]:
+        """Translate a scenario to node ids; unknown addresses become new nodes"""
+        new_addresses: Dict[str, int] = {}
+        node_count = len(self.addresses)
+
+        def node_id(address: str) -> int:
+            known = self.graph.addresses.lookup(address)
+            if known is not None:
+                return known
+            return new_addresses.setdefault(address, node_count + len(new_addresses))
+
+        def known_ids(addresses: Sequence[str]) -> np.ndarray:
+            ids = [self.graph.addresses.lookup(address) for address in addresses]
+            return np.asarray([-1 if i is None else i for i in ids], dtype=np.int64)
+
+        upserts = scenario.get('upserts', {})
+        columns = [upserts.get('attesters', []), upserts.get('borrowers', []), upserts.get('weights', [])]
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError(f"Scenario '{scenario['name']}': upsert columns must have the same length")
+        # Later upserts of the same pair win, as in AttestationGraph
+        latest: Dict[Tuple[int, int], float] = {}
+        for attester, borrower, weight in zip(*columns):
+            if weight < 0:
+                raise ValueError(f"Scenario '{scenario['name']}': weights must be non-negative")
+            latest[(node_id(attester), node_id(borrower))] = weight
+        pairs = np.asarray(list(latest), dtype=np.int64).reshape(-1, 2)
+        upsert_src, upsert_dst = pairs[:, 0], pairs[:, 1]
+        upsert_weight = np.asarray(list(latest.values()), dtype=np.float64)
+
+        removals = scenario.get('removals', {})
+        removal_src = known_ids(removals.get('attesters', []))
+        removal_dst = known_ids(removals.get('borrowers', []))
+        known = (removal_src >= 0) & (removal_dst >= 0)
+        remove_keys = removal_src[known] * self._key_base + removal_dst[known]
+
+        remove_attesters = known_ids(scenario.get('remove_attesters', []))
+
+        # Personalization for scenarios that introduce nodes is rebuilt over the extended order
+        personalization = None
+        if self.personalization is not None and new_addresses:
+            personalization = self.personalization.vector(list(self.addresses) + list(new_addresses))
+
+        return {
+            'alpha': scenario.get('alpha', self.alpha),
+            'new_nodes': len(new_addresses),
+            'upsert_src': upsert_src,
+            'upsert_dst': upsert_dst,
+            'upsert_weight': upsert_weight,
+            'remove_keys': remove_keys,
+            'remove_attesters': remove_attesters[remove_attesters >= 0],
+            'personalization': personalization,
+            'track': track,
+        }
+
+    def run(self, scenarios: Sequence[Dict[str, Any]], track: Optional[Sequence[str]] = None,
+            workers: Optional[int] = None, chunksize: int = 8) -> SweepResult:
+        """
+        Evaluate scenarios in a process pool
+
+        Args:
+            scenarios: Scenario dictionaries (see module docstring)
+            track: Addresses to report (default: every base node)
+            workers: Pool size (default os.cpu_count())
+            chunksize: Scenarios sent to a worker per round trip
+
+        Returns:
+            SweepResult with one row per scenario (failed scenarios carry their error)
+        """
+        addresses = list(self.addresses) if track is None else list(track)
+        missing = [a for a in addresses if self.graph.addresses.lookup(a) is None]
+        if missing:
+            raise ValueError(f"Tracked addresses not in the base graph: {missing[:5]}")
+        track_ids = None if track is None else np.asarray([self.graph.addresses.lookup(a) for a in addresses])
+        tasks = [self._task(scenario, track_ids) for scenario in scenarios]
+
+        node_count, edge_count = len(self.addresses), len(self._src)
+        size = sum(length * np.dtype(dtype).itemsize for _, dtype, length in _layout(node_count, edge_count))
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            views = _views(block.buf, node_count, edge_count)
+            views['src'][:] = self._src
+            views['dst'][:] = self._dst
+            views['weight'][:] = self._weight
+            keys = self._src * self._key_base + self._dst
+            order = np.argsort(keys, kind='stable')
+            views['keys'][:] = keys[order]
+            views['key_order'][:] = order
+            views['base_scores'][:] = self.base_scores
+            if self._vector is not None:
+                views['personalization'][:] = self._vector
+            del views
+
+            settings = {'max_iter': self.max_iter, 'tol': self.tol, 'scale': self.scale, 'key_base': self._key_base}
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                     initargs=(block.name, node_count, edge_count,
+                                               self._vector is not None, settings)) as pool:
+                results = list(pool.map(_run_scenario, tasks, chunksize=chunksize))
+        finally:
+            block.close()
+            block.unlink()
+
+        base_ids = np.arange(len(addresses)) if track_ids is None else track_ids
+        scores = np.vstack([scores for scores, _, _ in results]) if results else np.zeros((0, len(addresses)), dtype=np.int64)
+        return SweepResult(
+            [scenario['name'] for scenario in scenarios], addresses, scores,
+            (self.base_scores[base_ids] * self.scale).astype(np.int64),
+            [iterations for _, iterations, _ in results],
+            [error for _, _, error in results],
+        )
+
+
+def self_test() -> bool:
+    """
+    Check scenario deltas on a small graph: an upsert that adds a node must leave every
+    base edge untouched, sweep scores must match a fresh solve of the edited graph,
+    scenarios with and without new nodes must share one table, and a scenario that does
+    not converge must not fail the sweep
+    """
+    graph = AttestationGraph()
+    graph.add_edges(["0xb", "0xa", "0xc"], ["0xa", "0xc", "0xb"], [500_000, 300_000, 700_000])
+    sweep = ScenarioSweep(graph)
+    # Ids 0xb=0, 0xa=1, 0xc=2: key(0xa -> new node 3) = 1 * 3 + 3 aliases key(0xc -> 0xb) = 2 * 3 + 0
+    scenario = {'name': 'add-node', 'upserts': {'attesters': ["0xa", "0xa"], 'borrowers': ["0xnew", "0xc"],
+                                                'weights': [900_000, 400_000]}}
+    task = sweep._task(scenario, None)
+    keys = sweep._src * sweep._key_base + sweep._dst
+    order = np.argsort(keys, kind='stable')
+    src, dst, weight = apply_delta(sweep._src, sweep._dst, sweep._weight, keys[order], order,
+                                   sweep._key_base, task)
+    names = list(sweep.addresses) + ["0xnew"]
+    edges = {(names[u], names[v]): w for u, v, w in zip(src.tolist(), dst.tolist(), weight.tolist())}
+    expected = {("0xb", "0xa"): 500_000.0, ("0xa", "0xc"): 400_000.0, ("0xc", "0xb"): 700_000.0,
+                ("0xa", "0xnew"): 900_000.0}
+    edges_ok = edges == expected and len(src) == len(expected)
+    print(f"Edges after upsert: {edges} ({'ok' if edges_ok else 'MISMATCH'})")
+
+    edited = AttestationGraph()
+    edited.add_edges([u for u, _ in expected], [v for _, v in expected], [int(w) for w in expected.values()])
+    fresh = ScenarioSweep(edited, tol=1e-10)
+    fresh_scores = dict(zip(fresh.addresses, (fresh.base_scores * fresh.scale).astype(np.int64).tolist()))
+    swept = ScenarioSweep(graph, tol=1e-10).run([scenario], workers=1)
+    swept_scores = dict(zip(swept.addresses, swept.scores[0].tolist()))
+    scores_ok = all(abs(swept_scores[a] - fresh_scores[a]) <= 1 for a in swept_scores)
+    print(f"Sweep scores: {swept_scores}, fresh solve: {fresh_scores} ({'ok' if scores_ok else 'MISMATCH'})")
+
+    # Scenarios with and without new nodes share one table over the base addresses
+    mixed = [{'name': 'alpha', 'alpha': 0.8}, {'name': 'drop-0xa', 'remove_attesters': ["0xa"]}, scenario]
+    result = ScenarioSweep(graph, tol=1e-10).run(mixed, workers=2)
+    mixed_ok = (result.scores.shape == (3, 3) and result.errors == [None] * 3
+                and result.scores[2].tolist() == swept.scores[0].tolist())
+    print(f"Mixed sweep: {result.scores.tolist()} ({'ok' if mixed_ok else 'MISMATCH'})")
+
+    # A scenario that does not converge is reported without failing the others
+    limited = ScenarioSweep(graph, max_iter=3, tol=1e-10).run([{'name': 'unchanged'}, scenario], workers=1)
+    isolated_ok = limited.errors[0] is None and limited.errors[1] is not None
+    print(f"Non-converging scenario: {limited.errors} ({'ok' if isolated_ok else 'MISMATCH'})")
+    return edges_ok and scores_ok and mixed_ok and isolated_ok
+
+
+def main():
+    """Run a scenario sweep from JSON files"""
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        print("Checking scenario deltas...")
+        sys.exit(0 if self_test() else 1)
+    options = {'workers': None, 'track': None, 'output': None, 'tol': '1e-6'}
+    for arg in [a for a in sys.argv if a.startswith('--') and '=' in a]:
+        name, value = arg[2:].split('=', 1)
+        if name in options:
+            options[name] = value
+            sys.argv.remove(arg)
+
+    if len(sys.argv) < 3:
+        print("Usage: python scenario_sweep.py <attestations.json|store_dir> <scenarios.json> [options]")
+        print("       python scenario_sweep.py test - Check scenario deltas on a small graph")
+        print("Options:")
+        print("  --workers=<n> - Worker processes (default: CPU count)")
+        print("  --track=<addr,...> - Addresses to report (default: all)")
+        print("  --output=<file.csv> - Write the tidy score table as CSV (default: print JSON)")
+        print("  --tol=<x> - Convergence tolerance (default 1e-6)")
+        return
+
+    attestation_file, scenario_file = sys.argv[1], sys.argv[2]
+    try:
+        sweep = ScenarioSweep.from_columns(load_attestation_columns(attestation_file), tol=float(options['tol']))
+        with open(scenario_file, 'r') as f:
+            scenarios = json.load(f)
+        track = options['track'].split(',') if options['track'] else None
+        workers = int(options['workers']) if options['workers'] else None
+        result = sweep.run(scenarios, track=track, workers=workers)
+
+        if options['output']:
+            result.to_csv(options['output'])
+            print(f"Wrote {len(result.scenarios)} scenarios x {len(result.addresses)} addresses to {options['output']}")
+        else:
+            print(json.dumps(list(result.rows()), indent=2))
+
+    except FileNotFoundError as e:
+        print(f"Error: File {e.filename} not found")
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON input")
+    except (KeyError, ValueError) as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
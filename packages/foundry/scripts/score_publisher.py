@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Diff-based, gas-budgeted score publishing for the PageRank oracle
+
+Rewriting every credit score on-chain after each oracle run is the main operating cost.
+The publisher compares new scores with the last published snapshot, keeps only scores
+that moved by at least `threshold`, ABI-encodes real calldata and packs the updates into
+batches whose estimated gas fits `gas_budget`.
+
+The target function is configurable:
+- `setScoreOverride(address,uint256)` (default, the contract's owner-only score setter):
+  one call per update; a batch is a group of calls to submit together.
+- An array setter such as `updateCreditScores(address[],uint256[])`: one call per batch.
+
+The contract keeps computing its own PageRank from attestations; the oracle's scores
+reach it as credit-score overrides. Input scores are PageRank values, so by default
+they are first mapped through getCreditScore's curve (credit_scores.credit_scores) into
+SCALE units, the range setScoreOverride accepts; `curve=False` publishes them as given.
+
+Publishing is two steps. `publish` writes the batches to a batch file, where they stay
+pending; `confirm` records them in the snapshot once their transactions are confirmed
+on-chain and removes them from the file. The snapshot therefore only holds scores that
+are actually on-chain: until a batch is confirmed, every later plan still includes its
+changes (resubmitting them is harmless, the setters are idempotent), and unpublished
+drift never exceeds the threshold.
+
+Usage:
+    python score_publisher.py plan <scores.json> [options]
+    python score_publisher.py publish <scores.json> [options]
+    python score_publisher.py confirm <batches.json> [index ...] [options]
+"""
+
+import json
+import os
+import sys
+from itertools import repeat
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from evm_encoding import (
+    address_words, calldata_gas, encode_call, function_selector, parse_signature, uint256_words
+)
+from credit_scores import credit_scores
+from gas_model import TX_BASE_GAS, sstore_gas
+
+DEFAULT_SIGNATURE = 'setScoreOverride(address,uint256)'
+DEFAULT_SNAPSHOT = 'published_scores.json'
+DEFAULT_BATCH_FILE = 'score_update_batches.json'
+# Minimum score change worth a write, in SCALE units (1e6 = 100%)
+DEFAULT_THRESHOLD = 1_000
+DEFAULT_GAS_BUDGET = 3_000_000
+
+# Gas estimates (Berlin/London pricing, storage writes via gas_model.sstore_gas);
+# calldata is priced per byte via EIP-2028
+CALL_OVERHEAD_GAS = 5_000     # dispatch, onlyOwner check (cold SLOAD), argument decoding
+ARRAY_ELEMENT_GAS = 300       # loop and bounds checks per element of an array setter
+
+_SINGLE_TYPES = ['address', 'uint256']
+_ARRAY_TYPES = ['address[]', 'uint256[]']
+
+
+class ScoreBatch:
+    """Score updates submitted together, with their calldata and estimated gas"""
+
+    def __init__(self, addresses: List[str], scores: List[int], calldata: List[bytes], gas: int):
+        """
+        Args:
+            addresses: Addresses updated by the batch
+            scores: New score per address
+            calldata: One calldata payload per contract call in the batch
+            gas: Estimated total gas of the batch
+        """
+        self.addresses = addresses
+        self.scores = scores
+        self.calldata = calldata
+        self.gas = gas
+
+    def to_dict(self) -> Dict:
+        return {
+            'addresses': self.addresses,
+            'scores': self.scores,
+            'calldata': ['0x' + data.hex() for data in self.calldata],
+            'gas': self.gas,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ScoreBatch':
+        """Rebuild a batch saved by `to_dict`"""
+        return cls(list(data['addresses']), [int(score) for score in data['scores']],
+                   [bytes.fromhex(call[2:]) for call in data['calldata']], int(data['gas']))
+
+
+class ScorePublisher:
+    def __init__(self, snapshot_path: Optional[str] = DEFAULT_SNAPSHOT, threshold: int = DEFAULT_THRESHOLD,
+                 gas_budget: int = DEFAULT_GAS_BUDGET, function_signature: str = DEFAULT_SIGNATURE,
+                 curve: bool = True):
+        """
+        Initialize the publisher
+
+        Args:
+            snapshot_path: JSON file holding the last published scores (None keeps the
+                snapshot in memory only)
+            threshold: Minimum absolute score change to publish
+            gas_budget: Maximum estimated gas per batch
+            function_signature: `name(address,uint256)` or `name(address[],uint256[])`
+            curve: Map input PageRank scores to credit scores before diffing
+
+        Raises:
+            ValueError: If the signature does not take (address, uint256) or arrays of them
+        """
+        _, types = parse_signature(function_signature)
+        if types not in (_SINGLE_TYPES, _ARRAY_TYPES):
+            raise ValueError(f"'{function_signature}' must take (address,uint256) or (address[],uint256[])")
+        self.snapshot_path = snapshot_path
+        self.threshold = threshold
+        self.gas_budget = gas_budget
+        self.function_signature = function_signature
+        self.batched_call = types == _ARRAY_TYPES
+        self.curve = curve
+        self._snapshot_stat = None
+        self.published: Dict[str, int] = {}
+        self._refresh()
+
+    def _refresh(self):
+        """Reload the snapshot if another process (a confirm run) rewrote it"""
+        if self.snapshot_path is None:
+            return
+        try:
+            stat = os.stat(self.snapshot_path)
+        except FileNotFoundError:
+            return
+        if (stat.st_mtime_ns, stat.st_size, stat.st_ino) == self._snapshot_stat:
+            return
+        with open(self.snapshot_path, 'r') as f:
+            self.published = {address: int(score) for address, score in json.load(f)['scores'].items()}
+        self._snapshot_stat = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def diff(self, scores: Dict[str, int]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        Select the scores that moved by at least the threshold since the last publish
+
+        Addresses in the snapshot but missing from `scores` are treated as score 0.
+
+        Returns:
+            Tuple (addresses, new_scores, published_scores) of the changed entries
+        """
+        addresses = list(scores) + [a for a in self.published if a not in scores]
+        count = len(addresses)
+        new = np.fromiter(map(scores.get, addresses, repeat(0)), dtype=np.int64, count=count)
+        old = np.fromiter(map(self.published.get, addresses, repeat(0)), dtype=np.int64, count=count)
+
+        change = np.abs(new - old)
+        changed = np.flatnonzero((change > 0) & (change >= self.threshold))
+        return [addresses[i] for i in changed.tolist()], new[changed], old[changed]
+
+    def plan(self, scores: Dict[str, int]) -> List[ScoreBatch]:
+        """
+        Diff `scores` against the snapshot and pack the changes into gas-budgeted batches
+
+        Args:
+            scores: PageRank score per address (credit scores if `curve` is off)
+
+        Raises:
+            ValueError: If a single update does not fit the gas budget
+        """
+        self._refresh()
+        if self.curve and scores:
+            mapped = credit_scores(np.fromiter(scores.values(), dtype=np.int64, count=len(scores)))
+            scores = dict(zip(scores, mapped.tolist()))
+        addresses, new, old = self.diff(scores)
+        if not addresses:
+            return []
+
+        address_rows = address_words(addresses)
+        score_rows = uint256_words(new)
+        storage_gas = sstore_gas(old, new)
+        element_bytes = np.concatenate([address_rows, score_rows], axis=1)
+        nonzero = np.count_nonzero(element_bytes, axis=1)
+        element_calldata_gas = 16 * nonzero + 4 * (element_bytes.shape[1] - nonzero)
+
+        if self.batched_call:
+            # Selector plus two offset and two length words, each bounded by two
+            # non-zero bytes (values below 2**16)
+            selector = np.frombuffer(function_selector(self.function_signature), dtype=np.uint8)
+            header = calldata_gas(selector) + 4 * (2 * 16 + 30 * 4)
+            fixed = TX_BASE_GAS + CALL_OVERHEAD_GAS + header
+            costs = element_calldata_gas + storage_gas + ARRAY_ELEMENT_GAS
+        else:
+            selector = np.frombuffer(function_selector(self.function_signature), dtype=np.uint8)
+            # Every update is its own transaction
+            fixed = 0
+            costs = TX_BASE_GAS + CALL_OVERHEAD_GAS + calldata_gas(selector) + element_calldata_gas + storage_gas
+
+        batches = []
+        for start, end in self._split(costs, fixed):
+            batch_addresses = addresses[start:end]
+            batch_scores = new[start:end].tolist()
+            if self.batched_call:
+                calldata = [encode_call(self.function_signature, [batch_addresses, batch_scores])]
+                payload = np.frombuffer(calldata[0], dtype=np.uint8)
+                gas = (TX_BASE_GAS + CALL_OVERHEAD_GAS + calldata_gas(payload)
+                       + int((storage_gas[start:end] + ARRAY_ELEMENT_GAS).sum()))
+            else:
+                rows = np.concatenate([
+                    np.broadcast_to(selector, (end - start, len(selector))), element_bytes[start:end]
+                ], axis=1)
+                calldata = [row.tobytes() for row in rows]
+                gas = int(costs[start:end].sum())
+            batches.append(ScoreBatch(batch_addresses, batch_scores, calldata, gas))
+        return batches
+
+    def _split(self, costs: np.ndarray, fixed: int) -> List[Tuple[int, int]]:
+        """Greedy [start, end) ranges whose fixed + summed costs stay within the gas budget"""
+        cumulative = np.cumsum(costs)
+        ranges = []
+        start = 0
+        while start < len(costs):
+            spent = int(cumulative[start - 1]) if start else 0
+            end = int(np.searchsorted(cumulative, spent + self.gas_budget - fixed, side='right'))
+            if end == start:
+                raise ValueError(f"A single score update needs more than the {self.gas_budget} gas budget")
+            ranges.append((start, end))
+            start = end
+        return ranges
+
+    def mark_published(self, batches: Sequence[ScoreBatch]):
+        """Record the scores of batches confirmed on-chain in the snapshot"""
+        self._refresh()
+        for batch in batches:
+            self.published.update(zip(batch.addresses, batch.scores))
+        if self.snapshot_path is None:
+            return
+        temporary = self.snapshot_path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump({'function': self.function_signature, 'scores': self.published}, f, indent=2)
+        os.replace(temporary, self.snapshot_path)
+        stat = os.stat(self.snapshot_path)
+        self._snapshot_stat = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def write_batches(batches: Sequence[ScoreBatch], filename: str = DEFAULT_BATCH_FILE):
+    """Save batches (hex calldata per call) for submission; they stay pending until confirmed"""
+    temporary = filename + '.tmp'
+    with open(temporary, 'w') as f:
+        json.dump([batch.to_dict() for batch in batches], f, indent=2)
+    os.replace(temporary, filename)
+
+
+def read_batches(filename: str = DEFAULT_BATCH_FILE) -> List[ScoreBatch]:
+    """Load the pending batches of a batch file (none if it does not exist)"""
+    if not os.path.exists(filename):
+        return []
+    with open(filename, 'r') as f:
+        return [ScoreBatch.from_dict(batch) for batch in json.load(f)]
+
+
+def confirm_batches(publisher: ScorePublisher, filename: str = DEFAULT_BATCH_FILE,
+                    indices: Optional[Sequence[int]] = None) -> List[ScoreBatch]:
+    """
+    Record pending batches as published and remove them from the batch file
+
+    Call this only once the batches' transactions are confirmed on-chain.
+
+    Args:
+        publisher: Publisher whose snapshot receives the scores
+        filename: Batch file written by `write_batches`
+        indices: Positions of the confirmed batches in the file (default: all of them)
+
+    Returns:
+        The confirmed batches
+
+    Raises:
+        ValueError: If an index does not refer to a pending batch
+    """
+    pending = read_batches(filename)
+    selected = set(range(len(pending)) if indices is None else indices)
+    if not selected <= set(range(len(pending))):
+        raise ValueError(f"{filename} holds {len(pending)} pending batches, "
+                         f"no batch {min(selected - set(range(len(pending))))}")
+    confirmed = [batch for i, batch in enumerate(pending) if i in selected]
+    publisher.mark_published(confirmed)
+    write_batches([batch for i, batch in enumerate(pending) if i not in selected], filename)
+    return confirmed
+
+
+def summarize(batches: Sequence[ScoreBatch], total: int) -> str:
+    updates = sum(len(batch.addresses) for batch in batches)
+    gas = sum(batch.gas for batch in batches)
+    return f"{updates} of {total} scores changed: {len(batches)} batches, ~{gas} gas"
+
+
+def main():
+    """Plan, publish or confirm score updates"""
+    options = {
+        'snapshot': DEFAULT_SNAPSHOT,
+        'threshold': str(DEFAULT_THRESHOLD),
+        'gas-budget': str(DEFAULT_GAS_BUDGET),
+        'function': DEFAULT_SIGNATURE,
+        'output': DEFAULT_BATCH_FILE,
+        'curve': 'on',
+    }
+    for arg in [a for a in sys.argv if a.startswith('--') and '=' in a]:
+        name, value = arg[2:].split('=', 1)
+        if name in options:
+            options[name] = value
+            sys.argv.remove(arg)
+
+    if len(sys.argv) < 3:
+        print("Usage: python score_publisher.py <command> <file> [options]")
+        print("Commands:")
+        print("  plan <scores.json> - Show the update batches without writing them")
+        print("  publish <scores.json> - Write the update batches, pending until confirmed")
+        print("  confirm <batches.json> [index ...] - Record batches confirmed on-chain (default: all) "
+              "in the snapshot and remove them from the batch file")
+        print("Options:")
+        print(f"  --snapshot=<file> - Last published scores (default {DEFAULT_SNAPSHOT})")
+        print(f"  --threshold=<n> - Minimum score change to publish (default {DEFAULT_THRESHOLD})")
+        print(f"  --gas-budget=<n> - Maximum estimated gas per batch (default {DEFAULT_GAS_BUDGET})")
+        print(f"  --function=<sig> - Update function (default {DEFAULT_SIGNATURE})")
+        print(f"  --output=<file> - Batch file written by publish (default {DEFAULT_BATCH_FILE})")
+        print("  --curve=off - Publish the input scores as given instead of mapping PageRank "
+              "through the getCreditScore curve")
+        return
+
+    command = sys.argv[1]
+    scores_file = sys.argv[2]
+    try:
+        if command == "confirm":
+            publisher = ScorePublisher(options['snapshot'], function_signature=options['function'])
+            indices = [int(index) for index in sys.argv[3:]] or None
+            confirmed = confirm_batches(publisher, scores_file, indices)
+            updates = sum(len(batch.addresses) for batch in confirmed)
+            print(f"Confirmed {len(confirmed)} batches ({updates} scores); "
+                  f"{len(read_batches(scores_file))} still pending in {scores_file}")
+            return
+
+        with open(scores_file, 'r') as f:
+            scores = json.load(f)
+        if 'pagerank_scores' in scores:
+            scores = scores['pagerank_scores']
+
+        publisher = ScorePublisher(options['snapshot'], int(options['threshold']),
+                                   int(options['gas-budget']), options['function'], options['curve'] != 'off')
+        batches = publisher.plan(scores)
+
+        if command == "plan":
+            print(json.dumps([batch.to_dict() for batch in batches], indent=2))
+            print(summarize(batches, len(scores)))
+        elif command == "publish":
+            write_batches(batches, options['output'])
+            print(summarize(batches, len(scores)))
+            print(f"Batches saved to {options['output']}; "
+                  f"run 'confirm {options['output']}' once they are confirmed on-chain")
+        else:
+            print(f"Unknown command: {command}")
+
+    except FileNotFoundError:
+        print(f"Error: File {scores_file} not found")
+    except json.JSONDecodeError:
+        print(f"Error: Invalid JSON in {scores_file}")
+    except ValueError as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.17;
+
+/*
+ * PageRankLargeGraph.t.sol
+ *
+ * Generated by scripts/differential_verification.py, do not edit by hand:
+ *
+ *     cd packages/foundry/scripts
+ *     python differential_verification.py fixture --generator=powerlaw --edges=1600 --seed=0 --samples=24
+ *
+ * Graph: powerlaw, 1600 attestations (671 re-attested pairs), 197 nodes.
+ * Expected values come from the bit-exact on-chain emulator (scripts/onchain_pagerank.py), so
+ * scores, their total and the iteration count are asserted exactly rather than within the
+ * NetworkX tolerance. Re-attestations add to pagerankOutDegree, so the total stays below
+ * PR_SCALE whenever the graph has any.
+ */
+import "forge-std/Test.sol";
+import "../contracts/DecentralizedMicrocredit.sol";
+
+/// Loads a graph straight into PageRank storage; recordAttestation would recompute
+/// PageRank after every edge.
+contract PageRankGraphHarness is DecentralizedMicrocredit {
+    uint256 constant NODE_BASE = 0x10000;
+
+    constructor() DecentralizedMicrocredit(500, 2000, 10_000e6, address(0xC0FFEE), address(0xC0FFEE)) {}
+
+    /// @param packed 8 bytes per attestation: uint16 attester, uint16 borrower, uint32 weight
+    function loadEdges(bytes memory packed) external {
+        for (uint256 offset = 0; offset < packed.length; offset += 8) {
+            uint256 edge;
+            assembly ("memory-safe") {
+                edge := shr(192, mload(add(add(packed, 32), offset)))
+            }
+            address from = address(uint160(NODE_BASE + (edge >> 48)));
+            address to = address(uint160(NODE_BASE + ((edge >> 32) & 0xffff)));
+            _addPagerankNode(from);
+            _addPagerankNode(to);
+            _addPagerankEdge(from, to, edge & 0xffffffff);
+        }
+    }
+}
+
+contract PageRankLargeGraphTest is Test {
+    PageRankGraphHarness credit;
+
+    uint256 constant NODE_BASE = 0x10000;
+    uint256 constant NODE_COUNT = 197;
+    uint256 constant EXPECTED_ITERATIONS = 3;
+    uint256 constant EXPECTED_TOTAL = 70899;
+
+    bytes constant EDGES =
+        hex"000000010000c26f00020001000f0136000300040009cde800030005000d4026000600070004d23a00080009000ede8a000a000b000e2617000c000d000f141c"
+        hex"000e000f00035362001000110000fbab0012000f00065e780003000e00091cd80013001400046c4e0003000b00002d48000c00150005b6db0003001600016e32"
+        hex"0017000b00021658000e000b000247ee0002000f00093c5600180001000efc78000300190001e1ba0003001a000a2f1a001b001c000839cd001d001e0009c45d"
+        hex"001f000f000d8f97002000210000c2e600220009000a0aa7002300060006a35700240001000e328b001d000a000c27fd002500090007f12b002000090006dfec"
+        hex"00030026000dfe8a0027002800007fe500290009000afe6e0002002a00059072002b002c0006afc3002d002e000074740026002f000a47360015000f000410a6"
+        hex"0030000900080a350015000f000d29f60031000f00001f6a00150032000ac6710020000b000895a2003300010004104500020009000a6678001f0034000864c4"
+        hex"0003000b00091c5d00350021000620330036000b000e00d600020023000ab7490005000b000db22f000300090006c60800150037000cde630003000b000d5127"
+        hex"001800090000287000380007000e260f000200090003caa900030029000d121000200009000e3e4a000300390001f5aa0003000f000762240030000900044e09"
+        hex"0002000900055c65003a001c000dcdb20003000900000e9c001c003b000e51d0001500010006da950003000b000e83f0003c003d0006769e0032000900002e2b"
+        hex"0018002c000273e7003e00090005414e003f000f0001df59001800010006b09e001f0009000abd6e0040004100062022004200070008a585002b000900006fd3"
+        hex"00430044000dd5ba003f00090003bcf000290032000cbdda00450009000e6b700020000f0002688e00460032000ddeed0047004800031b14004900280001fbdc"
+        hex"00030001000f0434000c00090000c25200320009000eb45f004a0001000adc0500030009000ed221001700090002b0470048001a000ab311004b000900048ad6"
+        hex"000300010004b26e00010009000f3e40002d004c0001d00f004d0023000d7993002b0009000daf580002002100025e26004e0032000d1d64004f00500005abd3"
+        hex"000200090006ed1e000e0009000636c700180051000bb069005200090000e7260003003900091759004600090007772b001f0001000696a1000300010002eb7f"
+        hex"00270013000bdde200030008000c77c000430053000861a1003f0054000d89d600550035000cace50003000b000977fc0056000b0002a2090003003900036553"
+        hex"0015000b000a1903001800090007f38b0057000900060beb0058000f00066f56000200010000a36e00020059000e1afe000f001300010aba0002005a000e3edb"
+        hex"000300090002e753000200090008411500310006000248f1005800390003f78f005b001500007b6d0058000b0003cb930002003900016281002000090002fa42"
+        hex"005c005d00022178003c00150006cceb005e0009000689fc0015005f000b07cf000e0039000420d000310018000084e7006000090000df850003000f000ae2cc"
+        hex"002000320003376d006100320004d3860003003a000b91a2004d0032000583ba0020000b0004c02c0062000b000f408e0003000b0008b0ab0015000a0002d54a"
+        hex"0003000b00070e24001d0009000b7a9d000200090008eb7f006300070005f7d30064000b0009ee1700030001000d3f260065000b0003bf6100030009000c3ac9"
+        hex"00200009000843dd0018000b000309fa003f00660005d4b30067000b000027cd00680069000aa47f00020035000f1594000200030002a89400170034000f1e9d"
+        hex"000d000900091096003f006a0003ba6300150023000a3958004000390003cea3001500390007ba5c00030009000bc494006b000b0000e8e000060058000c4626"
+        hex"001b00090000e992005e005d0006b216001a00090003884d006c006d000b2fd4006e000b0006812e0002000a000e92b100030015000a4e37001b000b000c4659"
+        hex"006f000b00094a57000300090006d4670020004e0003345e00610070000d351600580009000ce2a8003000710004ed5800030052000f2b4e002900340000f14a"
+        hex"0029000f0009814d0003000900001ac9007200420004f5fe00300073000c21d700030014000e2de80074000b0003d84700750015000067880031000900063291"
+        hex"00150058000bd82900030028000aa401003a00390000377e000300090000596f003000090002e19b000a00210007da7e00760042000af10b000300070001d984"
+        hex"003f000b000748f6007700780001e89c00030009000119050020002c0008b46f00030007000cc39f000c0001000b26100003000b0001d2790020005200058460"
+        hex"007900090001f6d2002b00090003453c0008002c00032430007a001400072590007b00090005e54a0003000b0006405a00030009000df1330003007c00078a28"
+        hex"00160009000c61f1003c0001000e3fa1003f0009000a6b730003000a0009b980003a0012000efd900015007d0001757500470001000711e3002b00090001e06c"
+        hex"003f007e000cbb260036001500007a77000300520005d7ea0030000900093daa00030009000d877d007e0001000bc95c003f000a00007296007c002900077967"
+        hex"00030029000edb53007f001500063fe3004e002900009459002b000f000d95700006000b0006f946000a00080000730b002c00090008ce1c00800081000ec385"
+        hex"0003005e0001118e000700090009caa00020003700099b410015000b000c998400390001000831b800820009000bbe15002b0083000da5c500180029000d80ef"
+        hex"008400090003d8d600030001000196b0004700680008361e003600090004e22b00850060000e936b0015000b00091f95008500090007dacb0002002c0004789a"
+        hex"00150010000232690020000100090a0a000e0001000f1b210003000b000dbfc30020000b0003f15000030009000a45ac007700320005f0b3008600010000f0e9"
+        hex"00030009000cef9f006300520001e0ed004d00490007617500720054000edac9004c000900057ce80018007c000113300087000f000e81bd00690072000cdae7"
+        hex"003f0009000a9b1300880085000f0e110080000900025d89002b00810002798c00170058000569cc00630047000abe3e0002000b000d584f00090081000c5459"
+        hex"003000080004298100030009000e848e002000090008e5170003000b000cdd58002b008900069e9100180039000b6cd80018000b00058df300310015000bc138"
+        hex"0003000100084e120026000b000bdf8200240009000b5145008a0001000163e9008b000900013f9800300007000527780003000f00067c8f00470009000d0c79"
+        hex"0058000b000e780a005a000a000b426d0029000b00032a6c0006008c000e852d00220009000d34d10015001a000cd6240003008d000022d00020007a0009f306"
+        hex"0088000a0006530f0018000f0008236500310009000c9c440003000a0001a53f000c001a0001cf370002000100069e9c00030009000e466a0017000a000ead9c"
+        hex"00580009000bec4d002b00290000b55400190039000e662300030025000eb6c9008e0009000137830015001800016e550003000900005430003a000f000bae75"
+        hex"00150081000491db001500320001facc00640001000103f70003003e0004d392003f008e000c6a5d0003000f0004ac670003000900094f430004000100056b1b"
+        hex"003600090001fc5800580035000d1a6c00020018000321a0005800320002c29200030009000c475f0047008f000d4bb4006f0009000695f8001d00080005b8ed"
+        hex"000a00390005e08d0003000b000117740002003e000a246200300001000d6646002000290007962e00900009000bb4a1004f00090007d9e5000300660006d2ab"
+        hex"00310009000d8758008e00090009fa6500030014000285c00015000b000a5583006f00370003d6160091000900061a0b00150009000ca5050002000f00085dc9"
+        hex"004d00430003c1370030000900062942002b00090003fdca0002000a00074f0e00030039000cdf5900030039000abb640030000b000996c50003007d0006554d"
+        hex"0078005f0000384a0003003900062a6400180092000a767c00200058000bc6e90002000900014aa7006c006a0004759b0000000f00022f66000c002c000546f3"
+        hex"000300090006f65c001500080006869f0029000b000372660018001400037a0a0003000b00010f4200030093000d4a4d0094000900028fec0003002900061b39"
+        hex"008600090008277c004d000b0005027f0020008d00029c98002b00320000f2de008a00090008ff15002400020003698e00950039000dbdf3004300090009367f"
+        hex"0025000a000005eb000800390000bc55004d00070006c92f00030039000ed23d006c0013000d137c0003007e000f31840018004d0005c8b10020002900022797"
+        hex"00030039000bcaf3002e007d0000c48f0003007c000d02df00030009000667d20015000900006ebd0096006800040e3c000200150004c0bc00620009000285b8"
+        hex"0003001400086a3c00310009000191ec005e0009000a7ddd006f000f0007719400230078000475970030003a000d61120097000c000a6ab20095000f000f0b77"
+        hex"006800670003df29000f000900052b77003c0078000eb6730015000b00060de80029007d0001a23a0002000a0009f77c006800090009ee2f000300090005dc5f"
+        hex"0030000b000c20f9000e0009000dd0e4003a004200031bfe0098000a000c1a4700030018000a346c003c00780009041400200009000ede0b001f000f000a0e1d"
+        hex"008e00210000b82a00300031000ae06300460099000939760029000f000a1576002b0007000a13530002007b00055ae5000200090003a226008e009a00084023"
+        hex"008e0039000802cc0003008900048271009b0009000a02f0001b00240004544f0029005600073d010056001a000a4910002b0009000bb873002b003900068556"
+        hex"0002001c0005a0ce0003000f000cd43a0047004900085cb0004c001500035ba0003a0009000a856f0015009c0003fae40030000b00014d5b00580009000d330b"
+        hex"009d0018000e431300200054000576b90003000b0006b9f50084000a000ed5fc001400300000ef0e00030039000204b900030001000ab39b00000015000d143f"
+        hex"0036007d00067997000a001800086e1500030009000e10950003001900083068003f000a0002aff60012007e000823ad0002001c00058916000300090002c89a"
+        hex"000e0025000ccc4e00030091000bd57c000300280000b8eb0074000b0006287a004d000900070f310020000900098e51000200290006c2ac000200090009ca9d"
+        hex"0015000f000814b80030002a000d3d69002900130000220400150001000e241f00000009000354a4003a000b0008328400580009000a35cc00200015000324f2"
+        hex"003c0039000b3d35003100010008043c0015000f000a45be0002000f000f3ec0000e0039000e481d001f000100047512000a002a00085be70020000800039baf"
+        hex"005800090006eeff008d000f000b4bcc0018000b000a3b03004c001c000d9692000300660008c4b3000500350002faf500210009000e6a1f00020032000ae082"
+        hex"0003000a000cc10b002b0039000e8caa00030001000a95d80054004200089929008b000900056d32009a0009000d8053000a00180006723700290009000a7079"
+        hex"00350001000e9288001d009e000a302000020009000a58490026005f000210360018000f000e4f1a0074000900037417003f006400001285000300130003a91b"
+        hex"0002000b000629240030009f0005ac5d00030001000bf4b5000300080001f305001800010009bf8b009800090002f8ff001f004b000045fa0015007e000c79e3"
+        hex"006f000b000e8e3c002b0008000402b100890009000e19b8006800550000e5940062000b000b81610002000b00029744000300a00005897b000300090003c525"
+        hex"001800280000019d003f000900025a4b0003000700021fda0082009d00050ed00016002900004138001500250004850f003f001c000133130031000f000bf06a"
+        hex"0027000b000ded970003002c0006488d00020052000725c10046000f000b903f0058008000077a0500a10042000aeadf00180013000d2a810020000b00052316"
+        hex"000200850006af4d0002000b0003ce68001d00320005186e0002000a000ebaf70017000a000d6d2f00020001000a0b86003a007d0007b065005800a2000193ef"
+        hex"003c0009000f3d4b00a30009000bb826000300390008dec40003006f0000747000030078000c2b800003001300096c3000290039000997d700030040000d4964"
+        hex"007e00090000f978000300620000ca1700150026000b3247002b00010008875800020039000c62ac0015000b0000f20600020039000b2b4d00020014000c91ac"
+        hex"003200090008cd9f00200009000bcf370020000800054310000a000900024701001b000b000ecb12002c00390005017a00030029000e4ab70030003500042921"
+        hex"00a400090006d74f003800430007828500310089000b549f0003000700081c2800030009000d30be00150039000438fe00320009000dcfb4002b008f000ad698"
+        hex"00a30009000507e6002b005b0002f5d1004300080004d876002b00010000c4ad00470009000e4f4700150029000c5320002d000f0002d3dd0002000900027307"
+        hex"00030009000c2ad20027000a000e8db7003a0009000b41dc002c000b000a5ff100250079000722470031007e00055f8e000300520004a9cc001b009a0003d198"
+        hex"00030009000de22100030000000694a800200009000d156c002000280002e9490003000b0004443b001800230004d246001f00a50000e7ba002000080002ec23"
+        hex"0047000f000c9d650002000100004cf50003006a00011aa5006c007100074818001b008e0000989800180028000b5ab800030009000c17ac001b0039000c67f0"
+        hex"006c007a000382140003000900045c820025000100038ad800150012000cac7a007b000b000f110100880037000b13a10002000b00023307002e000f000ac76d"
+        hex"000300090006e931000300a600071dc10002007b000b4b980046001800081586002900040005162c002b00010001f3b2000200a7000b65d800430006000d13c5"
+        hex"0003000200016ef900020009000a0164007e005c00057f7f001800060005a39b0005000100044716000a001f0006109800360009000cc2710003000b00067bb5"
+        hex"0015000f000933230020000f0006613c003f009d000698b0002b00a800029e4a004d000f000bd2440003000900037fe600a9004a000c7075002d0009000281bf"
+        hex"00030013000b4c1000030008000b08ee0002000f00094be1002000090000b08b00aa001300087caa000300ab000697730082000b000d7e06002b002e0000a8b8"
+        hex"00030008000b2e3d0015007d00023582002000080009531700020009000628a900020009000af2f6002000090003a75300760009000eb5c3002b00390002dbda"
+        hex"008f0001000a8c5b000300580006eea40003000f0005ad7300030032000577b2001b0009000b9b7f000200520002f8430030000b000f33240038009f00044397"
+        hex"00150021000928020002001800022ae2000c0009000106a9002b00a200091a800003006200074131000300130006b01d00a400060003dfd6006e0009000831eb"
+        hex"0033001c000b5212003f00aa0008bf3100030069000a35fb0002002d000d3b4700180008000153700086000900054e55001d0014000cc4d60002004b00088925"
+        hex"0043000b000ad2af0018000a00048e410093000b000a909b001800090004791a009500880001a9bd0003002800061d92006f0015000e79cf0020006900056182"
+        hex"003f000b0001f59a00030028000a7e75005500ac0006582e00030054000674e20058007e000c0cf9003100480000c374006a0001000d774a002b0001000000f9"
+        hex"00620009000b8134002900ad000676b200a5002b0008be5a006f000f000641060008007700096bff001c004e00091851004e009f0001108a0003000100053322"
+        hex"00030091000c1254001f0062000d49560002005e000eb4d70020000900095585000300ae000d6f5300980039000b20c500a0000b000e95890003000900024b7e"
+        hex"002900110008ebad002000090003a4360070002b000c0d47002b000f00062ea2004600100006611e00580001000953b3007500780004240a002000010002b58d"
+        hex"0066000100000e780020001a000beca5000300af000ad3ca008200090004faaa0002000900052e5b0058000b000b7422001d0009000bf50a0003000b000a2123"
+        hex"0003008a000d639200b0001200015e4b001200620001617700030012000a46ea0060000b0003306d00020009000c2f500002000100000a56007400b0000f365e"
+        hex"004300090003ef35002a009500052c3d000300390005d3e9006c003500008c1f002b00080008b367001500090005785b0046003b000c5290004c00090008edb5"
+        hex"00150046000a693300030032000840ca0090001a0004d26d00ac000900007a2d00020009000f0ef3000600a2000079c40003000900007435000800090006b41c"
+        hex"007400090001e52a00030009000d64b9000200340000922b00310078000116e10015000d000b3bf600a4002a000ca89600310009000660df0003000b00082e45"
+        hex"000a00110006c29900030015000d78340003007e000c777d0003004400057024001500b1000a48d8000300b1000c73850055000f000912c00002001500087f5f"
+        hex"000200090008cf8a0015000900026361003d00150004dcbe0015000b0003117a00180001000ad5660002000b000ece800067000a00052c32001500b10004a4c3"
+        hex"0003000b00050bb3002c00090000a992006f005e000036fd001500180006bae90003000100077f13002000320008e49900180009000d6c450040000b000a8be1"
+        hex"006a0009000b5b32001f00090000024b0003000a000d97a9002500090002e3a500980001000e9e0d0003001c0000174d0020002b0009b19f0015000b0003303c"
+        hex"00300001000a5e7e001d000b0009bc4f0003000b000b7487002b00610004a92a00900039000b0814000300820002f78000150009000698400015000a000ba2b1"
+        hex"0020000a0006d5c9001600620008238100180028000941980004000f0009bb470030000900002a6a00180046000c429300020001000d1b4e008a00090003a049"
+        hex"00000015000b5119000300090000e682000300160005485300030042000a1fe200b200130007c6a400200009000c24fb005c0039000558ea00a300150007e643"
+        hex"0002009f000a89f800030001000c5749000300b3000bd3d8007400390005835f00030009000370a500580039000ae99600030023000145f4007a000900080a56"
+        hex"002b00010005fc8e000e00680004ff1600020009000351b000180001000a3b110003003900065679005b000a0001df20004100150009309b00880021000794f9"
+        hex"003f000f000286ab004c0009000a947e000300010003d4b2001b0009000aee85000900320002acca001500b40001d616001300090000d8a20003000f000b57e3"
+        hex"003c004c0002218a000200690001a872003c0036000913030002007d000c2ae00003000900077f0a003c0039000a1501003f003e00079737000300520003a4af"
+        hex"00b50001000db30b000400290008b0cb000e00620000a1320063002b000e08980018001500041ab2004e000c0000c343000700360004a958007a0093000addc8"
+        hex"0002000100063b1d00030008000a563b002c001b0001d41d00200009000986d700140015000dde7c006a000a000999f70029000b00029dab002000620004d454"
+        hex"00470052000cbdfa00470078000057550024004a00046b6a0056000a0005e0cb0030007d000028ab00290009000d20a90029001a0004c555002d00090007f5fa"
+        hex"001500ae0002865d0056002600042acc003f00090008d4e5000300ab0003862e00180032000e62710002007c0007fa9800290090000829ba00860001000c6b4c"
+        hex"00030002000714ac002b00a60000a65400300075000aa2200009000b00014caf002100910003a218000e000f0007570c009e000900029fe50015000b000bce30"
+        hex"007a00090008e420007a0052000a39a0000e001500069605000300090009cf3600200013000005d000020009000c2fbf006d00070003917e0000000100033afa"
+        hex"00b2006300054f6e0002003200086ab70018004e000f2f2500580001000664bb0015000f0003ef170018000b000c690900310042000dde69000300b1000ec10b"
+        hex"001500090002d64600030007000c9b70002b0008000bd8a9000a002300089cf80003000a00072b460002002c000e056400af000b00054ea3003b00620001ae72"
+        hex"0020005000037820000600090008d73f00020028000016d300630009000da195000e0037000dfaed001800080009e93c002c0013000344b30003000f00091b0e"
+        hex"0003000a0002b7aa000200090007bed90024003a00025ef10063000b0001538300240013000d9d18000900210001f0240003000b0006475e00030009000b7d4d"
+        hex"00a000090004c03e001500090003ac850058000a000c3f88003f0001000c34f5003c0009000025f600030049000170800009000b0009885600030009000bc590"
+        hex"002400010009eccd0020000b0006c430003f000f00064563003a000b000c440b001500010001a10d000300290000391b009c0009000c371b00290009000b73fd"
+        hex"0077000b0005a425002900390006468a005c0008000f084f0058000b000ecaf30003000900086fbb000000980003d6800003000b0009b134008a0032000632a2"
+        hex"00240009000e672a008c0009000a26e7003c00280004a8a60002000b000ac51000580013000c5bc600740008000a7efa0047000800047b0600150065000caf69"
+        hex"002c000a000284720010007c000e4bb3002400130008e9e100150035000b06a000b6000a0006e354005a002c0007d59a00a00000000e05270003001c000b6492"
+        hex"000200ad000890b900700009000ef9ae00020009000acdea0003005e00000f76002400090000516c00850001000ba9100000000f00031e06001500a2000699d6"
+        hex"0058000b0000f1cb00030009000a6f30005800390006f5930013004e00034c0b000300090003b5970020000800037db30003007e00093a630020000a000bcaba"
+        hex"0003008e0000ef4d005a000f000b9af4003f007e0008750500180009000a2193000a00090001090700a9002c0000abd20002003900065f53000200150006affd"
+        hex"000300620000a1400002000b000400da00030032000d0123000300230000f153000e0009000ac11d000300070003146b0003004b00099ad9005100090009b048"
+        hex"000300580009ee6f000300090004d13900aa00010009d93b001b0009000d0c75000c0001000493e200580006000ae34a000300090009ff4c005600050003897e"
+        hex"002000390003617100200032000d50770003000b000b2f34000300b30000e4c6002900090004ca5300580037000590510029000800085c29001f000100089baf"
+        hex"00840028000074b4003f000d0008c565002000b0000a93a0000200090001601300020009000632ad0058000b000afe4e003800010009fa470018000b000e77bc"
+        hex"000300090008a10d0003000b000b02db0003003b000ae4710015000100091e620024001c000bc6a80031001500043f70002c00a2000a36e600180078000564bb"
+        hex"0003005000026467000200150000733a003f00090006c84b003f0001000425980002000b00098b54008a00090008fc030018001a00063332002a00690007ec93"
+        hex"00020056000491c60021000b0001e0f3000300390002eb210009000b000544b400030001000adf1400020039000869a9007d004d000953cc001500090008040d"
+        hex"00a6000f000528400055000500021846004e00070002803400200001000cadbc006a00630002b907001800b7000d13bb00030034000256bb008600a9000d18dc"
+        hex"0012002900025ed50003000b0009bf07001100090003cc0100290017000ba3e700770009000e3c5d000200ae000c0e870002001c00052bc90060000f000797db"
+        hex"000a000b000c34db00030009000284c00015004a0004c885006a00290005f979002b009d000d785400150014000a6880001500490006737e008a0009000b4bf4"
+        hex"001800420006bbb60042007e0001b35d0015000a00054c9f004300090001c68000020039000bed790009007400051e5800030058000c8c0a0003000e000eff7a"
+        hex"0002005f0005d2a7007d00320002238a00150058000b5417002b00010000aad30003000100046ef30058000f00031651000300af00069b1400030001000b6007"
+        hex"004e00130006bb22000200ae000e60a10003002f000e6ab6000a00ad0000874400030015000e9b72000300a2000129a50062000f00022afe0020000a000b872c"
+        hex"0065000c00053f30007700090006a274000300b80008332c00030037000242ab000300b90009d2a4003f000b000c795a0015001c00016bf5003500a80001cb5a"
+        hex"002b00090007b40f0058004e0006fd6a002000a2000651ab0043001a00037f5e00250007000c385700240053000d05cb0074000f000f05110020000f0006c55d"
+        hex"00030001000a3ce1005c0032000e63690015007e000d9e0300250039000a4817007c0039000d96810063000900021280004100150004583c0003000b0007582c"
+        hex"000a00620009c9e000030067000cbbad001e003900041348009a000900022291000300ba00077d9c0003000f000bf1e400350032000ed67200250095000f3dd1"
+        hex"0048007d0008bca00043000a0004149b0031002b000c95c6000e000b0002ca6d000300090003d1700045001a0009e2fd0020000f000e420c0003001500019f3f"
+        hex"000e0034000c9e280015000a000c1465000a001900025551000300090002be9e0003006600043936000e00910008b8e9000a0009000cf3600003001500006c3f"
+        hex"00000041000d22c80056000f0002f2590002000a000c136200290081000a9e150071008d00016e0b0063000f00094b2f000300b8000a1a22006d0026000227f4"
+        hex"00150009000dc066008a00780002e6b50018004e000d5c1a003600b8000b34a7009e000f0005ee1f00ba000b000f3db900af00090008b9540015008800040580"
+        hex"00080001000f360300030047000c19de00020013000acf5a001d000b0000dc6c006c000f00013f0f00030054000731910002005a000cc6d300150001000e1a96"
+        hex"002a00370003146b0003000900091e31002d0008000c6eec00150009000554f9001f007300029ba3009d00ad000afa2a00030001000de596000e00bb0008b123"
+        hex"000200090008f770006300390007b464005c000b00025e11000200ba000c6613006a0009000e969d00030008000be5fb002b000b0009d4c5000300ad0006bd15"
+        hex"0002000a000e38c500150088000a352f008e005800097ae30015002a0008fb210029000100013ba5001d0009000527930045000f00030678000200090002bf50"
+        hex"0003000b0008e201000200620008718b000e0009000a57f9008400090004f05b002c00290002376d000a0037000ba728000300090009cd3b003f008a000ce324"
+        hex"001500010009dd1300150008000a116300bc002c000b04c3000300150003fe2c000300070003cd4d0002000900076fce0000003200041a8200020081000e4763"
+        hex"006300090002452f008e00110006927b001800090008d1190007003700046ada0015000f0004d4b1001f000b000c184b000e008900093c7500030050000ea360"
+        hex"00150013000ae8610058000f0008cea700670091000a0d4e00450009000955c9002b000f0008ed120003000f0008dd2700020009000528370003000f00094745"
+        hex"00300001000b1b1e00180009000bd25f002c00090005b8ef0029008700067ea50020000900077e7a001500090007ceaa0003008f000b1841009300800001d674"
+        hex"00030001000a929e000300090007d2c500020013000dcd7f00030039000d0bc3003800bd00064a910003000900014b83001500af000ab48f00030009000dd901"
+        hex"0049000900008e730015000b00021cbe004c0009000a016c007600ae0006edb8000c00090007b8150002000a0008cf74003f00090006f914008200af000ef20a"
+        hex"008e007800045d8c005a0009000a6042000e000900027b15002c001b00091390001500390007d9400003000b0009c329008e002c000b487b00030077000589eb"
+        hex"0045000a000d51b70003000b000ec97f001f00080000239a0031001c000e6dc500030009000400040031003b0004448c004300150005172d000e00140000dc6a"
+        hex"003a00390009e9150047003900035164000300090009a407001a00a00000c83b00150009000dad7d0030000b000d21db00030001000adc1600be001b000570b7"
+        hex"002c00150003ac78002b0009000dae6300580066000a6aa70003000b0007a78d000200090003856c00bf003b0000ebe8000300bb000a42a900030010000d5ab9"
+        hex"00300009000bc52c0074000a00036308008600090007ce02006e000b000b044f009800090003d6d300150041000085880030000b000927cd0006008700005831"
+        hex"00030008000de647000300070005376e002b0091000aea3400020021000854fe0003002b000a9ddd00290009000c845b00150032000dc0e900040015000e959f"
+        hex"001500090005dc5d002c003b0000c4ee005800390003ff98000200620002ec51002b003f0008995d0015007d000935530002009d0008e9710003000b0007d14a"
+        hex"00030039000d44210002008a000701360003000f000cfb1d0003000a000d42f7000300090007c3d400150078000c3eb30002000b0003e6f6000300090006e838"
+        hex"000300b4000a39e800810009000357d60002001c00071e450003000b000074f6003c000a000ad18c000e006000055269002000560002b1dd0046009d000bdede"
+        hex"00ab0009000882410020000900013c130015009d00014b610029000a000bffe8000200bf000cb685000300010002e1a70020002c000ca6b0003a000b000dcc1b"
+        hex"0003000f0002bf6e000300320001e152007e00090002eba10015000f0004e87b00580001000321810003000b0004dd1a000e002a000c3fd900030013000f3911"
+        hex"00030039000c15300018000700057b2b00290039000252f000030001000b5a07002b000b0003b4bd008200ad000540d800630009000e073e001500090007012a"
+        hex"003f00290002cd4d0085000b0009c9bd0002000b000502f90003009d0007cbbb0083006d0009ef2b001e0008000370e100790009000957d7002b001300028c0c"
+        hex"00030063000345e800770009000e66500070000b000bb3ff0050000900092f0400030041000c2bc40006002f0006e89800150016000a62c4001b000f0006867c"
+        hex"00a10037000e5c0c00020015000de3b5009f000f0007a183000300390003979f00030009000a186d002b00b900036093006f004e0000de1e001a0009000ad7e3"
+        hex"002a001a00007d3900aa000900056d98001800090001950a002000090008c418003100290005e81600250001000375d700ba00b8000b613600310013000e2886"
+        hex"00710048000e3a2f002000c0000c96fe00090074000b2fdd00b70001000c833c0003000f00052923004700010000a4c700ba000b000f03020014007d00005192"
+        hex"001e00090006a8270002007e000115c40020000f000c6f0a003f000800054094009900140000dd480002001a0004f594002c000b0000011c0098000a000cfc5b"
+        hex"0003000100060a44007d008b000cda02003f002c000ea15f00a50001000cbce6002d000b00040f8600bd000900075ed30003000900045ca90007002600088751"
+        hex"0017000b000915ec00bd00180006a8b7001d003d00085819001500090005a2ec0031007b00056d530003000900014bb200c10077000cf85f00270002000c3ae7"
+        hex"00150050000b2ef800ac00010008da120047000b000ef65f0015001c0008529200550062000055f900150071000811e900150009000ecfa60003000f000275f3"
+        hex"0063000b0004c30e00030001000ca56b0003000b000107dc002c0009000a50ad004a000b0005e19d000300c20006cfc6009800420004863b0002001c00056953"
+        hex"006e00160004892d000300180001188e0003000a0007b46800780008000d2a5e003000090005e97700030035000983d600030001000eba30002000c3000bac69"
+        hex"0018000f0002298000290021000d295600240039000213110003000900055cb300150008000c9c690003003f0006326300be000b000e638900180009000df793"
+        hex"003a0055000424ea0002000f0001a5da000300320007980b000300290006d4790003000700025c5f002500540009d2fd0081000f0005221d00030032000221c1"
+        hex"000300090007b5e2004e009c00051fd600000028000a01b500bd00010004076200150009000dd53e00180008000e72bf000200090009d8c700af00010000047f"
+        hex"00030015000d9dd1002000320003114d002c00290005bf97008000be000f03140006000b000d4b75000300390004779d00650009000c4f7d0070008200031d91"
+        hex"002b00070008c80e00580092000c7d1b00180014000eda8a0003000a000bd8040015000800063780008000390005f8d40031000100050261000300130006aa10"
+        hex"000e000f00086551001f00500004f80e005b00b400088b9d00300001000cb39d00030042000a2af700990039000272850002000b000b441e000c004d0007dfc8"
+        hex"0025000b0005246a004f001400052788007a002a0007a82f002000ad0000a6e800030009000abbf3002c000b000d9e88000300210003bac20003000b000581af"
+        hex"00030030000c84480030003900080836003600150008cad9000300320005103000150039000c8b130020000a0002b8e300a10060000527c6001d00090007d800"
+        hex"0020003300051ae600c4000900071b920025003900083f76003a0042000b4ebb004700160002a01a000e0014000c238d002b0032000b0b5e009b00a00009d16c"
+        hex"00300039000106a70020000b000137550003003700029f1b000300290003cdfe00970009000dc7c4005900010002b844000300090002f24a000300150000ca0b"
+        hex"003a00090005f8f700020058000b009d001b002900079c8b000300b900050b5900200009000d1635001500580007e2ef00020009000bcb660074000900077ef1"
+        hex"0002002c000af259007b001500069f6c0003000b000a304c00a30032000e2aa8000300090002a3df00020039000831a400970007000389e80003009500021bb3"
+        hex"003b00bf0008147a00030040000162670029009e00087dd10037000f000756f500030039000c3251002000090001b6a7003f00390008cab9001d003200093267"
+        hex"00150029000d70130002005e0007b15000b20009000e00c80003000b000ce7e200480039000967690003004b0009e8a10002001a0005220000460047000ddc53"
+        hex"008800090001287300290001000a11ad00030009000d63500002008a000c82fd0003005200014d4600a700010008903a002b003200011fea00090074000746ac"
+        hex"0071004100031bc700200060000c4406004f000b00078ea30024007e000d2940000a0032000711b10018007800084da000180007000998c900150008000da8d0"
+        hex"0002001c00081589002b000900080c000020000900063f4000020001000ada5e000300090007e39c0001000f00048ac7003000090002ab7400150009000c7d49"
+        hex"003b007e00091fdb002b00090000f5fd0095001c000ad751000300010009ede2000300340004f35700020016000ced4c006e00090002313a007a000f00029757"
+        hex"00150001000f1cb70026001800027064006e000100006a3e0020001a00000153000a00c3000b6ca800b800010005e2db0063001c00090049000300a200050ff1";
+
+    function setUp() public {
+        // The O(n^2) recompute is far above the default block gas limit; only results are checked
+        vm.pauseGasMetering();
+        credit = new PageRankGraphHarness();
+        credit.loadEdges(EDGES);
+    }
+
+    function testLargeGraphExactScores() public {
+        vm.pauseGasMetering();
+        assertEq(credit.computePageRank(), EXPECTED_ITERATIONS, "iterations");
+
+        uint16[24] memory nodes = [
+            uint16(1), 3, 8, 9, 11, 15, 17, 35,
+            51, 58, 93, 115, 116, 124, 129, 154,
+            174, 181, 182, 188, 191, 193, 194, 196
+        ];
+        uint256[24] memory expected = [
+            uint256(3599), 108, 885, 13583, 3477, 4765, 168, 213,
+            108, 116, 148, 118, 1776, 212, 3011, 129,
+            133, 108, 108, 108, 420, 108, 108, 108
+        ];
+        for (uint256 i = 0; i < nodes.length; i++) {
+            address node = address(uint160(NODE_BASE + nodes[i]));
+            assertEq(credit.pagerankScores(node), expected[i], "score mismatch");
+        }
+    }
+
+    function testLargeGraphTotalScore() public {
+        vm.pauseGasMetering();
+        credit.computePageRank();
+
+        (address[] memory allNodes, uint256[] memory allScores) = credit.getAllPageRankScores();
+        assertEq(allNodes.length, NODE_COUNT, "node count");
+        uint256 total = 0;
+        for (uint256 i = 0; i < allScores.length; i++) {
+            total += allScores[i];
+        }
+        assertEq(total, EXPECTED_TOTAL, "total score");
+    }
+}